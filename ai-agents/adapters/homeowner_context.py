@@ -13,6 +13,8 @@ import json
 from supabase import Client, create_client
 from dotenv import load_dotenv
 
+from services.data_loader import get_loader, request_scope
+
 # Load from ROOT env file
 root_env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.env')
 load_dotenv(root_env_path, override=True)
@@ -141,6 +143,9 @@ class HomeownerContextAdapter:
         """Get all bid cards for a homeowner"""
         try:
             result = self.supabase.table("bid_cards").select("*").eq("user_id", user_id).execute()
+            loader = get_loader(self.supabase)
+            for card in result.data or []:
+                loader.prime("bid_cards", card)
             return result.data or []
         except Exception as e:
             logger.error(f"Error getting bid cards: {e}")
@@ -149,9 +154,7 @@ class HomeownerContextAdapter:
     def get_bid_card(self, bid_card_id: str) -> Optional[Dict[str, Any]]:
         """Get specific bid card"""
         try:
-            result = self.supabase.table("bid_cards").select("*").eq("id", bid_card_id).execute()
-            if result.data:
-                return result.data[0]
+            return get_loader(self.supabase).load_many("bid_cards", [bid_card_id])[bid_card_id]
         except Exception as e:
             logger.error(f"Error getting bid card: {e}")
         return None
@@ -160,6 +163,7 @@ class HomeownerContextAdapter:
         """Update bid card (for JAA integration)"""
         try:
             result = self.supabase.table("bid_cards").update(updates).eq("id", bid_card_id).execute()
+            get_loader(self.supabase).clear("bid_cards")
             return bool(result.data)
         except Exception as e:
             logger.error(f"Error updating bid card: {e}")
@@ -168,13 +172,10 @@ class HomeownerContextAdapter:
     def get_contractor_bids(self, bid_card_id: str) -> List[Dict[str, Any]]:
         """Get all bids for a bid card from bid_document JSONB field"""
         try:
-            # Get bid card and extract submitted_bids from bid_document
-            result = self.supabase.table("bid_cards").select("bid_document").eq("id", bid_card_id).execute()
-            if not result or not result.data or not result.data[0]:
-                return []
+            # Get bid card (usually already loaded this request) and extract submitted_bids
+            first_record = get_loader(self.supabase).load_many("bid_cards", [bid_card_id])[bid_card_id]
             
             # CRITICAL NULL CHECK: Ensure bid_document exists before accessing
-            first_record = result.data[0]
             if not first_record or not isinstance(first_record, dict):
                 return []
                 
@@ -375,7 +376,16 @@ class HomeownerContextAdapter:
         Get COMPLETE context for CIA agent with FULL database access
         This is the main method CIA should use to get all context
         """
-        
+        # Bid cards loaded once are reused for their bids and the current bid card
+        with request_scope():
+            return self._build_full_agent_context(user_id, specific_bid_card_id, conversation_id)
+    
+    def _build_full_agent_context(
+        self,
+        user_id: str,
+        specific_bid_card_id: Optional[str],
+        conversation_id: Optional[str]
+    ) -> Dict[str, Any]:
         context = {
             "user_id": user_id,
             "timestamp": datetime.now().isoformat(),
@@ -429,15 +439,12 @@ class HomeownerContextAdapter:
             context["messages"] = self.get_unified_messages(conversation_id)
             context["memory"] = self.get_unified_memory(conversation_id)
             
-            # Get attachments for all messages
-            attachments = {}
-            for msg in context.get("messages", []):
-                msg_id = msg.get("id")
-                if msg_id:
-                    msg_attachments = self.get_message_attachments(msg_id)
-                    if msg_attachments:
-                        attachments[msg_id] = msg_attachments
-            context["attachments"] = attachments
+            # Get attachments for all messages in one query
+            message_ids = [msg["id"] for msg in context.get("messages", []) if msg.get("id")]
+            attachments = get_loader(self.supabase).load_related_many(
+                "unified_message_attachments", "message_id", message_ids
+            ) if message_ids else {}
+            context["attachments"] = {msg_id: atts for msg_id, atts in attachments.items() if atts}
         else:
             # Get all conversations for user
             context["conversations"] = self.get_unified_conversations(user_id)
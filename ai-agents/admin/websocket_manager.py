@@ -1,6 +1,10 @@
 """
 Admin Dashboard WebSocket Manager
 Handles real-time connections for admin clients with authentication and broadcasting
+
+Broadcasts go through the WebSocket backplane: "admin" reaches every worker
+with an admin connection, "admin:{subscription}" only workers holding a
+client with that subscription, "admin-client:{id}" the worker holding it.
 """
 
 import asyncio
@@ -13,6 +17,8 @@ from typing import Optional
 
 from fastapi import WebSocket
 
+from utils.ws_backplane import WebSocketBackplane, admin_channel, admin_client_channel, get_backplane
+
 
 logger = logging.getLogger(__name__)
 
@@ -68,7 +74,8 @@ class AdminWebSocketConnection:
 class AdminWebSocketManager:
     """Manages WebSocket connections for admin dashboard with real-time broadcasting"""
 
-    def __init__(self):
+    def __init__(self, backplane: Optional[WebSocketBackplane] = None):
+        self._backplane = backplane
         self.active_connections: dict[str, AdminWebSocketConnection] = {}
         self.message_queue: list[dict] = []
         self.max_queue_size = 1000
@@ -79,6 +86,11 @@ class AdminWebSocketManager:
         self.messages_sent = 0
         self.connections_total = 0
 
+    @property
+    def backplane(self) -> WebSocketBackplane:
+        """Process-wide backplane unless one was injected"""
+        return self._backplane or get_backplane()
+
     async def connect(self, websocket: WebSocket, client_id: str, admin_user_id: str) -> bool:
         """Register new admin WebSocket connection (already accepted)"""
         try:
@@ -87,6 +99,10 @@ class AdminWebSocketManager:
             self.active_connections[client_id] = connection
             self.connections_total += 1
 
+            backplane = self.backplane
+            await backplane.subscribe(admin_channel(), self._deliver_broadcast)
+            await backplane.subscribe(admin_client_channel(client_id), self._deliver_to_client)
+
             # Send welcome message
             welcome_message = {
                 "type": MessageType.CONNECTION_STATUS.value,
@@ -127,6 +143,13 @@ class AdminWebSocketManager:
             # Remove connection
             del self.active_connections[client_id]
 
+            backplane = self.backplane
+            await backplane.unsubscribe(admin_client_channel(client_id), self._deliver_to_client)
+            for subscription in connection.subscriptions:
+                await self._release_subscription(subscription)
+            if not self.active_connections:
+                await backplane.unsubscribe(admin_channel(), self._deliver_broadcast)
+
             # Broadcast to other admins
             await self.broadcast_to_others({
                 "type": MessageType.CONNECTION_STATUS.value,
@@ -144,7 +167,7 @@ class AdminWebSocketManager:
 
     async def broadcast_message(self, message_type: MessageType, data: dict,
                               target_subscription: Optional[str] = None) -> int:
-        """Broadcast message to all connected admin clients"""
+        """Broadcast message to all connected admin clients (all workers); returns sends on this worker"""
         message = {
             "type": message_type.value,
             "data": data,
@@ -156,6 +179,16 @@ class AdminWebSocketManager:
         if len(self.message_queue) > self.max_queue_size:
             self.message_queue.pop(0)
 
+        return await self.backplane.publish(admin_channel(target_subscription), {"message": message})
+
+    async def broadcast_to_others(self, message: dict, exclude_client: str) -> int:
+        """Broadcast message to all admin clients except one"""
+        return await self.backplane.publish(admin_channel(), {"message": message, "exclude_client": exclude_client})
+
+    async def _deliver_broadcast(self, channel: str, envelope: dict) -> int:
+        """Send a backplane broadcast to the matching connections held by this worker"""
+        target_subscription = channel.partition(":")[2] or None
+        exclude_client = envelope.get("exclude_client")
         sent_count = 0
         failed_connections = []
 
@@ -164,11 +197,14 @@ class AdminWebSocketManager:
             # Check subscription filter
             if target_subscription and target_subscription not in connection.subscriptions:
                 continue
+            if client_id == exclude_client:
+                continue
 
-            success = await connection.send_message(message)
+            success = await connection.send_message(envelope["message"])
             if success:
                 sent_count += 1
-                self.messages_sent += 1
+                if exclude_client is None:
+                    self.messages_sent += 1
             else:
                 failed_connections.append(client_id)
 
@@ -179,31 +215,20 @@ class AdminWebSocketManager:
 
         return sent_count
 
-    async def broadcast_to_others(self, message: dict, exclude_client: str) -> int:
-        """Broadcast message to all admin clients except one"""
-        sent_count = 0
-        failed_connections = []
-
-        for client_id, connection in self.active_connections.items():
-            if client_id == exclude_client:
-                continue
-
-            success = await connection.send_message(message)
-            if success:
-                sent_count += 1
-            else:
-                failed_connections.append(client_id)
-
-        # Clean up failed connections
-        for client_id in failed_connections:
-            await self.disconnect(client_id)
+    async def _deliver_to_client(self, channel: str, envelope: dict) -> int:
+        connection = self.active_connections.get(channel.partition(":")[2])
+        return int(bool(connection) and await connection.send_message(envelope["message"]))
 
-        return sent_count
+    async def _release_subscription(self, subscription: str) -> None:
+        """Stop receiving a subscription channel once no local client wants it"""
+        if not any(subscription in c.subscriptions for c in self.active_connections.values()):
+            await self.backplane.unsubscribe(admin_channel(subscription), self._deliver_broadcast)
 
     async def subscribe_client(self, client_id: str, subscription: str) -> bool:
         """Add subscription filter for client"""
         if client_id in self.active_connections:
             self.active_connections[client_id].subscriptions.add(subscription)
+            await self.backplane.subscribe(admin_channel(subscription), self._deliver_broadcast)
             logger.info(f"Client {client_id} subscribed to {subscription}")
             return True
         return False
@@ -212,22 +237,26 @@ class AdminWebSocketManager:
         """Remove subscription filter for client"""
         if client_id in self.active_connections:
             self.active_connections[client_id].subscriptions.discard(subscription)
+            await self._release_subscription(subscription)
             logger.info(f"Client {client_id} unsubscribed from {subscription}")
             return True
         return False
 
     async def send_to_client(self, client_id: str, message_type: MessageType, data: dict) -> bool:
-        """Send message to specific admin client"""
-        if client_id in self.active_connections:
-            message = {
-                "type": message_type.value,
-                "data": data,
-                "timestamp": datetime.now().isoformat()
-            }
+        """Send message to specific admin client, wherever it is connected"""
+        message = {
+            "type": message_type.value,
+            "data": data,
+            "timestamp": datetime.now().isoformat()
+        }
 
+        if client_id in self.active_connections:
             return await self.active_connections[client_id].send_message(message)
 
-        return False
+        # Held by another worker (if any): forward through the backplane
+        backplane = self.backplane
+        await backplane.publish(admin_client_channel(client_id), {"message": message})
+        return backplane.forwards
 
     async def health_check(self) -> dict:
         """Check health of all connections and clean up stale ones"""
@@ -1,19 +1,58 @@
 """
 Follow-up Automation System
 Intelligent re-engagement of contractors who haven't responded
-Uses Opus 4 to craft personalized follow-up messages
+
+- Contractors and bid cards for a whole batch are prefetched in bulk
+- Personalized messages are generated with one LLM prompt per bid card
+  (up to FOLLOWUP_LLM_BATCH_SIZE contractors), FOLLOWUP_LLM_CONCURRENCY
+  prompts in flight at once
+- Sends run concurrently behind per-channel token buckets and the
+  follow-up logs are written in a single insert
 """
 
+import asyncio
 import json
 import os
+from collections import Counter
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
 from openai import OpenAI
 from dotenv import load_dotenv
 from supabase import create_client
 
+from services.data_loader import get_loader
+from services.outreach_rollups import OutreachRollups, outreach_rollups_enabled, summarize_followups
+from utils.rate_limiter import AsyncTokenBucket
+
+
+FOLLOWUP_LLM_MODEL = os.getenv("FOLLOWUP_LLM_MODEL", "gpt-4o")
+FOLLOWUP_LLM_CONCURRENCY = int(os.getenv("FOLLOWUP_LLM_CONCURRENCY", "4"))
+FOLLOWUP_LLM_BATCH_SIZE = int(os.getenv("FOLLOWUP_LLM_BATCH_SIZE", "8"))
+FOLLOWUP_SEND_CONCURRENCY = int(os.getenv("FOLLOWUP_SEND_CONCURRENCY", "10"))
+
+# Sends per second (and burst) per channel, shared by every campaign in the process
+CHANNEL_RATE_LIMITS = {
+    "email": (float(os.getenv("FOLLOWUP_EMAIL_QPS", "10")), float(os.getenv("FOLLOWUP_EMAIL_BURST", "20"))),
+    "sms": (float(os.getenv("FOLLOWUP_SMS_QPS", "1")), float(os.getenv("FOLLOWUP_SMS_BURST", "3"))),
+    "website_form": (float(os.getenv("FOLLOWUP_FORM_QPS", "0.5")), float(os.getenv("FOLLOWUP_FORM_BURST", "2"))),
+}
+
+# Generated content is keyed by format, not by channel name
+CONTENT_KEYS = {"email": "email", "sms": "sms", "website_form": "form"}
+
+_channel_limiters: dict[str, AsyncTokenBucket] = {}
+
+
+def get_channel_rate_limiter(channel: str) -> AsyncTokenBucket:
+    """Process-wide limiter for one follow-up channel"""
+    limiter = _channel_limiters.get(channel)
+    if limiter is None:
+        rate, burst = CHANNEL_RATE_LIMITS.get(channel, CHANNEL_RATE_LIMITS["email"])
+        limiter = _channel_limiters[channel] = AsyncTokenBucket(rate=rate, capacity=burst)
+    return limiter
+
 
 class FollowUpStrategy(Enum):
     """Follow-up strategies based on contractor behavior"""
@@ -22,7 +61,7 @@ class FollowUpStrategy(Enum):
     URGENCY = "urgency"                      # Project starting soon
     FINAL_CHANCE = "final_chance"           # Last attempt
     DIFFERENT_CHANNEL = "different_channel"  # Try SMS if email failed
-    PERSONALIZED = "personalized"           # Opus 4 crafted message
+    PERSONALIZED = "personalized"           # LLM crafted message
 
 
 class FollowUpAutomation:
@@ -33,10 +72,12 @@ class FollowUpAutomation:
         load_dotenv(override=True)
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_ANON_KEY")
-        self.anthropic_key = os.getenv("OPENAI_API_KEY")
+        self.openai_key = os.getenv("OPENAI_API_KEY")
 
         self.supabase = create_client(self.supabase_url, self.supabase_key)
-        self.anthropic = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai = OpenAI(api_key=self.openai_key)
+        self.rollups = OutreachRollups(self.supabase)
+        self.use_rollups = outreach_rollups_enabled()
 
         # Import dependencies
         self._bid_tracker = None
@@ -76,6 +117,9 @@ class FollowUpAutomation:
         """
         Run automated follow-up campaign
 
+        Synchronous wrapper around run_followup_campaign_async for scripts
+        and schedulers; call the async version from inside an event loop.
+
         Args:
             days_since_sent: Days to wait before first follow-up
             max_follow_ups: Maximum follow-ups per contractor
@@ -84,12 +128,20 @@ class FollowUpAutomation:
         Returns:
             Campaign results
         """
+        return asyncio.run(self.run_followup_campaign_async(days_since_sent, max_follow_ups, batch_size))
+
+    async def run_followup_campaign_async(self,
+                                          days_since_sent: int = 3,
+                                          max_follow_ups: int = 2,
+                                          batch_size: int = 20) -> dict[str, Any]:
+        """Run automated follow-up campaign (see run_followup_campaign)"""
         try:
             print("\n[FollowUp] RUNNING FOLLOW-UP CAMPAIGN")
             print("=" * 60)
 
             # Get candidates for follow-up
-            candidates_result = self.bid_tracker.get_follow_up_candidates(
+            candidates_result = await asyncio.to_thread(
+                self.bid_tracker.get_follow_up_candidates,
                 days_since_sent=days_since_sent,
                 max_follow_ups=max_follow_ups
             )
@@ -105,7 +157,16 @@ class FollowUpAutomation:
             candidates = candidates_result["candidates"][:batch_size]
             print(f"[FollowUp] Found {len(candidates)} contractors for follow-up")
 
-            # Process each candidate
+            plans = self._plan_followups(candidates)
+            contents = await self._generate_contents(plans)
+
+            send_limit = asyncio.Semaphore(FOLLOWUP_SEND_CONCURRENCY)
+            outcomes = await asyncio.gather(*(
+                self._send_planned_followup(plan, contents[plan["candidate"]["distribution_id"]], send_limit)
+                for plan in plans
+            ))
+            self._log_followups([log_entry for _, log_entry in outcomes if log_entry])
+
             results = {
                 "total_processed": 0,
                 "follow_ups_sent": 0,
@@ -113,8 +174,7 @@ class FollowUpAutomation:
                 "contractors": []
             }
 
-            for candidate in candidates:
-                result = self._process_followup(candidate)
+            for result, _ in outcomes:
                 results["contractors"].append(result)
                 results["total_processed"] += 1
 
@@ -138,74 +198,192 @@ class FollowUpAutomation:
             print(f"[FollowUp ERROR] Campaign failed: {e}")
             return {"success": False, "error": str(e)}
 
-    def _process_followup(self, candidate: dict[str, Any]) -> dict[str, Any]:
-        """Process follow-up for a single contractor"""
+    def _plan_followups(self, candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Strategy, contractor and bid card per candidate, rows fetched in bulk"""
+        loader = get_loader(self.supabase)
+        contractors = loader.load_many("potential_contractors", [c["contractor_id"] for c in candidates])
+        bid_cards = loader.load_many("bid_cards", [c["bid_card_id"] for c in candidates])
+
+        return [
+            {
+                "candidate": candidate,
+                "strategy": self._determine_strategy(candidate),
+                "contractor": contractors.get(candidate["contractor_id"]) or {},
+                "bid_card": bid_cards.get(candidate["bid_card_id"]) or {},
+            }
+            for candidate in candidates
+        ]
+
+    async def _generate_contents(self, plans: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Follow-up content per distribution_id
+
+        Personalized candidates are grouped per bid card so the project is
+        described once per prompt; a value is an Exception when no content
+        could be produced for that candidate.
+        """
+        contents: dict[str, Any] = {}
+        personalized: dict[str, list[dict[str, Any]]] = {}
+
+        for plan in plans:
+            distribution_id = plan["candidate"]["distribution_id"]
+            if plan["strategy"] == FollowUpStrategy.PERSONALIZED and plan["contractor"] and plan["bid_card"]:
+                personalized.setdefault(plan["bid_card"]["id"], []).append(plan)
+                continue
+            contents[distribution_id] = self._template_or_error(plan, plan["strategy"])
+
+        batches = [
+            group[start:start + FOLLOWUP_LLM_BATCH_SIZE]
+            for group in personalized.values()
+            for start in range(0, len(group), FOLLOWUP_LLM_BATCH_SIZE)
+        ]
+        llm_limit = asyncio.Semaphore(FOLLOWUP_LLM_CONCURRENCY)
+        for generated in await asyncio.gather(*(self._generate_personalized_batch(batch, llm_limit) for batch in batches)):
+            contents.update(generated)
+        return contents
+
+    def _template_or_error(self, plan: dict[str, Any], strategy: FollowUpStrategy) -> Any:
         try:
-            contractor_id = candidate["contractor_id"]
-            company_name = candidate["company_name"]
+            return self._generate_template_followup(plan["contractor"], plan["bid_card"], plan["candidate"], strategy)
+        except Exception as e:
+            return e
+
+    async def _generate_personalized_batch(self,
+                                           plans: list[dict[str, Any]],
+                                           limit: asyncio.Semaphore) -> dict[str, Any]:
+        """Personalized follow-ups for several contractors on one bid card in a single LLM call"""
+        bid_card = plans[0]["bid_card"]
+        messages: Any = {}
+        try:
+            prompt = self._personalized_prompt(bid_card, plans)
+            async with limit:
+                content = await asyncio.to_thread(self._complete, prompt, 400 * len(plans))
+            messages = json.loads(content)
+            print(f"  [LLM] Generated {len(plans)} personalized follow-ups for bid card {bid_card['id']}")
+        except Exception as e:
+            print(f"  [LLM ERROR] {e}")
+
+        results = {}
+        for plan in plans:
+            distribution_id = plan["candidate"]["distribution_id"]
+            message = messages.get(distribution_id) if isinstance(messages, dict) else None
+            if isinstance(message, dict) and all(message.get(key) for key in ("email", "sms", "form")):
+                results[distribution_id] = message
+            else:
+                # Fallback to template
+                results[distribution_id] = self._template_or_error(plan, FollowUpStrategy.VALUE_PROPOSITION)
+        return results
+
+    def _personalized_prompt(self, bid_card: dict[str, Any], plans: list[dict[str, Any]]) -> str:
+        bid_document = bid_card.get("bid_document") or {}
+        budget = bid_document.get("budget_information") or {}
+        location = bid_card.get("location") or {}
+        contractors = "\n\n".join(
+            f"""ID: {plan['candidate']['distribution_id']}
+- Company: {plan['contractor']['company_name']}
+- Type: {plan['contractor'].get('contractor_type', 'General Contractor')}
+- Location: {plan['contractor'].get('city', '')}, {plan['contractor'].get('state', '')}
+- Match Score: {plan['candidate']['match_score']}/100
+- Days Since Contact: {plan['candidate']['days_since_sent']}
+- Previous Method: {plan['candidate']['last_method']}"""
+            for plan in plans
+        )
+
+        return f"""You are crafting follow-up messages to contractors who haven't responded to a project opportunity.
 
-            print(f"\n[FollowUp] Processing: {company_name}")
+Project Details:
+- Type: {bid_card.get('project_type', 'Unknown')}
+- Location: {location.get('city', '')}, {location.get('state', '')}
+- Budget: ${budget.get('budget_min') or 0:,} - ${budget.get('budget_max') or 0:,}
+- Timeline: {(bid_document.get('timeline') or {}).get('urgency_level', 'Flexible')}
+- Customer Notes: {((bid_document.get('project_overview') or {}).get('description') or '')[:200]}
 
-            # Determine follow-up strategy
-            strategy = self._determine_strategy(candidate)
-            print(f"  Strategy: {strategy.value}")
+Contractors:
 
-            # Get contractor and bid details
-            contractor = self._get_contractor_details(contractor_id)
-            bid_card = self._get_bid_card_details(candidate["bid_card_id"])
+{contractors}
 
-            # Generate follow-up content based on strategy
-            if strategy == FollowUpStrategy.PERSONALIZED:
-                # Use Opus 4 for intelligent personalization
-                content = self._generate_opus4_followup(contractor, bid_card, candidate)
-            else:
-                # Use template-based approach
-                content = self._generate_template_followup(contractor, bid_card, candidate, strategy)
+For each contractor generate a personalized follow-up that:
+1. References something specific about their company (use company name creatively)
+2. Highlights why this project is perfect for them
+3. Creates urgency without being pushy
+4. Mentions the homeowner is ready to move forward
+5. Includes a clear call-to-action
 
-            # Determine channel
-            channel = self._determine_channel(candidate, contractor)
+Provide each message in three formats:
+1. Email (professional but friendly, 150 words max)
+2. SMS (casual and urgent, 140 characters max)
+3. Form message (brief and to the point, 100 words max)
 
-            # Send follow-up
-            success = False
-            if channel == "email" and contractor.get("primary_email"):
-                success = self._send_email_followup(contractor, content["email"])
-            elif channel == "sms" and contractor.get("phone"):
-                success = self._send_sms_followup(contractor, content["sms"])
-            elif channel == "website_form" and contractor.get("website"):
-                success = self._send_form_followup(contractor, content["form"])
+Respond with a JSON object keyed by contractor ID, each value an object with keys: email, sms, form"""
+
+    def _complete(self, prompt: str, max_tokens: int) -> str:
+        """Blocking chat completion returning a JSON object string"""
+        response = self.openai.chat.completions.create(
+            model=FOLLOWUP_LLM_MODEL,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+
+    async def _send_planned_followup(self,
+                                     plan: dict[str, Any],
+                                     content: Any,
+                                     limit: asyncio.Semaphore) -> tuple[dict[str, Any], Optional[dict[str, Any]]]:
+        """Send one follow-up; returns the contractor result and its log entry (None on failure)"""
+        candidate = plan["candidate"]
+        contractor = plan["contractor"]
+        strategy = plan["strategy"]
+        contractor_id = candidate["contractor_id"]
+        company_name = candidate["company_name"]
 
-            if success:
-                # Record follow-up
-                self.bid_tracker.record_follow_up(candidate["distribution_id"], channel)
+        try:
+            if isinstance(content, Exception):
+                raise content
 
-                # Log follow-up details
-                self._log_followup(candidate, strategy, channel, content)
+            channel = self._determine_channel(candidate, contractor)
+            send, address_field = {
+                "email": (self._send_email_followup, "primary_email"),
+                "sms": (self._send_sms_followup, "phone"),
+                "website_form": (self._send_form_followup, "website"),
+            }[channel]
 
-                print(f"  ✓ Follow-up sent via {channel}")
+            success = False
+            if contractor.get(address_field):
+                await get_channel_rate_limiter(channel).acquire()
+                async with limit:
+                    success = await asyncio.to_thread(send, contractor, content[CONTENT_KEYS[channel]])
 
-                return {
-                    "success": True,
-                    "contractor_id": contractor_id,
-                    "company_name": company_name,
-                    "strategy": strategy.value,
-                    "channel": channel
-                }
-            else:
-                print("  ✗ Failed to send follow-up")
+            if not success:
+                print(f"  ✗ Failed to send follow-up to {company_name}")
                 return {
                     "success": False,
                     "contractor_id": contractor_id,
                     "company_name": company_name,
                     "error": "Failed to send"
-                }
+                }, None
+
+            # Record follow-up
+            await asyncio.to_thread(
+                self.bid_tracker.record_follow_up, candidate["distribution_id"], channel
+            )
+            print(f"  ✓ Follow-up sent to {company_name} via {channel} ({strategy.value})")
+
+            return {
+                "success": True,
+                "contractor_id": contractor_id,
+                "company_name": company_name,
+                "strategy": strategy.value,
+                "channel": channel
+            }, self._log_entry(candidate, strategy, channel, content)
 
         except Exception as e:
-            print(f"  ✗ Error: {e}")
+            print(f"  ✗ Error for {company_name}: {e}")
             return {
                 "success": False,
-                "contractor_id": candidate["contractor_id"],
+                "contractor_id": contractor_id,
                 "error": str(e)
-            }
+            }, None
 
     def _determine_strategy(self, candidate: dict[str, Any]) -> FollowUpStrategy:
         """Determine best follow-up strategy based on contractor behavior"""
@@ -234,73 +412,6 @@ class FollowUpAutomation:
             # Final attempt
             return FollowUpStrategy.FINAL_CHANCE
 
-    def _generate_opus4_followup(self,
-                               contractor: dict[str, Any],
-                               bid_card: dict[str, Any],
-                               candidate: dict[str, Any]) -> dict[str, str]:
-        """Use Claude Opus 4 to generate intelligent follow-up"""
-        try:
-            # Prepare context for Opus 4
-            prompt = f"""You are crafting a follow-up message to a contractor who hasn't responded to a project opportunity.
-
-Contractor Details:
-- Company: {contractor['company_name']}
-- Type: {contractor.get('contractor_type', 'General Contractor')}
-- Location: {contractor.get('city', '')}, {contractor.get('state', '')}
-- Match Score: {candidate['match_score']}/100
-- Days Since Contact: {candidate['days_since_sent']}
-- Previous Method: {candidate['last_method']}
-
-Project Details:
-- Type: {bid_card.get('project_type', 'Unknown')}
-- Location: {bid_card.get('location', {}).get('city', '')}, {bid_card.get('location', {}).get('state', '')}
-- Budget: ${bid_card.get('bid_document', {}).get('budget_information', {}).get('budget_min', 0):,} - ${bid_card.get('bid_document', {}).get('budget_information', {}).get('budget_max', 0):,}
-- Timeline: {bid_card.get('bid_document', {}).get('timeline', {}).get('urgency_level', 'Flexible')}
-- Customer Notes: {bid_card.get('bid_document', {}).get('project_overview', {}).get('description', '')[:200]}
-
-Generate a personalized follow-up that:
-1. References something specific about their company (use company name creatively)
-2. Highlights why this project is perfect for them
-3. Creates urgency without being pushy
-4. Mentions the homeowner is ready to move forward
-5. Includes a clear call-to-action
-
-Provide the message in three formats:
-1. Email (professional but friendly, 150 words max)
-2. SMS (casual and urgent, 140 characters max)
-3. Form message (brief and to the point, 100 words max)
-
-Format as JSON with keys: email, sms, form"""
-
-            # Call Opus 4
-            response = self.openai.chat.completions.create(
-                model="claude-opus-4-20250514",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            # Parse response
-            content = response.choices[0].message.content
-
-            # Try to parse as JSON
-            try:
-                messages = json.loads(content)
-            except:
-                # Fallback parsing
-                messages = {
-                    "email": content.split("Email:")[1].split("SMS:")[0].strip() if "Email:" in content else content[:500],
-                    "sms": content.split("SMS:")[1].split("Form:")[0].strip() if "SMS:" in content else f"Still interested in the {bid_card.get('project_type', 'project')}? Customer ready to hire: instabids.com/bid/{bid_card['id'][:8]}",
-                    "form": content.split("Form:")[1].strip() if "Form:" in content else f"Following up on {bid_card.get('project_type', 'project')} opportunity. Customer ready to review bids."
-                }
-
-            print("  [Opus 4] Generated personalized follow-up")
-            return messages
-
-        except Exception as e:
-            print(f"  [Opus 4 ERROR] {e}")
-            # Fallback to template
-            return self._generate_template_followup(contractor, bid_card, candidate, FollowUpStrategy.VALUE_PROPOSITION)
-
     def _generate_template_followup(self,
                                   contractor: dict[str, Any],
                                   bid_card: dict[str, Any],
@@ -459,80 +570,71 @@ Instabids Team""",
         except Exception:
             return False
 
-    def _get_contractor_details(self, contractor_id: str) -> dict[str, Any]:
-        """Get contractor details"""
-        try:
-            result = self.supabase.table("potential_contractors").select("*").eq(
-                "id", contractor_id
-            ).limit(1).execute()
-            return result.data[0] if result.data else {}
-        except Exception:
-            return {}
+    def _log_entry(self,
+                   candidate: dict[str, Any],
+                   strategy: FollowUpStrategy,
+                   channel: str,
+                   content: dict[str, str]) -> dict[str, Any]:
+        """followup_logs row for a sent follow-up"""
+        return {
+            "distribution_id": candidate["distribution_id"],
+            "contractor_id": candidate["contractor_id"],
+            "bid_card_id": candidate["bid_card_id"],
+            "strategy": strategy.value,
+            "channel": channel,
+            "follow_up_number": candidate["follow_up_count"] + 1,
+            "content_preview": content.get(CONTENT_KEYS.get(channel, channel), "")[:100],
+            "created_at": datetime.now().isoformat()
+        }
 
-    def _get_bid_card_details(self, bid_card_id: str) -> dict[str, Any]:
-        """Get bid card details"""
-        try:
-            result = self.supabase.table("bid_cards").select("*").eq(
-                "id", bid_card_id
-            ).limit(1).execute()
-            return result.data[0] if result.data else {}
-        except Exception:
-            return {}
-
-    def _log_followup(self,
-                     candidate: dict[str, Any],
-                     strategy: FollowUpStrategy,
-                     channel: str,
-                     content: dict[str, str]):
-        """Log follow-up details for analysis"""
+    def _log_followups(self, log_entries: list[dict[str, Any]]):
+        """Log a campaign's follow-ups for analysis in one insert"""
+        if not log_entries:
+            return
         try:
-            log_entry = {
-                "distribution_id": candidate["distribution_id"],
-                "contractor_id": candidate["contractor_id"],
-                "bid_card_id": candidate["bid_card_id"],
-                "strategy": strategy.value,
-                "channel": channel,
-                "follow_up_number": candidate["follow_up_count"] + 1,
-                "content_preview": content.get(channel, "")[:100],
-                "created_at": datetime.now().isoformat()
-            }
-
-            self.supabase.table("followup_logs").insert(log_entry).execute()
-
+            self.supabase.table("followup_logs").insert(log_entries).execute()
         except Exception as e:
             print(f"[FollowUp ERROR] Failed to log: {e}")
+            return
+
+        buckets = Counter((entry["created_at"][:10], entry["strategy"], entry["channel"]) for entry in log_entries)
+        for (day, strategy, channel), count in buckets.items():
+            self.rollups.record_followup(day, strategy, channel, count)
 
     def get_followup_analytics(self, days_back: int = 30) -> dict[str, Any]:
-        """Get analytics on follow-up effectiveness"""
+        """
+        Get analytics on follow-up effectiveness
+
+        With rollups the period starts at the beginning of the (UTC) day
+        days_back days ago rather than at the exact timestamp.
+        """
         try:
-            since_date = (datetime.now() - timedelta(days=days_back)).isoformat()
-
-            # Get follow-up logs
-            logs_result = self.supabase.table("followup_logs").select("*").gte(
-                "created_at", since_date
-            ).execute()
-
-            logs = logs_result.data if logs_result.data else []
-
-            # Analyze by strategy
-            strategy_stats = {}
-            for log in logs:
-                strategy = log["strategy"]
-                if strategy not in strategy_stats:
-                    strategy_stats[strategy] = {
-                        "count": 0,
-                        "responses": 0,
-                        "conversions": 0
-                    }
-                strategy_stats[strategy]["count"] += 1
+            since = datetime.now() - timedelta(days=days_back)
+
+            stats = None
+            if self.use_rollups:
+                try:
+                    buckets = self.rollups.fetch_followups(since)
+                    # No buckets may just mean the window predates the backfill
+                    stats = summarize_followups(buckets) if buckets else None
+                except Exception as e:
+                    print(f"[FollowUp] Rollups unavailable, scanning logs: {e}")
+
+            if stats is None:
+                # Get follow-up logs
+                logs_result = self.supabase.table("followup_logs").select("strategy").gte(
+                    "created_at", since.isoformat()
+                ).execute()
+                stats = self._followup_stats_from_logs(logs_result.data if logs_result.data else [])
 
             # Get response data for these follow-ups
             # This would need to join with response data
 
+            strategy_stats = stats["by_strategy"]
             return {
                 "success": True,
                 "period_days": days_back,
-                "total_followups": len(logs),
+                "total_followups": stats["total_followups"],
                 "by_strategy": strategy_stats,
                 "most_effective_strategy": max(
                     strategy_stats.items(),
@@ -544,6 +646,21 @@ Instabids Team""",
             print(f"[FollowUp ERROR] Failed to get analytics: {e}")
             return {"success": False, "error": str(e)}
 
+    @staticmethod
+    def _followup_stats_from_logs(logs: list[dict[str, Any]]) -> dict[str, Any]:
+        """Analyze follow-up logs by strategy (fallback when rollups are unavailable)"""
+        strategy_stats = {}
+        for log in logs:
+            strategy = log["strategy"]
+            if strategy not in strategy_stats:
+                strategy_stats[strategy] = {
+                    "count": 0,
+                    "responses": 0,
+                    "conversions": 0
+                }
+            strategy_stats[strategy]["count"] += 1
+        return {"total_followups": len(logs), "by_strategy": strategy_stats}
+
 
 # Create required tables
 CREATE_TABLES_SQL = """
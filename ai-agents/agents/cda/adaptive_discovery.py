@@ -1,22 +1,104 @@
 """
 Adaptive Discovery System with Radius Expansion
 Automatically expands search radius when insufficient contractors found
+
+Each expansion stage only pays for the new ring:
+- Stages are planned as rings (inner radius -> outer radius) with the ZIPs
+  that ring adds; a ring that adds no new ZIPs is skipped. The (blocking)
+  ZIP lookups run off the event loop and the plan is cached per center ZIP
+- Discovery functions that accept `ring` / `exclude_place_ids` are told what
+  is already covered so they can skip re-enriching inner-area places
+- Results are de-duplicated on stable identifiers (place_id, phone, website
+  domain) as well as company name
+- With an `on_results` scorer, the next ring starts speculatively while the
+  current ring is being scored, and is cancelled if scoring fills the target
 """
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional
-from agents.cda.geocoding_service import GeocodingService
+import inspect
+import re
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Set, Callable, Awaitable
+
+from services.api_response_cache import normalize_domain
 
 logger = logging.getLogger(__name__)
 
+# Shared hosts that say nothing about which business a listing belongs to
+_SHARED_DOMAINS = {
+    "facebook.com", "instagram.com", "yelp.com", "google.com", "business.site",
+    "linktr.ee", "angi.com", "homeadvisor.com", "thumbtack.com", "nextdoor.com",
+}
+
+_RING_KWARGS = ("ring", "exclude_place_ids")
+
+
+@dataclass
+class ExpansionRing:
+    """One expansion stage: the annulus between the previous radius and this one"""
+    stage: int
+    inner_radius: float
+    outer_radius: float
+    description: str
+    new_zips: Optional[List[str]] = None  # None when ZIP coverage is unknown
+
+    @property
+    def area_ratio(self) -> float:
+        """Area of this ring relative to the full disc at outer_radius"""
+        return 1 - (self.inner_radius / self.outer_radius) ** 2 if self.outer_radius else 1.0
+
+
+def contractor_identifiers(contractor: Dict[str, Any]) -> Set[str]:
+    """Stable identities for de-duplication: place id, phone, website domain, name"""
+    identifiers = set()
+    place_id = contractor.get("place_id") or contractor.get("google_place_id")
+    if place_id:
+        identifiers.add(f"place:{place_id}")
+    digits = re.sub(r"\D", "", str(contractor.get("phone") or ""))
+    if len(digits) >= 10:
+        identifiers.add(f"phone:{digits[-10:]}")
+    domain = normalize_domain(contractor.get("website"))
+    if domain and domain not in _SHARED_DOMAINS:
+        identifiers.add(f"domain:{domain}")
+    name = str(contractor.get("company_name") or contractor.get("name") or "").lower().strip()
+    if name:
+        identifiers.add(f"name:{name}")
+    return identifiers
+
+
+class SeenContractors:
+    """Identifiers of every contractor accepted so far"""
+
+    def __init__(self):
+        self._identifiers: Set[str] = set()
+        self.place_ids: Set[str] = set()
+
+    def add_new(self, contractors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return only contractors not seen before (by any identifier) and remember them"""
+        unique = []
+        for contractor in contractors:
+            identifiers = contractor_identifiers(contractor)
+            if not identifiers or identifiers & self._identifiers:
+                continue
+            self._identifiers |= identifiers
+            place_id = contractor.get("place_id") or contractor.get("google_place_id")
+            if place_id:
+                self.place_ids.add(place_id)
+            unique.append(contractor)
+        return unique
+
 
 class AdaptiveDiscoverySystem:
     """
     Implements multi-stage geographic expansion for contractor discovery
     """
     
-    def __init__(self):
-        self.geocoder = GeocodingService()
+    def __init__(self, geocoder=None):
+        if geocoder is None:
+            from agents.cda.geocoding_service import GeocodingService
+            geocoder = GeocodingService()
+        self.geocoder = geocoder
+        self._ring_plans: Dict[str, List[ExpansionRing]] = {}
         self.expansion_stages = [
             {"radius": 15, "description": "Initial 15-mile radius"},
             {"radius": 25, "description": "Expanded 25-mile radius"},
@@ -26,11 +108,37 @@ class AdaptiveDiscoverySystem:
         ]
         logger.info("[AdaptiveDiscovery] Initialized with 5-stage expansion")
     
+    def plan_rings(self, center_zip: Optional[str]) -> List[ExpansionRing]:
+        """Split the expansion stages into rings, each with only the ZIPs it adds"""
+        if center_zip and center_zip in self._ring_plans:
+            return self._ring_plans[center_zip]
+        rings = []
+        covered: Set[str] = set()
+        inner = 0
+        for stage_num, stage in enumerate(self.expansion_stages, 1):
+            new_zips = None
+            if center_zip:
+                zips = set(self.geocoder.get_nearby_zips(center_zip, stage["radius"]))
+                new_zips = sorted(zips - covered)
+                covered |= zips
+            rings.append(ExpansionRing(
+                stage=stage_num,
+                inner_radius=inner,
+                outer_radius=stage["radius"],
+                description=stage["description"],
+                new_zips=new_zips
+            ))
+            inner = stage["radius"]
+        if center_zip:
+            self._ring_plans[center_zip] = rings
+        return rings
+    
     async def discover_with_expansion(self,
                                      discovery_function,
                                      location: Dict[str, str],
                                      target_count: int,
                                      min_acceptable: int = None,
+                                     on_results: Optional[Callable[[List[Dict[str, Any]]], Awaitable[Optional[int]]]] = None,
                                      **kwargs) -> Dict[str, Any]:
         """
         Discover contractors with automatic radius expansion
@@ -40,6 +148,9 @@ class AdaptiveDiscoverySystem:
             location: Location dict with zip, city, state
             target_count: Number of contractors needed
             min_acceptable: Minimum acceptable (default: 50% of target)
+            on_results: Optional scorer for each ring's new contractors; returns
+                how many it accepted (None = all). While it runs, the next
+                ring is already being discovered.
             **kwargs: Additional args for discovery function
         
         Returns:
@@ -51,73 +162,109 @@ class AdaptiveDiscoverySystem:
         all_contractors = []
         expansion_history = []
         total_api_calls = 0
+        accepted_total = 0
+        skipped_rings = 0
+        seen = SeenContractors()
         
         logger.info(f"[AdaptiveDiscovery] Starting discovery for {target_count} contractors")
         logger.info(f"[AdaptiveDiscovery] Minimum acceptable: {min_acceptable}")
         
-        for stage_num, stage in enumerate(self.expansion_stages, 1):
-            radius = stage["radius"]
-            
-            logger.info(f"[AdaptiveDiscovery] Stage {stage_num}: {stage['description']}")
-            
-            # Call discovery function with current radius
-            try:
-                result = await discovery_function(
-                    location=location,
-                    radius_miles=radius,
-                    target_count=target_count - len(all_contractors),
-                    **kwargs
-                )
+        center_zip = location.get("zip_code") or location.get("zip")
+        rings = await asyncio.to_thread(self.plan_rings, center_zip)
+        ring_kwargs = self._supported_ring_kwargs(discovery_function)
+        
+        def next_ring(after: int) -> Optional[ExpansionRing]:
+            nonlocal skipped_rings
+            for ring in rings[after:]:
+                if ring.new_zips is not None and not ring.new_zips:
+                    logger.info(f"[AdaptiveDiscovery] Stage {ring.stage}: no new ZIPs in ring, skipping")
+                    skipped_rings += 1
+                    continue
+                return ring
+            return None
+        
+        def start(ring: ExpansionRing, needed: int, speculative: bool) -> asyncio.Task:
+            logger.info(f"[AdaptiveDiscovery] Stage {ring.stage}: {ring.description} "
+                        f"(ring {ring.inner_radius}-{ring.outer_radius} mi{', speculative' if speculative else ''})")
+            call_kwargs = dict(kwargs)
+            if "ring" in ring_kwargs:
+                call_kwargs["ring"] = ring
+            if "exclude_place_ids" in ring_kwargs:
+                call_kwargs["exclude_place_ids"] = frozenset(seen.place_ids)
+            return asyncio.create_task(self._run_ring(
+                discovery_function, location, ring, needed, speculative, call_kwargs
+            ))
+        
+        ring = next_ring(0)
+        task = start(ring, target_count, False) if ring else None
+        
+        try:
+            while task is not None:
+                ring, speculative, result = await task
+                task = None
                 
-                if result.get("success") and result.get("contractors"):
-                    new_contractors = result.get("contractors", [])
-                    
-                    # Deduplicate based on company name
-                    existing_names = {c.get("company_name", "").lower() for c in all_contractors}
-                    unique_new = [
-                        c for c in new_contractors 
-                        if c.get("company_name", "").lower() not in existing_names
-                    ]
-                    
-                    all_contractors.extend(unique_new)
-                    
-                    # Track expansion
-                    expansion_history.append({
-                        "stage": stage_num,
-                        "radius": radius,
-                        "found": len(unique_new),
-                        "total": len(all_contractors),
-                        "description": stage["description"]
-                    })
-                    
-                    # Track API calls if available
-                    if "api_calls" in result:
-                        total_api_calls += sum(result["api_calls"].values())
-                    
-                    logger.info(f"[AdaptiveDiscovery] Found {len(unique_new)} new contractors")
-                    logger.info(f"[AdaptiveDiscovery] Total: {len(all_contractors)}/{target_count}")
-                    
-                    # Check if we have enough
-                    if len(all_contractors) >= target_count:
-                        logger.info(f"[AdaptiveDiscovery] Target reached!")
-                        break
-                    
-                    # Check if we have minimum acceptable and expansion isn't helping
-                    if len(all_contractors) >= min_acceptable and len(unique_new) < 2:
-                        logger.info(f"[AdaptiveDiscovery] Minimum reached, expansion not yielding results")
-                        break
+                if not (result.get("success") and result.get("contractors")):
+                    following = next_ring(ring.stage)
+                    if following:
+                        task = start(following, target_count - accepted_total, False)
+                    continue
                 
-            except Exception as e:
-                logger.error(f"[AdaptiveDiscovery] Error in stage {stage_num}: {e}")
-                continue
-            
-            # Add delay between expansions
-            if stage_num < len(self.expansion_stages):
-                await asyncio.sleep(1)
+                # Deduplicate on place id / phone / domain / name
+                unique_new = seen.add_new(result.get("contractors", []))
+                all_contractors.extend(unique_new)
+                
+                # Track expansion
+                expansion_history.append({
+                    "stage": ring.stage,
+                    "radius": ring.outer_radius,
+                    "inner_radius": ring.inner_radius,
+                    "new_zips": len(ring.new_zips) if ring.new_zips is not None else None,
+                    "found": len(unique_new),
+                    "total": len(all_contractors),
+                    "speculative": speculative,
+                    "description": ring.description
+                })
+                
+                # Track API calls if available
+                if "api_calls" in result:
+                    total_api_calls += sum(result["api_calls"].values())
+                
+                logger.info(f"[AdaptiveDiscovery] Found {len(unique_new)} new contractors")
+                
+                following = next_ring(ring.stage)
+                projected = accepted_total + len(unique_new)
+                
+                # Start the next ring while this one is being scored
+                if on_results is not None and following and projected < target_count:
+                    task = start(following, target_count - projected, True)
+                
+                if on_results is not None:
+                    accepted = await on_results(unique_new)
+                    accepted_total += len(unique_new) if accepted is None else accepted
+                else:
+                    accepted_total += len(unique_new)
+                
+                logger.info(f"[AdaptiveDiscovery] Total: {accepted_total}/{target_count}")
+                
+                # Check if we have enough
+                if accepted_total >= target_count:
+                    logger.info(f"[AdaptiveDiscovery] Target reached!")
+                    break
+                
+                # Check if we have minimum acceptable and expansion isn't helping
+                if accepted_total >= min_acceptable and len(unique_new) < 2:
+                    logger.info(f"[AdaptiveDiscovery] Minimum reached, expansion not yielding results")
+                    break
+                
+                if task is None and following:
+                    task = start(following, target_count - accepted_total, False)
+        finally:
+            if task is not None:
+                task.cancel()
         
         # Calculate success metrics
-        success = len(all_contractors) >= min_acceptable
-        completion_rate = (len(all_contractors) / target_count) * 100
+        success = accepted_total >= min_acceptable
+        completion_rate = (accepted_total / target_count) * 100 if target_count else 100.0
         
         return {
             "success": success,
@@ -127,10 +274,37 @@ class AdaptiveDiscoverySystem:
             "completion_rate": completion_rate,
             "expansion_stages_used": len(expansion_history),
             "expansion_history": expansion_history,
+            "skipped_rings": skipped_rings,
             "final_radius": expansion_history[-1]["radius"] if expansion_history else 15,
             "total_api_calls": total_api_calls
         }
     
+    async def _run_ring(self, discovery_function, location: Dict[str, str], ring: ExpansionRing,
+                        needed: int, speculative: bool, call_kwargs: Dict[str, Any]):
+        """Run the discovery function for one ring; failures become an empty result"""
+        try:
+            result = await discovery_function(
+                location=location,
+                radius_miles=ring.outer_radius,
+                target_count=needed,
+                **call_kwargs
+            )
+        except Exception as e:
+            logger.error(f"[AdaptiveDiscovery] Error in stage {ring.stage}: {e}")
+            result = {}
+        return ring, speculative, result or {}
+    
+    @staticmethod
+    def _supported_ring_kwargs(discovery_function) -> Set[str]:
+        """Ring-aware kwargs the discovery function can take (older functions get none)"""
+        try:
+            parameters = inspect.signature(discovery_function).parameters
+        except (TypeError, ValueError):
+            return set()
+        if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+            return set(_RING_KWARGS)
+        return {name for name in _RING_KWARGS if name in parameters}
+    
     def get_expanded_zips(self, center_zip: str, radius: int) -> List[str]:
         """
         Get all ZIP codes within expanded radius
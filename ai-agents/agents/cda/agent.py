@@ -2,6 +2,7 @@
 CDA v2 - Intelligent Contractor Discovery Agent
 Powered by GPT-4 for nuanced matching decisions
 """
+import asyncio
 import json
 import os
 import sys
@@ -20,6 +21,8 @@ from agents.cda.tier2_reengagement import Tier2Reengagement
 from agents.cda.web_search_agent import WebSearchContractorAgent
 from agents.cda.enhanced_web_search_agent import EnhancedWebSearchAgent
 from agents.cda.adaptive_discovery import AdaptiveDiscoverySystem
+from agents.cda.discovery_pipeline import TierDiscoveryPipeline
+from agents.cda.scoring import ContractorScorer
 
 
 class ContractorDiscoveryAgent:
@@ -46,6 +49,7 @@ class ContractorDiscoveryAgent:
         self.tier1_matcher = Tier1Matcher(self.supabase)
         self.tier2_reengagement = Tier2Reengagement(self.supabase)
         self.adaptive_discovery = AdaptiveDiscoverySystem()  # Radius expansion system
+        self.scorer = ContractorScorer()  # Vectorized tier-aware ranking
 
         print("[CDA v2] Initialized with enhanced service-specific matching and adaptive discovery")
 
@@ -56,9 +60,11 @@ class ContractorDiscoveryAgent:
         Process:
         1. Load bid card data
         2. Calculate how many contractors to actually contact (5-to-1 ratio)
-        3. Search for contractors (3-tier system with radius filtering)
-        4. Score each contractor
-        5. Select best matches with explanations
+        3. Search for contractors (3-tier system with radius filtering) -
+           Tier 1, Tier 2 and project analysis run concurrently, Tier 3 starts
+           early when they are trending short
+        4. Score each contractor as its tier returns
+        5. Rank the pool in one batch pass and select the best matches
         
         Args:
             bid_card_id: ID of the bid card to process
@@ -92,9 +98,6 @@ class ContractorDiscoveryAgent:
             print(f"[CDA v2] Need {bids_needed} bids, targeting {contractors_to_find} contractors")
             print(f"[CDA v2] Urgency level: {urgency}")
 
-            # Step 3: Intelligent project analysis using OpenAI GPT-4
-            print("[CDA v2] Analyzing project requirements with GPT-4...")
-
             # Format location properly for the tier matchers
             location = {
                 "city": bid_card.get("location_city", ""),
@@ -105,26 +108,41 @@ class ContractorDiscoveryAgent:
             # Also update the bid_card with the formatted location for tier matchers
             bid_card["location"] = location
 
-            # Use service-specific matcher for intelligent analysis
-            if self.service_matcher:
-                project_analysis = self.service_matcher.analyze_project_requirements(bid_card)
-                print("[CDA v2] Intelligent Analysis Complete:")
-                print(f"  - Service Category: {project_analysis.get('service_category', 'Unknown')}")
-                print(f"  - Service Type: {project_analysis.get('service_type', 'Unknown')}")
-                print(f"  - Specialization Required: {project_analysis.get('specialization_required', [])}")
-                print(f"  - Scope Complexity: {project_analysis.get('scope_complexity', 'Unknown')}")
-            else:
-                # Fallback to simple analysis
-                project_analysis = {
-                    "service_category": bid_card.get("project_type", "Unknown"),
-                    "service_type": "general",
-                    "specialization_required": [],
-                    "urgency_indicators": [],
-                    "quality_preferences": "balanced",
-                    "scope_complexity": "moderate",
-                    "contractor_requirements": []
-                }
-                print("[CDA v2] Using fallback analysis (service matcher unavailable)")
+            # Step 3: Project analysis, Tier 1 and Tier 2 all start concurrently.
+            # Candidates are scored as soon as their tier returns; scoring waits
+            # only for the analysis it needs, not for the other tiers.
+            print("[CDA v2] Analyzing project requirements with GPT-4...")
+            analysis_task = asyncio.create_task(asyncio.to_thread(self._analyze_project, bid_card))
+
+            async def score_candidate(contractor: dict[str, Any]) -> None:
+                project_analysis = await asyncio.shield(analysis_task)
+                await asyncio.to_thread(self._score_contractor, contractor, project_analysis)
+
+            async def run_tier1() -> list[dict[str, Any]]:
+                print(f"[CDA v2] Searching Tier 1: Internal contractor database within {radius_miles} miles...")
+                tier1_results = await asyncio.to_thread(
+                    self.tier1_matcher.find_matching_contractors, bid_card, radius_miles
+                )
+                if tier1_results.get("success") and tier1_results.get("contractors"):
+                    return tier1_results["contractors"]
+                return []
+
+            async def run_tier2() -> list[dict[str, Any]]:
+                print(f"[CDA v2] Searching Tier 2: Previous contractor contacts within {radius_miles} miles...")
+                return await asyncio.to_thread(
+                    self.tier2_reengagement.find_reengagement_candidates, bid_card, radius_miles
+                )
+
+            async def run_tier3(remaining_needed: int) -> list[dict[str, Any]]:
+                print("[CDA v2] Searching Tier 3: Enhanced web search with adaptive radius expansion...")
+                return await self._discover_tier3(bid_card_id, bid_card, location, remaining_needed)
+
+            pipeline = TierDiscoveryPipeline(contractors_to_find, score_candidate=score_candidate)
+            pipeline_result = await pipeline.run(
+                {"tier1": run_tier1, "tier2": run_tier2},
+                tier3=run_tier3
+            )
+            project_analysis = await analysis_task
 
             # Include original bid analysis structure for compatibility
             bid_analysis = {
@@ -138,75 +156,10 @@ class ContractorDiscoveryAgent:
                 "service_analysis": project_analysis  # Include intelligent analysis
             }
 
-            # Step 3: Gather contractors from all sources
-            all_contractors = []
-
-            # Tier 1: Internal database with radius search
-            print(f"[CDA v2] Searching Tier 1: Internal contractor database within {radius_miles} miles...")
-            tier1_results = self.tier1_matcher.find_matching_contractors(bid_card, radius_miles=radius_miles)
-            if tier1_results["success"] and tier1_results["contractors"]:
-                all_contractors.extend(tier1_results["contractors"])
-                print(f"[CDA v2] Found {len(tier1_results['contractors'])} internal contractors within radius")
-            else:
-                print(f"[CDA v2] No internal contractors found within {radius_miles} miles")
-
-            # Tier 2: Previous contacts with radius search
-            print(f"[CDA v2] Searching Tier 2: Previous contractor contacts within {radius_miles} miles...")
-            tier2_results = self.tier2_reengagement.find_reengagement_candidates(bid_card, radius_miles=radius_miles)
-            if tier2_results and len(tier2_results) > 0:
-                all_contractors.extend(tier2_results)
-                print(f"[CDA v2] Found {len(tier2_results)} previous contacts within radius")
-            else:
-                print(f"[CDA v2] No previous contacts found within {radius_miles} miles")
-
-            # Tier 3: Enhanced web search with adaptive radius expansion
-            if len(all_contractors) < contractors_to_find:  # Get the full amount we need
-                print(f"[CDA v2] Searching Tier 3: Enhanced web search with adaptive radius expansion...")
-                # Search for remaining contractors needed
-                remaining_needed = contractors_to_find - len(all_contractors)
-                
-                # Use adaptive discovery with automatic radius expansion
-                async def discovery_wrapper(location_dict, radius):
-                    """Wrapper to make the discovery function compatible with adaptive discovery"""
-                    try:
-                        enhanced_results = await self.enhanced_web_search.discover_contractors_with_profiles(
-                            bid_card_id=bid_card_id,
-                            project_type=project_type,
-                            location=location_dict,
-                            contractors_needed=remaining_needed,
-                            radius_miles=radius
-                        )
-                        if enhanced_results["success"]:
-                            return enhanced_results["contractors"]
-                    except:
-                        # Fallback to regular web search if enhanced fails
-                        web_results = self.web_search.discover_contractors_for_bid(
-                            bid_card_id,
-                            contractors_needed=remaining_needed,
-                            radius_miles=radius
-                        )
-                        if web_results["success"]:
-                            return web_results["contractors"]
-                    return []
-                
-                # Use adaptive discovery with radius expansion
-                discovery_result = await self.adaptive_discovery.discover_with_expansion(
-                    discovery_function=discovery_wrapper,
-                    location=location,
-                    target_count=remaining_needed,
-                    min_acceptable=max(1, remaining_needed // 2)  # Accept at least half
-                )
-                
-                if discovery_result["contractors"]:
-                    all_contractors.extend(discovery_result["contractors"])
-                    print(f"[CDA v2] Found {len(discovery_result['contractors'])} contractors via adaptive discovery")
-                    print(f"[CDA v2] Final radius used: {discovery_result['final_radius']} miles")
-                    if discovery_result["expansion_stages"] > 1:
-                        print(f"[CDA v2] Expanded search {discovery_result['expansion_stages'] - 1} times")
-
-            # Remove duplicates
-            unique_contractors = self._deduplicate_contractors(all_contractors)
+            # Already de-duplicated in tier priority order
+            unique_contractors = pipeline_result.contractors
             print(f"[CDA v2] Total unique contractors found: {len(unique_contractors)}")
+            print(f"[CDA v2] Tier latency (ms): {pipeline_result.tier_latency_ms} - total {pipeline_result.total_ms:.0f}ms")
 
             if not unique_contractors:
                 return {
@@ -215,38 +168,10 @@ class ContractorDiscoveryAgent:
                     "bid_analysis": bid_analysis
                 }
 
-            # Step 4: Intelligent scoring using GPT-4 service-specific matching
-            print(f"[CDA v2] Scoring {len(unique_contractors)} contractors with intelligent service matching...")
-
-            # Score each contractor using service-specific analysis
-            for contractor in unique_contractors:
-                if self.service_matcher:
-                    try:
-                        # Get intelligent scoring based on service requirements
-                        scoring_result = self.service_matcher.score_contractor_match(contractor, project_analysis)
-
-                        # Apply the intelligent scoring
-                        contractor["match_score"] = scoring_result.get("match_score", 50)
-                        contractor["recommendation"] = scoring_result.get("recommendation", "possible_match")
-                        contractor["reasoning"] = scoring_result.get("reasoning", "Intelligent analysis")
-                        contractor["key_strengths"] = scoring_result.get("key_strengths", [])
-                        contractor["concerns"] = scoring_result.get("concerns", [])
-                        contractor["specialization_match"] = scoring_result.get("specialization_match", "moderate")
-
-                        print(f"[CDA v2] Intelligent score for {contractor.get('company_name', 'Unknown')}: {contractor['match_score']}")
-
-                    except Exception as e:
-                        print(f"[CDA v2] Error in intelligent scoring for {contractor.get('company_name', 'Unknown')}: {e}")
-                        # Fallback to simple scoring
-                        self._apply_simple_scoring(contractor)
-                else:
-                    # Fallback to simple scoring when service matcher unavailable
-                    self._apply_simple_scoring(contractor)
-
-            # Sort by score and select top matches
-            unique_contractors.sort(key=lambda x: x.get("match_score", 0), reverse=True)
-            # Select the number we calculated we need to contact, not just the bids needed
-            selected = unique_contractors[:contractors_to_find]
+            # Rank the whole pool in one batch pass (tier, match score, quality, fit)
+            # and select the number we calculated we need to contact, not just the bids needed
+            selected = self.scorer.score_contractors(unique_contractors, bid_card, top_k=contractors_to_find)
+            selected = selected[:contractors_to_find]
 
             selection_result = {
                 "selected_contractors": selected,
@@ -283,10 +208,13 @@ class ContractorDiscoveryAgent:
                 "all_scores": selection_result["all_scores"],
                 "stored_ids": stored_contractors,
                 "tier_results": {
-                    "tier1_internal": len(tier1_results.get("contractors", [])) if tier1_results.get("success") else 0,
-                    "tier2_previous": len(tier2_results) if tier2_results else 0,
-                    "tier3_web": len(web_results.get("contractors", [])) if "web_results" in locals() and web_results.get("success") else 0
-                }
+                    "tier1_internal": pipeline_result.tier_counts.get("tier1", 0),
+                    "tier2_previous": pipeline_result.tier_counts.get("tier2", 0),
+                    "tier3_web": pipeline_result.tier_counts.get("tier3", 0)
+                },
+                "tier_latency_ms": pipeline_result.tier_latency_ms,
+                "tier3_speculative": pipeline_result.tier3_speculative,
+                "discovery_ms": pipeline_result.total_ms
             }
 
             print(f"[CDA v2] Discovery complete - Selected {len(selection_result['selected_contractors'])} contractors to contact")
@@ -305,6 +233,94 @@ class ContractorDiscoveryAgent:
                 "bid_card_id": bid_card_id
             }
 
+    def _analyze_project(self, bid_card: dict[str, Any]) -> dict[str, Any]:
+        """Service-specific project analysis (GPT-4), with a simple fallback"""
+        if self.service_matcher:
+            project_analysis = self.service_matcher.analyze_project_requirements(bid_card)
+            print("[CDA v2] Intelligent Analysis Complete:")
+            print(f"  - Service Category: {project_analysis.get('service_category', 'Unknown')}")
+            print(f"  - Service Type: {project_analysis.get('service_type', 'Unknown')}")
+            print(f"  - Specialization Required: {project_analysis.get('specialization_required', [])}")
+            print(f"  - Scope Complexity: {project_analysis.get('scope_complexity', 'Unknown')}")
+            return project_analysis
+
+        print("[CDA v2] Using fallback analysis (service matcher unavailable)")
+        return {
+            "service_category": bid_card.get("project_type", "Unknown"),
+            "service_type": "general",
+            "specialization_required": [],
+            "urgency_indicators": [],
+            "quality_preferences": "balanced",
+            "scope_complexity": "moderate",
+            "contractor_requirements": []
+        }
+
+    def _score_contractor(self, contractor: dict[str, Any], project_analysis: dict[str, Any]) -> None:
+        """Apply service-specific scoring to one contractor, falling back to simple scoring"""
+        if not self.service_matcher:
+            self._apply_simple_scoring(contractor)
+            return
+
+        try:
+            scoring_result = self.service_matcher.score_contractor_match(contractor, project_analysis)
+
+            contractor["match_score"] = scoring_result.get("match_score", 50)
+            contractor["recommendation"] = scoring_result.get("recommendation", "possible_match")
+            contractor["reasoning"] = scoring_result.get("reasoning", "Intelligent analysis")
+            contractor["key_strengths"] = scoring_result.get("key_strengths", [])
+            contractor["concerns"] = scoring_result.get("concerns", [])
+            contractor["specialization_match"] = scoring_result.get("specialization_match", "moderate")
+
+            print(f"[CDA v2] Intelligent score for {contractor.get('company_name', 'Unknown')}: {contractor['match_score']}")
+
+        except Exception as e:
+            print(f"[CDA v2] Error in intelligent scoring for {contractor.get('company_name', 'Unknown')}: {e}")
+            self._apply_simple_scoring(contractor)
+
+    async def _discover_tier3(self, bid_card_id: str, bid_card: dict[str, Any],
+                              location: dict[str, str], remaining_needed: int) -> list[dict[str, Any]]:
+        """Tier 3: enhanced web search with adaptive radius expansion"""
+        project_type = bid_card.get("project_type", "")
+
+        async def discovery_wrapper(location: dict[str, str], radius_miles: int, target_count: int,
+                                    exclude_place_ids: frozenset = frozenset()) -> dict[str, Any]:
+            """Adapts the web search agents to the adaptive discovery call contract"""
+            try:
+                enhanced_results = await self.enhanced_web_search.discover_contractors_with_profiles(
+                    bid_card_id=bid_card_id,
+                    project_type=project_type,
+                    location=location,
+                    contractors_needed=target_count,
+                    radius_miles=radius_miles,
+                    exclude_place_ids=exclude_place_ids
+                )
+                if enhanced_results["success"]:
+                    return enhanced_results
+            except Exception as e:
+                print(f"[CDA v2] Enhanced web search failed, using basic web search: {e}")
+
+            # Fallback to regular web search if enhanced fails
+            return await asyncio.to_thread(
+                self.web_search.discover_contractors_for_bid,
+                bid_card_id,
+                contractors_needed=target_count,
+                radius_miles=radius_miles
+            )
+
+        discovery_result = await self.adaptive_discovery.discover_with_expansion(
+            discovery_function=discovery_wrapper,
+            location=location,
+            target_count=remaining_needed,
+            min_acceptable=max(1, remaining_needed // 2)  # Accept at least half
+        )
+
+        if discovery_result["contractors"]:
+            print(f"[CDA v2] Found {len(discovery_result['contractors'])} contractors via adaptive discovery")
+            print(f"[CDA v2] Final radius used: {discovery_result['final_radius']} miles")
+            if discovery_result["expansion_stages_used"] > 1:
+                print(f"[CDA v2] Expanded search {discovery_result['expansion_stages_used'] - 1} times")
+        return discovery_result["contractors"]
+
     def _load_bid_card(self, bid_card_id: str) -> Optional[dict[str, Any]]:
         """Load bid card from database or test data"""
         # Handle test bid cards
@@ -416,19 +432,6 @@ class ContractorDiscoveryAgent:
         except:
             return None
 
-    def _deduplicate_contractors(self, contractors: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """Remove duplicate contractors based on company name"""
-        seen = set()
-        unique = []
-
-        for contractor in contractors:
-            name = contractor.get("company_name", "").lower().strip()
-            if name and name not in seen:
-                seen.add(name)
-                unique.append(contractor)
-
-        return unique
-
     def _store_matched_contractors(self,
                                  contractors: list[dict[str, Any]],
                                  bid_card_id: str,
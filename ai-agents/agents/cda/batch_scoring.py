@@ -0,0 +1,375 @@
+"""
+Vectorized Batch Contractor Scoring
+Columnar versions of ContractorScorer and BidSpecificScoringEngine
+
+Candidate features are pulled out of the contractor dicts once into NumPy
+arrays; every score component and the weighted total are then computed
+as whole-column operations. Results are identical to the per-contractor
+scorers (same thresholds, same order of additions) - see
+tests/cda/test_batch_scoring.py for the parity checks.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from agents.cda.bid_specific_scoring import PROJECT_KEYWORDS, BidCardPreferences
+from agents.cda.specialty_index import get_specialty_index
+
+
+def _num(value: Any, default: float = 0.0) -> float:
+    return default if value is None else float(value)
+
+
+def top_k_indices(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+
+    Ties keep input order, matching a stable list.sort(reverse=True), while
+    only the top k are fully sorted (argpartition for the selection).
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    part = np.argpartition(-scores, k - 1)[:k]
+    kth = scores[part].min()
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - len(above)]
+    selected = np.concatenate([above, ties])
+    order = np.lexsort((selected, -scores[selected]))
+    return selected[order]
+
+
+# ---------------------------------------------------------------------------
+# ContractorScorer (agents/cda/scoring.py)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ContractorColumns:
+    """Bid-independent candidate features for ContractorScorer"""
+    tier: np.ndarray
+    match_score: np.ndarray
+    rating: np.ndarray
+    total_projects: np.ndarray
+    min_size: np.ndarray
+    max_size: np.ndarray
+    available: np.ndarray
+    busy: np.ndarray
+    onboarded: np.ndarray
+    licensed: np.ndarray
+    insured: np.ndarray
+    reengaged_interested: np.ndarray
+    reengaged_pending: np.ndarray
+    general_specialty: np.ndarray
+
+    @classmethod
+    def from_contractors(cls, contractors: list[dict[str, Any]]) -> "ContractorColumns":
+        n = len(contractors)
+        tier = np.zeros(n, dtype=np.int8)
+        match_score = np.zeros(n)
+        rating = np.zeros(n)
+        total_projects = np.zeros(n)
+        min_size = np.zeros(n)
+        max_size = np.zeros(n)
+        available = np.zeros(n, dtype=bool)
+        busy = np.zeros(n, dtype=bool)
+        onboarded = np.zeros(n, dtype=bool)
+        licensed = np.zeros(n, dtype=bool)
+        insured = np.zeros(n, dtype=bool)
+        interested = np.zeros(n, dtype=bool)
+        pending = np.zeros(n, dtype=bool)
+        general = np.zeros(n, dtype=bool)
+
+        for i, c in enumerate(contractors):
+            t = c.get("discovery_tier", 3)
+            tier[i] = t if t in (1, 2, 3) else 0
+            match_score[i] = _num(c.get("match_score", 0))
+            rating[i] = _num(c.get("rating", 0))
+            total_projects[i] = _num(c.get("total_projects", 0))
+            min_size[i] = _num(c.get("min_project_size", 0))
+            max_size[i] = _num(c.get("max_project_size", 999999), 999999)
+            availability = (c.get("availability") or "").lower()
+            available[i] = availability == "available"
+            busy[i] = availability == "busy"
+            onboarded[i] = bool(c.get("onboarded"))
+            licensed[i] = bool(c.get("license_number"))
+            insured[i] = bool(c.get("insurance_verified"))
+            last_response = (c.get("reengagement_data") or {}).get("last_response")
+            interested[i] = last_response == "interested"
+            pending[i] = last_response == "pending"
+            general[i] = "general" in str(c.get("specialties", [])).lower()
+
+        return cls(tier, match_score, rating, total_projects, min_size, max_size, available,
+                   busy, onboarded, licensed, insured, interested, pending, general)
+
+
+def _extract_zip_from_bid(bid_data: dict[str, Any]) -> str:
+    full_location = bid_data.get("location", {}).get("full_location", "")
+    zip_match = re.search(r"\b(\d{5})\b", full_location)
+    return zip_match.group(1) if zip_match else ""
+
+
+class BatchContractorScorer:
+    """Vectorized equivalent of ContractorScorer"""
+
+    def score_components(self, contractors: list[dict[str, Any]], bid_data: dict[str, Any],
+                         columns: Optional[ContractorColumns] = None) -> dict[str, np.ndarray]:
+        """Compute every score component for all candidates as arrays"""
+        cols = columns or ContractorColumns.from_contractors(contractors)
+        n = len(contractors)
+
+        # Bid-dependent string features (substring semantics kept exactly)
+        project_type = bid_data.get("project_type", "").lower()
+        project_zip = _extract_zip_from_bid(bid_data)
+        specialty_match = np.fromiter(
+            (any(project_type in str(s).lower() for s in c.get("specialties", [])) for c in contractors),
+            dtype=bool, count=n,
+        )
+        zip_match = np.zeros(n, dtype=bool)
+        if project_zip:
+            zip_match = np.fromiter(
+                (any(project_zip in str(z) for z in c.get("zip_codes", [])) for c in contractors),
+                dtype=bool, count=n,
+            )
+
+        tier_base = np.select([cols.tier == 1, cols.tier == 2, cols.tier == 3], [100.0, 80.0, 50.0], 0.0)
+        tier_weight = np.select([cols.tier == 1, cols.tier == 2, cols.tier == 3], [0.5, 0.4, 0.3], 0.0)
+        weighted_match = np.where(cols.tier > 0, cols.match_score * tier_weight, 0.0)
+
+        # Quality (rating 0-50 + experience 0-30)
+        r, p = cols.rating, cols.total_projects
+        rating_pts = np.select([r >= 4.8, r >= 4.5, r >= 4.0, r >= 3.5, r >= 3.0], [50, 40, 30, 20, 10], 0)
+        exp_pts = np.select([p >= 200, p >= 100, p >= 50, p >= 20, p >= 10, p >= 5], [30, 25, 20, 15, 10, 5], 0)
+        quality = 0.0 + rating_pts + exp_pts
+
+        # Project fit (specialty + budget + zip)
+        spec_pts = np.where(specialty_match, 25.0, np.where(cols.general_specialty, 10.0, 0.0))
+        budget_max = bid_data.get("budget_max", 0)
+        budget_pts = np.zeros(n)
+        if budget_max > 0:
+            lo, hi = cols.min_size, cols.max_size
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(lo > 0, budget_max / np.where(lo > 0, lo, 1.0), 0.0)
+            budget_pts = np.select(
+                [(lo <= budget_max) & (budget_max <= hi), budget_max < lo, budget_max > hi],
+                [20.0, np.maximum(0, 10 * ratio), 15.0],
+                0.0,
+            )
+        project_fit = 0.0 + spec_pts + budget_pts + np.where(zip_match, 15.0, 0.0)
+
+        availability = (
+            0.0 + np.select([cols.available, cols.busy], [20.0, 5.0], 0.0)
+            + np.where(cols.onboarded, 10.0, 0.0)
+        )
+
+        verification = (
+            0.0 + np.where(cols.licensed, 15.0, 0.0) + np.where(cols.insured, 15.0, 0.0)
+            + np.select(
+                [cols.tier == 1, (cols.tier == 2) & cols.reengaged_interested, (cols.tier == 2) & cols.reengaged_pending],
+                [10.0, 8.0, 4.0],
+                0.0,
+            )
+        )
+
+        # Same order of additions as ContractorScorer._calculate_total_score
+        total = 0.0 + tier_base + weighted_match + quality + project_fit + availability + verification
+        total = np.minimum(300.0, np.maximum(0.0, total))
+
+        return {
+            "tier_base": tier_base,
+            "match_score": weighted_match,
+            "quality": quality,
+            "project_fit": project_fit,
+            "availability": availability,
+            "verification": verification,
+            "final_score": total,
+        }
+
+    def score_contractors(self, contractors: list[dict[str, Any]], bid_data: dict[str, Any],
+                          top_k: Optional[int] = None) -> list[dict[str, Any]]:
+        """Score, annotate and rank contractors; only the top_k are returned when given"""
+        if not contractors:
+            return []
+        comps = self.score_components(contractors, bid_data)
+        ranked = []
+        for i in top_k_indices(comps["final_score"], top_k):
+            contractor = contractors[i]
+            contractor["final_score"] = float(comps["final_score"][i])
+            contractor["score_breakdown"] = {
+                key: float(comps[key][i])
+                for key in ("tier_base", "match_score", "quality", "project_fit", "availability", "verification")
+            }
+            ranked.append(contractor)
+        return ranked
+
+
+# ---------------------------------------------------------------------------
+# BidSpecificScoringEngine (agents/cda/bid_specific_scoring.py)
+# ---------------------------------------------------------------------------
+
+SIZE_CODES = {"mom_and_pop": 0, "medium": 1, "large": 2}
+SIZE_NAMES = {code: name for name, code in SIZE_CODES.items()}
+
+
+class BatchBidSpecificScorer:
+    """Vectorized equivalent of BidSpecificScoringEngine.calculate_bid_specific_score"""
+
+    BREAKDOWN_KEYS = (
+        "base_score", "size_match", "budget_match", "urgency_match", "quality_match",
+        "location_match", "specialization_match", "requirements_match", "penalties",
+    )
+
+    def __init__(self, engine: Optional[Any] = None):
+        if engine is None:
+            from agents.cda.bid_specific_scoring import BidSpecificScoringEngine
+            engine = BidSpecificScoringEngine()
+        self.engine = engine
+
+    def score_components(self, contractors: list[dict[str, Any]], prefs: BidCardPreferences,
+                         bid_location: dict[str, Any]) -> dict[str, np.ndarray]:
+        n = len(contractors)
+        rating = np.fromiter((c.get("google_rating", 0) for c in contractors), dtype=float, count=n)
+        reviews = np.fromiter((c.get("google_review_count", 0) for c in contractors), dtype=float, count=n)
+        has_phone = np.fromiter((bool(c.get("phone")) for c in contractors), dtype=bool, count=n)
+        has_website = np.fromiter((bool(c.get("website")) for c in contractors), dtype=bool, count=n)
+        has_email = np.fromiter((bool(c.get("email")) for c in contractors), dtype=bool, count=n)
+        size = np.fromiter(
+            (SIZE_CODES[self.engine._detect_contractor_size(c)] for c in contractors), dtype=np.int8, count=n
+        )
+
+        # 1. Size
+        pref = prefs.preferred_contractor_size
+        if pref == "any":
+            size_match = np.zeros(n)
+        else:
+            size_match = np.where(size == SIZE_CODES.get(pref, -1), 20.0, 0.0)
+            if pref == "mom_and_pop":
+                size_match = np.select([size == 0, size == 1, size == 2], [20.0, -10.0, -20.0], 0.0)
+            elif pref == "large":
+                size_match = np.select([size == 2, size == 0, size == 1], [20.0, -15.0, -5.0], 0.0)
+
+        # 2. Budget (price tier: 3 premium, 2 mid_high, 1 mid, 0 budget)
+        price_tier = np.select(
+            [(rating >= 4.8) & (reviews > 100), (rating >= 4.5) & (reviews > 50), rating >= 4.0], [3, 2, 1], 0
+        )
+        budget_min, budget_max = prefs.budget_range
+        midpoint = (budget_min + budget_max) / 2
+        if midpoint < 5000:
+            budget_match = np.select([price_tier == 0, price_tier == 1], [10.0, 5.0], -5.0)
+        elif midpoint < 20000:
+            budget_match = np.where((price_tier == 1) | (price_tier == 2), 10.0, 5.0)
+        else:
+            budget_match = np.where(price_tier >= 2, 10.0, 0.0)
+
+        # 3. Urgency
+        if prefs.urgency_level == "emergency":
+            urgency_match = (
+                0.0 + np.where(has_phone, 5.0, 0.0) + np.where(has_website, 3.0, 0.0)
+                + np.where(rating >= 4.5, 2.0, 0.0)
+            )
+        elif prefs.urgency_level == "week":
+            urgency_match = np.where(has_phone | has_website, 5.0, 0.0)
+        else:
+            urgency_match = np.zeros(n)
+
+        # 4. Quality vs price
+        if prefs.quality_vs_price == "quality_first":
+            quality_match = np.select(
+                [(rating >= 4.8) & (reviews >= 20), rating >= 4.5, rating >= 4.0], [15.0, 10.0, 5.0], -10.0
+            )
+        elif prefs.quality_vs_price == "budget_conscious":
+            quality_match = np.select([(rating >= 3.5) & (rating <= 4.5), rating > 4.5], [10.0, 5.0], 0.0)
+        else:
+            quality_match = np.select([rating >= 4.0, rating >= 3.5], [8.0, 4.0], 0.0)
+
+        # 5. Location (string comparison done once per candidate)
+        bid_zip = bid_location.get("zip_code", "")
+        location_match = np.fromiter(
+            (self._location_points(c.get("zip_code", ""), bid_zip) for c in contractors), dtype=float, count=n
+        )
+
+        # 6. Specialization via the precompiled trade bitsets
+        index = get_specialty_index()
+        keywords = index.keyword_bits(
+            PROJECT_KEYWORDS.get(prefs.project_type.lower(), [prefs.project_type.lower()])
+        )
+        name_hit = np.fromiter(
+            (bool(keywords & index.bits_for_text(c.get("company_name", ""))) for c in contractors), dtype=bool, count=n
+        )
+        spec_hit = np.fromiter(
+            (bool(keywords & index.bits_for_list(c.get("specialties", []))) for c in contractors), dtype=bool, count=n
+        )
+        gtype_hit = np.fromiter(
+            (bool(keywords & index.bits_for_list(c.get("google_types", []))) for c in contractors), dtype=bool, count=n
+        )
+        specialization_match = np.select([name_hit, spec_hit, gtype_hit], [10.0, 8.0, 6.0], 0.0)
+
+        # 7. Requirements
+        requirements_match = np.zeros(n)
+        flags = {
+            "licensed": np.fromiter((bool(c.get("license_number")) for c in contractors), dtype=bool, count=n),
+            "insured": np.fromiter((bool(c.get("insurance_verified")) for c in contractors), dtype=bool, count=n),
+            "bonded": np.fromiter((bool(c.get("bonded")) for c in contractors), dtype=bool, count=n),
+        }
+        for requirement in prefs.special_requirements:
+            if requirement in flags:
+                requirements_match = requirements_match + np.where(flags[requirement], 5.0, 0.0)
+
+        # 8. Penalties
+        penalties = (
+            0.0 - np.where(~has_phone & ~has_email, 10.0, 0.0)
+            - np.where(rating < 3.0, 15.0, 0.0) - np.where(reviews == 0, 5.0, 0.0)
+        )
+
+        components = {
+            "base_score": np.full(n, 50.0),
+            "size_match": size_match,
+            "budget_match": budget_match,
+            "urgency_match": urgency_match,
+            "quality_match": quality_match,
+            "location_match": location_match,
+            "specialization_match": specialization_match,
+            "requirements_match": requirements_match,
+            "penalties": penalties,
+        }
+        # Same summation order as sum(score_breakdown.values())
+        total = np.zeros(n)
+        for key in self.BREAKDOWN_KEYS:
+            total = total + components[key]
+        components["match_score"] = np.maximum(0, np.minimum(100, total))
+        components["size_code"] = size
+        return components
+
+    @staticmethod
+    def _location_points(contractor_zip: str, bid_zip: str) -> float:
+        if contractor_zip and bid_zip:
+            if contractor_zip == bid_zip:
+                return 10.0
+            if contractor_zip[:3] == bid_zip[:3]:
+                return 7.0
+            return 3.0
+        return 0.0
+
+    def score_contractors(self, contractors: list[dict[str, Any]], prefs: BidCardPreferences,
+                          bid_location: dict[str, Any], top_k: Optional[int] = None) -> list[dict[str, Any]]:
+        """Return (contractor, result) pairs for the top_k candidates, best first"""
+        if not contractors:
+            return []
+        comps = self.score_components(contractors, prefs, bid_location)
+        results = []
+        for i in top_k_indices(comps["match_score"], top_k):
+            breakdown = {key: float(comps[key][i]) for key in self.BREAKDOWN_KEYS}
+            final_score = float(comps["match_score"][i])
+            results.append({
+                "contractor": contractors[i],
+                "match_score": final_score,
+                "score_breakdown": breakdown,
+                "contractor_size_detected": SIZE_NAMES[int(comps["size_code"][i])],
+                "matches_preferences": final_score >= 70,
+                "recommendation": self.engine._get_recommendation(final_score, breakdown),
+            })
+        return results
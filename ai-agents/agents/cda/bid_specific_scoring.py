@@ -4,7 +4,21 @@ Calculates contractor match scores based on specific project requirements
 """
 import json
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
+
+from agents.cda.specialty_index import get_specialty_index
+
+
+# Map project types to specialization keywords
+PROJECT_KEYWORDS = {
+    "kitchen": ["kitchen", "cabinet", "remodel"],
+    "bathroom": ["bathroom", "bath", "plumbing"],
+    "roofing": ["roof", "roofing", "shingle"],
+    "lawn care": ["lawn", "landscape", "turf", "grass"],
+    "artificial turf": ["artificial", "synthetic", "turf"],
+    "plumbing": ["plumb", "pipe", "drain"],
+    "electrical": ["electric", "wire", "volt"]
+}
 
 
 @dataclass
@@ -109,6 +123,20 @@ class BidSpecificScoringEngine:
             "recommendation": self._get_recommendation(final_score, score_breakdown)
         }
 
+    def score_many(self,
+                   contractors: list[dict[str, Any]],
+                   bid_preferences: BidCardPreferences,
+                   bid_location: dict[str, Any],
+                   top_k: Optional[int] = None) -> list[dict[str, Any]]:
+        """
+        Score a whole candidate pool at once (vectorized)
+
+        Returns the calculate_bid_specific_score result for each of the best
+        top_k contractors, best first, with the contractor under "contractor"
+        """
+        from agents.cda.batch_scoring import BatchBidSpecificScorer
+        return BatchBidSpecificScorer(self).score_contractors(contractors, bid_preferences, bid_location, top_k)
+
     def _calculate_size_match(self, contractor: dict[str, Any], preferred_size: str) -> float:
         """Calculate how well contractor size matches preference"""
         if preferred_size == "any":
@@ -277,34 +305,19 @@ class BidSpecificScoringEngine:
 
     def _calculate_specialization_match(self, contractor: dict[str, Any], project_type: str) -> float:
         """Check if contractor specializes in the project type"""
-        company_name = contractor.get("company_name", "").lower()
-        specialties = contractor.get("specialties", [])
-        google_types = contractor.get("google_types", [])
-
-        # Map project types to keywords
-        project_keywords = {
-            "kitchen": ["kitchen", "cabinet", "remodel"],
-            "bathroom": ["bathroom", "bath", "plumbing"],
-            "roofing": ["roof", "roofing", "shingle"],
-            "lawn care": ["lawn", "landscape", "turf", "grass"],
-            "artificial turf": ["artificial", "synthetic", "turf"],
-            "plumbing": ["plumb", "pipe", "drain"],
-            "electrical": ["electric", "wire", "volt"]
-        }
-
-        keywords = project_keywords.get(project_type.lower(), [project_type.lower()])
-
-        # Check for specialization
-        score = 0.0
-        for keyword in keywords:
-            if keyword in company_name:
-                score = max(score, 10.0)
-            if any(keyword in str(spec).lower() for spec in specialties):
-                score = max(score, 8.0)
-            if any(keyword in str(gtype).lower() for gtype in google_types):
-                score = max(score, 6.0)
-
-        return score
+        index = get_specialty_index()
+        keywords = index.keyword_bits(
+            PROJECT_KEYWORDS.get(project_type.lower(), [project_type.lower()])
+        )
+
+        # Strongest signal first: name, then listed specialties, then Google types
+        if keywords & index.bits_for_text(contractor.get("company_name", "")):
+            return 10.0
+        if keywords & index.bits_for_list(contractor.get("specialties", [])):
+            return 8.0
+        if keywords & index.bits_for_list(contractor.get("google_types", [])):
+            return 6.0
+        return 0.0
 
     def _check_special_requirements(self, contractor: dict[str, Any], requirements: list[str]) -> float:
         """Check if contractor meets special requirements"""
@@ -10,16 +10,21 @@ import asyncio
 from typing import Dict, Any, Optional, List
 import json
 
+from services.api_response_cache import ApiResponseCache, get_api_response_cache, make_cache_key, normalize_domain, normalize_text
+
 logger = logging.getLogger(__name__)
 
+WEBSITE_ANALYSIS_API = "contractor_website_analysis"
+
 
 class ContractorWebsiteAnalyzer:
     """Website analysis tool for contractor discovery and validation"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ApiResponseCache] = None):
         # Initialize Tavily API from environment
         self.tavily_api_key = os.getenv("TAVILY_API_KEY")
         self.use_tavily = bool(self.tavily_api_key)
+        self.cache = cache or get_api_response_cache()
         
         if self.use_tavily:
             logger.info("ContractorWebsiteAnalyzer initialized with Tavily API key")
@@ -37,6 +42,22 @@ class ContractorWebsiteAnalyzer:
         Returns:
             Dict with company size classification and business details
         """
+        key = make_cache_key(
+            WEBSITE_ANALYSIS_API,
+            domain=normalize_domain(website_url),
+            company=normalize_text(company_name)
+        )
+        return await self.cache.get_or_fetch(
+            WEBSITE_ANALYSIS_API, key,
+            lambda: self._analyze_contractor_website(website_url, company_name),
+            is_negative=lambda result: not result['website_data'].get('pages_analyzed'),
+            # Fallback analyses and runs with failed API calls are retried next time
+            is_cacheable=lambda result: not result['website_data'].get('analysis_failed')
+            and not result['website_data'].get('failed_calls')
+        )
+
+    async def _analyze_contractor_website(self, website_url: str, company_name: str) -> Dict[str, Any]:
+        """Uncached website discovery + size classification"""
         logger.info(f"Analyzing contractor website: {company_name} - {website_url}")
         
         try:
@@ -67,7 +88,8 @@ class ContractorWebsiteAnalyzer:
                     'has_team_page': size_indicators['has_team_page'],
                     'has_about_page': size_indicators['has_about_page'],
                     'services_count': len(size_indicators['services_mentioned']),
-                    'locations_count': len(size_indicators['office_locations'])
+                    'locations_count': len(size_indicators['office_locations']),
+                    'failed_calls': page_data.get('failed_calls', 0)
                 }
             }
             
@@ -96,7 +118,8 @@ class ContractorWebsiteAnalyzer:
             discovery_data = {
                 "main_website": website_url,
                 "discovered_pages": [],
-                "api_used": "TAVILY_CONTRACTOR_ANALYSIS"
+                "api_used": "TAVILY_CONTRACTOR_ANALYSIS",
+                "failed_calls": 0
             }
             
             # Targeted searches for contractor analysis
@@ -141,6 +164,7 @@ class ContractorWebsiteAnalyzer:
                         
                 except Exception as api_error:
                     logger.error(f"Tavily API error: {api_error}")
+                    discovery_data["failed_calls"] += 1
                     continue
                 
                 # Rate limiting
@@ -188,6 +212,7 @@ class ContractorWebsiteAnalyzer:
                 
             except Exception as extract_error:
                 logger.warning(f"Content extraction error for {url}: {extract_error}")
+                discovery_data["failed_calls"] += 1
                 continue
             
             await asyncio.sleep(1.5)
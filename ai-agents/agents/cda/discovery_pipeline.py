@@ -0,0 +1,189 @@
+"""
+Concurrent Tier Discovery Pipeline
+Runs CDA discovery tiers concurrently and streams candidates to scoring
+
+- Tier 1, Tier 2 (and anything else passed as an early tier) start together
+- Tier 3 starts as soon as the early tiers are trending short, instead of
+  waiting for both to finish; it is cancelled if they fill the target after all
+- Every accepted candidate is scored immediately while other tiers are still running
+- De-duplication is incremental but keeps the same winner and order as the
+  sequential tier1 -> tier2 -> tier3 pass, whatever order the tiers finish in
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Optional
+
+
+# Start Tier 3 early once a finished early tier leaves us below this share of the target
+SPECULATIVE_TIER3_RATIO = 0.5
+
+# Concurrent per-candidate scoring calls (each one is a GPT-4 request)
+SCORING_CONCURRENCY = 8
+
+TIER3 = "tier3"
+
+
+def _dedup_key(contractor: dict[str, Any]) -> str:
+    return (contractor.get("company_name") or "").lower().strip()
+
+
+class IncrementalDeduplicator:
+    """
+    Company-name de-duplication that accepts tiers in any arrival order.
+
+    Each entry remembers (tier priority, position in tier). A later-arriving
+    copy from a higher priority tier replaces the earlier one, so the final
+    result equals de-duplicating the tiers concatenated in priority order.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, contractors: list[dict[str, Any]], priority: int) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Add one tier's results; returns (accepted, superseded) contractors"""
+        accepted, superseded = [], []
+        for position, contractor in enumerate(contractors):
+            name = _dedup_key(contractor)
+            if not name:
+                continue
+            rank = (priority, position)
+            current = self._entries.get(name)
+            if current is None or rank < current[0]:
+                if current is not None:
+                    superseded.append(current[1])
+                self._entries[name] = (rank, contractor)
+                accepted.append(contractor)
+        return accepted, superseded
+
+    def unique(self) -> list[dict[str, Any]]:
+        """Winning contractors in sequential (tier, position) order"""
+        return [contractor for _, contractor in sorted(self._entries.values(), key=lambda entry: entry[0])]
+
+
+@dataclass
+class DiscoveryPipelineResult:
+    """Unique scored candidates plus per-tier accounting"""
+    contractors: list[dict[str, Any]]
+    tier_counts: dict[str, int] = field(default_factory=dict)
+    tier_latency_ms: dict[str, float] = field(default_factory=dict)
+    tier3_started: bool = False
+    tier3_speculative: bool = False
+    tier3_cancelled: bool = False
+    total_ms: float = 0.0
+
+
+class TierDiscoveryPipeline:
+    """Runs discovery tiers concurrently and scores candidates as they arrive"""
+
+    def __init__(self,
+                 target_count: int,
+                 score_candidate: Optional[Callable[[dict[str, Any]], Awaitable[None]]] = None,
+                 speculative_ratio: float = SPECULATIVE_TIER3_RATIO,
+                 scoring_concurrency: int = SCORING_CONCURRENCY):
+        self.target_count = target_count
+        self.score_candidate = score_candidate
+        self.speculative_ratio = speculative_ratio
+        self._scoring_slots = asyncio.Semaphore(max(1, scoring_concurrency))
+
+    async def run(self,
+                  early_tiers: dict[str, Callable[[], Awaitable[list[dict[str, Any]]]]],
+                  tier3: Optional[Callable[[int], Awaitable[list[dict[str, Any]]]]] = None) -> DiscoveryPipelineResult:
+        """
+        Run the tiers and return de-duplicated, scored candidates.
+
+        Args:
+            early_tiers: Tier name -> coroutine factory, in priority order
+            tier3: Coroutine factory taking the number of contractors still needed
+        """
+        started = time.perf_counter()
+        priorities = {name: rank for rank, name in enumerate(early_tiers)}
+        priorities[TIER3] = len(priorities)
+
+        result = DiscoveryPipelineResult(contractors=[])
+        dedup = IncrementalDeduplicator()
+        scoring: dict[int, asyncio.Task] = {}
+
+        tasks = {
+            asyncio.create_task(self._timed(name, factory, started, result)): name
+            for name, factory in early_tiers.items()
+        }
+        tier3_task: Optional[asyncio.Task] = None
+
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks.pop(task)
+                    if task.cancelled():
+                        continue
+                    accepted, superseded = dedup.add(task.result(), priorities[name])
+                    for contractor in superseded:
+                        stale = scoring.pop(id(contractor), None)
+                        if stale:
+                            stale.cancel()
+                    for contractor in accepted:
+                        scoring[id(contractor)] = asyncio.create_task(self._score(contractor))
+
+                early_pending = any(name != TIER3 for name in tasks.values())
+                found = len(dedup)
+
+                if tier3 is not None and tier3_task is None and found < self.target_count:
+                    trending_short = found < self.target_count * self.speculative_ratio
+                    if not early_pending or trending_short:
+                        remaining = self.target_count - found
+                        result.tier3_started = True
+                        result.tier3_speculative = early_pending
+                        print(f"[CDA Pipeline] Starting Tier 3 for {remaining} contractors"
+                              f"{' (speculative)' if early_pending else ''}")
+                        tier3_task = asyncio.create_task(
+                            self._timed(TIER3, partial(tier3, remaining), started, result)
+                        )
+                        tasks[tier3_task] = TIER3
+
+                if (tier3_task is not None and not tier3_task.done() and not early_pending
+                        and found >= self.target_count):
+                    print("[CDA Pipeline] Early tiers filled the target - cancelling speculative Tier 3")
+                    tier3_task.cancel()
+                    result.tier3_cancelled = True
+
+            if scoring:
+                await asyncio.gather(*scoring.values())
+        finally:
+            for task in list(tasks) + list(scoring.values()):
+                task.cancel()
+
+        result.contractors = dedup.unique()
+        result.total_ms = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    async def _timed(self, name: str, factory: Callable[[], Awaitable[list[dict[str, Any]]]],
+                     started: float, result: DiscoveryPipelineResult) -> list[dict[str, Any]]:
+        tier_start = time.perf_counter()
+        try:
+            contractors = list(await factory() or [])
+        except asyncio.CancelledError:
+            result.tier_latency_ms[name] = round((time.perf_counter() - tier_start) * 1000, 1)
+            raise
+        except Exception as e:
+            print(f"[CDA Pipeline] {name} failed: {e}")
+            contractors = []
+        result.tier_latency_ms[name] = round((time.perf_counter() - tier_start) * 1000, 1)
+        result.tier_counts[name] = len(contractors)
+        print(f"[CDA Pipeline] {name}: {len(contractors)} contractors in {result.tier_latency_ms[name]:.0f}ms "
+              f"(+{(time.perf_counter() - started) * 1000:.0f}ms)")
+        return contractors
+
+    async def _score(self, contractor: dict[str, Any]) -> None:
+        if self.score_candidate is None:
+            return
+        async with self._scoring_slots:
+            try:
+                await self.score_candidate(contractor)
+            except Exception as e:
+                print(f"[CDA Pipeline] Scoring failed for {contractor.get('company_name', 'Unknown')}: {e}")
@@ -5,7 +5,7 @@ Combines Google Places discovery with 66-field profile building
 import json
 import os
 from dataclasses import dataclass
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Set
 import logging
 import asyncio
 
@@ -38,7 +38,8 @@ class EnhancedWebSearchAgent:
                                                 project_type: str,
                                                 location: Dict[str, str],
                                                 contractors_needed: int = 10,
-                                                radius_miles: int = 15) -> Dict[str, Any]:
+                                                radius_miles: int = 15,
+                                                exclude_place_ids: Optional[Set[str]] = None) -> Dict[str, Any]:
         """
         Discover contractors and build complete 66-field profiles
         
@@ -48,6 +49,8 @@ class EnhancedWebSearchAgent:
             location: Location dict with city, state, zip
             contractors_needed: Number of contractors to find
             radius_miles: Search radius
+            exclude_place_ids: Google place ids already profiled by an inner
+                expansion ring; the Places search skips them
         
         Returns:
             Dict with discovered contractors with 66-field profiles
@@ -56,9 +59,11 @@ class EnhancedWebSearchAgent:
         
         try:
             # Step 1: Google Places Discovery
-            from google_places_optimized import GooglePlacesOptimized
+            from agents.cda.google_places_unified import GooglePlacesOptimized
             google_tool = GooglePlacesOptimized()
             
+            # Inner-ring places are excluded in the search itself, so the
+            # requested count is filled with places not profiled yet
             google_discovery = await google_tool.discover_contractors(
                 service_type=project_type,
                 location=location,
@@ -66,7 +71,8 @@ class EnhancedWebSearchAgent:
                 radius_miles=radius_miles,
                 cost_mode="CHEAPEST",
                 include_sabs=True,
-                min_rating=3.0
+                min_rating=3.0,
+                exclude_place_ids=exclude_place_ids
             )
             
             if not google_discovery.get("success"):
@@ -78,7 +84,8 @@ class EnhancedWebSearchAgent:
             
             # Step 2: Build 66-field profiles
             profiles = []
-            for google_contractor in google_discovery.get("contractors", []):
+            google_contractors = google_discovery.get("contractors", [])
+            for google_contractor in google_contractors:
                 try:
                     # Enrich with Tavily if website available
                     web_data = None
@@ -7,11 +7,35 @@ import logging
 import os
 import httpx
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, Callable, Collection
 from datetime import datetime
 
+from services.api_response_cache import ApiResponseCache, get_api_response_cache, geo_cell, make_cache_key, normalize_text
+from utils.rate_limiter import AsyncTokenBucket
+
 logger = logging.getLogger(__name__)
 
+# Places API (New) default quota is 600 requests/minute per method
+PLACES_QPS = float(os.getenv("GOOGLE_PLACES_QPS", "10"))
+PLACES_BURST = float(os.getenv("GOOGLE_PLACES_BURST", "10"))
+
+# Place Details requests in flight at once during shortlist enrichment
+ENRICHMENT_CONCURRENCY = int(os.getenv("GOOGLE_PLACES_ENRICHMENT_CONCURRENCY", "5"))
+
+PLACES_SEARCH_API = "google_places_search"
+PLACES_DETAILS_API = "google_places_details"
+
+_places_limiter: Optional[AsyncTokenBucket] = None
+
+
+def get_places_rate_limiter() -> AsyncTokenBucket:
+    """Process-wide limiter so every Places client shares one quota"""
+    global _places_limiter
+    if _places_limiter is None:
+        _places_limiter = AsyncTokenBucket(rate=PLACES_QPS, capacity=PLACES_BURST)
+    return _places_limiter
+
 
 class GooglePlacesOptimized:
     """
@@ -19,9 +43,17 @@ class GooglePlacesOptimized:
     Gets 20-60 contractors per search instead of 1
     """
     
-    def __init__(self):
+    def __init__(self,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 rate_limiter: Optional[AsyncTokenBucket] = None,
+                 enrichment_concurrency: int = ENRICHMENT_CONCURRENCY,
+                 cache: Optional[ApiResponseCache] = None):
         self.api_key = os.getenv("GOOGLE_PLACES_API_KEY") or os.getenv("GOOGLE_MAPS_API_KEY")
         self.base_url = "https://places.googleapis.com/v1"
+        self._http_client = http_client
+        self.rate_limiter = rate_limiter or get_places_rate_limiter()
+        self.enrichment_concurrency = max(1, enrichment_concurrency)
+        self.cache = cache or get_api_response_cache()
         
         if self.api_key:
             logger.info(f"Google Places Optimized initialized with key: {self.api_key[:20]}...")
@@ -35,7 +67,8 @@ class GooglePlacesOptimized:
                                  radius_miles: float = 15,
                                  cost_mode: str = "CHEAPEST",
                                  include_sabs: bool = True,
-                                 min_rating: float = 3.5) -> Dict[str, Any]:
+                                 min_rating: float = 3.5,
+                                 exclude_place_ids: Optional[Collection[str]] = None) -> Dict[str, Any]:
         """
         Main discovery method following the master prompt strategy
         
@@ -47,6 +80,9 @@ class GooglePlacesOptimized:
             cost_mode: "CHEAPEST" or "ONE_PASS_RICH"
             include_sabs: Include service area businesses (mobile contractors)
             min_rating: Minimum rating threshold
+            exclude_place_ids: Places already found (e.g. by an inner expansion
+                ring); they are skipped while paging so `target_count` is met
+                with new places only
         
         Returns:
             Dict with discovered contractors and metadata
@@ -66,153 +102,275 @@ class GooglePlacesOptimized:
         }
         
         places_type = service_to_type.get(service_type.lower(), "contractor")
+        excluded = frozenset(exclude_place_ids or ())
         
         # Calculate search area
         search_area = await self._calculate_search_area(location, radius_miles)
         
-        if cost_mode == "CHEAPEST":
-            return await self._discover_cheapest(
-                service_type, places_type, location, search_area,
-                target_count, include_sabs, min_rating
-            )
-        else:
-            return await self._discover_rich(
-                service_type, places_type, location, search_area,
-                target_count, include_sabs, min_rating
-            )
+        async with self._client_scope() as client:
+            if cost_mode == "CHEAPEST":
+                return await self._discover_cheapest(
+                    client, service_type, places_type, location, search_area,
+                    target_count, include_sabs, min_rating, excluded
+                )
+            else:
+                return await self._discover_rich(
+                    client, service_type, places_type, location, search_area,
+                    target_count, include_sabs, min_rating, excluded
+                )
     
-    async def _discover_cheapest(self, service_type: str, places_type: str,
+    @asynccontextmanager
+    async def _client_scope(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Yield a pooled HTTP client: the injected one, the app-wide client from
+        the FastAPI lifespan, or (outside the app) one client for this discovery run
+        """
+        if self._http_client is not None:
+            yield self._http_client
+            return
+        
+        try:
+            from utils.lifespan import get_http_client
+            yield get_http_client()
+            return
+        except (ImportError, RuntimeError):
+            pass
+        
+        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0)) as client:
+            yield client
+    
+    async def _request(self, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one Places API request through the shared quota limiter"""
+        await self.rate_limiter.acquire()
+        return await client.request(method, url, timeout=30.0, **kwargs)
+    
+    async def _discover_cheapest(self, client: httpx.AsyncClient,
+                                service_type: str, places_type: str,
                                 location: Dict[str, Any], search_area: Dict[str, Any],
                                 target_count: int, include_sabs: bool,
-                                min_rating: float) -> Dict[str, Any]:
+                                min_rating: float,
+                                excluded: Collection[str] = frozenset()) -> Dict[str, Any]:
         """
         CHEAPEST mode: Get IDs first, then enrich only what we need
         """
         logger.info("[CHEAPEST MODE] Discovery pass for IDs only")
         
         # Step 1: Discovery pass (IDs only)
-        all_place_ids = []
-        next_page_token = None
         max_pages = 3  # Up to 60 results
+        shortlist_size = target_count * 2
+        field_mask = "places.id,places.displayName,places.rating,places.userRatingCount,nextPageToken"
+        body = self._search_body(service_type, places_type, location, search_area, include_sabs)
         
-        for page in range(max_pages):
-            # Text Search for IDs only
-            headers = {
-                "Content-Type": "application/json",
-                "X-Goog-Api-Key": self.api_key,
-                "X-Goog-FieldMask": "places.id,places.displayName,places.rating,places.userRatingCount,nextPageToken"
+        def eligible(place: Dict[str, Any]) -> bool:
+            if place.get("id") in excluded:
+                return False
+            return place.get("rating", 0) >= min_rating or not place.get("rating")
+        
+        def enough(pages: List[List[Dict[str, Any]]]) -> bool:
+            # Enough new candidates to fill the enrichment shortlist
+            return sum(1 for places in pages for place in places if eligible(place)) >= shortlist_size
+        
+        pages, searches = await self._search_pages(client, body, field_mask, search_area, max_pages, enough)
+        
+        # Quick filter by rating if available
+        all_place_ids = [
+            {
+                "id": place.get("id"),
+                "name": place.get("displayName", {}).get("text", ""),
+                "rating": place.get("rating"),
+                "reviews": place.get("userRatingCount", 0)
             }
-            
-            if page == 0:
-                # First search
-                query = f"{service_type} {location.get('city', '')} {location.get('state', '')}"
-                body = {
-                    "textQuery": query,
-                    "includedType": places_type,
-                    "strictTypeFiltering": True,
-                    "includePureServiceAreaBusinesses": include_sabs,
-                    "pageSize": 20
-                }
-                
-                # Add location restriction if we have a rectangle
-                if search_area.get("rectangle"):
-                    body["locationRestriction"] = {"rectangle": search_area["rectangle"]}
-                elif search_area.get("circle"):
-                    body["locationBias"] = {"circle": search_area["circle"]}
-            else:
-                # Pagination
-                if not next_page_token:
-                    break
-                body = {
-                    "pageToken": next_page_token
-                }
-            
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{self.base_url}/places:searchText",
-                        json=body,
-                        headers=headers,
-                        timeout=30.0
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        places = data.get("places", [])
-                        
-                        # Quick filter by rating if available
-                        for place in places:
-                            if place.get("rating", 0) >= min_rating or not place.get("rating"):
-                                all_place_ids.append({
-                                    "id": place.get("id"),
-                                    "name": place.get("displayName", {}).get("text", ""),
-                                    "rating": place.get("rating"),
-                                    "reviews": place.get("userRatingCount", 0)
-                                })
-                        
-                        logger.info(f"[PAGE {page+1}] Found {len(places)} places, {len(all_place_ids)} total after filtering")
-                        
-                        next_page_token = data.get("nextPageToken")
-                        if not next_page_token:
-                            break
-                    else:
-                        logger.error(f"Search failed: {response.status_code} - {response.text}")
-                        break
-                        
-            except Exception as e:
-                logger.error(f"Error in discovery pass: {e}")
-                break
-            
-            # Rate limiting
-            if page < max_pages - 1:
-                await asyncio.sleep(1)
+            for places in pages for place in places if eligible(place)
+        ]
         
         logger.info(f"[DISCOVERY COMPLETE] Found {len(all_place_ids)} candidates")
         
         # Step 2: Sort by rating/reviews and take top candidates
-        all_place_ids.sort(key=lambda x: (x.get("rating", 0) * x.get("reviews", 0)), reverse=True)
-        shortlist = all_place_ids[:min(len(all_place_ids), target_count * 2)]
+        all_place_ids.sort(key=lambda x: ((x.get("rating") or 0) * (x.get("reviews") or 0)), reverse=True)
+        shortlist = all_place_ids[:min(len(all_place_ids), shortlist_size)]
         
         # Step 3: Enrich shortlist with details
         logger.info(f"[ENRICHMENT] Getting details for top {len(shortlist)} contractors")
-        enriched_contractors = []
-        
-        for place_info in shortlist[:target_count * 2]:  # Get details for 2x target
-            details = await self._get_place_details(place_info["id"])
-            if details:
-                enriched_contractors.append(details)
-            
-            # Stop if we have enough
-            if len(enriched_contractors) >= target_count:
-                break
-            
-            # Rate limiting
-            await asyncio.sleep(0.5)
+        enriched_contractors, detail_calls = await self._enrich_shortlist(client, shortlist, target_count)
         
         return {
             "success": True,
-            "contractors": enriched_contractors[:target_count],
+            "contractors": enriched_contractors,
             "total_discovered": len(all_place_ids),
-            "search_pages": page + 1,
+            "search_pages": len(pages),
             "cost_mode": "CHEAPEST",
             "api_calls": {
-                "searches": page + 1,
-                "details": len(enriched_contractors)
+                "searches": searches,
+                "details": detail_calls
             }
         }
     
-    async def _discover_rich(self, service_type: str, places_type: str,
+    def _search_body(self, service_type: str, places_type: str, location: Dict[str, Any],
+                     search_area: Dict[str, Any], include_sabs: bool) -> Dict[str, Any]:
+        """First-page Text Search request body"""
+        query = f"{service_type} {location.get('city', '')} {location.get('state', '')}"
+        body = {
+            "textQuery": query,
+            "includedType": places_type,
+            "strictTypeFiltering": True,
+            "includePureServiceAreaBusinesses": include_sabs,
+            "pageSize": 20
+        }
+        
+        # Add location restriction if we have a rectangle
+        if search_area.get("rectangle"):
+            body["locationRestriction"] = {"rectangle": search_area["rectangle"]}
+        elif search_area.get("circle"):
+            body["locationBias"] = {"circle": search_area["circle"]}
+        return body
+    
+    def _search_cache_key(self, body: Dict[str, Any], field_mask: str, search_area: Dict[str, Any]) -> str:
+        """Normalized key: query text + type + geo cell/radius + field mask"""
+        area = ""
+        circle = search_area.get("circle")
+        rectangle = search_area.get("rectangle")
+        if rectangle:
+            low, high = rectangle.get("low", {}), rectangle.get("high", {})
+            area = (f"rect:{geo_cell(low.get('latitude'), low.get('longitude'))}"
+                    f":{geo_cell(high.get('latitude'), high.get('longitude'))}")
+        elif circle:
+            center = circle.get("center", {})
+            area = (f"circle:{geo_cell(center.get('latitude'), center.get('longitude'))}"
+                    f":{round(float(circle.get('radius', 0)) / 1609.34)}mi")
+        return make_cache_key(
+            PLACES_SEARCH_API,
+            query=normalize_text(body.get("textQuery")),
+            included_type=body.get("includedType"),
+            strict=body.get("strictTypeFiltering"),
+            sabs=body.get("includePureServiceAreaBusinesses"),
+            area=area,
+            field_mask=field_mask,
+        )
+    
+    async def _search_pages(self, client: httpx.AsyncClient, body: Dict[str, Any], field_mask: str,
+                            search_area: Dict[str, Any], max_pages: int,
+                            enough: Callable[[List[List[Dict[str, Any]]]], bool]) -> Tuple[List[List[Dict[str, Any]]], int]:
+        """
+        Run Text Search page by page until `enough` is satisfied.
+        
+        The raw pages are cached under the normalized request key. A cached
+        result is reused when it was exhausted or already satisfies `enough`;
+        otherwise the search is re-run from the first page (page tokens expire).
+        Returns (pages, paid search calls).
+        """
+        key = self._search_cache_key(body, field_mask, search_area)
+        entry = await asyncio.to_thread(
+            self.cache.get, PLACES_SEARCH_API, key,
+            lambda cached: cached.value["exhausted"] or enough(cached.value["pages"])
+        )
+        if entry is not None:
+            logger.info(f"[CACHE HIT] Text Search '{body.get('textQuery')}' ({len(entry.value['pages'])} pages)")
+            return entry.value["pages"], 0
+        
+        headers = {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": self.api_key,
+            "X-Goog-FieldMask": field_mask
+        }
+        pages: List[List[Dict[str, Any]]] = []
+        exhausted = False
+        failed = False
+        searches = 0
+        request_body = body
+        
+        for page in range(max_pages):
+            try:
+                searches += 1
+                response = await self._request(
+                    client, "POST", f"{self.base_url}/places:searchText",
+                    json=request_body,
+                    headers=headers
+                )
+                
+                if response.status_code != 200:
+                    logger.error(f"Search failed: {response.status_code} - {response.text}")
+                    failed = True
+                    break
+                
+                data = response.json()
+                pages.append(data.get("places", []))
+                logger.info(f"[PAGE {page+1}] Found {len(pages[-1])} places")
+                
+                next_page_token = data.get("nextPageToken")
+                if not next_page_token:
+                    exhausted = True
+                    break
+                if enough(pages):
+                    break
+                
+                # Pagination
+                request_body = {"pageToken": next_page_token}
+                
+            except Exception as e:
+                logger.error(f"Error in discovery pass: {e}")
+                failed = True
+                break
+        
+        # Transient failures are not cached; an exhausted empty search is a negative result
+        if not failed:
+            await asyncio.to_thread(
+                self.cache.set, PLACES_SEARCH_API, key,
+                {"pages": pages, "exhausted": exhausted},
+                exhausted and not any(pages)
+            )
+        
+        return pages, searches
+    
+    async def _enrich_shortlist(self, client: httpx.AsyncClient,
+                                shortlist: List[Dict[str, Any]],
+                                target_count: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch details for the shortlist with bounded concurrency.
+        
+        Returns the first `target_count` successfully enriched places in
+        shortlist order (the same set the one-at-a-time loop produced) and
+        cancels the remaining requests as soon as that prefix is settled.
+        """
+        if not shortlist or target_count <= 0:
+            return [], 0
+        
+        slots = asyncio.Semaphore(self.enrichment_concurrency)
+        calls = 0
+        
+        async def fetch(place_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            nonlocal calls
+            async with slots:
+                calls += 1
+                return await self._get_place_details(place_info["id"], client)
+        
+        tasks = [asyncio.create_task(fetch(place_info)) for place_info in shortlist]
+        enriched: List[Dict[str, Any]] = []
+        try:
+            for task in tasks:
+                details = await task
+                if details:
+                    enriched.append(details)
+                    # Stop as soon as the target is met
+                    if len(enriched) >= target_count:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        return enriched, calls
+    
+    async def _discover_rich(self, client: httpx.AsyncClient,
+                            service_type: str, places_type: str,
                             location: Dict[str, Any], search_area: Dict[str, Any],
                             target_count: int, include_sabs: bool,
-                            min_rating: float) -> Dict[str, Any]:
+                            min_rating: float,
+                            excluded: Collection[str] = frozenset()) -> Dict[str, Any]:
         """
         ONE_PASS_RICH mode: Get all fields in one search
         """
         logger.info("[RICH MODE] Single pass with all fields")
         
         headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": self.api_key,
             "X-Goog-FieldMask": (
                 "places.id,places.displayName,places.formattedAddress,"
                 "places.primaryType,places.types,places.businessStatus,"
@@ -223,57 +381,29 @@ class GooglePlacesOptimized:
             )
         }
         
-        query = f"{service_type} {location.get('city', '')} {location.get('state', '')}"
-        body = {
-            "textQuery": query,
-            "includedType": places_type,
-            "strictTypeFiltering": True,
-            "includePureServiceAreaBusinesses": include_sabs,
-            "pageSize": 20
-        }
-        
-        # Add location restriction
-        if search_area.get("rectangle"):
-            body["locationRestriction"] = {"rectangle": search_area["rectangle"]}
-        elif search_area.get("circle"):
-            body["locationBias"] = {"circle": search_area["circle"]}
-        
-        all_contractors = []
+        body = self._search_body(service_type, places_type, location, search_area, include_sabs)
+        pages, searches = await self._search_pages(
+            client, body, headers["X-Goog-FieldMask"], search_area, max_pages=1, enough=lambda pages: True
+        )
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/places:searchText",
-                    json=body,
-                    headers=headers,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    places = data.get("places", [])
-                    
-                    for place in places:
-                        if place.get("rating", 0) >= min_rating or not place.get("rating"):
-                            contractor = self._format_contractor(place)
-                            all_contractors.append(contractor)
-                    
-                    logger.info(f"[RICH MODE] Found {len(all_contractors)} contractors in one call")
-                else:
-                    logger.error(f"Search failed: {response.status_code}")
-                    
-        except Exception as e:
-            logger.error(f"Error in rich mode: {e}")
+        all_contractors = [
+            self._format_contractor(place)
+            for places in pages for place in places
+            if place.get("id") not in excluded
+            and (place.get("rating", 0) >= min_rating or not place.get("rating"))
+        ]
+        logger.info(f"[RICH MODE] Found {len(all_contractors)} contractors in one call")
         
         return {
             "success": True,
             "contractors": all_contractors[:target_count],
             "total_discovered": len(all_contractors),
             "cost_mode": "ONE_PASS_RICH",
-            "api_calls": {"searches": 1, "details": 0}
+            "api_calls": {"searches": searches, "details": 0}
         }
     
-    async def _get_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_place_details(self, place_id: str,
+                                 client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, Any]]:
         """Get detailed information for a specific place"""
         headers = {
             "X-Goog-Api-Key": self.api_key,
@@ -285,21 +415,35 @@ class GooglePlacesOptimized:
             )
         }
         
+        key = make_cache_key(PLACES_DETAILS_API, place_id=place_id, field_mask=headers["X-Goog-FieldMask"])
+        entry = await asyncio.to_thread(self.cache.get, PLACES_DETAILS_API, key)
+        if entry is not None:
+            return self._format_contractor(entry.value) if entry.value else None
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/places/{place_id}",
-                    headers=headers,
-                    timeout=30.0
+            if client is None:
+                async with self._client_scope() as scoped_client:
+                    response = await self._request(
+                        scoped_client, "GET", f"{self.base_url}/places/{place_id}", headers=headers
+                    )
+            else:
+                response = await self._request(
+                    client, "GET", f"{self.base_url}/places/{place_id}", headers=headers
                 )
+            
+            if response.status_code == 200:
+                place = response.json()
+                await asyncio.to_thread(self.cache.set, PLACES_DETAILS_API, key, place)
+                return self._format_contractor(place)
+            elif response.status_code == 404:
+                # Place no longer exists - remember that instead of paying for it again
+                logger.warning(f"Details not found for {place_id}")
+                await asyncio.to_thread(self.cache.set, PLACES_DETAILS_API, key, None, True)
+                return None
+            else:
+                logger.error(f"Details failed for {place_id}: {response.status_code}")
+                return None
                 
-                if response.status_code == 200:
-                    place = response.json()
-                    return self._format_contractor(place)
-                else:
-                    logger.error(f"Details failed for {place_id}: {response.status_code}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error getting details for {place_id}: {e}")
             return None
@@ -308,22 +452,11 @@ class GooglePlacesOptimized:
                                     radius_miles: float) -> Dict[str, Any]:
         """Calculate search area using national geocoding service"""
         # Use the geocoding service for accurate nationwide coverage
-        from geocoding_service import GeocodingService
+        from agents.cda.geocoding_service import GeocodingService
         geocoder = GeocodingService()
         
         # Delegate to geocoding service
         return geocoder.calculate_search_area(location, radius_miles)
-                },
-                "high": {
-                    "latitude": center_lat + lat_offset,
-                    "longitude": center_lng + lng_offset
-                }
-            },
-            "circle": {
-                "center": {"latitude": center_lat, "longitude": center_lng},
-                "radius": radius_meters
-            }
-        }
     
     def _format_contractor(self, place: Dict[str, Any]) -> Dict[str, Any]:
         """Format Google Place into contractor record"""
@@ -2,19 +2,23 @@
 Contractor Scoring Algorithm
 Unified scoring system for all tiers of contractors
 """
-from typing import Any
+from typing import Any, Optional
+
+from agents.cda.batch_scoring import BatchContractorScorer
 
 
 class ContractorScorer:
     """Unified contractor scoring and ranking system"""
 
-    def score_contractors(self, contractors: list[dict[str, Any]], bid_data: dict[str, Any]) -> list[dict[str, Any]]:
+    def score_contractors(self, contractors: list[dict[str, Any]], bid_data: dict[str, Any],
+                          top_k: Optional[int] = None) -> list[dict[str, Any]]:
         """
         Score and rank contractors from all tiers
 
         Args:
             contractors: List of contractors from all tiers
             bid_data: Bid card data for scoring context
+            top_k: Only rank and return the best top_k contractors
 
         Returns:
             Sorted list of contractors by score (highest first)
@@ -22,20 +26,8 @@ class ContractorScorer:
         try:
             print(f"[Scorer] Scoring {len(contractors)} contractors")
 
-            scored_contractors = []
-
-            for contractor in contractors:
-                # Calculate comprehensive score
-                total_score = self._calculate_total_score(contractor, bid_data)
-
-                # Add final score to contractor data
-                contractor["final_score"] = total_score
-                contractor["score_breakdown"] = self._get_score_breakdown(contractor, bid_data)
-
-                scored_contractors.append(contractor)
-
-            # Sort by final score (highest first)
-            scored_contractors.sort(key=lambda x: x["final_score"], reverse=True)
+            # Columnar scoring - identical results to the per-contractor methods below
+            scored_contractors = BatchContractorScorer().score_contractors(contractors, bid_data, top_k=top_k)
 
             print(f"[Scorer] Top contractor: {scored_contractors[0]['company_name']} (score: {scored_contractors[0]['final_score']:.1f})")
 
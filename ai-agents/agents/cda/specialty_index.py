@@ -0,0 +1,232 @@
+"""
+Specialty Taxonomy Index
+Precompiled trade ids and bitsets for contractor specialty matching
+
+Built once from specialty_mapper and the project type catalog:
+- Every normalized term of the trade taxonomy gets a stable integer trade id;
+  the vocabulary is fixed once built, and terms outside it map to no bit
+- Project types resolve (once) to a bitset of trade ids, including the
+  taxonomy expansions that used to be re-scanned per contractor
+- Contractor specialty lists and free text resolve to bitsets, memoized in
+  bounded LRUs (MEMO_SIZE entries each)
+
+A specialty match is then a single integer AND per contractor.
+"""
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any, Optional
+
+from agents.cda.specialty_mapper import GOOGLE_TYPE_SPECIALTIES, PROJECT_TYPE_SPECIALTIES
+
+
+MEMO_SIZE = 8_192
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = {"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"}
+
+# Suffixes collapsed so 'plumber'/'plumbing'/'plumb' and 'electrician'/'electrical'
+# share a trade id. Applied once, longest first.
+_SUFFIXES = (
+    ("icians", "ic"), ("ician", "ic"), ("ical", "ic"),
+    ("ings", ""), ("ing", ""), ("ers", ""), ("er", ""),
+    ("ies", "y"), ("es", ""), ("ed", ""), ("s", ""), ("e", ""),
+)
+
+# Service words that say nothing about the trade; never used when expanding
+# a project type through the taxonomy ('roofing repair' must not pull in 'pipe repair')
+_GENERIC_TERMS = {
+    "repair", "installation", "install", "maintenance", "work", "service", "general",
+    "home", "improvement", "contracting", "cleaning", "upgrades", "interior", "exterior",
+}
+
+# Keyword expansions per project type family (previously inlined in Tier1Matcher)
+TRADE_KEYWORDS = {
+    "kitchen": ["kitchen", "remodel", "cabinet", "countertop"],
+    "bathroom": ["bathroom", "bath", "plumbing", "tile"],
+    "deck": ["deck", "patio", "outdoor", "carpentry"],
+    "roofing": ["roof", "roofing", "shingle", "gutter"],
+    "painting": ["paint", "painting", "drywall", "interior"],
+    "flooring": ["floor", "flooring", "tile", "hardwood", "carpet"],
+    "plumbing": ["plumb", "plumbing", "pipe", "drain"],
+    "electrical": ["electric", "electrical", "wiring", "panel"],
+}
+
+
+def stem(token: str) -> str:
+    """Collapse common trade-word suffixes"""
+    for suffix, replacement in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)] + replacement
+    return token
+
+
+def normalize_terms(text: str) -> list[str]:
+    """Split a specialty, google type or project type into normalized terms"""
+    terms = []
+    for token in _TOKEN_RE.findall(str(text).lower().replace("_", " ")):
+        if token in _STOPWORDS:
+            continue
+        terms.append(stem(token))
+        # Compound rooms ('bathroom', 'mudroom') also match their prefix
+        if token.endswith("room") and len(token) > 6:
+            terms.append(stem(token[:-4]))
+    return terms
+
+
+_GENERIC_STEMS = {stem(term) for term in _GENERIC_TERMS}
+
+
+class SpecialtyIndex:
+    """Maps normalized specialties and project types to integer trade ids and bitsets"""
+
+    def __init__(self, project_types: Optional[Iterable[str]] = None, memo_size: int = MEMO_SIZE):
+        self._trade_ids: dict[str, int] = {}
+        self._text_bits: OrderedDict[str, int] = OrderedDict()
+        self._list_bits: OrderedDict[tuple, int] = OrderedDict()
+        self._project_bits: OrderedDict[str, int] = OrderedDict()
+        self._memo_size = memo_size
+        self._frozen = False
+        self._lock = threading.Lock()
+
+        # Register the taxonomy so trade ids are stable from startup
+        for google_type, specialties in GOOGLE_TYPE_SPECIALTIES.items():
+            self.bits_for_text(google_type)
+            self.bits_for_list(specialties)
+        for keywords in TRADE_KEYWORDS.values():
+            self.keyword_bits(keywords)
+        for project_type in PROJECT_TYPE_SPECIALTIES:
+            self.project_bits(project_type)
+        for project_type in project_types or []:
+            self.project_bits(project_type)
+        # Contractor names and specialties never add trade ids
+        self._frozen = True
+
+    @property
+    def trade_count(self) -> int:
+        return len(self._trade_ids)
+
+    def trade_id(self, term: str) -> Optional[int]:
+        """Return the integer trade id for a normalized term; None outside the vocabulary"""
+        trade_id = self._trade_ids.get(term)
+        if trade_id is None and not self._frozen:
+            trade_id = self._trade_ids.setdefault(term, len(self._trade_ids))
+        return trade_id
+
+    def _term_bits(self, terms: Iterable[str]) -> int:
+        bits = 0
+        for term in terms:
+            trade_id = self.trade_id(term)
+            if trade_id is not None:
+                bits |= 1 << trade_id
+        return bits
+
+    def _recall(self, memo: OrderedDict, key: Hashable) -> Optional[int]:
+        with self._lock:
+            bits = memo.get(key)
+            if bits is not None:
+                memo.move_to_end(key)
+            return bits
+
+    def _remember(self, memo: OrderedDict, key: Hashable, bits: int) -> int:
+        with self._lock:
+            memo[key] = bits
+            memo.move_to_end(key)
+            while len(memo) > self._memo_size:
+                memo.popitem(last=False)
+        return bits
+
+    def bits_for_text(self, text: str) -> int:
+        """Bitset of trade ids for a single specialty/type string"""
+        key = str(text).lower()
+        bits = self._recall(self._text_bits, key)
+        if bits is None:
+            bits = self._remember(self._text_bits, key, self._term_bits(normalize_terms(key)))
+        return bits
+
+    def bits_for_list(self, values: Optional[Iterable[Any]]) -> int:
+        """Bitset for a contractor's specialties or google types, memoized by content"""
+        if not values:
+            return 0
+        if isinstance(values, str):
+            values = [values]
+        key = tuple(str(v) for v in values)
+        bits = self._recall(self._list_bits, key)
+        if bits is None:
+            bits = 0
+            for value in key:
+                bits |= self.bits_for_text(value)
+            bits = self._remember(self._list_bits, key, bits)
+        return bits
+
+    def keyword_bits(self, keywords: Iterable[str]) -> int:
+        return self.bits_for_list(list(keywords))
+
+    def _expansion_bits(self, specialties: Iterable[str]) -> int:
+        bits = 0
+        for specialty in specialties:
+            bits |= self._term_bits(term for term in normalize_terms(specialty) if term not in _GENERIC_STEMS)
+        return bits
+
+    def project_bits(self, project_type: str) -> int:
+        """
+        Bitset for a project type: its own terms plus taxonomy expansions.
+
+        Resolved once per project type; the substring scan over the
+        taxonomy keys never runs per contractor.
+        """
+        key = (project_type or "").lower().strip()
+        bits = self._recall(self._project_bits, key)
+        if bits is None:
+            bits = self.bits_for_text(key)
+            for family, keywords in TRADE_KEYWORDS.items():
+                if family in key:
+                    bits |= self.keyword_bits(keywords)
+            for family, specialties in PROJECT_TYPE_SPECIALTIES.items():
+                if family in key:
+                    bits |= self._expansion_bits(specialties)
+            bits = self._remember(self._project_bits, key, bits)
+        return bits
+
+    def matches(self, project_type: str, specialties: Optional[Iterable[Any]]) -> bool:
+        """True when a contractor's specialties share a trade with the project type"""
+        return bool(self.project_bits(project_type) & self.bits_for_list(specialties))
+
+    def filter_contractors(
+        self,
+        project_type: str,
+        contractors: Iterable[dict[str, Any]],
+        include_unspecified: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Return contractors whose specialties match; unspecified ones are kept by default"""
+        wanted = self.project_bits(project_type)
+        matched = []
+        for contractor in contractors:
+            specialties = contractor.get("specialties")
+            if not specialties:
+                if include_unspecified:
+                    matched.append(contractor)
+            elif wanted & self.bits_for_list(specialties):
+                matched.append(contractor)
+        return matched
+
+
+_index: Optional[SpecialtyIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_specialty_index() -> SpecialtyIndex:
+    """Return the process-wide specialty index, building it from the catalog on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    from agents.project_categorization.project_types import PROJECT_TYPE_MAPPING
+                    catalog = [pt for types in PROJECT_TYPE_MAPPING.values() for pt in types]
+                except ImportError:
+                    catalog = []
+                _index = SpecialtyIndex(catalog)
+    return _index
@@ -2,6 +2,45 @@
 Specialty Mapper - Maps Google Maps types to contractor specialties
 """
 
+# Mapping of Google types to our specialty terms
+GOOGLE_TYPE_SPECIALTIES = {
+    # Service types
+    "plumber": ["plumbing", "pipe repair", "drain cleaning"],
+    "electrician": ["electrical work", "wiring", "electrical repairs"],
+    "roofing_contractor": ["roofing repair", "roofing installation", "roof maintenance"],
+    "painter": ["painting", "interior painting", "exterior painting"],
+    "carpenter": ["carpentry", "woodwork", "custom carpentry"],
+    "hvac_contractor": ["hvac", "heating", "cooling", "air conditioning"],
+    "landscaping": ["landscaping", "lawn care", "yard maintenance"],
+    "flooring_contractor": ["flooring", "tile installation", "hardwood flooring"],
+    "general_contractor": ["general contracting", "home remodeling", "renovations"],
+    "construction_company": ["construction", "building", "home additions"],
+    "bathroom_remodeler": ["bathroom remodeling", "bath renovation", "shower installation"],
+    "kitchen_remodeler": ["kitchen remodeling", "cabinet installation", "countertop installation"],
+    "handyman": ["general repairs", "minor repairs", "home maintenance"],
+    "contractor": ["general contracting", "home improvement"],
+
+    # Additional service indicators
+    "home_improvement_store": ["materials supply", "DIY assistance"],
+    "building_materials_store": ["materials supply"],
+    "hardware_store": ["tools and materials"],
+}
+
+# Default specialties per project type
+PROJECT_TYPE_SPECIALTIES = {
+    "roofing": ["roofing repair", "roofing installation", "roof maintenance"],
+    "plumbing": ["plumbing", "pipe repair", "drain cleaning", "fixture installation"],
+    "electrical": ["electrical work", "wiring", "electrical repairs", "panel upgrades"],
+    "kitchen remodel": ["kitchen remodeling", "cabinet installation", "countertop installation"],
+    "bathroom remodel": ["bathroom remodeling", "tile work", "fixture installation"],
+    "landscaping": ["landscaping", "lawn care", "tree service", "yard maintenance"],
+    "painting": ["interior painting", "exterior painting", "drywall repair"],
+    "hvac": ["hvac repair", "hvac installation", "hvac maintenance"],
+    "flooring": ["flooring installation", "tile work", "carpet installation"],
+    "general": ["general contracting", "home improvement", "repairs"],
+}
+
+
 def map_google_types_to_specialties(google_types: list[str], project_type: str) -> list[str]:
     """
     Map Google Maps place types to contractor specialties
@@ -16,41 +55,17 @@ def map_google_types_to_specialties(google_types: list[str], project_type: str)
 
     specialties = []
 
-    # Mapping of Google types to our specialty terms
-    type_to_specialty_map = {
-        # Service types
-        "plumber": ["plumbing", "pipe repair", "drain cleaning"],
-        "electrician": ["electrical work", "wiring", "electrical repairs"],
-        "roofing_contractor": ["roofing repair", "roofing installation", "roof maintenance"],
-        "painter": ["painting", "interior painting", "exterior painting"],
-        "carpenter": ["carpentry", "woodwork", "custom carpentry"],
-        "hvac_contractor": ["hvac", "heating", "cooling", "air conditioning"],
-        "landscaping": ["landscaping", "lawn care", "yard maintenance"],
-        "flooring_contractor": ["flooring", "tile installation", "hardwood flooring"],
-        "general_contractor": ["general contracting", "home remodeling", "renovations"],
-        "construction_company": ["construction", "building", "home additions"],
-        "bathroom_remodeler": ["bathroom remodeling", "bath renovation", "shower installation"],
-        "kitchen_remodeler": ["kitchen remodeling", "cabinet installation", "countertop installation"],
-        "handyman": ["general repairs", "minor repairs", "home maintenance"],
-        "contractor": ["general contracting", "home improvement"],
-
-        # Additional service indicators
-        "home_improvement_store": ["materials supply", "DIY assistance"],
-        "building_materials_store": ["materials supply"],
-        "hardware_store": ["tools and materials"],
-    }
-
     # Process each Google type
     for google_type in google_types:
         # Clean and normalize the type
         google_type_clean = google_type.lower().replace("_", " ")
 
         # Direct mapping
-        if google_type in type_to_specialty_map:
-            specialties.extend(type_to_specialty_map[google_type])
+        if google_type in GOOGLE_TYPE_SPECIALTIES:
+            specialties.extend(GOOGLE_TYPE_SPECIALTIES[google_type])
 
         # Check for partial matches (e.g., "roofing_contractor" contains "roofing")
-        for key, values in type_to_specialty_map.items():
+        for key, values in GOOGLE_TYPE_SPECIALTIES.items():
             if key in google_type or google_type in key:
                 for specialty in values:
                     if specialty not in specialties:
@@ -78,28 +93,15 @@ def get_project_type_specialties(project_type: str) -> list[str]:
     """
     Get default specialties based on project type
     """
-    project_specialty_map = {
-        "roofing": ["roofing repair", "roofing installation", "roof maintenance"],
-        "plumbing": ["plumbing", "pipe repair", "drain cleaning", "fixture installation"],
-        "electrical": ["electrical work", "wiring", "electrical repairs", "panel upgrades"],
-        "kitchen remodel": ["kitchen remodeling", "cabinet installation", "countertop installation"],
-        "bathroom remodel": ["bathroom remodeling", "tile work", "fixture installation"],
-        "landscaping": ["landscaping", "lawn care", "tree service", "yard maintenance"],
-        "painting": ["interior painting", "exterior painting", "drywall repair"],
-        "hvac": ["hvac repair", "hvac installation", "hvac maintenance"],
-        "flooring": ["flooring installation", "tile work", "carpet installation"],
-        "general": ["general contracting", "home improvement", "repairs"],
-    }
-
     # Clean project type
     project_type_clean = project_type.lower().strip()
 
     # Direct match
-    if project_type_clean in project_specialty_map:
-        return project_specialty_map[project_type_clean]
+    if project_type_clean in PROJECT_TYPE_SPECIALTIES:
+        return PROJECT_TYPE_SPECIALTIES[project_type_clean]
 
     # Partial match
-    for key, values in project_specialty_map.items():
+    for key, values in PROJECT_TYPE_SPECIALTIES.items():
         if key in project_type_clean or project_type_clean in key:
             return values
 
@@ -8,16 +8,21 @@ import os
 import asyncio
 from typing import Dict, Any, Optional
 
+from services.api_response_cache import ApiResponseCache, get_api_response_cache, make_cache_key, normalize_domain, normalize_text
+
 logger = logging.getLogger(__name__)
 
+TAVILY_PAGES_API = "tavily_contractor_pages"
+
 
 class TavilySearchTool:
     """Tavily API web research tool for comprehensive contractor discovery"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ApiResponseCache] = None):
         # Initialize Tavily API from environment
         self.tavily_api_key = os.getenv("TAVILY_API_KEY")
         self.use_tavily = bool(self.tavily_api_key)
+        self.cache = cache or get_api_response_cache()
         
         if self.use_tavily:
             logger.info("TavilySearchTool initialized with API key")
@@ -27,7 +32,25 @@ class TavilySearchTool:
     async def discover_contractor_pages(self, company_name: str, website_url: str, location: Optional[str] = None) -> Dict[str, Any]:
         """
         Discover contractor pages using Tavily API for comprehensive research
+        
+        Results are cached per (company, website domain, location); sites with no
+        matching pages are cached negatively, failed or partial runs are not cached.
         """
+        key = make_cache_key(
+            TAVILY_PAGES_API,
+            company=normalize_text(company_name),
+            domain=normalize_domain(website_url),
+            location=normalize_text(location)
+        )
+        return await self.cache.get_or_fetch(
+            TAVILY_PAGES_API, key,
+            lambda: self._discover_contractor_pages(company_name, website_url, location),
+            is_negative=lambda data: not data.get("discovered_pages"),
+            is_cacheable=lambda data: "error" not in data and not data.get("failed_calls")
+        )
+
+    async def _discover_contractor_pages(self, company_name: str, website_url: str, location: Optional[str] = None) -> Dict[str, Any]:
+        """Uncached Tavily search + extract run"""
         logger.info(f"Using Tavily API to discover pages for {company_name}")
         
         try:
@@ -50,7 +73,8 @@ class TavilySearchTool:
                 "discovered_pages": [],
                 "content_sources": [],
                 "extraction_priority": [],
-                "api_used": "TAVILY_API"
+                "api_used": "TAVILY_API",
+                "failed_calls": 0
             }
             
             # Targeted searches for contact info and services
@@ -96,6 +120,7 @@ class TavilySearchTool:
                         
                 except Exception as api_error:
                     logger.error(f"Tavily API error: {api_error}")
+                    discovery_data["failed_calls"] += 1
                     continue
                 
                 # Rate limiting
@@ -159,6 +184,7 @@ class TavilySearchTool:
                 
             except Exception as extract_error:
                 logger.warning(f"Extract API error for {url}: {extract_error}")
+                discovery_data["failed_calls"] += 1
                 continue
             
             # Rate limiting
@@ -12,6 +12,7 @@ from supabase import Client
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from agents.cda.specialty_index import get_specialty_index
 from utils.radius_search_fixed import calculate_distance_miles, get_zip_codes_in_radius
 
 
@@ -163,37 +164,8 @@ class Tier1Matcher:
         if not project_type or not specialties:
             return True  # If we don't know, include them
 
-        # Project type keywords
-        project_keywords = project_type.lower().split()
-
-        # Check each specialty
-        for specialty in specialties:
-            specialty_lower = specialty.lower()
-            # Check for any keyword match
-            for keyword in project_keywords:
-                if keyword in specialty_lower:
-                    return True
-
-        # Common mappings
-        mappings = {
-            "kitchen": ["kitchen", "remodel", "cabinet", "countertop"],
-            "bathroom": ["bathroom", "bath", "plumbing", "tile"],
-            "deck": ["deck", "patio", "outdoor", "carpentry"],
-            "roofing": ["roof", "roofing", "shingle", "gutter"],
-            "painting": ["paint", "painting", "drywall", "interior"],
-            "flooring": ["floor", "flooring", "tile", "hardwood", "carpet"],
-            "plumbing": ["plumb", "plumbing", "pipe", "drain"],
-            "electrical": ["electric", "electrical", "wiring", "panel"]
-        }
-
-        # Check mappings
-        for key, values in mappings.items():
-            if key in project_type:
-                for specialty in specialties:
-                    if any(v in specialty.lower() for v in values):
-                        return True
-
-        return False
+        # Precompiled trade bitsets - project keywords and mappings are resolved once
+        return get_specialty_index().matches(project_type, specialties)
 
     def _check_radius_location_match(self, contractor: dict[str, Any], project_zip: str, radius_miles: int) -> bool:
         """Check if contractor is within radius of project location using distance calculation"""
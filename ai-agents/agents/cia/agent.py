@@ -276,20 +276,16 @@ class CustomerInterfaceAgent:
                             if extracted_data.get('eligible_for_group_bidding') is not None:
                                 field_updates['eligible_for_group_bidding'] = extracted_data['eligible_for_group_bidding']
                             
-                            # Update all extracted fields directly in database
-                            for field_name, field_value in field_updates.items():
-                                success = await self.bid_cards.update_bid_card_field(
-                                    bid_card_id=bid_card_id,
-                                    field_name=field_name,
-                                    field_value=field_value,
-                                    confidence=0.9
-                                )
-                                if success:
-                                    logger.info(f"✅ Updated {field_name}: {field_value}")
-                                else:
-                                    logger.error(f"❌ Failed to update {field_name}")
+                            # Update all extracted fields in one versioned write
+                            updated_count = await self.bid_cards.update_bid_card_fields(
+                                bid_card_id=bid_card_id,
+                                fields=field_updates,
+                                confidence=0.9
+                            )
+                            if updated_count < len(field_updates):
+                                logger.error(f"❌ Only {updated_count} of {len(field_updates)} fields updated")
                                     
-                            logger.info(f"🎯 Updated {len(field_updates)} fields from 17-field extraction")
+                            logger.info(f"🎯 Updated {updated_count} fields from 17-field extraction")
                         
                         # FORCE CATEGORIZATION after update_bid_card
                         if bid_card_id and extracted_data.get('description'):
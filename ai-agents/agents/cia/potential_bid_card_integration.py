@@ -5,7 +5,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
 import httpx
 
@@ -59,6 +59,21 @@ class _InMemoryPotentialBidCardStore:
             card["completion_percentage"] = min(non_empty * 10, 100)
             return True
 
+    async def update_fields(self, bid_card_id: str, fields: Dict[str, Tuple[Any, float]]) -> bool:
+        async with self._lock:
+            card = self._cards.get(bid_card_id)
+            if not card:
+                return False
+
+            stored = card.setdefault("fields", {})
+            for field_name, (field_value, confidence) in fields.items():
+                stored[field_name] = {"value": field_value, "confidence": confidence}
+
+            non_empty = len([f for f in stored.values() if f["value"] not in (None, "")])
+            card["completion_percentage"] = min(non_empty * 10, 100)
+            card["version"] = card.get("version", 0) + 1
+            return True
+
     async def get_status(self, bid_card_id: str) -> Optional[Dict[str, Any]]:
         async with self._lock:
             card = self._cards.get(bid_card_id)
@@ -155,10 +170,14 @@ class PotentialBidCardManager:
         client: Optional[httpx.AsyncClient] = None,
         use_fallback: bool = False,
         fallback_store: Optional[_InMemoryPotentialBidCardStore] = None,
+        patcher: Optional[Any] = None,
     ) -> None:
         api_base = base_url or ServiceEndpoints.CIA_POTENTIAL_BID_CARDS
         self.api_endpoint = api_base.rstrip("/")
         self._client = client
+        # In-process PotentialBidCardPatcher: writes go straight to the database instead of
+        # looping back through our own HTTP API
+        self._patcher = patcher
         self._fallback = fallback_store if use_fallback else None
         if use_fallback and self._fallback is None:
             self._fallback = _InMemoryPotentialBidCardStore()
@@ -213,6 +232,10 @@ class PotentialBidCardManager:
                 return True
 
             mapped_field = self.FIELD_MAPPING.get(field_name, field_name)
+
+            if self._patcher:
+                return await self._apply_direct(bid_card_id, {mapped_field: (field_value, confidence)}) is not None
+
             payload = {
                 "field_name": mapped_field,
                 "field_value": field_value,
@@ -243,30 +266,83 @@ class PotentialBidCardManager:
             logger.error(f"[CIA] Error updating bid card field: {exc}")
             return False
 
+    async def update_bid_card_fields(
+        self,
+        bid_card_id: str,
+        fields: Dict[str, Any],
+        confidence: Union[float, Dict[str, float]] = 1.0,
+    ) -> int:
+        """Update many fields in one write; confidence is one value or per field. Returns fields accepted."""
+        mapped: Dict[str, Tuple[Any, float]] = {}
+        for field_name, field_value in fields.items():
+            if field_name in self.IGNORED_FIELDS:
+                continue
+            field_confidence = confidence.get(field_name, 1.0) if isinstance(confidence, dict) else confidence
+            mapped[self.FIELD_MAPPING.get(field_name, field_name)] = (field_value, field_confidence)
+        if not bid_card_id or not mapped:
+            return 0
+
+        try:
+            if self._fallback:
+                success = await self._fallback.update_fields(bid_card_id, mapped)
+                return len(mapped) if success else 0
+
+            if self._patcher:
+                result = await self._apply_direct(bid_card_id, mapped)
+                return len(result.applied) if result else 0
+
+            payload = {
+                "fields": [
+                    {"field_name": name, "field_value": value, "confidence": field_confidence}
+                    for name, (value, field_confidence) in mapped.items()
+                ],
+                "source": "conversation",
+            }
+            response = await self._patch(f"{self.api_endpoint}/{bid_card_id}/fields", payload)
+
+            if response and response.status_code == 200:
+                updated = response.json().get("fields_updated", list(mapped))
+                logger.info(f"[CIA] Patched {len(updated)} bid card fields in one request")
+                return len(updated)
+
+            status = response.status_code if response else "no-response"
+            logger.error(f"[CIA] Failed to patch {len(mapped)} fields: {status}")
+            return 0
+
+        except Exception as exc:
+            logger.error(f"[CIA] Error patching bid card fields: {exc}")
+            return 0
+
     async def update_from_collected_info(
         self,
         bid_card_id: str,
         collected_info: Dict[str, Any],
     ) -> int:
-        """Update multiple fields from CIA's collected_info."""
+        """Update multiple fields from CIA's collected_info in a single write."""
         if not bid_card_id or not collected_info:
             return 0
 
-        updated_count = 0
-
-        for field_name, field_value in collected_info.items():
-            if field_value not in (None, ""):
-                success = await self.update_bid_card_field(
-                    bid_card_id,
-                    field_name,
-                    field_value,
-                )
-                if success:
-                    updated_count += 1
+        updated_count = await self.update_bid_card_fields(
+            bid_card_id,
+            {name: value for name, value in collected_info.items() if value not in (None, "")},
+        )
 
         logger.info(f"[CIA] Updated {updated_count} fields in potential bid card")
         return updated_count
 
+    async def _apply_direct(self, bid_card_id: str, fields: Dict[str, Tuple[Any, float]]) -> Optional[Any]:
+        """Run the in-process patcher off the event loop"""
+        from services.potential_bid_card_patch import FieldUpdate
+
+        updates = [FieldUpdate(name, value, field_confidence) for name, (value, field_confidence) in fields.items()]
+        try:
+            result = await asyncio.to_thread(self._patcher.apply, bid_card_id, updates)
+        except Exception as exc:
+            logger.error(f"[CIA] Direct bid card patch failed for {bid_card_id}: {exc}")
+            return None
+        logger.info(f"[CIA] Patched {len(result.applied)} bid card fields directly (v{result.version})")
+        return result
+
     async def get_bid_card_status(self, bid_card_id: str) -> Optional[Dict[str, Any]]:
         """Get the current status of a potential bid card."""
         try:
@@ -336,6 +412,16 @@ class PotentialBidCardManager:
             logger.error(f"[CIA] PUT request failed for {url}: {exc}")
             return None
 
+    async def _patch(self, url: str, payload: Dict[str, Any]) -> Optional[httpx.Response]:
+        try:
+            if self._client:
+                return await self._client.patch(url, json=payload)
+            async with httpx.AsyncClient() as client:
+                return await client.patch(url, json=payload)
+        except Exception as exc:
+            logger.error(f"[CIA] PATCH request failed for {url}: {exc}")
+            return None
+
     async def _get(self, url: str) -> Optional[httpx.Response]:
         try:
             if self._client:
@@ -28,10 +28,29 @@ from .subagents.account_agent import create_account_from_staging
 
 logger = logging.getLogger(__name__)
 
+# How long the research-agent waits for the landing page's background research job
+SHARED_RESEARCH_WAIT_SECONDS = 45
+
+
+def _shared_research(company_name: str, location: str):
+    """Research data from the background job queue for this company, if any"""
+    try:
+        from services.coia_research_jobs import get_research_job_store, wait_for_research
+        job = wait_for_research(get_research_job_store(), company_name, location, timeout=SHARED_RESEARCH_WAIT_SECONDS)
+    except Exception as e:
+        logger.warning(f"Shared research lookup failed for {company_name}: {e}")
+        return None
+    if job is None or not job.result:
+        return None
+    logger.info(f"Reusing research job {job.id} for {company_name}")
+    return job.result.get("research_data")
+
+
 def complete_research_workflow(company_name: str, location: str):
     """
     Wrapped function that forces all 3 research steps to execute sequentially.
     This solves the DeepAgents coordination issue by wrapping the workflow in a single function.
+    Step 1 reuses the landing page's background research job when one exists for the company.
     """
     import time
     
@@ -39,12 +58,15 @@ def complete_research_workflow(company_name: str, location: str):
         logger.info(f"Starting complete research workflow for {company_name} in {location}")
         start_time = time.time()
         
-        # Step 1: Research company basic info
+        # Step 1: Research company basic info (sources run concurrently inside)
         logger.info("Step 1: Researching company basic info...")
         step1_start = time.time()
-        research_data = research_company_basic(company_name, location)
+        research_data = _shared_research(company_name, location)
+        research_reused = research_data is not None
+        if not research_reused:
+            research_data = research_company_basic(company_name, location)
         step1_time = time.time() - step1_start
-        logger.info(f"Step 1 completed in {step1_time:.1f}s")
+        logger.info(f"Step 1 completed in {step1_time:.1f}s (reused={research_reused})")
         
         # Check if we got actual data (research_company_basic returns dict with data, not 'success' key)
         if not research_data:
@@ -115,6 +137,7 @@ def complete_research_workflow(company_name: str, location: str):
             'profile_data': profile_data,
             'save_result': save_result,
             'execution_time': total_time,
+            'research_reused': research_reused,
             'step_times': {
                 'research': step1_time,
                 'extraction': step2_time,
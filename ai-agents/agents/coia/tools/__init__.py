@@ -3,8 +3,9 @@ COIA Tools - Refactored modular architecture
 Main interface that delegates to specialized tool modules
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Awaitable
 
 from .google_api.places import GooglePlacesTool
 from .google_api.licenses import LicenseSearchTool
@@ -17,6 +18,12 @@ from .base import BaseTool
 logger = logging.getLogger(__name__)
 
 
+def _state_from_location(location: Optional[str]) -> str:
+    """Two-letter state from a 'City, ST' style hint (licenses default to FL)"""
+    tail = (location or "").replace(",", " ").split()
+    return tail[-1].upper() if tail and len(tail[-1]) == 2 and tail[-1].isalpha() else "FL"
+
+
 class COIATools(BaseTool):
     """
     Main COIA tools interface that delegates to specialized tools
@@ -58,9 +65,12 @@ class COIATools(BaseTool):
     
     # Keep complex methods that orchestrate multiple tools here temporarily
     # These will be refactored in phase 2
-    async def research_business(self, company_name: str, location: str = "") -> Dict[str, Any]:
+    async def research_business(self, company_name: str, location: str = "",
+                                progress: Optional[Callable[..., Awaitable[None]]] = None) -> Dict[str, Any]:
         """
         Comprehensive web research - orchestrates multiple tools
+        Google and license lookups run concurrently; Tavily starts as soon as
+        Google returns the website. `progress(step, **data)` is awaited after each source.
         TODO: This should be moved to a separate orchestration layer
         """
         logger.info(f"Starting comprehensive web research for {company_name}")
@@ -73,24 +83,46 @@ class COIATools(BaseTool):
             "website_data": {},
             "social_media_data": {},
             "business_intelligence": {},
+            "license_data": {},
             "data_sources": []
         }
         
-        # 1. Google Business Search
-        google_data = await self.search_google_business(company_name, location)
-        if google_data:
-            comprehensive_data["google_data"] = google_data
-            comprehensive_data["data_sources"].append("google_business")
+        async def report(step: str, **data: Any) -> None:
+            if progress is not None:
+                await progress(step, **data)
+        
+        # License lookup does not depend on Google, so run it alongside
+        license_task = asyncio.create_task(
+            self.search_contractor_licenses(company_name, _state_from_location(location))
+        )
         
-        # 2. Check for website in Google data
-        website_url = google_data.get("website") if google_data else None
+        try:
+            # 1. Google Business Search
+            google_data = await self.search_google_business(company_name, location)
+            if google_data:
+                comprehensive_data["google_data"] = google_data
+                comprehensive_data["data_sources"].append("google_business")
+            await report("google_business", found=bool(google_data))
+            
+            # 2. Check for website in Google data
+            website_url = google_data.get("website") if google_data else None
+            
+            if website_url:
+                # 3. Use Tavily for comprehensive page discovery
+                logger.info(f"🔍 Using Tavily API for comprehensive website content extraction: {website_url}")
+                tavily_data = await self.tavily_search.discover_contractor_pages(company_name, website_url, location)
+                comprehensive_data["tavily_discovery_data"] = tavily_data
+                comprehensive_data["data_sources"].append("tavily_discovery")
+                await report("tavily_discovery", pages=len(tavily_data.get("discovered_pages", [])))
+            
+            license_data = await license_task
+        except BaseException:
+            license_task.cancel()
+            raise
         
-        if website_url:
-            # 3. Use Tavily for comprehensive page discovery
-            logger.info(f"🔍 Using Tavily API for comprehensive website content extraction: {website_url}")
-            tavily_data = await self.tavily_search.discover_contractor_pages(company_name, website_url, location)
-            comprehensive_data["tavily_discovery_data"] = tavily_data
-            comprehensive_data["data_sources"].append("tavily_discovery")
+        if license_data.get("success"):
+            comprehensive_data["license_data"] = license_data
+            comprehensive_data["data_sources"].append("license_search")
         
         return comprehensive_data
     
@@ -117,13 +149,14 @@ class COIATools(BaseTool):
         return await self.contractor_db.save_potential_contractor(profile)
     
     # Web search company method - orchestrates research
-    async def web_search_company(self, company_name: str, location: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def web_search_company(self, company_name: str, location: Optional[str] = None,
+                                 progress: Optional[Callable[..., Awaitable[None]]] = None) -> Optional[Dict[str, Any]]:
         """
         Comprehensive web research for company information
         Returns structured data with completeness metrics
         """
         # Use research_business for now which orchestrates the tools
-        result = await self.research_business(company_name, location or "")
+        result = await self.research_business(company_name, location or "", progress=progress)
         
         # Add completeness calculation
         total_fields = 66
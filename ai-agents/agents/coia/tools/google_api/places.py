@@ -12,17 +12,27 @@ from urllib.parse import parse_qs, quote_plus, unquote, urlparse
 
 import httpx
 
+from services.api_response_cache import ApiResponseCache, get_api_response_cache, make_cache_key, normalize_text
+
 from ..base import BaseTool
 
 logger = logging.getLogger(__name__)
 
+GOOGLE_BUSINESS_API = "coia_google_business"
+GOOGLE_BUSINESS_FIELD_MASK = (
+    "places.displayName,places.formattedAddress,places.websiteUri,places.nationalPhoneNumber,"
+    "places.rating,places.userRatingCount,places.googleMapsUri,places.id,places.businessStatus,places.types"
+)
+
 
 class GooglePlacesTool(BaseTool):
     """Google Places API integration for business search"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ApiResponseCache] = None):
         super().__init__()
         self.google_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+        self.places_search_url = "https://places.googleapis.com/v1/places:searchText"
+        self.cache = cache or get_api_response_cache()
         if self.google_api_key:
             logger.info(f"Google Places API initialized with key: {self.google_api_key[:20]}...")
         else:
@@ -41,51 +51,19 @@ class GooglePlacesTool(BaseTool):
                 if location:
                     query = f"{company_name} {location}"
                 
-                # Use Google Places API (New) Text Search
-                url = "https://places.googleapis.com/v1/places:searchText"
-                headers = {
-                    "Content-Type": "application/json",
-                    "X-Goog-Api-Key": self.google_api_key,
-                    "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.websiteUri,places.nationalPhoneNumber,places.rating,places.userRatingCount,places.googleMapsUri,places.id,places.businessStatus,places.types"
-                }
+                # Same business + location resolves to the same cached lookup;
+                # "no such business" is cached too, API errors are not
+                key = make_cache_key(GOOGLE_BUSINESS_API, query=normalize_text(query), field_mask=GOOGLE_BUSINESS_FIELD_MASK)
+                business_data = await self.cache.get_or_fetch(
+                    GOOGLE_BUSINESS_API, key,
+                    lambda: self._google_text_search(query, company_name)
+                )
                 
-                data = {
-                    "textQuery": query,
-                    "maxResultCount": 1
-                }
-                
-                logger.info(f"Making Google Places API call for: {query}")
-                
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(url, json=data, headers=headers, timeout=30.0)
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        
-                        if result.get("places") and len(result["places"]) > 0:
-                            place = result["places"][0]
-                            
-                            # Extract business data with proper Google API fields
-                            business_data = {
-                                "company_name": place.get("displayName", {}).get("text", company_name),
-                                "address": place.get("formattedAddress", ""),
-                                "website": place.get("websiteUri", ""),
-                                "phone": place.get("nationalPhoneNumber", ""),
-                                "google_rating": place.get("rating", 0),
-                                "google_review_count": place.get("userRatingCount", 0),
-                                "google_maps_url": place.get("googleMapsUri", ""),
-                                "google_place_id": place.get("id", ""),
-                                "google_business_status": place.get("businessStatus", ""),
-                                "google_types": place.get("types", []),
-                                "data_source": "google_places_api"
-                            }
-                            
-                            logger.info(f"✅ Google API SUCCESS - Found {company_name}: rating={business_data.get('google_rating')}, reviews={business_data.get('google_review_count')}")
-                            return business_data
-                        else:
-                            logger.info(f"No Google Places results found for {query}")
-                    else:
-                        logger.error(f"Google Places API error: {response.status_code} - {response.text}")
+                if business_data:
+                    logger.info(f"✅ Google API SUCCESS - Found {company_name}: rating={business_data.get('google_rating')}, reviews={business_data.get('google_review_count')}")
+                    return business_data
+                else:
+                    logger.info(f"No Google Places results found for {query}")
                         
             except Exception as e:
                 logger.error(f"Error with Google Places API: {e}")
@@ -111,6 +89,52 @@ class GooglePlacesTool(BaseTool):
             logger.error(f"Error with fallback web search: {e}")
             return self._create_minimal_business_data(company_name, location, query)
 
+    async def _google_text_search(self, query: str, company_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Single Google Places API (New) Text Search call.
+        
+        Returns the business data, None when Google has no match, and raises on API errors.
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": self.google_api_key,
+            "X-Goog-FieldMask": GOOGLE_BUSINESS_FIELD_MASK
+        }
+        
+        data = {
+            "textQuery": query,
+            "maxResultCount": 1
+        }
+        
+        logger.info(f"Making Google Places API call for: {query}")
+        
+        async with httpx.AsyncClient() as client:
+            response = await client.post(self.places_search_url, json=data, headers=headers, timeout=30.0)
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Google Places API error: {response.status_code} - {response.text}")
+        
+        result = response.json()
+        if not result.get("places"):
+            return None
+        
+        place = result["places"][0]
+        
+        # Extract business data with proper Google API fields
+        return {
+            "company_name": place.get("displayName", {}).get("text", company_name),
+            "address": place.get("formattedAddress", ""),
+            "website": place.get("websiteUri", ""),
+            "phone": place.get("nationalPhoneNumber", ""),
+            "google_rating": place.get("rating", 0),
+            "google_review_count": place.get("userRatingCount", 0),
+            "google_maps_url": place.get("googleMapsUri", ""),
+            "google_place_id": place.get("id", ""),
+            "google_business_status": place.get("businessStatus", ""),
+            "google_types": place.get("types", []),
+            "data_source": "google_places_api"
+        }
+
     async def _search_business_web(self, query: str, max_results: int = 5) -> Optional[Dict[str, Any]]:
         """Use DuckDuckGo Lite as a lightweight web fallback when Google is unavailable."""
         logger.info(f"Attempting DuckDuckGo Lite fallback search for: {query}")
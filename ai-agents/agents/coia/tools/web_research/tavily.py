@@ -8,6 +8,7 @@ import os
 import asyncio
 from typing import Dict, Any, Optional
 
+from utils.rate_limiter import AsyncTokenBucket
 from ..base import BaseTool
 
 # Import LangFuse for observability (safe import)
@@ -20,6 +21,20 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Shared pacing for Tavily calls instead of fixed sleeps between requests
+TAVILY_QPS = float(os.getenv("TAVILY_QPS", "2"))
+TAVILY_BURST = float(os.getenv("TAVILY_BURST", "4"))
+
+_tavily_rate_limiter: Optional[AsyncTokenBucket] = None
+
+
+def get_tavily_rate_limiter() -> AsyncTokenBucket:
+    """Process-wide limiter shared by every TavilySearchTool"""
+    global _tavily_rate_limiter
+    if _tavily_rate_limiter is None:
+        _tavily_rate_limiter = AsyncTokenBucket(rate=TAVILY_QPS, capacity=TAVILY_BURST)
+    return _tavily_rate_limiter
+
 
 class TavilySearchTool(BaseTool):
     """Tavily API web research tool - REAL IMPLEMENTATION"""
@@ -29,6 +44,7 @@ class TavilySearchTool(BaseTool):
         # Initialize Tavily API from environment
         self.tavily_api_key = os.getenv("TAVILY_API_KEY")
         self.use_tavily = bool(self.tavily_api_key)
+        self.rate_limiter = get_tavily_rate_limiter()
         
         if self.use_tavily:
             logger.info("TavilySearchTool initialized with API key")
@@ -99,46 +115,47 @@ class TavilySearchTool(BaseTool):
             ]
             
             discovered_urls = set()
+            website_domain = website_url.replace("http://", "").replace("https://", "").split("/")[0] if website_url else None
             
-            for query in search_queries:
+            async def run_search(query: str):
                 logger.info(f"Making REAL Tavily API call: {query}")
-                
+                await self.rate_limiter.acquire()
                 try:
                     # Search for pages AND get their content - FIXED for specific website
-                    website_domain = website_url.replace("http://", "").replace("https://", "").split("/")[0] if website_url else None
-                    response = client.search(
+                    return await asyncio.to_thread(
+                        client.search,
                         query=query,
                         search_depth="advanced",
                         max_results=8,  # Reduced from 10 to 8 to avoid rate limits
                         include_domains=[website_domain] if website_domain else None,
                         include_raw_content=True  # GET THE ACTUAL CONTENT
                     )
-                    
-                    if response and 'results' in response:
-                        for result in response['results']:
-                            url = result.get('url', '')
-                            score = result.get('score', 0)
-                            if url and url not in discovered_urls and score > 0.4:  # Lower threshold for better coverage
-                                discovered_urls.add(url)
-                                page_type = self._categorize_page_type(url, result.get('title', ''))
-                                priority = self._calculate_page_priority(url, result.get('title', ''), page_type)
-                                
-                                discovery_data["discovered_pages"].append({
-                                    "url": url,
-                                    "title": result.get('title', ''),
-                                    "score": score,
-                                    "content": result.get('content', '')[:1500],  # Increased for better extraction
-                                    "type": page_type,
-                                    "priority": priority,
-                                    "has_contact_info": self._likely_has_contact_info(url, result.get('title', ''), result.get('content', ''))
-                                })
-                        
                 except Exception as api_error:
                     logger.error(f"REAL Tavily API error: {api_error}")
-                    continue
-                
-                # INCREASED rate limiting for real API to avoid blocks
-                await asyncio.sleep(3)
+                    return None
+            
+            # Both searches are independent - run them together, paced by the shared limiter
+            responses = await asyncio.gather(*(run_search(query) for query in search_queries))
+            
+            for response in responses:
+                if response and 'results' in response:
+                    for result in response['results']:
+                        url = result.get('url', '')
+                        score = result.get('score', 0)
+                        if url and url not in discovered_urls and score > 0.4:  # Lower threshold for better coverage
+                            discovered_urls.add(url)
+                            page_type = self._categorize_page_type(url, result.get('title', ''))
+                            priority = self._calculate_page_priority(url, result.get('title', ''), page_type)
+                            
+                            discovery_data["discovered_pages"].append({
+                                "url": url,
+                                "title": result.get('title', ''),
+                                "score": score,
+                                "content": result.get('content', '')[:1500],  # Increased for better extraction
+                                "type": page_type,
+                                "priority": priority,
+                                "has_contact_info": self._likely_has_contact_info(url, result.get('title', ''), result.get('content', ''))
+                            })
             
             # Prioritize discovered pages with new priority system
             discovery_data["extraction_priority"] = sorted(
@@ -179,31 +196,33 @@ class TavilySearchTool(BaseTool):
                             x.get('score', 0)
                         ), reverse=True)[:4]  # Increased to 4 for better coverage
         
+        if not top_urls:
+            return
+        
+        try:
+            # REAL EXTRACT API CALL - one batched request for all top pages
+            await self.rate_limiter.acquire()
+            extract_response = await asyncio.to_thread(
+                client.extract,
+                [page["url"] for page in top_urls],
+                extract_depth="advanced",  # Get tables, structured data
+                format="markdown"  # Better structured content
+            )
+        except Exception as extract_error:
+            logger.warning(f"Extract API error for {len(top_urls)} urls: {extract_error}")
+            return
+        
+        extracted = {
+            result.get('url'): result.get('raw_content', '')
+            for result in (extract_response or {}).get('results', [])
+        }
         for page in top_urls:
             url = page["url"]
-            try:
-                # REAL EXTRACT API CALL
-                extract_response = client.extract(
-                    url,
-                    extract_depth="advanced",  # Get tables, structured data
-                    format="markdown"  # Better structured content
-                )
-                
-                if extract_response and 'results' in extract_response:
-                    for extract_result in extract_response['results']:
-                        if extract_result.get('url') == url:
-                            # Limit extracted content to 2000 chars to prevent context overflow
-                            full_content = extract_result.get('raw_content', '')[:2000]
-                            page["full_content"] = full_content
-                            logger.info(f"✅ Extracted {len(full_content)} chars from {url} (limited to prevent context overflow)")
-                            break
-                
-            except Exception as extract_error:
-                logger.warning(f"Extract API error for {url}: {extract_error}")
-                continue
-            
-            # INCREASED rate limiting for extract API
-            await asyncio.sleep(2)
+            if url in extracted:
+                # Limit extracted content to 2000 chars to prevent context overflow
+                full_content = (extracted[url] or '')[:2000]
+                page["full_content"] = full_content
+                logger.info(f"✅ Extracted {len(full_content)} chars from {url} (limited to prevent context overflow)")
 
     def _categorize_page_type(self, url: str, title: str) -> str:
         """Helper to categorize page types from URL and title"""
@@ -243,46 +243,78 @@ class ExternalAcquisitionAgent:
                 response_content, channel
             )
 
-            # Extract contractor information
-            contractor_info = self._get_contractor_from_message(message_id)
-
-            # Save response to database
-            response_record = {
-                "message_id": message_id,
-                "response_type": parsed_response["intent"],
-                "sentiment_score": parsed_response["sentiment"],
-                "interest_level": parsed_response["interest_level"],
-                "extracted_data": parsed_response["extracted_data"],
-                "response_content": response_content,
-                "processed_at": datetime.now().isoformat()
-            }
+            return self._handle_parsed_response(message_id, response_content, parsed_response)
 
-            self._save_response(response_record)
+        except Exception as e:
+            print(f"[EAA ERROR] Failed to process response: {e}")
+            return {"success": False, "error": str(e)}
 
-            # Handle high-interest responses
-            if parsed_response["interest_level"] == "high":
-                self._initiate_onboarding(contractor_info, response_record)
+    def process_responses(self, responses: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Process a batch of inbound responses (webhook deliveries, IMAP fetches)
 
-            # Schedule follow-up if needed
-            elif parsed_response["intent"] == "need_info":
-                self._schedule_follow_up(message_id, contractor_info)
+        Each item needs message_id, response_content and channel; results are
+        returned in input order.
+        """
+        try:
+            print(f"[EAA] Processing batch of {len(responses)} responses")
+            parsed_responses = self.response_parser.parse_many(
+                (response["response_content"], response["channel"]) for response in responses
+            )
+        except Exception as e:
+            print(f"[EAA ERROR] Failed to parse response batch: {e}")
+            return [{"success": False, "error": str(e)} for _ in responses]
+
+        results = []
+        for response, parsed_response in zip(responses, parsed_responses):
+            try:
+                results.append(self._handle_parsed_response(
+                    response["message_id"], response["response_content"], parsed_response
+                ))
+            except Exception as e:
+                print(f"[EAA ERROR] Failed to process response: {e}")
+                results.append({"success": False, "error": str(e)})
+        return results
+
+    def _handle_parsed_response(self, message_id: str, response_content: str,
+                                parsed_response: dict[str, Any]) -> dict[str, Any]:
+        """Save a parsed response and trigger onboarding or follow-up"""
+        # Extract contractor information
+        contractor_info = self._get_contractor_from_message(message_id)
+
+        # Save response to database
+        response_record = {
+            "message_id": message_id,
+            "response_type": parsed_response["intent"],
+            "sentiment_score": parsed_response["sentiment"],
+            "interest_level": parsed_response["interest_level"],
+            "extracted_data": parsed_response["extracted_data"],
+            "response_content": response_content,
+            "processed_at": datetime.now().isoformat()
+        }
 
-            result = {
-                "success": True,
-                "response_id": str(uuid.uuid4()),
-                "intent": parsed_response["intent"],
-                "interest_level": parsed_response["interest_level"],
-                "action_taken": self._get_action_taken(parsed_response),
-                "follow_up_scheduled": parsed_response["intent"] == "need_info"
-            }
+        self._save_response(response_record)
 
-            print(f"[EAA] Response processed: {parsed_response['intent']} ({parsed_response['interest_level']} interest)")
+        # Handle high-interest responses
+        if parsed_response["interest_level"] == "high":
+            self._initiate_onboarding(contractor_info, response_record)
 
-            return result
+        # Schedule follow-up if needed
+        elif parsed_response["intent"] == "need_info":
+            self._schedule_follow_up(message_id, contractor_info)
+
+        result = {
+            "success": True,
+            "response_id": str(uuid.uuid4()),
+            "intent": parsed_response["intent"],
+            "interest_level": parsed_response["interest_level"],
+            "action_taken": self._get_action_taken(parsed_response),
+            "follow_up_scheduled": parsed_response["intent"] == "need_info"
+        }
 
-        except Exception as e:
-            print(f"[EAA ERROR] Failed to process response: {e}")
-            return {"success": False, "error": str(e)}
+        print(f"[EAA] Response processed: {parsed_response['intent']} ({parsed_response['interest_level']} interest)")
+
+        return result
 
     def start_onboarding(self, contractor_email: str, source_campaign: str | None = None) -> dict[str, Any]:
         """Start onboarding process for interested contractor"""
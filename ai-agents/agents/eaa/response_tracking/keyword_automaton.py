@@ -0,0 +1,127 @@
+"""
+Keyword Automaton
+Single-pass multi-keyword matching for response classification
+
+- Keywords are compiled into one trie-shaped regex, so a text is scanned
+  once however many keywords there are (the trie is walked in C by `re`)
+- Every occurrence is reported, including overlapping ones and keywords
+  that are prefixes of longer keywords, which keeps substring semantics
+- Optional word-boundary matching, longest-match-only and negation windows
+  ("not" within N words before a keyword) for stricter classification
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable
+
+
+_END = ""
+_WORD = re.compile(r"[\w']+")
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    keyword: str
+    start: int
+    end: int
+    negated: bool = False
+
+
+def _trie_regex(node: dict) -> str:
+    """Regex for a trie node; greedy optional groups make the longest keyword win"""
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if _END in node else body
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] in "_'")
+
+
+class KeywordAutomaton:
+    """Finds every keyword occurrence in a text with one scan"""
+
+    def __init__(self,
+                 keywords: Iterable[str],
+                 word_boundaries: bool = False,
+                 longest_only: bool = False,
+                 negations: Iterable[str] = (),
+                 negation_window: int = 3):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        if not self.keywords:
+            raise ValueError("at least one keyword is required")
+        self.word_boundaries = word_boundaries
+        self.longest_only = longest_only
+        self.negations = frozenset(negations)
+        self.negation_window = negation_window
+
+        trie: dict = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        # Zero-width lookahead so matches starting inside another match are found too
+        self._pattern = re.compile(f"(?=({_trie_regex(trie)}))")
+        # Keywords matching at a position are exactly the keyword prefixes of the longest one
+        self._prefixes = {
+            keyword: sorted((k for k in self.keywords if keyword.startswith(k)), key=len, reverse=True)
+            for keyword in self.keywords
+        }
+
+    def matches(self, text: str) -> list[tuple[int, str]]:
+        """
+        Raw automaton output: (start, longest keyword starting there)
+
+        The other keywords at that start are prefixes_of(longest); this is
+        the cheap path for substring-semantics callers.
+        """
+        return [(match.start(), match.group(1)) for match in self._pattern.finditer(text)]
+
+    def prefixes_of(self, keyword: str) -> list[str]:
+        """Keywords that are prefixes of keyword (itself included), longest first"""
+        return self._prefixes[keyword]
+
+    def hits(self, text: str) -> list[KeywordHit]:
+        """All keyword occurrences in text, in order of start position"""
+        hits = []
+        covered_until = 0
+        for start, longest in self.matches(text):
+            for keyword in self._prefixes[longest]:
+                end = start + len(keyword)
+                if self.word_boundaries and not (_is_boundary(text, start - 1) and _is_boundary(text, end)):
+                    continue
+                if self.longest_only:
+                    if end <= covered_until:
+                        break
+                    covered_until = end
+                hits.append(KeywordHit(keyword, start, end))
+                if self.longest_only:
+                    break
+
+        if self.negations and hits:
+            hits = self._mark_negated(text, hits)
+        return hits
+
+    def present(self, text: str) -> set[str]:
+        """Distinct keywords occurring (and not negated) in text"""
+        return {hit.keyword for hit in self.hits(text) if not hit.negated}
+
+    def _mark_negated(self, text: str, hits: list[KeywordHit]) -> list[KeywordHit]:
+        words = [(m.start(), m.group()) for m in _WORD.finditer(text)]
+        starts = [start for start, _ in words]
+        # A negation word that is part of a keyword ("no problem") negates nothing
+        negators = {
+            index for index, (start, word) in enumerate(words)
+            if word in self.negations and not any(h.start <= start < h.end for h in hits)
+        }
+        marked = []
+        for hit in hits:
+            # Words strictly before the one the keyword starts in
+            index = max(0, bisect_right(starts, hit.start) - 1)
+            negated = any(i in negators for i in range(max(0, index - self.negation_window), index))
+            marked.append(KeywordHit(hit.keyword, hit.start, hit.end, negated) if negated else hit)
+        return marked
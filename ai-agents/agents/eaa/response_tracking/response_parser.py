@@ -1,16 +1,58 @@
 """
 Response Parser for EAA
 Parse and analyze contractor responses from email and SMS
+
+- All keyword lists are matched in one scan by a compiled KeywordAutomaton
+  (shared between parser instances), and intent and sentiment are both
+  derived from that scan
+- parse_many() parses inbound webhook / IMAP batches with one log line
+- RESPONSE_PARSER_STRICT=1 switches to word-boundary, longest-match
+  matching with negation windows ("not interested" no longer also counts
+  as "interested"); the default keeps the original substring semantics
 """
+import os
 import re
+from collections import Counter
 from datetime import datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+from .keyword_automaton import KeywordAutomaton
+
+
+EXPLICIT_POSITIVE = ("yes", "y", "yeah", "yep", "sure")
+EXPLICIT_NEGATIVE = ("no", "n", "nope", "not interested", "pass")
+OPT_OUT_KEYWORDS = ("stop", "unsubscribe", "remove", "opt out")
+NEGATIONS = ("not", "no", "never", "don't", "dont", "can't", "cannot", "won't", "isn't", "wasn't", "without")
+
+STRICT_MATCHING = os.getenv("RESPONSE_PARSER_STRICT", "").lower() in ("1", "true", "yes")
+
+_THREAD_HEADER = re.compile(r"on .+ wrote:")
+_QUOTED_LINE = re.compile(r">.*$", re.MULTILINE)
+_MOBILE_SIGNATURE = re.compile(r"sent from my.*")
+_WHITESPACE = re.compile(r"\s+")
+
+_PHONE = re.compile(r"\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b")
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")
+_AVAILABILITY = re.compile(r"available|free|open|busy|booked")
+_TIME_REFERENCE = re.compile(
+    r"\b(?:next|this)\s+(?:week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b", re.IGNORECASE
+)
+_QUESTION = re.compile(r"[^.!?]*\?[^.!?]*")
+_BUSINESS = re.compile(r"\b(?:LLC|Inc|Corp|Company|Construction|Builders?)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=16)
+def _compile_matcher(keywords: tuple[str, ...], strict: bool) -> KeywordAutomaton:
+    if strict:
+        return KeywordAutomaton(keywords, word_boundaries=True, longest_only=True, negations=NEGATIONS)
+    return KeywordAutomaton(keywords)
 
 
 class ResponseParser:
     """Parse and analyze contractor responses"""
 
-    def __init__(self):
+    def __init__(self, strict: Optional[bool] = None):
         """Initialize response parser with sentiment and intent rules"""
         self.positive_keywords = [
             "yes", "interested", "available", "sounds good", "absolutely",
@@ -33,7 +75,15 @@ class ResponseParser:
             "questions", "clarification", "need to know"
         ]
 
-        print("[ResponseParser] Initialized with sentiment analysis rules")
+        self.strict = STRICT_MATCHING if strict is None else strict
+        self._positive = frozenset(self.positive_keywords)
+        self._negative = frozenset(self.negative_keywords)
+        self._info_requests = frozenset(self.info_request_keywords)
+        self._polarity: dict[str, tuple[list[str], int, int]] = {}
+        self._matcher = _compile_matcher(tuple(dict.fromkeys(
+            [*EXPLICIT_POSITIVE, *EXPLICIT_NEGATIVE, *OPT_OUT_KEYWORDS,
+             *self.positive_keywords, *self.negative_keywords, *self.info_request_keywords]
+        )), self.strict)
 
     def parse_response(self, response_content: str, channel: str) -> dict[str, Any]:
         """
@@ -46,15 +96,37 @@ class ResponseParser:
         Returns:
             Parsed response with intent, sentiment, and extracted data
         """
+        result = self._parse(response_content, channel, datetime.now().isoformat())
+        if "error" in result:
+            print(f"[ResponseParser ERROR] Failed to parse response: {result['error']}")
+        else:
+            print(f"[ResponseParser] Parsed {channel} response: {result['intent']} ({result['interest_level']} interest)")
+        return result
+
+    def parse_many(self, responses: Iterable[tuple[str, str]]) -> list[dict[str, Any]]:
+        """
+        Parse a batch of (response_content, channel) pairs, e.g. an inbound
+        webhook delivery or an IMAP fetch; results are in input order
+        """
+        processed_at = datetime.now().isoformat()
+        results = [self._parse(content, channel, processed_at) for content, channel in responses]
+
+        failed = sum(1 for result in results if "error" in result)
+        intents = Counter(result["intent"] for result in results)
+        print(f"[ResponseParser] Parsed {len(results)} responses ({failed} failed): {dict(intents)}")
+        return results
+
+    def _parse(self, response_content: str, channel: str, processed_at: str) -> dict[str, Any]:
         try:
             # Clean and normalize content
             cleaned_content = self._clean_content(response_content)
+            scan = self._scan(cleaned_content)
 
             # Determine intent
-            intent = self._classify_intent(cleaned_content)
+            intent = self._classify_intent(cleaned_content, scan)
 
             # Calculate sentiment score
-            sentiment = self._calculate_sentiment(cleaned_content)
+            sentiment = self._calculate_sentiment(cleaned_content, scan)
 
             # Determine interest level
             interest_level = self._determine_interest_level(intent, sentiment)
@@ -65,22 +137,17 @@ class ResponseParser:
             # Get response metadata
             metadata = self._get_response_metadata(response_content, channel)
 
-            result = {
+            return {
                 "intent": intent,
                 "sentiment": sentiment,
                 "interest_level": interest_level,
                 "extracted_data": extracted_data,
                 "metadata": metadata,
-                "processed_at": datetime.now().isoformat(),
+                "processed_at": processed_at,
                 "confidence_score": self._calculate_confidence(intent, sentiment, cleaned_content)
             }
 
-            print(f"[ResponseParser] Parsed {channel} response: {intent} ({interest_level} interest)")
-
-            return result
-
         except Exception as e:
-            print(f"[ResponseParser ERROR] Failed to parse response: {e}")
             return {
                 "intent": "unknown",
                 "sentiment": 0.0,
@@ -99,39 +166,102 @@ class ResponseParser:
         cleaned = content.lower().strip()
 
         # Remove common email artifacts
-        cleaned = re.sub(r"on .+ wrote:", "", cleaned)  # Remove email thread headers
-        cleaned = re.sub(r">.*$", "", cleaned, flags=re.MULTILINE)  # Remove quoted text
-        cleaned = re.sub(r"sent from my.*", "", cleaned)  # Remove mobile signatures
+        cleaned = _THREAD_HEADER.sub("", cleaned)  # Remove email thread headers
+        cleaned = _QUOTED_LINE.sub("", cleaned)  # Remove quoted text
+        cleaned = _MOBILE_SIGNATURE.sub("", cleaned)  # Remove mobile signatures
 
         # Remove extra whitespace
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
+        cleaned = _WHITESPACE.sub(" ", cleaned).strip()
 
         return cleaned
 
-    def _classify_intent(self, content: str) -> str:
+    def _scan(self, content: str) -> dict[str, Any]:
+        """
+        One automaton pass over cleaned content
+
+        Returns the keywords present, the negated ones (strict mode only) and
+        the whitespace-separated words (identified by their end offset)
+        containing a positive or negative keyword; negated keywords count for
+        the opposite polarity.
+        """
+        present: set[str] = set()
+        negated: set[str] = set()
+        positive_words: set[int] = set()
+        negative_words: set[int] = set()
+
+        if self.strict:
+            for hit in self._matcher.hits(content):
+                (negated if hit.negated else present).add(hit.keyword)
+                positive, negative = hit.keyword in self._positive, hit.keyword in self._negative
+                if hit.negated:
+                    positive, negative = negative, positive
+                if positive or negative:
+                    word_end = self._word_end(content, hit.start)
+                    if hit.end <= word_end:
+                        (positive_words if positive else negative_words).add(word_end)
+        else:
+            for start, longest in self._matcher.matches(content):
+                prefixes, positive_len, negative_len = self._prefix_polarity(longest)
+                present.update(prefixes)
+                if positive_len or negative_len:
+                    word_end = self._word_end(content, start)
+                    # The shortest keyword of a polarity is the one most likely to fit in the word
+                    if positive_len and start + positive_len <= word_end:
+                        positive_words.add(word_end)
+                    if negative_len and start + negative_len <= word_end:
+                        negative_words.add(word_end)
+
+        return {
+            "present": present,
+            "negated": negated,
+            "word_count": len(content.split()),
+            "positive_words": positive_words,
+            "negative_words": negative_words,
+        }
+
+    @staticmethod
+    def _word_end(content: str, start: int) -> int:
+        whitespace = _WHITESPACE.search(content, start)
+        return whitespace.start() if whitespace else len(content)
+
+    def _prefix_polarity(self, longest: str) -> tuple[list[str], int, int]:
+        """Keywords matching where `longest` matches, plus the shortest positive/negative length (0 if none)"""
+        cached = self._polarity.get(longest)
+        if cached is None:
+            prefixes = self._matcher.prefixes_of(longest)
+            cached = self._polarity[longest] = (
+                prefixes,
+                min((len(k) for k in prefixes if k in self._positive), default=0),
+                min((len(k) for k in prefixes if k in self._negative), default=0),
+            )
+        return cached
+
+    def _classify_intent(self, content: str, scan: Optional[dict[str, Any]] = None) -> str:
         """Classify the intent of the response"""
         if not content:
             return "no_response"
+        scan = scan or self._scan(content)
+        present = scan["present"]
 
         # Check for explicit positive responses
-        if any(keyword in content for keyword in ["yes", "y", "yeah", "yep", "sure"]):
+        if present.intersection(EXPLICIT_POSITIVE):
             return "interested"
 
         # Check for explicit negative responses
-        if any(keyword in content for keyword in ["no", "n", "nope", "not interested", "pass"]):
+        if present.intersection(EXPLICIT_NEGATIVE):
             return "not_interested"
 
         # Check for information requests
-        if any(keyword in content for keyword in self.info_request_keywords):
+        if present & self._info_requests:
             return "need_info"
 
         # Check for opt-out requests
-        if any(keyword in content for keyword in ["stop", "unsubscribe", "remove", "opt out"]):
+        if present.intersection(OPT_OUT_KEYWORDS):
             return "opt_out"
 
         # Check based on positive/negative keyword density
-        positive_count = sum(1 for keyword in self.positive_keywords if keyword in content)
-        negative_count = sum(1 for keyword in self.negative_keywords if keyword in content)
+        positive_count = len(present & self._positive) + len(scan["negated"] & self._negative)
+        negative_count = len(present & self._negative) + len(scan["negated"] & self._positive)
 
         if positive_count > negative_count and positive_count > 0:
             return "interested"
@@ -142,20 +272,19 @@ class ResponseParser:
         else:
             return "mixed"
 
-    def _calculate_sentiment(self, content: str) -> float:
+    def _calculate_sentiment(self, content: str, scan: Optional[dict[str, Any]] = None) -> float:
         """Calculate sentiment score from -1.0 (negative) to 1.0 (positive)"""
         if not content:
             return 0.0
+        scan = scan or self._scan(content)
 
-        words = content.split()
-        total_words = len(words)
-
+        total_words = scan["word_count"]
         if total_words == 0:
             return 0.0
 
-        # Count positive and negative words
-        positive_count = sum(1 for word in words if any(keyword in word for keyword in self.positive_keywords))
-        negative_count = sum(1 for word in words if any(keyword in word for keyword in self.negative_keywords))
+        # Count words containing positive and negative keywords
+        positive_count = len(scan["positive_words"])
+        negative_count = len(scan["negative_words"])
 
         # Calculate sentiment score
         sentiment_score = (positive_count - negative_count) / total_words
@@ -181,38 +310,32 @@ class ResponseParser:
         extracted = {}
 
         # Extract phone numbers
-        phone_pattern = r"\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b"
-        phone_matches = re.findall(phone_pattern, content)
+        phone_matches = _PHONE.findall(content)
         if phone_matches:
             extracted["phone_numbers"] = [f"({m[0]}) {m[1]}-{m[2]}" for m in phone_matches]
 
         # Extract email addresses
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        email_matches = re.findall(email_pattern, content)
+        email_matches = _EMAIL.findall(content)
         if email_matches:
             extracted["email_addresses"] = email_matches
 
         # Extract availability mentions
-        availability_keywords = ["available", "free", "open", "busy", "booked"]
-        availability_mentions = [word for word in content.split() if any(keyword in word.lower() for keyword in availability_keywords)]
+        availability_mentions = [word for word in content.split() if _AVAILABILITY.search(word.lower())]
         if availability_mentions:
             extracted["availability_mentions"] = availability_mentions
 
         # Extract time-related information
-        time_pattern = r"\b(?:next|this)\s+(?:week|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b"
-        time_matches = re.findall(time_pattern, content, re.IGNORECASE)
+        time_matches = _TIME_REFERENCE.findall(content)
         if time_matches:
             extracted["time_references"] = time_matches
 
         # Extract questions or concerns
-        question_pattern = r"[^.!?]*\?[^.!?]*"
-        questions = re.findall(question_pattern, content)
+        questions = _QUESTION.findall(content)
         if questions:
             extracted["questions"] = [q.strip() for q in questions]
 
         # Extract company/business mentions
-        business_pattern = r"\b(?:LLC|Inc|Corp|Company|Construction|Builders?)\b"
-        business_matches = re.findall(business_pattern, content, re.IGNORECASE)
+        business_matches = _BUSINESS.findall(content)
         if business_matches:
             extracted["business_mentions"] = business_matches
 
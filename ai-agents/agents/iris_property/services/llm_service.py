@@ -172,9 +172,7 @@ class IRISLLMService:
             }
         
         try:
-            # Initialize OpenAI client with proper format
-            from openai import OpenAI
-            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            from services.vision_analysis_service import get_vision_service
             
             prompt = f"""Analyze this property photo and identify:
             1. What room or area is shown
@@ -186,27 +184,14 @@ class IRISLLMService:
             {f'Expected room: {room_type}' if room_type else ''}
             """
             
-            response = client.chat.completions.create(
-                model="gpt-4o",  # Vision-capable model (gpt-4o-mini doesn't support vision)
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}"
-                                }
-                            }
-                        ]
-                    }
-                ],
+            # Cached by image content, so re-uploads across agents skip GPT-4o
+            analysis_text = get_vision_service().analyze_sync(
+                image_base64,
+                prompt,
+                variant="iris_llm_context",
                 max_tokens=500
             )
             
-            analysis_text = response.choices[0].message.content
-            
             # Parse response into structured data
             return {
                 "success": True,
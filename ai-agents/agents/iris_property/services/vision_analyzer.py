@@ -6,8 +6,8 @@ Uses OpenAI Vision API to detect maintenance issues in property photos
 import logging
 import base64
 from typing import List, Dict, Any, Optional
-import openai
-import os
+
+from services.vision_analysis_service import VisionAnalysisService, get_vision_service
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +15,10 @@ class VisionAnalyzer:
     """Analyzes property photos to detect maintenance issues using OpenAI Vision API"""
     
     def __init__(self):
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
+        self.vision_service: VisionAnalysisService = get_vision_service()
+        if self.vision_service.sync_client is None:
             logger.warning("OPENAI_API_KEY not found, vision analysis will be limited")
-            self.client = None
         else:
-            self.client = openai.OpenAI(api_key=api_key)
             logger.info("VisionAnalyzer initialized with OpenAI Vision API")
     
     def analyze_property_photo(
@@ -36,43 +34,23 @@ class VisionAnalyzer:
             Dict with detected issues, severity, and contractor recommendations
         """
         
-        if not self.client:
+        if self.vision_service.sync_client is None:
             return self._get_fallback_analysis(room_type, user_message)
         
         try:
             # Prepare the prompt
             prompt = self._create_analysis_prompt(room_type, user_message)
             
-            # Ensure image data is properly formatted for OpenAI
-            if not image_data.startswith('data:image/'):
-                image_data = f"data:image/jpeg;base64,{image_data}"
-            
-            # Call OpenAI Vision API using new client format
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # Use vision-capable model
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": prompt
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_data
-                                }
-                            }
-                        ]
-                    }
-                ],
+            # Shared service dedupes by image content and downscales before upload
+            analysis_text = self.vision_service.analyze_sync(
+                image_data,
+                prompt,
+                variant="iris_property_issues",
                 max_tokens=1000,
                 temperature=0.1
             )
             
             # Parse the response
-            analysis_text = response.choices[0].message.content
             return self._parse_analysis_response(analysis_text, room_type)
             
         except Exception as e:
@@ -3,6 +3,7 @@ IRIS Conversational Property Documentation Flow
 Handles back-and-forth conversation for room documentation and task creation
 """
 
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 import uuid
@@ -608,14 +609,18 @@ class ConversationalFlow:
         contractor_suggestions_all = []
         
         if request.images:
-            for img in request.images:
-                # Use LLM service for vision analysis
-                vision_analysis = self.llm_service.analyze_image_with_context(
+            # Analyze all photos concurrently; the shared vision cache dedupes repeats
+            vision_analyses = await asyncio.gather(*(
+                asyncio.to_thread(
+                    self.llm_service.analyze_image_with_context,
                     image_base64=img.data,
                     user_message=request.message,
                     room_type=room_type
                 )
-                
+                for img in request.images
+            ))
+            
+            for img, vision_analysis in zip(request.images, vision_analyses):
                 if vision_analysis.get('success'):
                     issues_found.extend(vision_analysis.get('detected_issues', []))
                     contractor_suggestions_all.extend(vision_analysis.get('contractor_suggestions', []))
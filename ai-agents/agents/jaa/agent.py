@@ -1,12 +1,19 @@
 """
 Intelligent Job Assessment Agent - LangGraph + GPT-4 Implementation
 Replaces regex-based extraction with real AI intelligence
+
+The workflow runs with ainvoke and makes a single structured-output LLM
+call; validation, categorization checks and deadline parsing are local
+(services/jaa_extraction.py). Repeat runs on a thread only send the turns
+added since the last extraction (services/jaa_incremental.py).
 """
+import asyncio
+import copy
 import json
 import os
 import sys
 from datetime import datetime
-from typing import Annotated, Any
+from typing import Annotated, Any, Optional
 import time
 
 from dotenv import load_dotenv
@@ -23,10 +30,40 @@ from typing_extensions import TypedDict
 
 from bid_card_utils import create_bid_card_with_defaults
 from database_simple import SupabaseDB
+from services.bid_card_change_fanout import SEGMENTS, BidCardChangeFanout
+from services.jaa_extraction import (
+    EXTRACTION_SYSTEM_PROMPT,
+    JAAExtraction,
+    build_bid_card_data,
+    build_extraction_prompt,
+    build_project_data,
+    extract_dates,
+    message_text,
+    user_messages,
+    validate_extraction,
+)
+from services.jaa_incremental import (
+    DEFAULT_DELTA_CONFIDENCE,
+    ExtractionState,
+    ExtractionStateStore,
+    JAADeltaExtraction,
+    build_delta_prompt,
+    merge_cia_facts,
+    merge_extraction,
+)
 from services.llm_cost_tracker import LLMCostTracker
 from utils.date_parser import SimpleDateParser
 
 
+# Who each notification variant is written for
+SEGMENT_AUDIENCE = {
+    "has_bid": "Contractors who already submitted a bid and may need to revise it",
+    "messaging_only": "Contractors who have been messaging the homeowner but have not bid yet",
+    "email_only": "Contractors who were invited by email and have not responded yet",
+    "form_only": "Contractors who were contacted through their website form and have not responded yet",
+}
+
+
 class IntelligentJAAState(TypedDict):
     """State for the Intelligent JAA Agent"""
     messages: Annotated[list[BaseMessage], add_messages]
@@ -58,12 +95,18 @@ class JobAssessmentAgent:
             temperature=0.1,
             max_tokens=4000
         )
+        # One function-calling round trip for analysis, extraction, categorization and date phrases
+        self.extractor = self.llm.with_structured_output(JAAExtraction, method="function_calling")
+        # Same schema plus per-field confidence, for follow-up runs that only see new turns
+        self.delta_extractor = self.llm.with_structured_output(JAADeltaExtraction, method="function_calling")
 
         # Initialize Supabase
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_ANON_KEY")
         self.supabase = create_client(self.supabase_url, self.supabase_key)
         self.db = SupabaseDB()
+        self.extraction_store = ExtractionStateStore(self.supabase)
+        self.change_fanout = BidCardChangeFanout(self.supabase)
         
         # Initialize cost tracker
         self.cost_tracker = LLMCostTracker()
@@ -105,21 +148,41 @@ class JobAssessmentAgent:
         
         return response
 
+    async def _tracked_structured_ainvoke(self, messages: list, context: dict = None, extractor=None) -> JAAExtraction:
+        """Structured-output extraction call with cost tracking, without blocking the event loop"""
+        start_time = time.time()
+
+        extraction = await (extractor or self.extractor).ainvoke(messages)
+
+        # Approximate tokens: 1 token ≈ 4 characters
+        input_tokens = len(" ".join(msg.content for msg in messages)) // 4
+        output_tokens = len(extraction.model_dump_json()) // 4
+
+        await self.cost_tracker.track_llm_call(
+            agent_name="JAA",
+            provider="openai",
+            model="gpt-4",
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            duration_ms=int((time.time() - start_time) * 1000),
+            context=context or {}
+        )
+
+        return extraction
+
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow for intelligent bid card generation"""
 
         workflow = StateGraph(IntelligentJAAState)
 
-        # Add nodes
-        workflow.add_node("analyze_conversation", self._analyze_conversation)
+        # Add nodes (only extract_project_data calls the LLM)
         workflow.add_node("extract_project_data", self._extract_project_data)
         workflow.add_node("extract_dates", self._extract_dates)
         workflow.add_node("validate_extraction", self._validate_extraction)
         workflow.add_node("generate_bid_card", self._generate_bid_card)
 
         # Add edges
-        workflow.add_edge(START, "analyze_conversation")
-        workflow.add_edge("analyze_conversation", "extract_project_data")
+        workflow.add_edge(START, "extract_project_data")
         workflow.add_edge("extract_project_data", "extract_dates")
         workflow.add_edge("extract_dates", "validate_extraction")
         workflow.add_edge("validate_extraction", "generate_bid_card")
@@ -127,12 +190,13 @@ class JobAssessmentAgent:
 
         return workflow.compile()
 
-    async def process_conversation(self, thread_id: str) -> dict[str, Any]:
+    async def process_conversation(self, thread_id: str, rebuild: bool = False) -> dict[str, Any]:
         """
         Main entry point: Process CIA conversation with full AI intelligence
 
         Args:
             thread_id: The conversation thread ID from CIA
+            rebuild: Ignore the saved extraction state and re-read the whole thread
 
         Returns:
             Dict with success status and bid card data
@@ -140,23 +204,31 @@ class JobAssessmentAgent:
         print(f"\n[INTELLIGENT JAA] Processing conversation: {thread_id}")
 
         try:
-            # Step 1: Load conversation from unified conversation system
+            # Step 1: Load the saved extraction state and only the messages after its watermark
             print("[INTELLIGENT JAA] Loading conversation from unified system...")
-            conversation_data = await self.db.load_conversation_state(thread_id)
+            snapshot = self.extraction_store.load(thread_id)
 
-            if not conversation_data:
+            if not snapshot:
                 return {
                     "success": False,
                     "error": f"No conversation found for thread_id: {thread_id}"
                 }
 
-            # Extract state from unified conversation system
-            state = conversation_data.get("state", {})
-            if isinstance(state, str):
-                state = json.loads(state)
-                conversation_data["state"] = state
+            incremental = snapshot.state is not None and not rebuild
+            extraction_state = snapshot.state if incremental else ExtractionState(
+                snapshot.conversation_id, memory_id=snapshot.state.memory_id if snapshot.state else None
+            )
+            new_messages = self.extraction_store.new_messages(
+                snapshot.conversation_id, extraction_state if incremental else None
+            )
+            conversation_data = {
+                "state": {"messages": new_messages, "collected_info": snapshot.collected_info},
+                "extraction_state": extraction_state,
+                "incremental": incremental,
+            }
 
-            print(f"[INTELLIGENT JAA] Loaded unified conversation with {len(state.get('messages', []))} messages")
+            mode = "incremental" if incremental else "full"
+            print(f"[INTELLIGENT JAA] Loaded {len(new_messages)} messages ({mode} extraction)")
 
             # Step 2: Initialize state and run LangGraph workflow
             initial_state = {
@@ -165,12 +237,12 @@ class JobAssessmentAgent:
                 "extracted_data": {},
                 "bid_card_data": {},
                 "thread_id": thread_id,
-                "stage": "analysis",
+                "stage": "extraction",
                 "errors": []
             }
 
             # Run the intelligent workflow
-            final_state = self.workflow.invoke(initial_state)
+            final_state = await self.workflow.ainvoke(initial_state)
 
             if final_state["errors"]:
                 return {
@@ -178,56 +250,18 @@ class JobAssessmentAgent:
                     "error": f'Processing errors: {"; ".join(final_state["errors"])}'
                 }
 
-            # Step 3: Save to database using new utility
-            print("[INTELLIGENT JAA] Creating bid card with fixed database schema...")
-
-            # Prepare project data for the new utility
-            project_data = {
-                "project_type": final_state["bid_card_data"].get("project_type", "general_renovation"),
-                "title": final_state["bid_card_data"].get("title", "New Project"),
-                "description": final_state["bid_card_data"].get("description", ""),
-                "urgency_level": final_state["bid_card_data"].get("urgency_level", "week"),
-                "complexity_score": final_state["bid_card_data"].get("complexity_score", 3),
-                "contractor_count_needed": final_state["bid_card_data"].get("contractor_count_needed", 3),
-                "budget_min": final_state["bid_card_data"].get("budget_min"),
-                "budget_max": final_state["bid_card_data"].get("budget_max"),
-                "requirements": final_state["bid_card_data"].get("requirements", []),
-                "location_city": final_state["bid_card_data"].get("location_city"),
-                "location_state": final_state["bid_card_data"].get("location_state"),
-                "location_zip": final_state["bid_card_data"].get("location_zip"),
-                "cia_thread_id": thread_id[-20:],  # Truncate to fit VARCHAR(20)
-                "timeline_start": final_state["bid_card_data"].get("timeline_start"),
-                "timeline_end": final_state["bid_card_data"].get("timeline_end"),
-                # NEW: Add exact date fields
-                "bid_collection_deadline": final_state["extracted_data"].get("bid_collection_deadline"),
-                "project_completion_deadline": final_state["extracted_data"].get("project_completion_deadline"),
-                "deadline_hard": final_state["extracted_data"].get("deadline_hard", False),
-                "deadline_context": final_state["extracted_data"].get("deadline_context")
-            }
+            extraction_state.advance(new_messages)
+            self.extraction_store.save(extraction_state)
 
-            # Create bid card using the new utility
+            # Step 3: Save bid card and bid_document in one insert
+            print("[INTELLIGENT JAA] Creating bid card with fixed database schema...")
+            project_data = build_project_data(thread_id, final_state["bid_card_data"], final_state["extracted_data"])
             create_result = create_bid_card_with_defaults(project_data)
 
             if create_result["success"]:
                 bid_card_data = create_result["bid_card"]
                 bid_card_number = create_result["bid_card_number"]
 
-                # Update the bid_document with AI analysis
-                bid_document = {
-                    "bid_card_number": bid_card_number,
-                    "full_cia_thread_id": thread_id,
-                    "all_extracted_data": final_state["extracted_data"],
-                    "ai_analysis": final_state["bid_card_data"],
-                    "generated_at": datetime.now().isoformat(),
-                    "extraction_method": "IntelligentJAA_ClaudeOpus4",
-                    "instabids_version": "3.0"
-                }
-
-                # Update the bid_document field
-                update_result = self.supabase.table("bid_cards").update({
-                    "bid_document": bid_document
-                }).eq("id", bid_card_data["id"]).execute()
-
                 print(f"[INTELLIGENT JAA] SUCCESS: Created bid card {bid_card_number}")
                 print(f"[INTELLIGENT JAA] Project: {final_state['bid_card_data'].get('project_type')}")
                 print(f"[INTELLIGENT JAA] Budget: ${final_state['bid_card_data'].get('budget_min')}-${final_state['bid_card_data'].get('budget_max')}")
@@ -254,228 +288,60 @@ class JobAssessmentAgent:
                 "error": str(e)
             }
 
-    def _analyze_conversation(self, state: IntelligentJAAState) -> IntelligentJAAState:
-        """Step 1: Analyze conversation with AI to understand project scope"""
-        print("[INTELLIGENT JAA] Stage 1: Analyzing conversation with GPT-4...")
-
-        # Extract conversation messages
-        conversation_state = state["conversation_data"].get("state", {})
-        messages = conversation_state.get("messages", [])
-        collected_info = conversation_state.get("collected_info", {})
-
-        # Combine all user messages
-        user_messages = []
-        for msg in messages:
-            if msg.get("role") == "user":
-                user_messages.append(msg.get("content", ""))
-
-        full_conversation = "\n".join(user_messages)
-
-        # Create analysis prompt
-        analysis_prompt = f"""
-You are an expert project analyst for InstaBids, a contractor marketplace.
-
-Analyze this homeowner conversation and provide a detailed understanding of their project:
-
-CONVERSATION:
-{full_conversation}
-
-COLLECTED INFO FROM CIA:
-{json.dumps(collected_info, indent=2)}
-
-Please analyze and provide:
-
-1. PROJECT UNDERSTANDING:
-   - What type of project is this?
-   - What is the homeowner's primary goal?
-   - What specific work needs to be done?
-
-2. URGENCY & TIMELINE:
-   - How urgent is this project?
-   - When do they want to start?
-   - Any time constraints or deadlines?
-
-3. BUDGET ANALYSIS:
-   - What budget range did they mention?
-   - Do they seem price-sensitive or quality-focused?
-   - Are there any budget constraints?
-
-4. COMPLEXITY ASSESSMENT:
-   - Is this a simple or complex project?
-   - What challenges might contractors face?
-   - Any special requirements or permits needed?
-
-5. HOMEOWNER PROFILE:
-   - How serious are they about proceeding?
-   - Do they seem well-informed about the project?
-   - Any specific preferences or concerns?
-
-Provide your analysis in clear, structured format.
-"""
-
-        try:
-            response = self._tracked_llm_invoke([
-                SystemMessage(content="You are an expert project analyst for InstaBids contractor marketplace."),
-                HumanMessage(content=analysis_prompt)
-            ], context={"thread_id": state.get("thread_id"), "stage": "analysis"})
-
-            # Store analysis
-            state["extracted_data"]["ai_analysis"] = response.content
-            state["stage"] = "extraction"
-
-            print("[INTELLIGENT JAA] Conversation analysis complete")
-            return state
-
-        except Exception as e:
-            state["errors"].append(f"Analysis failed: {e!s}")
-            return state
-
-    def _extract_project_data(self, state: IntelligentJAAState) -> IntelligentJAAState:
-        """Step 2: Extract structured data points using AI intelligence"""
-        print("[INTELLIGENT JAA] Stage 2: Extracting structured data with AI...")
+    async def _extract_project_data(self, state: IntelligentJAAState) -> IntelligentJAAState:
+        """Step 1: Analyze the conversation (or only its new turns) and extract structured data in one LLM call"""
+        print("[INTELLIGENT JAA] Stage 1: Analyzing and extracting structured data...")
 
-        # Get conversation data
-        conversation_state = state["conversation_data"].get("state", {})
+        conversation_data = state["conversation_data"]
+        conversation_state = conversation_data.get("state", {})
         messages = conversation_state.get("messages", [])
         collected_info = conversation_state.get("collected_info", {})
-
-        user_messages = []
-        for msg in messages:
-            if msg.get("role") == "user":
-                user_messages.append(msg.get("content", ""))
-
-        full_conversation = "\n".join(user_messages)
-
-        # Create extraction prompt
-        extraction_prompt = f"""
-You are a data extraction specialist for InstaBids contractor marketplace.
-
-Extract structured data from this homeowner conversation:
-
-CONVERSATION:
-{full_conversation}
-
-COLLECTED INFO:
-{json.dumps(collected_info, indent=2)}
-
-PREVIOUS ANALYSIS:
-{state["extracted_data"].get('ai_analysis', 'No previous analysis')}
-
-Extract the following data points in JSON format:
-
-{{
-  "project_type": "kitchen|bathroom|roofing|flooring|plumbing|electrical|hvac|painting|landscaping|general",
-  "service_type": "installation|repair|maintenance|renovation|new_construction",
-  "project_description": "Detailed description of work needed",
-  "budget_min": integer (minimum budget in dollars),
-  "budget_max": integer (maximum budget in dollars),
-  "budget_confidence": "high|medium|low",
-  "urgency_level": "emergency|urgent|week|month|flexible",
-  "timeline_start": "when they want to start",
-  "timeline_duration": "expected project duration",
-  "location": {{
-    "address": "full address if provided",
-    "city": "city name",
-    "state": "state name",
-    "zip_code": "zip code",
-    "property_type": "house|condo|apartment|commercial"
-  }},
-  "materials_specified": ["list of materials mentioned"],
-  "special_requirements": ["list of special needs"],
-  "homeowner_info": {{
-    "name": "homeowner name if provided",
-    "email": "email if provided",
-    "phone": "phone if provided",
-    "communication_preference": "email|phone|text"
-  }},
-  "contractor_requirements": {{
-    "count_needed": integer (3-6 contractors),
-    "specialties_required": ["list of required specialties"],
-    "license_requirements": ["list of required licenses"]
-  }},
-  "complexity_factors": ["list of complexity factors"],
-  "quality_expectations": "basic|standard|premium",
-  "intention_score": integer (1-10, how serious are they)
-}}
-
-IMPORTANT:
-- Only extract data that is clearly mentioned or strongly implied
-- Use null for unknown values
-- Be conservative with budget estimates
-- Consider urgency carefully based on language used
-- Assess intention score based on specificity and commitment level
-
-Return ONLY the JSON, no additional text.
-"""
+        extraction_state = conversation_data["extraction_state"]
 
         try:
-            response = self.llm.invoke([
-                SystemMessage(content="You are a data extraction specialist. Return only valid JSON."),
-                HumanMessage(content=extraction_prompt)
-            ])
+            new_turns = user_messages(messages)
+            if not conversation_data.get("incremental"):
+                extraction = await self._tracked_structured_ainvoke([
+                    SystemMessage(content=EXTRACTION_SYSTEM_PROMPT),
+                    HumanMessage(content=build_extraction_prompt("\n".join(new_turns), collected_info))
+                ], context={"thread_id": state.get("thread_id"), "stage": "extraction"})
+                extraction_state.extracted, extraction_state.confidence = {}, {}
+                merge_extraction(extraction_state.extracted, extraction_state.confidence, extraction.model_dump())
+            elif new_turns:
+                delta = await self._tracked_structured_ainvoke([
+                    SystemMessage(content=EXTRACTION_SYSTEM_PROMPT),
+                    HumanMessage(content=build_delta_prompt(extraction_state.extracted, new_turns))
+                ], context={"thread_id": state.get("thread_id"), "stage": "incremental_extraction"},
+                    extractor=self.delta_extractor)
+                changed = merge_extraction(
+                    extraction_state.extracted, extraction_state.confidence,
+                    delta.model_dump(exclude={"confidence"}), delta.confidence, DEFAULT_DELTA_CONFIDENCE
+                )
+                print(f"[INTELLIGENT JAA] {len(new_turns)} new turns updated: {', '.join(changed) or 'nothing'}")
+            else:
+                print("[INTELLIGENT JAA] No new homeowner turns since last extraction, skipping LLM call")
 
-            # Clean the response - remove markdown code blocks if present
-            response_content = response.content.strip()
-            if response_content.startswith("```json"):
-                response_content = response_content[7:]  # Remove ```json
-            if response_content.endswith("```"):
-                response_content = response_content[:-3]  # Remove ```
-            response_content = response_content.strip()
+            # Fields CIA recorded itself are authoritative
+            merge_cia_facts(extraction_state, collected_info)
 
-            # Parse the JSON response
-            extracted_data = json.loads(response_content)
-            state["extracted_data"].update(extracted_data)
+            # Validation fills defaults in place; keep them out of the saved facts
+            state["extracted_data"].update(copy.deepcopy(extraction_state.extracted))
+            state["extracted_data"]["ai_analysis"] = extraction_state.extracted.get("project_analysis")
             state["stage"] = "validation"
 
             print("[INTELLIGENT JAA] Data extraction complete")
             return state
 
-        except json.JSONDecodeError as e:
-            state["errors"].append(f"JSON parsing failed: {e!s}")
-            return state
         except Exception as e:
             state["errors"].append(f"Extraction failed: {e!s}")
             return state
 
-    async def _validate_extraction(self, state: IntelligentJAAState) -> IntelligentJAAState:
-        """Step 3: Validate extracted data and fill in missing pieces"""
+    def _validate_extraction(self, state: IntelligentJAAState) -> IntelligentJAAState:
+        """Step 3: Validate extracted data and fill in missing pieces (local)"""
         print("[INTELLIGENT JAA] Stage 3: Validating and enriching data...")
 
-        # Basic validation and defaults
-        extracted = state["extracted_data"]
-
-        # Ensure required fields have sensible defaults
-        if not extracted.get("project_type"):
-            extracted["project_type"] = "general"
-
-        if not extracted.get("budget_min") or extracted["budget_min"] < 100:
-            extracted["budget_min"] = 5000
-
-        if not extracted.get("budget_max") or extracted["budget_max"] < extracted["budget_min"]:
-            extracted["budget_max"] = max(extracted["budget_min"] * 2, 15000)
-
-        if not extracted.get("urgency_level"):
-            extracted["urgency_level"] = "flexible"
-
-        if not extracted.get("contractor_requirements"):
-            extracted["contractor_requirements"] = {
-                "count_needed": 4,
-                "specialties_required": [],
-                "license_requirements": []
-            }
-
-        # CRITICAL: Categorize project and get contractor_type_ids for BSA matching
-        project_description = extracted.get("project_description", "")
-        project_type = extracted.get("project_type", "general")
-        
-        contractor_type_ids = await self._categorize_project_and_populate_contractor_types(
-            project_description, project_type
-        )
-        extracted["contractor_type_ids"] = contractor_type_ids
-
-        # Calculate complexity score
-        complexity_score = self._calculate_complexity_score(extracted)
-        extracted["complexity_score"] = complexity_score
+        validate_extraction(state["extracted_data"])
+        print(f"[JAA CATEGORIZATION] Project categorized with contractor_type_ids: {state['extracted_data']['contractor_type_ids']}")
 
         state["stage"] = "generation"
         print("[INTELLIGENT JAA] Data validation complete")
@@ -485,167 +351,15 @@ Return ONLY the JSON, no additional text.
         """Step 4: Generate final bid card with all InstaBids-specific data"""
         print("[INTELLIGENT JAA] Stage 4: Generating professional bid card...")
 
-        extracted = state["extracted_data"]
-
-        # Generate final bid card data
-        bid_card_data = {
-            # Core project info
-            "project_type": extracted.get("project_type", "general"),
-            "service_type": extracted.get("service_type", "installation"),
-            "project_description": extracted.get("project_description", "Project details to be discussed"),
-
-            # Budget and timeline
-            "budget_min": extracted.get("budget_min", 5000),
-            "budget_max": extracted.get("budget_max", 15000),
-            "budget_confidence": extracted.get("budget_confidence", "medium"),
-            "urgency_level": extracted.get("urgency_level", "flexible"),
-            "timeline_start": extracted.get("timeline_start"),
-            "timeline_duration": extracted.get("timeline_duration"),
-
-            # Location
-            "location": extracted.get("location", {}),
-
-            # Requirements
-            "materials_specified": extracted.get("materials_specified", []),
-            "special_requirements": extracted.get("special_requirements", []),
-
-            # Contractor needs
-            "contractor_count_needed": extracted.get("contractor_requirements", {}).get("count_needed", 4),
-            "specialties_required": extracted.get("contractor_requirements", {}).get("specialties_required", []),
-            "license_requirements": extracted.get("contractor_requirements", {}).get("license_requirements", []),
-            
-            # CRITICAL: contractor_type_ids for BSA matching - populated by GPT-4o categorization
-            "contractor_type_ids": extracted.get("contractor_type_ids", []),
-
-            # InstaBids metrics
-            "complexity_score": extracted.get("complexity_score", 5),
-            "intention_score": extracted.get("intention_score", 7),
-            "quality_expectations": extracted.get("quality_expectations", "standard"),
-
-            # Homeowner info
-            "homeowner_info": extracted.get("homeowner_info", {}),
-
-            # AI generated insights
-            "ai_insights": {
-                "project_analysis": state["extracted_data"].get("ai_analysis"),
-                "complexity_factors": extracted.get("complexity_factors", []),
-                "generated_by": "IntelligentJAA_ClaudeOpus4",
-                "generated_at": datetime.now().isoformat()
-            }
-        }
-
-        state["bid_card_data"] = bid_card_data
+        state["bid_card_data"] = build_bid_card_data(state["extracted_data"])
         print("[INTELLIGENT JAA] Bid card generation complete")
         return state
 
-    def _calculate_complexity_score(self, extracted_data: dict[str, Any]) -> int:
-        """Calculate project complexity score (1-10) using AI-extracted data"""
-        score = 5  # Base score
-
-        # Budget impact
-        budget_max = extracted_data.get("budget_max", 0)
-        if budget_max > 100000:
-            score += 4
-        elif budget_max > 50000:
-            score += 3
-        elif budget_max > 25000:
-            score += 2
-        elif budget_max > 10000:
-            score += 1
-        elif budget_max < 2000:
-            score -= 2
-
-        # Urgency impact
-        urgency = extracted_data.get("urgency_level", "flexible")
-        if urgency == "emergency":
-            score += 3
-        elif urgency == "urgent":
-            score += 2
-
-        # Special requirements
-        special_reqs = extracted_data.get("special_requirements", [])
-        score += len(special_reqs)
-
-        # Complexity factors
-        complexity_factors = extracted_data.get("complexity_factors", [])
-        score += len(complexity_factors) * 0.5
-
-        # License requirements indicate complexity
-        license_reqs = extracted_data.get("contractor_requirements", {}).get("license_requirements", [])
-        score += len(license_reqs)
-
-        return max(1, min(10, int(score)))
-
     def _generate_bid_card_number(self) -> str:
         """Generate unique bid card number"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         return f"IBC-{timestamp}"  # Intelligent Bid Card prefix
 
-    async def _categorize_project_and_populate_contractor_types(self, project_description: str, project_type: str) -> list[int]:
-        """
-        Use GPT-4o to categorize project and return contractor_type_ids
-        
-        Args:
-            project_description: Full project description
-            project_type: Extracted project type
-            
-        Returns:
-            List of contractor_type_ids for BSA matching
-        """
-        try:
-            categorization_prompt = f"""
-You are a project categorization expert for a contractor matching platform.
-
-PROJECT INFO:
-- Type: {project_type}
-- Description: {project_description}
-
-Your job is to determine which contractor types are needed for this project.
-
-Common contractor type mappings:
-- Plumbing work: [33, 207] (plumbing, plumber)
-- Electrical work: [48, 208] (electrical, electrician)  
-- General construction: [127, 219] (handyman, general contractor)
-- HVAC work: [156, 234] (hvac, hvac contractor)
-- Roofing: [89, 223] (roofing, roofer)
-- Flooring: [67, 198] (flooring, flooring installer)
-- Kitchen remodel: [33, 48, 127, 207, 208, 219] (plumbing, electrical, general)
-- Bathroom remodel: [33, 48, 127, 207, 208, 219] (plumbing, electrical, general)
-
-Analyze the project and return ONLY a JSON array of contractor type IDs:
-[33, 207, 127]
-
-Return ONLY the JSON array, no other text.
-"""
-
-            response = self._tracked_llm_invoke([
-                SystemMessage(content="You are a contractor categorization specialist. Return only JSON."),
-                HumanMessage(content=categorization_prompt)
-            ])
-
-            # Clean and parse response
-            response_content = response.content.strip()
-            if response_content.startswith("```"):
-                # Remove code blocks
-                lines = response_content.split('\n')
-                for line in lines:
-                    if line.strip().startswith('['):
-                        response_content = line.strip()
-                        break
-
-            contractor_type_ids = json.loads(response_content)
-            
-            if isinstance(contractor_type_ids, list) and all(isinstance(x, int) for x in contractor_type_ids):
-                print(f"[JAA CATEGORIZATION] Project categorized with contractor_type_ids: {contractor_type_ids}")
-                return contractor_type_ids
-            else:
-                print("[JAA CATEGORIZATION] Invalid categorization result, using default")
-                return [127, 219]  # Default to general contractors
-                
-        except Exception as e:
-            print(f"[JAA CATEGORIZATION] Error in categorization: {e}")
-            return [127, 219]  # Default fallback
-
     async def update_existing_bid_card(self, bid_card_id: str, update_request: dict[str, Any]) -> dict[str, Any]:
         """
         Update existing bid card with intelligent analysis and contractor notifications
@@ -714,7 +428,8 @@ Return ONLY the JSON array, no other text.
                 current_bid_card, 
                 updated_data, 
                 update_analysis["changes_made"],
-                update_request
+                update_request,
+                affected_contractors
             )
             
             # Step 7: Return complete update package
@@ -823,115 +538,44 @@ RULES:
             return {"errors": [f"Analysis failed: {str(e)}"]}
 
     async def _find_affected_contractors(self, bid_card_id: str) -> list[dict[str, Any]]:
-        """Find all contractors who need notification about this bid card update"""
+        """Find all contractors who need notification about this bid card update (grouped queries)"""
         print("[JAA UPDATE] Finding affected contractors...")
-        
-        affected_contractors = []
-        
+
         try:
-            # Find contractors via outreach attempts (contractor_leads)
-            outreach_attempts = self.supabase.table("contractor_outreach_attempts")\
-                .select("contractor_lead_id, channel, status")\
-                .eq("bid_card_id", bid_card_id)\
-                .execute()
-            
-            contractor_lead_ids = list(set([attempt["contractor_lead_id"] for attempt in outreach_attempts.data if attempt["contractor_lead_id"]]))
-            
-            if contractor_lead_ids:
-                contractor_leads = self.supabase.table("contractor_leads")\
-                    .select("id, company_name, contact_name, email, phone")\
-                    .in_("id", contractor_lead_ids)\
-                    .execute()
-                
-                for lead in contractor_leads.data:
-                    # Determine engagement status
-                    lead_attempts = [a for a in outreach_attempts.data if a["contractor_lead_id"] == lead["id"]]
-                    channels = [a["channel"] for a in lead_attempts]
-                    
-                    affected_contractors.append({
-                        "contractor_id": lead["id"],
-                        "contractor_type": "contractor_lead",
-                        "company_name": lead["company_name"] or "Unknown Company",
-                        "contact_name": lead["contact_name"],
-                        "email": lead["email"],
-                        "phone": lead["phone"],
-                        "engagement_status": self._determine_engagement_status(bid_card_id, lead["id"], channels),
-                        "channels_used": channels,
-                        "requires_notification": True
-                    })
-            
-            # Find contractors via direct bids (contractors table)
-            contractor_bids = self.supabase.table("contractor_bids")\
-                .select("contractor_id")\
-                .eq("bid_card_id", bid_card_id)\
-                .execute()
-            
-            contractor_ids = list(set([bid["contractor_id"] for bid in contractor_bids.data]))
-            
-            if contractor_ids:
-                contractors = self.supabase.table("contractors")\
-                    .select("id, company_name, user_id")\
-                    .in_("id", contractor_ids)\
-                    .execute()
-                
-                for contractor in contractors.data:
-                    affected_contractors.append({
-                        "contractor_id": contractor["id"],
-                        "contractor_type": "contractor",
-                        "company_name": contractor["company_name"] or "Contractor",
-                        "contact_name": None,
-                        "email": None,  # Would need to get from user profile
-                        "phone": None,  # Would need to get from user profile
-                        "engagement_status": "has_bid",
-                        "channels_used": ["platform"],
-                        "requires_notification": True
-                    })
-            
+            engaged = self.change_fanout.resolve_engagement(bid_card_id)
+            affected_contractors = [{
+                "contractor_id": contractor.contractor_id,
+                "contractor_type": contractor.contractor_type,
+                "company_name": contractor.company_name or "Unknown Company",
+                "contact_name": contractor.contact_name,
+                "email": contractor.email,
+                "phone": contractor.phone,
+                "engagement_status": contractor.segment,
+                "channels_used": contractor.channels_used or ["platform"],
+                "requires_notification": True
+            } for contractor in engaged]
+
             print(f"[JAA UPDATE] Found {len(affected_contractors)} affected contractors")
             return affected_contractors
-            
+
         except Exception as e:
             print(f"[JAA UPDATE ERROR] Failed to find contractors: {e}")
             return []
 
-    def _determine_engagement_status(self, bid_card_id: str, contractor_lead_id: str, channels_used: list[str]) -> str:
-        """Determine contractor engagement status based on interactions"""
-        try:
-            # Check if contractor has submitted a bid
-            bid_check = self.supabase.table("contractor_bids")\
-                .select("id")\
-                .eq("bid_card_id", bid_card_id)\
-                .eq("contractor_id", contractor_lead_id)\
-                .execute()
-            
-            if bid_check.data:
-                return "has_bid"
-            
-            # Check if contractor has sent messages
-            message_check = self.supabase.table("bid_card_messages")\
-                .select("id")\
-                .eq("bid_card_id", bid_card_id)\
-                .eq("sender_type", "contractor")\
-                .execute()
-            
-            # Note: This is a simplified check - in production would need sender_id matching
-            if message_check.data:
-                return "messaging_only"
-            
-            # Default to email/form only
-            return "email_only" if "email" in channels_used else "form_only"
-            
-        except Exception:
-            return "email_only"
-
     async def _generate_update_notification_content(
         self, 
         current_bid_card: dict[str, Any], 
         updated_data: dict[str, Any],
         changes_made: list[dict[str, Any]],
-        update_request: dict[str, Any]
+        update_request: dict[str, Any],
+        affected_contractors: list[dict[str, Any]] = ()
     ) -> dict[str, Any]:
-        """Generate professional notification content using GPT-4"""
+        """
+        Generate professional notification content using GPT-4, once per engagement segment
+
+        Top-level fields hold the content for the most engaged segment; "segments"
+        maps each segment present among affected_contractors to its content.
+        """
         print("[JAA UPDATE] Generating notification content...")
         
         # Create change description
@@ -948,13 +592,31 @@ RULES:
         
         changes_text = ". ".join(change_descriptions)
         project_type = current_bid_card.get('project_type', 'project').replace('_', ' ').title()
-        
+        context = update_request.get('update_context', {}).get('conversation_snippet', '')
+
+        present = {c.get("engagement_status") for c in affected_contractors}
+        segments = [segment for segment in SEGMENTS if segment in present] or [None]
+        contents = await asyncio.gather(*(
+            self._generate_segment_notification(project_type, changes_text, context, segment) for segment in segments
+        ))
+
+        notification_content = dict(contents[0])
+        if segments != [None]:
+            notification_content["segments"] = dict(zip(segments, contents))
+        return notification_content
+
+    async def _generate_segment_notification(
+        self, project_type: str, changes_text: str, context: str, segment: Optional[str]
+    ) -> dict[str, Any]:
+        """Notification content for one audience segment (None = all contractors)"""
+        audience = SEGMENT_AUDIENCE.get(segment, "Contractors who were invited to this project")
         notification_prompt = f"""
 Generate a professional contractor notification email for a bid card update.
 
 PROJECT: {project_type}
 CHANGES: {changes_text}
-CONTEXT: {update_request.get('update_context', {}).get('conversation_snippet', '')}
+CONTEXT: {context}
+AUDIENCE: {audience}
 
 Create professional notification content in JSON format:
 {{
@@ -967,12 +629,12 @@ Create professional notification content in JSON format:
 REQUIREMENTS:
 - Professional InstaBids tone
 - Clear explanation of changes
-- Actionable next steps
+- Actionable next steps for this audience
 - Appropriate urgency level
 """
 
         try:
-            response = self.llm.invoke([
+            response = await self.llm.ainvoke([
                 SystemMessage(content="Generate professional contractor communications."),
                 HumanMessage(content=notification_prompt)
             ])
@@ -987,12 +649,10 @@ REQUIREMENTS:
             notification_content["sender"] = "InstaBids Project Team"
             notification_content["footer"] = "View updated project details at InstaBids.com"
             
-            return notification_content
-            
         except Exception as e:
             print(f"[JAA UPDATE] Notification generation failed: {e}")
             # Fallback notification content
-            return {
+            notification_content = {
                 "subject": f"Project Update: {project_type}",
                 "message_template": f"The homeowner has updated their {project_type.lower()} project. {changes_text}. Please review the updated project details.",
                 "urgency_level": "medium",
@@ -1001,6 +661,11 @@ REQUIREMENTS:
                 "footer": "View updated project details at InstaBids.com"
             }
 
+        # Fields the change fan-out writes into notifications rows
+        notification_content.setdefault("title", notification_content.get("subject"))
+        notification_content.setdefault("message", notification_content.get("message_template"))
+        return notification_content
+
     async def _log_bid_card_change(
         self,
         bid_card_id: str,
@@ -1092,100 +757,18 @@ REQUIREMENTS:
         return actions
 
     def _extract_dates(self, state: IntelligentJAAState) -> IntelligentJAAState:
-        """NEW: Extract exact dates from conversation"""
-        print("[INTELLIGENT JAA] Stage 2.5: Extracting exact dates with SimpleDateParser...")
-        
+        """Step 2: Parse exact deadlines locally from the extracted date phrases"""
+        print("[INTELLIGENT JAA] Stage 2: Extracting exact dates with SimpleDateParser...")
+
         try:
-            # Get conversation text
-            conversation_data = state["conversation_data"]
-            conversation_state = conversation_data.get("state", {})
-            messages = conversation_state.get("messages", [])
-            
-            # Combine all conversation text for date extraction
-            conversation_text = ""
-            for msg in messages:
-                if isinstance(msg, dict) and msg.get("content"):
-                    conversation_text += f" {msg['content']}"
-                elif hasattr(msg, 'content'):
-                    conversation_text += f" {msg.content}"
-            
-            print(f"[INTELLIGENT JAA] Analyzing {len(conversation_text)} characters for date mentions...")
-            
-            # Use Claude to identify date-related text first
-            date_extraction_prompt = SystemMessage(content="""
-            You are a date extraction specialist. Find any mentions of deadlines, timelines, or specific dates in this conversation.
-            
-            Look for patterns like:
-            - "by Friday", "before Christmas", "need it done by [date]"
-            - "wedding June 15th", "graduation May 20", "party on [date]"
-            - Specific dates: "6/15", "June 15", "2025-06-15"
-            - Urgency indicators: "ASAP", "urgent", "rush job"
-            
-            Extract the exact phrases that mention timing or deadlines. Return as JSON:
-            {
-                "date_phrases": ["exact phrase 1", "exact phrase 2"],
-                "urgency_indicators": ["urgent", "ASAP"],
-                "context": "brief summary of timeline requirements"
-            }
-            """)
-            
-            user_message = HumanMessage(content=f"Conversation text: {conversation_text}")
-            
-            # Call Claude for initial date phrase extraction
-            llm_response = self._tracked_llm_invoke(
-                [date_extraction_prompt, user_message],
-                context={"stage": "date_extraction", "thread_id": state["thread_id"]}
+            messages = state["conversation_data"].get("state", {}).get("messages", [])
+            extracted_dates = extract_dates(
+                state["extracted_data"], [message_text(m) for m in messages], self.date_parser
             )
-            
-            # Parse Claude's response
-            try:
-                import json
-                date_analysis = json.loads(llm_response.content)
-            except:
-                date_analysis = {
-                    "date_phrases": [conversation_text[:200]],  # Fallback
-                    "urgency_indicators": [],
-                    "context": "Could not parse AI response"
-                }
-            
-            # Now use SimpleDateParser on each identified phrase
-            extracted_dates = {}
-            best_confidence = 0.0
-            
-            for phrase in date_analysis.get("date_phrases", []):
-                result = self.date_parser.parse_natural_language_date(phrase)
-                
-                if result["parsed_date"] and result["confidence"] > best_confidence:
-                    extracted_dates = {
-                        "project_completion_deadline": result["parsed_date"].date() if result["parsed_date"] else None,
-                        "deadline_hard": result["deadline_hard"],
-                        "deadline_context": result["deadline_context"],
-                        "confidence": result["confidence"]
-                    }
-                    best_confidence = result["confidence"]
-            
-            # Calculate bid collection deadline if we have a project deadline
-            if extracted_dates.get("project_completion_deadline"):
-                urgency = state["extracted_data"].get("urgency_level", "week")
-                bid_deadline = self.date_parser.calculate_bid_collection_deadline(
-                    datetime.combine(extracted_dates["project_completion_deadline"], datetime.min.time()),
-                    urgency
-                )
-                extracted_dates["bid_collection_deadline"] = bid_deadline.date()
-                
-                # Override urgency based on deadline proximity
-                calculated_urgency = self.date_parser.determine_campaign_duration(
-                    datetime.combine(extracted_dates["project_completion_deadline"], datetime.min.time())
-                )
-                if calculated_urgency != urgency:
-                    print(f"[INTELLIGENT JAA] Overriding urgency: {urgency} → {calculated_urgency} (based on deadline)")
-                    state["extracted_data"]["urgency_level"] = calculated_urgency
-            
-            # Add to extracted data
             state["extracted_data"].update(extracted_dates)
-            
+
             if extracted_dates:
-                print(f"[INTELLIGENT JAA] Date extraction successful:")
+                print("[INTELLIGENT JAA] Date extraction successful:")
                 print(f"  Project deadline: {extracted_dates.get('project_completion_deadline')}")
                 print(f"  Bid deadline: {extracted_dates.get('bid_collection_deadline')}")
                 print(f"  Hard deadline: {extracted_dates.get('deadline_hard')}")
@@ -1193,11 +776,11 @@ REQUIREMENTS:
                 print(f"  Confidence: {extracted_dates.get('confidence', 0):.1%}")
             else:
                 print("[INTELLIGENT JAA] No specific dates found in conversation")
-                
+
         except Exception as e:
             print(f"[INTELLIGENT JAA] Date extraction error: {e}")
             state["errors"].append(f"Date extraction failed: {e}")
-        
+
         return state
 
 
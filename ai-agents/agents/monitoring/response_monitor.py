@@ -2,18 +2,27 @@
 Response Monitoring System
 Tracks contractor responses across all channels
 Monitors email opens, link clicks, form submissions, and direct responses
+Analytics are served from the outreach rollup tables (services/outreach_rollups.py)
 """
 
 import json
 import os
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Optional
 
 from dotenv import load_dotenv
 from supabase import create_client
 
+from services.outreach_rollups import (
+    DISTRIBUTION_ROLLUP_COLUMNS,
+    OutreachRollups,
+    outreach_rollups_enabled,
+    parse_timestamp,
+    summarize_outreach,
+)
+
 
 class ResponseType(Enum):
     """Types of contractor responses"""
@@ -38,6 +47,9 @@ class ResponseMonitor:
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_ANON_KEY")
         self.supabase = create_client(self.supabase_url, self.supabase_key)
+        self.rollups = OutreachRollups(self.supabase)
+        # Set OUTREACH_ROLLUPS_ENABLED=true once scripts/backfill_outreach_rollups.py has run
+        self.use_rollups = outreach_rollups_enabled()
 
         print("[Monitor] Initialized Response Monitoring System")
 
@@ -216,80 +228,37 @@ class ResponseMonitor:
         Args:
             bid_card_id: Filter by specific bid card
             campaign_id: Filter by specific campaign
-            date_range: Tuple of (start_date, end_date)
+            date_range: Tuple of (start_date, end_date); with rollups the
+                range is applied to whole (UTC) days of distributed_at
         """
         try:
-            # Build query
-            query = self.supabase.table("bid_card_distributions").select("*")
-
-            if bid_card_id:
-                query = query.eq("bid_card_id", bid_card_id)
-            if campaign_id:
-                query = query.eq("campaign_id", campaign_id)
-            if date_range:
-                query = query.gte("distributed_at", date_range[0].isoformat())
-                query = query.lte("distributed_at", date_range[1].isoformat())
-
-            result = query.execute()
-            distributions = result.data if result.data else []
-
-            # Calculate metrics
-            total = len(distributions)
-            sent = total
-            opened = sum(1 for d in distributions if d.get("opened_at"))
-            responded = sum(1 for d in distributions if d.get("responded_at"))
-
-            # Interest breakdown
-            interest_levels = {"high": 0, "medium": 0, "low": 0, "none": 0, "unknown": 0}
-            for dist in distributions:
-                level = dist.get("interest_level", "unknown")
-                interest_levels[level] = interest_levels.get(level, 0) + 1
-
-            # Response time analysis
-            response_times = []
-            for dist in distributions:
-                if dist.get("responded_at") and dist.get("distributed_at"):
-                    sent_time = datetime.fromisoformat(dist["distributed_at"].replace("Z", "+00:00"))
-                    response_time = datetime.fromisoformat(dist["responded_at"].replace("Z", "+00:00"))
-                    hours_to_respond = (response_time - sent_time).total_seconds() / 3600
-                    response_times.append(hours_to_respond)
-
-            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-
-            # Channel performance
-            channel_stats = {}
-            for dist in distributions:
-                channel = dist.get("distribution_method", "unknown")
-                if channel not in channel_stats:
-                    channel_stats[channel] = {
-                        "sent": 0, "opened": 0, "responded": 0, "interested": 0
-                    }
-                channel_stats[channel]["sent"] += 1
-                if dist.get("opened_at"):
-                    channel_stats[channel]["opened"] += 1
-                if dist.get("responded_at"):
-                    channel_stats[channel]["responded"] += 1
-                if dist.get("interest_level") == "high":
-                    channel_stats[channel]["interested"] += 1
+            computed = None
+            source = "rollups"
+            if self.use_rollups:
+                try:
+                    start, end = date_range if date_range else (None, None)
+                    buckets = self.rollups.fetch_outreach(bid_card_id, campaign_id, start, end)
+                    # No buckets may just mean the window predates the backfill
+                    computed = summarize_outreach(buckets) if buckets else None
+                except Exception as e:
+                    print(f"[Monitor] Rollups unavailable, scanning distributions: {e}")
+
+            if computed is None:
+                source = "distributions"
+                computed = self._analytics_from_distributions(
+                    self._fetch_distributions(bid_card_id, campaign_id, date_range)
+                )
 
             analytics = {
                 "success": True,
-                "summary": {
-                    "total_sent": sent,
-                    "total_opened": opened,
-                    "total_responded": responded,
-                    "open_rate": (opened / sent * 100) if sent > 0 else 0,
-                    "response_rate": (responded / sent * 100) if sent > 0 else 0,
-                    "avg_response_time_hours": round(avg_response_time, 1)
-                },
-                "interest_breakdown": interest_levels,
-                "channel_performance": channel_stats,
-                "best_performing_channel": self._get_best_channel(channel_stats),
+                **computed,
+                "best_performing_channel": self._get_best_channel(computed["channel_performance"]),
                 "filters_applied": {
                     "bid_card_id": bid_card_id,
                     "campaign_id": campaign_id,
                     "date_range": [d.isoformat() for d in date_range] if date_range else None
-                }
+                },
+                "source": source
             }
 
             return analytics
@@ -298,6 +267,79 @@ class ResponseMonitor:
             print(f"[Monitor ERROR] Failed to get analytics: {e}")
             return {"success": False, "error": str(e)}
 
+    def _fetch_distributions(self,
+                             bid_card_id: Optional[str] = None,
+                             campaign_id: Optional[str] = None,
+                             date_range: Optional[tuple[datetime, datetime]] = None) -> list[dict[str, Any]]:
+        """Raw distribution rows for the row-scan analytics path"""
+        query = self.supabase.table("bid_card_distributions").select(DISTRIBUTION_ROLLUP_COLUMNS)
+
+        if bid_card_id:
+            query = query.eq("bid_card_id", bid_card_id)
+        if campaign_id:
+            query = query.eq("campaign_id", campaign_id)
+        if date_range:
+            query = query.gte("distributed_at", date_range[0].isoformat())
+            query = query.lte("distributed_at", date_range[1].isoformat())
+
+        result = query.execute()
+        return result.data if result.data else []
+
+    @staticmethod
+    def _analytics_from_distributions(distributions: list[dict[str, Any]]) -> dict[str, Any]:
+        """Compute analytics by scanning distribution rows (fallback and backfill check)"""
+        # Calculate metrics
+        total = len(distributions)
+        sent = total
+        opened = sum(1 for d in distributions if d.get("opened_at"))
+        responded = sum(1 for d in distributions if d.get("responded_at"))
+
+        # Interest breakdown
+        interest_levels = {"high": 0, "medium": 0, "low": 0, "none": 0, "unknown": 0}
+        for dist in distributions:
+            level = dist.get("interest_level") or "unknown"
+            interest_levels[level] = interest_levels.get(level, 0) + 1
+
+        # Response time analysis
+        response_times = []
+        for dist in distributions:
+            if dist.get("responded_at") and dist.get("distributed_at"):
+                sent_time = parse_timestamp(dist["distributed_at"])
+                response_time = parse_timestamp(dist["responded_at"])
+                hours_to_respond = (response_time - sent_time).total_seconds() / 3600
+                response_times.append(hours_to_respond)
+
+        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+
+        # Channel performance
+        channel_stats = {}
+        for dist in distributions:
+            channel = dist.get("distribution_method") or "unknown"
+            if channel not in channel_stats:
+                channel_stats[channel] = {
+                    "sent": 0, "opened": 0, "responded": 0, "interested": 0
+                }
+            channel_stats[channel]["sent"] += 1
+            if dist.get("opened_at"):
+                channel_stats[channel]["opened"] += 1
+            if dist.get("responded_at"):
+                channel_stats[channel]["responded"] += 1
+            if dist.get("interest_level") == "high":
+                channel_stats[channel]["interested"] += 1
+
+        return {
+            "summary": {
+                "total_sent": sent,
+                "total_opened": opened,
+                "total_responded": responded,
+                "open_rate": (opened / sent * 100) if sent > 0 else 0,
+                "response_rate": (responded / sent * 100) if sent > 0 else 0,
+                "avg_response_time_hours": round(avg_response_time, 1)
+            },
+            "interest_breakdown": interest_levels,
+            "channel_performance": channel_stats
+        }
+
     def get_hot_leads(self, limit: int = 10) -> dict[str, Any]:
         """
         Get contractors showing high interest across all campaigns
@@ -307,7 +349,9 @@ class ResponseMonitor:
         try:
             # Get high interest responses
             result = self.supabase.table("bid_card_distributions").select(
-                "*, potential_contractors!contractor_id(*), bid_cards!bid_card_id(*)"
+                "contractor_id, bid_card_id, responded_at, response_channel, match_score, engagement_score, "
+                "potential_contractors!contractor_id(company_name, primary_email, phone), "
+                "bid_cards!bid_card_id(project_type, location)"
             ).eq("interest_level", "high").order(
                 "responded_at", desc=True
             ).limit(limit).execute()
@@ -350,21 +394,17 @@ class ResponseMonitor:
         try:
             # Get all distributions for this contractor
             dist_result = self.supabase.table("bid_card_distributions").select(
-                "*, bid_cards!bid_card_id(*)"
+                "bid_card_id, distribution_method, distributed_at, opened_at, responded_at, "
+                "response_type, interest_level, bid_cards!bid_card_id(project_type)"
             ).eq("contractor_id", contractor_id).order("distributed_at", desc=True).execute()
 
-            # Get all responses
-            self.supabase.table("contractor_responses").select("*").eq(
-                "contractor_id", contractor_id
-            ).order("responded_at", desc=True).execute()
-
             distributions = dist_result.data if dist_result.data else []
 
             # Build engagement timeline
             timeline = []
 
             for dist in distributions:
-                bid_card = dist.get("bid_cards", {})
+                bid_card = dist.get("bid_cards") or {}
 
                 # Distribution event
                 timeline.append({
@@ -509,12 +549,13 @@ class ResponseMonitor:
         if not distributions:
             return "new"
 
-        # Check recent activity (last 30 days)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_distributions = [
-            d for d in distributions
-            if datetime.fromisoformat(d["distributed_at"].replace("Z", "+00:00")) > thirty_days_ago
-        ]
+        # Check recent activity (last 30 days); rows arrive newest first
+        thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        recent_distributions = []
+        for d in distributions:
+            if parse_timestamp(d["distributed_at"]) <= thirty_days_ago:
+                break
+            recent_distributions.append(d)
 
         if not recent_distributions:
             return "inactive"
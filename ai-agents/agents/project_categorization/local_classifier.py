@@ -0,0 +1,205 @@
+"""
+Local Project Type Classifier
+In-process lexical matcher over the full project_types catalog
+
+Runs ahead of the GPT-4o categorizer used by CIA and IRIS:
+- BM25 over name, category and description tokens retrieves candidates
+- IDF-weighted name coverage and character trigram containment score them
+- Confident matches are returned locally; ambiguous ones hand the LLM a
+  short top-k candidate list instead of the first 50 types
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+logger = logging.getLogger(__name__)
+
+CONFIDENT_SCORE = 0.7
+CONFIDENT_MARGIN = 0.1
+DEFAULT_TOP_K = 10
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "for", "from",
+    "get", "have", "i", "in", "is", "it", "my", "need", "needs", "of", "on", "or", "our",
+    "please", "some", "that", "the", "this", "to", "want", "we", "with", "would", "you",
+}
+
+
+def _stem(token: str) -> str:
+    """Very small suffix stripper so 'installing'/'installation'/'installs' collide"""
+    for suffix in ("ations", "ation", "ings", "ing", "ers", "er", "ies", "es", "ed", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, split on non-alphanumerics (underscores included), drop stopwords, stem"""
+    return [
+        _stem(tok)
+        for tok in _TOKEN_RE.findall((text or "").lower().replace("_", " "))
+        if tok not in _STOPWORDS
+    ]
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {' '.join(_TOKEN_RE.findall((text or '').lower().replace('_', ' ')))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class ClassificationResult:
+    """Outcome of a local classification"""
+    best: Optional[dict[str, Any]]
+    score: float
+    confident: bool
+    candidates: list[tuple[dict[str, Any], float]] = field(default_factory=list)
+
+
+class ProjectTypeClassifier:
+    """Lexical classifier built once over the project_types catalog"""
+
+    def __init__(self, project_types: list[dict[str, Any]], memo_size: int = 256):
+        self.project_types = project_types
+        self.memo_size = memo_size
+        self._memo: OrderedDict[str, ClassificationResult] = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+        self._doc_tokens: list[Counter] = []
+        self._name_tokens: list[list[str]] = []
+        self._name_trigrams: list[set[str]] = []
+        doc_freq: Counter = Counter()
+
+        for pt in project_types:
+            name = str(pt.get("name", ""))
+            name_toks = tokenize(name)
+            # Names carry most of the signal - count them twice
+            doc = Counter(name_toks * 2)
+            doc.update(tokenize(str(pt.get("service_category") or "")))
+            doc.update(tokenize(str(pt.get("description") or "")))
+            for extra in pt.get("keywords") or []:
+                doc.update(tokenize(str(extra)))
+
+            self._doc_tokens.append(doc)
+            self._name_tokens.append(name_toks)
+            self._name_trigrams.append(_trigrams(name))
+            doc_freq.update(doc.keys())
+
+        n_docs = max(len(project_types), 1)
+        self._idf = {
+            term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+        lengths = [sum(doc.values()) for doc in self._doc_tokens]
+        self._doc_len = lengths
+        self._avg_len = (sum(lengths) / len(lengths)) if lengths else 1.0
+
+        # Inverted index so scoring only touches docs sharing a query term
+        self._postings: dict[str, list[int]] = {}
+        for idx, doc in enumerate(self._doc_tokens):
+            for term in doc:
+                self._postings.setdefault(term, []).append(idx)
+
+    def _bm25(self, query_terms: Counter) -> dict[int, float]:
+        scores: dict[int, float] = {}
+        for term in query_terms:
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for idx in self._postings[term]:
+                tf = self._doc_tokens[idx][term]
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[idx] / self._avg_len)
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        return scores
+
+    def _name_coverage(self, idx: int, query_terms: Counter) -> float:
+        name_toks = self._name_tokens[idx]
+        if not name_toks:
+            return 0.0
+        total = sum(self._idf.get(t, 0.0) for t in name_toks)
+        if total <= 0:
+            return 0.0
+        return sum(self._idf.get(t, 0.0) for t in name_toks if t in query_terms) / total
+
+    def _trigram_containment(self, idx: int, query_grams: set[str]) -> float:
+        grams = self._name_trigrams[idx]
+        return len(grams & query_grams) / len(grams) if grams else 0.0
+
+    def classify(self, text: str, top_k: int = DEFAULT_TOP_K) -> ClassificationResult:
+        """Score the catalog against a description and report whether the best match is confident"""
+        key = " ".join((text or "").lower().split())
+        with self._memo_lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+
+        result = self._classify(key, top_k)
+
+        with self._memo_lock:
+            self._memo[key] = result
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+    def _classify(self, text: str, top_k: int) -> ClassificationResult:
+        query_terms = Counter(tokenize(text))
+        if not query_terms or not self.project_types:
+            return ClassificationResult(best=None, score=0.0, confident=False)
+
+        bm25 = self._bm25(query_terms)
+        if not bm25:
+            return ClassificationResult(best=None, score=0.0, confident=False)
+
+        max_bm25 = max(bm25.values())
+        query_grams = _trigrams(text)
+        scored = []
+        for idx, raw in bm25.items():
+            score = (
+                0.5 * self._name_coverage(idx, query_terms)
+                + 0.3 * self._trigram_containment(idx, query_grams)
+                + 0.2 * (raw / max_bm25)
+            )
+            scored.append((score, raw, idx))
+
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        candidates = [(self.project_types[idx], round(score, 4)) for score, _, idx in scored[:top_k]]
+
+        best_score = scored[0][0]
+        runner_up = scored[1][0] if len(scored) > 1 else 0.0
+        confident = best_score >= CONFIDENT_SCORE and (best_score - runner_up) >= CONFIDENT_MARGIN
+
+        return ClassificationResult(
+            best=candidates[0][0],
+            score=round(best_score, 4),
+            confident=confident,
+            candidates=candidates,
+        )
+
+
+_classifier: Optional[ProjectTypeClassifier] = None
+_classifier_signature: Optional[tuple] = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier(project_types: list[dict[str, Any]]) -> ProjectTypeClassifier:
+    """Return the shared classifier, rebuilding only when the catalog changes"""
+    global _classifier, _classifier_signature
+    signature = tuple((pt.get("id"), pt.get("name")) for pt in project_types)
+    with _classifier_lock:
+        if _classifier is None or signature != _classifier_signature:
+            _classifier = ProjectTypeClassifier(project_types)
+            _classifier_signature = signature
+            logger.info(f"Built local project type classifier over {len(project_types)} types")
+        return _classifier
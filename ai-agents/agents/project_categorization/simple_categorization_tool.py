@@ -1,32 +1,51 @@
 """
 Simple Project Categorization Tool
-Provides categorization functions for CIA and IRIS agents using GPT-4o
+Provides categorization functions for CIA and IRIS agents
+Local classifier first, GPT-4o only for ambiguous descriptions
 """
 
 import logging
 import json
+import time
 from typing import Dict, Any, Optional
 from database_simple import db
 # db_select is not available, use db.client.table().select() instead
 import openai
 from datetime import datetime
 
+from .local_classifier import DEFAULT_TOP_K, get_classifier
+
 logger = logging.getLogger(__name__)
 
+# Full project_types catalog, loaded once and refreshed periodically
+CATALOG_TTL_SECONDS = 3600
+_catalog_cache: Dict[str, Any] = {"loaded_at": 0.0, "rows": []}
+
+
+def _load_project_types() -> list:
+    """Load the full project_types catalog, reusing the cached copy while fresh"""
+    if _catalog_cache["rows"] and time.time() - _catalog_cache["loaded_at"] < CATALOG_TTL_SECONDS:
+        return _catalog_cache["rows"]
+    
+    result = db.client.table("project_types").select("*").execute()
+    rows = result.data if result else []
+    if rows:
+        _catalog_cache["rows"] = rows
+        _catalog_cache["loaded_at"] = time.time()
+    return rows
+
 async def categorize_and_save_project(
     description: str,
     bid_card_id: str,
     context: str = ""
 ) -> Dict[str, Any]:
     """
-    Categorize a project using GPT-4o and save the results
+    Categorize a project and save the results
     Maps project descriptions to actual project types in database
     """
     try:
-        # Load project types from database
-        # Use db.client directly instead of db_select
-        result = db.client.table("project_types").select("*").limit(200).execute()
-        project_types = result.data if result else []
+        # Load the full project type catalog (cached across calls)
+        project_types = _load_project_types()
         if not project_types:
             logger.error("No project types found in database")
             return {
@@ -35,7 +54,7 @@ async def categorize_and_save_project(
                 "message": "Database configuration error"
             }
         
-        # Find best matching project type using GPT-4o
+        # Find best matching project type (local classifier, GPT-4o fallback)
         matched_type = await _find_matching_project_type(description, context, project_types)
         
         if matched_type:
@@ -93,7 +112,10 @@ async def _find_matching_project_type(
     project_types: list
 ) -> Optional[Dict[str, Any]]:
     """
-    Use GPT-4o to find the best matching project type
+    Find the best matching project type
+    
+    Order: hard-coded direct mappings, then the local classifier over the
+    full catalog, then GPT-4o restricted to the classifier's top candidates
     """
     try:
         # Check for direct keyword matches first
@@ -124,7 +146,17 @@ async def _find_matching_project_type(
                         logger.info(f"Direct match found: {pt['name']} for keyword '{keyword}'")
                         return pt
         
-        # If no direct match, use GPT-4o
+        combined_description = f"{description} {context}".strip()
+        
+        # Local lexical classifier over the full catalog
+        local = get_classifier(project_types).classify(combined_description)
+        if local.confident:
+            logger.info(f"Local match: {local.best['name']} (score: {local.score})")
+            return local.best
+        
+        # Ambiguous - let GPT-4o choose among the top local candidates only
+        shortlist = [pt for pt, _ in local.candidates] or project_types[:DEFAULT_TOP_K]
+        
         system_prompt = """You are a construction project categorization expert for InstaBids.
 Match the project description to the EXACT project type from the available list.
 Focus on finding the most specific match possible.
@@ -138,15 +170,13 @@ For new toilet installations, choose 'Toilet Installation' (ID: 123)."""
                 "name": pt['name'],
                 "category": pt.get('service_category', 'general')
             } 
-            for pt in project_types
+            for pt in shortlist
         ]
         
-        combined_description = f"{description} {context}".strip()
-        
         user_prompt = f"""Project description: "{combined_description}"
 
-Available project types (showing first 50):
-{json.dumps(project_options[:50], indent=2)}
+Candidate project types:
+{json.dumps(project_options, indent=2)}
 
 Based on the description, which project type is the best match?
 
@@ -158,8 +188,8 @@ Return JSON format:
 }}"""
 
         # Call OpenAI GPT-4o
-        client = openai.OpenAI()
-        response = client.chat.completions.create(
+        client = openai.AsyncOpenAI()
+        response = await client.chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -186,7 +216,7 @@ Return JSON format:
         confidence = result.get('confidence', 0)
         reasoning = result.get('reasoning', '')
         
-        for project_type in project_types:
+        for project_type in shortlist:
             if project_type['id'] == project_id:
                 logger.info(f"GPT-4o match: {project_type['name']} (confidence: {confidence}%) - {reasoning}")
                 return project_type
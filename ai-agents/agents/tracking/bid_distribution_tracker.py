@@ -13,6 +13,10 @@ from dotenv import load_dotenv
 from supabase import create_client
 
 
+# Atomic follow_up_count + 1 (database/migrations/024_distribution_follow_up_increment.sql)
+FOLLOW_UP_INCREMENT_RPC = "increment_distribution_follow_up"
+
+
 class BidDistributionTracker:
     """Tracks bid card distribution to contractors"""
 
@@ -246,15 +250,14 @@ class BidDistributionTracker:
             return {"success": False, "error": str(e)}
 
     def record_follow_up(self, distribution_id: str, method: str) -> dict[str, Any]:
-        """Record that a follow-up was sent"""
+        """Record that a follow-up was sent (the count is incremented atomically in the database)"""
         try:
-            result = self.supabase.table("bid_card_distributions").update({
-                "follow_up_count": self.supabase.rpc("increment", {"x": 1}),
-                "last_follow_up_at": datetime.now().isoformat(),
-                "last_follow_up_method": method
-            }).eq("id", distribution_id).execute()
+            result = self.supabase.rpc(FOLLOW_UP_INCREMENT_RPC, {
+                "p_distribution_id": distribution_id,
+                "p_method": method
+            }).execute()
 
-            return {"success": bool(result.data)}
+            return {"success": result.data is not None, "follow_up_count": result.data}
 
         except Exception as e:
             print(f"[BidTracker ERROR] Failed to record follow-up: {e}")
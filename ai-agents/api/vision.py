@@ -11,17 +11,31 @@ import httpx
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from services.vision_analysis_service import get_vision_service
+
 
 router = APIRouter()
 
-# Initialize OpenAI client
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
+if not os.getenv("OPENAI_API_KEY"):
     print("Warning: OPENAI_API_KEY not found in environment")
-    openai_api_key = "dummy-key-for-testing"  # Will fail but won't crash startup
 
-from openai import OpenAI
-client = OpenAI(api_key=openai_api_key)
+VISION_ANALYSIS_PROMPT = """Analyze this image and provide:
+1. A detailed description of what you see
+2. The design style (e.g., modern, traditional, rustic, contemporary)
+3. Key elements visible (furniture, architectural features, landscaping, etc.)
+4. Room/space type if applicable (bedroom, kitchen, backyard, etc.)
+5. Potential issues or areas for improvement
+6. Suggestions for categorization
+
+Format as JSON with keys:
+- description: detailed description
+- style: design style
+- key_elements: array of key elements
+- room_type: space/room type
+- issues: array of potential issues
+- suggestions: array of improvement suggestions
+- category_suggestions: array of suitable project categories
+- room_suggestions: array of room types this could belong to"""
 
 class VisionAnalysisRequest(BaseModel):
     image_url: Optional[str] = None
@@ -43,38 +57,18 @@ async def analyze_image(request: VisionAnalysisRequest):
     """
     try:
         # Handle image data (either URL or base64)
-        image_b64 = None
-        media_type = "image/jpeg"  # Default
-        
         if request.image_data:
-            # Handle base64 data (from IRIS)
-            image_data_str = request.image_data
-            if image_data_str.startswith("data:"):
-                # Extract base64 from data URL
-                header, base64_data = image_data_str.split(",", 1)
-                image_b64 = base64_data
-                # Extract media type from header
-                if "image/png" in header:
-                    media_type = "image/png"
-                elif "image/webp" in header:
-                    media_type = "image/webp"
-                elif "image/gif" in header:
-                    media_type = "image/gif"
-                else:
-                    media_type = "image/jpeg"
-            else:
-                # Assume it's raw base64
-                image_b64 = image_data_str
+            # Base64 or data URL (from IRIS) - the vision service decodes both
+            image_payload = request.image_data
                 
         elif request.image_url:
             # Handle URL (legacy method)
-            async with httpx.AsyncClient() as client:
-                response = await client.get(request.image_url)
+            async with httpx.AsyncClient() as http_client:
+                response = await http_client.get(request.image_url)
                 if response.status_code != 200:
                     raise HTTPException(status_code=400, detail="Could not download image")
 
-                image_data = response.content
-                image_b64 = base64.b64encode(image_data).decode("utf-8")
+                image_b64 = base64.b64encode(response.content).decode("utf-8")
 
             # Determine the media type from URL
             if request.image_url.endswith(".webp"):
@@ -85,51 +79,20 @@ async def analyze_image(request: VisionAnalysisRequest):
                 media_type = "image/gif"
             else:
                 media_type = "image/jpeg"
+            image_payload = f"data:{media_type};base64,{image_b64}"
         else:
             raise HTTPException(status_code=400, detail="Either image_url or image_data must be provided")
 
-        # Create the OpenAI Vision message
-        response = client.chat.completions.create(
-            model="gpt-4o",  # Using gpt-4o which has vision capabilities
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": """Analyze this image and provide:
-1. A detailed description of what you see
-2. The design style (e.g., modern, traditional, rustic, contemporary)
-3. Key elements visible (furniture, architectural features, landscaping, etc.)
-4. Room/space type if applicable (bedroom, kitchen, backyard, etc.)
-5. Potential issues or areas for improvement
-6. Suggestions for categorization
-
-Format as JSON with keys:
-- description: detailed description
-- style: design style
-- key_elements: array of key elements
-- room_type: space/room type
-- issues: array of potential issues
-- suggestions: array of improvement suggestions
-- category_suggestions: array of suitable project categories
-- room_suggestions: array of room types this could belong to"""
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:{media_type};base64,{image_b64}"
-                            }
-                        }
-                    ]
-                }
-            ],
+        # Shared service: content-hash cache, downscaling, no event loop blocking
+        response_text = await get_vision_service().analyze(
+            image_payload,
+            VISION_ANALYSIS_PROMPT,
+            variant=f"api_vision_{request.analysis_type}",
             max_tokens=1024
         )
 
         # Parse the OpenAI response
         import json
-        response_text = response.choices[0].message.content
 
         # Try to extract JSON from the response
         try:
@@ -171,7 +134,7 @@ Format as JSON with keys:
             room_suggestions=analysis_result.get("room_suggestions", [])
         )
 
-    except openai.OpenAIError as e:
+    except (openai.OpenAIError, RuntimeError) as e:
         print(f"OpenAI API error: {e}")
         # Return a mock response for testing
         return VisionAnalysisResponse(
@@ -60,7 +60,14 @@ def create_bid_card_with_defaults(project_data: dict[str, Any]) -> dict[str, Any
         "requirements": project_data.get("requirements") if isinstance(project_data.get("requirements"), list)
                        else [project_data.get("requirements")] if project_data.get("requirements")
                        else None,  # Fixed: requirements must be array
-        "cia_thread_id": project_data.get("cia_thread_id")
+        "cia_thread_id": project_data.get("cia_thread_id"),
+        "bid_collection_deadline": project_data.get("bid_collection_deadline"),
+        "project_completion_deadline": project_data.get("project_completion_deadline"),
+        "deadline_hard": project_data.get("deadline_hard"),
+        "deadline_context": project_data.get("deadline_context"),
+        # Written with the row instead of a follow-up update
+        "bid_document": {**project_data["bid_document"], "bid_card_number": bid_card_number}
+                        if isinstance(project_data.get("bid_document"), dict) else None
     }
 
     # Remove None values to let database defaults take effect
@@ -0,0 +1,15 @@
+-- Shared vision analysis cache
+-- Keyed by image content hash + prompt variant + model so duplicate photos
+-- uploaded to CIA, IRIS and bid cards are only analyzed once
+
+CREATE TABLE IF NOT EXISTS vision_analysis_cache (
+    cache_key TEXT PRIMARY KEY,           -- model:variant:content_hash
+    content_hash VARCHAR(64) NOT NULL,    -- sha256 of the original image bytes
+    prompt_variant VARCHAR(100) NOT NULL, -- prompt family + prompt text hash
+    model VARCHAR(100) NOT NULL,
+    response_text TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_vision_cache_content_hash
+    ON vision_analysis_cache(content_hash);
@@ -0,0 +1,27 @@
+-- Durable COIA landing-page research jobs
+-- Queued/running research survives worker restarts; at most one active job
+-- per normalized (company, location) so concurrent sessions share the work
+
+CREATE TABLE IF NOT EXISTS coia_research_jobs (
+    id UUID PRIMARY KEY,
+    job_key TEXT NOT NULL,                       -- normalized "company|location"
+    company_name TEXT NOT NULL,
+    location TEXT,
+    subscribers JSONB NOT NULL DEFAULT '[]',     -- [{contractor_lead_id, session_id}]
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued | running | completed | failed
+    progress JSONB NOT NULL DEFAULT '[]',
+    result JSONB,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    lease_expires_at TIMESTAMPTZ NOT NULL,       -- renewed while a worker is running the job
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_coia_research_jobs_active_key
+    ON coia_research_jobs(job_key)
+    WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_coia_research_jobs_key_created
+    ON coia_research_jobs(job_key, created_at DESC);
@@ -0,0 +1,80 @@
+-- Pre-aggregated outreach analytics
+-- Daily buckets updated incrementally by ResponseMonitor / BidDistributionTracker /
+-- FollowUpAutomation; rebuilt from raw rows by scripts/backfill_outreach_rollups.py
+
+CREATE TABLE IF NOT EXISTS outreach_rollups_daily (
+    day DATE NOT NULL,                          -- UTC day the outreach was sent
+    campaign_id TEXT NOT NULL DEFAULT '',       -- '' when not part of a campaign
+    bid_card_id TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL DEFAULT 'unknown',    -- distribution_method
+    sent INTEGER NOT NULL DEFAULT 0,
+    opened INTEGER NOT NULL DEFAULT 0,
+    responded INTEGER NOT NULL DEFAULT 0,
+    interest_high INTEGER NOT NULL DEFAULT 0,
+    interest_medium INTEGER NOT NULL DEFAULT 0,
+    interest_low INTEGER NOT NULL DEFAULT 0,
+    interest_none INTEGER NOT NULL DEFAULT 0,
+    interest_unknown INTEGER NOT NULL DEFAULT 0,
+    response_hours_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    response_hours_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (day, campaign_id, bid_card_id, channel)
+);
+
+CREATE INDEX IF NOT EXISTS idx_outreach_rollups_bid_card ON outreach_rollups_daily(bid_card_id, day);
+CREATE INDEX IF NOT EXISTS idx_outreach_rollups_campaign ON outreach_rollups_daily(campaign_id, day);
+
+CREATE TABLE IF NOT EXISTS followup_rollups_daily (
+    day DATE NOT NULL,
+    strategy TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    followups INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (day, strategy, channel)
+);
+
+-- Atomic upsert-increment; deltas may be negative when a distribution changes state
+CREATE OR REPLACE FUNCTION apply_outreach_rollup_delta(
+    p_day DATE, p_campaign_id TEXT, p_bid_card_id TEXT, p_channel TEXT, p_deltas JSONB
+) RETURNS VOID AS $$
+    INSERT INTO outreach_rollups_daily AS r (
+        day, campaign_id, bid_card_id, channel,
+        sent, opened, responded,
+        interest_high, interest_medium, interest_low, interest_none, interest_unknown,
+        response_hours_sum, response_hours_count
+    ) VALUES (
+        p_day, p_campaign_id, p_bid_card_id, p_channel,
+        COALESCE((p_deltas->>'sent')::INTEGER, 0),
+        COALESCE((p_deltas->>'opened')::INTEGER, 0),
+        COALESCE((p_deltas->>'responded')::INTEGER, 0),
+        COALESCE((p_deltas->>'interest_high')::INTEGER, 0),
+        COALESCE((p_deltas->>'interest_medium')::INTEGER, 0),
+        COALESCE((p_deltas->>'interest_low')::INTEGER, 0),
+        COALESCE((p_deltas->>'interest_none')::INTEGER, 0),
+        COALESCE((p_deltas->>'interest_unknown')::INTEGER, 0),
+        COALESCE((p_deltas->>'response_hours_sum')::DOUBLE PRECISION, 0),
+        COALESCE((p_deltas->>'response_hours_count')::INTEGER, 0)
+    )
+    ON CONFLICT (day, campaign_id, bid_card_id, channel) DO UPDATE SET
+        sent = r.sent + EXCLUDED.sent,
+        opened = r.opened + EXCLUDED.opened,
+        responded = r.responded + EXCLUDED.responded,
+        interest_high = r.interest_high + EXCLUDED.interest_high,
+        interest_medium = r.interest_medium + EXCLUDED.interest_medium,
+        interest_low = r.interest_low + EXCLUDED.interest_low,
+        interest_none = r.interest_none + EXCLUDED.interest_none,
+        interest_unknown = r.interest_unknown + EXCLUDED.interest_unknown,
+        response_hours_sum = r.response_hours_sum + EXCLUDED.response_hours_sum,
+        response_hours_count = r.response_hours_count + EXCLUDED.response_hours_count,
+        updated_at = NOW();
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION apply_followup_rollup_delta(
+    p_day DATE, p_strategy TEXT, p_channel TEXT, p_count INTEGER
+) RETURNS VOID AS $$
+    INSERT INTO followup_rollups_daily AS r (day, strategy, channel, followups)
+    VALUES (p_day, p_strategy, p_channel, p_count)
+    ON CONFLICT (day, strategy, channel) DO UPDATE SET
+        followups = r.followups + EXCLUDED.followups,
+        updated_at = NOW();
+$$ LANGUAGE sql;
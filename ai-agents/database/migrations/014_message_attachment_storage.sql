@@ -0,0 +1,26 @@
+-- Message attachments stored as bucket references instead of inline base64
+-- New uploads write storage_path/thumbnail_path/content_hash and leave file_data NULL;
+-- scripts/migrate_message_attachments_to_storage.py moves existing rows over.
+
+ALTER TABLE unified_message_attachments
+    ADD COLUMN IF NOT EXISTS storage_path TEXT,
+    ADD COLUMN IF NOT EXISTS thumbnail_path TEXT,
+    ADD COLUMN IF NOT EXISTS content_hash TEXT,
+    ADD COLUMN IF NOT EXISTS mime_type TEXT,
+    ADD COLUMN IF NOT EXISTS file_size BIGINT;
+
+ALTER TABLE unified_message_attachments ALTER COLUMN file_data DROP NOT NULL;
+
+-- Dedup lookup: is this content already stored?
+CREATE INDEX IF NOT EXISTS idx_message_attachments_content_hash
+    ON unified_message_attachments(content_hash)
+    WHERE storage_path IS NOT NULL;
+
+-- Conversation loads fetch attachments for many messages at once
+CREATE INDEX IF NOT EXISTS idx_message_attachments_message_id
+    ON unified_message_attachments(message_id);
+
+-- Rows still waiting for the storage migration
+CREATE INDEX IF NOT EXISTS idx_message_attachments_inline
+    ON unified_message_attachments(id)
+    WHERE file_data IS NOT NULL AND storage_path IS NULL;
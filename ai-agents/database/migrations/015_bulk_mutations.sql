@@ -0,0 +1,88 @@
+-- Set-based bulk mutations executed in a single transaction
+-- Called from services/bulk_mutations.py; the service falls back to chunked
+-- UPDATE ... WHERE key IN (...) requests when these functions are missing.
+
+-- Re-own every conversation of an anonymous session at sign-up
+CREATE OR REPLACE FUNCTION migrate_anonymous_session(
+    p_session_id TEXT,
+    p_user_id UUID
+) RETURNS JSONB AS $$
+DECLARE
+    v_conversation_ids UUID[];
+    v_messages INTEGER;
+    v_participants INTEGER;
+BEGIN
+    WITH updated AS (
+        UPDATE unified_conversations
+        SET created_by = p_user_id,
+            entity_id = p_user_id,
+            updated_at = NOW()
+        WHERE metadata->>'session_id' = p_session_id
+        RETURNING id
+    )
+    SELECT COALESCE(array_agg(id), '{}') INTO v_conversation_ids FROM updated;
+
+    UPDATE unified_messages
+    SET sender_id = p_user_id
+    WHERE conversation_id = ANY(v_conversation_ids)
+      AND sender_type = 'user';
+    GET DIAGNOSTICS v_messages = ROW_COUNT;
+
+    UPDATE unified_conversation_participants
+    SET participant_id = p_user_id
+    WHERE conversation_id = ANY(v_conversation_ids);
+    GET DIAGNOSTICS v_participants = ROW_COUNT;
+
+    RETURN jsonb_build_object(
+        'conversations', cardinality(v_conversation_ids),
+        'messages', v_messages,
+        'participants', v_participants
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Record the winning contractor and rewrite submitted bid statuses in one statement;
+-- a no-op (selected = false) when the bid card already has a winner
+CREATE OR REPLACE FUNCTION select_winning_bid(
+    p_bid_card_id UUID,
+    p_contractor_id TEXT,
+    p_winner JSONB
+) RETURNS JSONB AS $$
+DECLARE
+    v_bids JSONB;
+BEGIN
+    UPDATE bid_cards
+    SET winner_contractor_id = p_winner->>'winner_contractor_id',
+        winner_selected_at = (p_winner->>'winner_selected_at')::TIMESTAMPTZ,
+        connection_fee_id = (p_winner->>'connection_fee_id')::UUID,
+        winner_bid_amount = (p_winner->>'winner_bid_amount')::NUMERIC,
+        status = COALESCE(p_winner->>'status', 'contractor_selected'),
+        bid_document = jsonb_set(
+            COALESCE(bid_document, '{}'::JSONB),
+            '{submitted_bids}',
+            COALESCE((
+                SELECT jsonb_agg(
+                    bid || jsonb_build_object(
+                        'status',
+                        CASE WHEN bid->>'contractor_id' = p_contractor_id THEN 'accepted' ELSE 'rejected' END
+                    )
+                    ORDER BY ordinality
+                )
+                FROM jsonb_array_elements(bid_document->'submitted_bids') WITH ORDINALITY AS bids(bid, ordinality)
+            ), '[]'::JSONB)
+        )
+    WHERE id = p_bid_card_id
+      AND winner_contractor_id IS NULL
+    RETURNING bid_document->'submitted_bids' INTO v_bids;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('selected', FALSE);
+    END IF;
+
+    RETURN jsonb_build_object(
+        'selected', TRUE,
+        'accepted', (SELECT COUNT(*) FROM jsonb_array_elements(v_bids) bid WHERE bid->>'status' = 'accepted'),
+        'rejected', (SELECT COUNT(*) FROM jsonb_array_elements(v_bids) bid WHERE bid->>'status' = 'rejected')
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,23 @@
+-- Notification inbox: indexed recipient key and a replay cursor
+-- Used by services/notification_inbox.py (WebSocket replay on connect, bulk
+-- read-marking). Replaces per-connect queries that filtered on
+-- metadata->>'contractor_id' inside an OR, which no index could serve.
+
+-- Who the notification is for: the contractor id written in metadata by the
+-- older producers, otherwise user_id (bid card change fan-out). Generated, so
+-- existing writers need no change and old rows are filled in by the ALTER.
+ALTER TABLE notifications
+    ADD COLUMN IF NOT EXISTS recipient_id TEXT
+    GENERATED ALWAYS AS (COALESCE(metadata->>'contractor_id', user_id::text)) STORED;
+
+-- Monotonic position in the inbox; clients resume from the last one they saw
+ALTER TABLE notifications
+    ADD COLUMN IF NOT EXISTS inbox_seq BIGINT GENERATED BY DEFAULT AS IDENTITY;
+
+-- Replay and mark-read-through only ever look at unread rows
+CREATE INDEX IF NOT EXISTS idx_notifications_inbox_unread
+    ON notifications(recipient_id, inbox_seq)
+    WHERE is_read = false;
+
+CREATE INDEX IF NOT EXISTS idx_notifications_inbox
+    ON notifications(recipient_id, inbox_seq);
@@ -0,0 +1,11 @@
+-- Versioned batch patching of potential bid cards
+-- Used by services/potential_bid_card_patch.py: every patch writes all of its
+-- fields in one UPDATE ... WHERE id = $1 AND version = $2 and bumps version,
+-- so concurrent CIA turns and manual edits cannot overwrite each other.
+
+ALTER TABLE potential_bid_cards
+    ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+
+-- Confidence of each stored column's value: {"zip_code": 0.9, ...}
+ALTER TABLE potential_bid_cards
+    ADD COLUMN IF NOT EXISTS field_confidence JSONB NOT NULL DEFAULT '{}'::jsonb;
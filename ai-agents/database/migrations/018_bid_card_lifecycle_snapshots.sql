@@ -0,0 +1,84 @@
+-- Materialized bid card lifecycle snapshots
+-- One document per bid card, built by services/bid_card_lifecycle_snapshot.py.
+-- Triggers on the related tables mark the affected sections dirty and bump
+-- version; the next read rebuilds only those sections. The table -> sections
+-- wiring below mirrors SOURCE_SECTIONS in the service.
+
+CREATE TABLE IF NOT EXISTS bid_card_lifecycle_snapshots (
+    bid_card_id TEXT PRIMARY KEY,
+    document JSONB NOT NULL DEFAULT '{}'::jsonb,        -- section name -> section data
+    version BIGINT NOT NULL DEFAULT 0,                  -- bumped by every refresh and every dirty mark
+    section_versions JSONB NOT NULL DEFAULT '{}'::jsonb, -- section -> version it was rebuilt at
+    section_built_at JSONB NOT NULL DEFAULT '{}'::jsonb,
+    dirty_sections TEXT[] NOT NULL DEFAULT '{}',
+    built_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- TG_ARGV[0]: how to find the bid card (a bid_card_id-like column, or
+-- campaign_id / discovery_run_id to go through the parent); the rest: sections
+CREATE OR REPLACE FUNCTION mark_lifecycle_snapshot_dirty() RETURNS TRIGGER AS $$
+DECLARE
+    v_row JSONB;
+    v_key TEXT := TG_ARGV[0];
+    v_sections TEXT[] := TG_ARGV[1:];
+    v_bid_card_id TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := to_jsonb(OLD);
+    ELSE
+        v_row := to_jsonb(NEW);
+    END IF;
+
+    IF v_key = 'campaign_id' THEN
+        SELECT bid_card_id::text INTO v_bid_card_id FROM outreach_campaigns WHERE id::text = v_row->>'campaign_id';
+    ELSIF v_key = 'discovery_run_id' THEN
+        SELECT bid_card_id::text INTO v_bid_card_id FROM discovery_runs WHERE id::text = v_row->>'discovery_run_id';
+    ELSE
+        v_bid_card_id := v_row->>v_key;
+    END IF;
+
+    IF v_bid_card_id IS NOT NULL THEN
+        UPDATE bid_card_lifecycle_snapshots
+        SET dirty_sections = ARRAY(SELECT DISTINCT unnest(dirty_sections || v_sections)),
+            version = version + 1
+        WHERE bid_card_id = v_bid_card_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_trigger RECORD;
+BEGIN
+    FOR v_trigger IN SELECT * FROM (VALUES
+        ('bid_cards',                    'id',               ARRAY['bid_card', 'connection_fee']),
+        ('discovery_runs',               'bid_card_id',      ARRAY['discovery']),
+        ('contractor_discovery_cache',   'bid_card_id',      ARRAY['discovery']),
+        ('contractor_leads',             'discovery_run_id', ARRAY['discovery']),
+        ('outreach_campaigns',           'bid_card_id',      ARRAY['campaigns']),
+        ('campaign_check_ins',           'campaign_id',      ARRAY['campaigns']),
+        ('campaign_contractors',         'campaign_id',      ARRAY['campaigns']),
+        ('manual_followup_tasks',        'campaign_id',      ARRAY['campaigns']),
+        ('contractor_outreach_attempts', 'bid_card_id',      ARRAY['outreach', 'discovery']),
+        ('contractor_responses',         'bid_card_id',      ARRAY['outreach', 'engagement']),
+        ('bid_card_views',               'bid_card_id',      ARRAY['engagement']),
+        ('bid_card_engagement_events',   'bid_card_id',      ARRAY['engagement']),
+        ('connection_fees',              'bid_card_id',      ARRAY['connection_fee'])
+    ) AS t(table_name, key_column, sections)
+    LOOP
+        IF to_regclass(v_trigger.table_name) IS NULL THEN
+            CONTINUE;
+        END IF;
+        EXECUTE format('DROP TRIGGER IF EXISTS lifecycle_snapshot_dirty ON %I', v_trigger.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER lifecycle_snapshot_dirty AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'FOR EACH ROW EXECUTE FUNCTION mark_lifecycle_snapshot_dirty(%L, %s)',
+            v_trigger.table_name,
+            v_trigger.key_column,
+            (SELECT string_agg(quote_literal(s), ', ') FROM unnest(v_trigger.sections) AS s)
+        );
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,79 @@
+-- Radius matching and live counters for group bidding pools
+-- Used by services/group_pool_index.py. Pools are bucketed into geo cells
+-- (a 0.1 degree lat/lng grid, "<floor(lat/0.1)>:<floor(lng/0.1)>"); a radius
+-- lookup reads the few cells covering the circle through the partial index
+-- below. group_pool_cell_stats keeps per (category, cell) counters that the
+-- trigger adjusts on every pool insert/update/delete, so local stats are a
+-- read of a handful of rows instead of a sum over pools.
+
+ALTER TABLE group_bidding_pools
+    ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS geo_cell TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_group_pools_forming_cell
+    ON group_bidding_pools (category_id, geo_cell)
+    WHERE pool_status = 'forming';
+
+CREATE INDEX IF NOT EXISTS idx_group_pools_forming_cell_any_category
+    ON group_bidding_pools (geo_cell)
+    WHERE pool_status = 'forming';
+
+CREATE TABLE IF NOT EXISTS group_pool_cell_stats (
+    category_id TEXT NOT NULL,
+    geo_cell TEXT NOT NULL,
+    forming_pools INTEGER NOT NULL DEFAULT 0,
+    forming_members INTEGER NOT NULL DEFAULT 0,
+    fulfilled_pools INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (category_id, geo_cell)
+);
+
+-- p_sign is +1 to add a pool's contribution, -1 to remove it
+CREATE OR REPLACE FUNCTION bump_group_pool_cell_stats(
+    p_category_id TEXT, p_geo_cell TEXT, p_status TEXT, p_members INTEGER, p_sign INTEGER
+) RETURNS VOID AS $$
+DECLARE
+    v_forming INTEGER := CASE WHEN p_status = 'forming' THEN p_sign ELSE 0 END;
+    v_members INTEGER := CASE WHEN p_status = 'forming' THEN p_sign * COALESCE(p_members, 0) ELSE 0 END;
+    v_fulfilled INTEGER := CASE WHEN p_status = 'fulfilled' THEN p_sign ELSE 0 END;
+BEGIN
+    IF v_forming = 0 AND v_fulfilled = 0 THEN
+        RETURN;
+    END IF;
+    INSERT INTO group_pool_cell_stats (category_id, geo_cell, forming_pools, forming_members, fulfilled_pools)
+    VALUES (p_category_id, p_geo_cell, v_forming, v_members, v_fulfilled)
+    ON CONFLICT (category_id, geo_cell) DO UPDATE SET
+        forming_pools = group_pool_cell_stats.forming_pools + EXCLUDED.forming_pools,
+        forming_members = group_pool_cell_stats.forming_members + EXCLUDED.forming_members,
+        fulfilled_pools = group_pool_cell_stats.fulfilled_pools + EXCLUDED.fulfilled_pools,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_group_pool_cell_stats() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.geo_cell IS NOT DISTINCT FROM NEW.geo_cell
+       AND OLD.category_id IS NOT DISTINCT FROM NEW.category_id
+       AND OLD.pool_status IS NOT DISTINCT FROM NEW.pool_status
+       AND OLD.member_count IS NOT DISTINCT FROM NEW.member_count THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.geo_cell IS NOT NULL THEN
+        PERFORM bump_group_pool_cell_stats(OLD.category_id::text, OLD.geo_cell, OLD.pool_status, OLD.member_count, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.geo_cell IS NOT NULL THEN
+        PERFORM bump_group_pool_cell_stats(NEW.category_id::text, NEW.geo_cell, NEW.pool_status, NEW.member_count, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_group_pool_cell_stats ON group_bidding_pools;
+CREATE TRIGGER trg_group_pool_cell_stats
+    AFTER INSERT OR UPDATE OR DELETE ON group_bidding_pools
+    FOR EACH ROW EXECUTE FUNCTION track_group_pool_cell_stats();
+
+-- Existing pools have no geo_cell yet; scripts/backfill_group_pool_cells.py
+-- fills it in from their ZIP codes, and the trigger counts them as it does.
@@ -0,0 +1,96 @@
+-- Property dashboard counters and maintenance-issue index
+-- Used by services/property_summary.py. Room, photo, asset and open issue
+-- counts live on the properties row and are kept exact by triggers, so the
+-- dashboard reads one property row plus the latest photos. Maintenance issues
+-- parsed from photo AI analysis are stored one row per issue when a photo is
+-- analyzed instead of being re-parsed from every photo on each request.
+
+ALTER TABLE properties
+    ADD COLUMN IF NOT EXISTS room_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS photo_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS asset_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS maintenance_issue_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS issues_indexed_at TIMESTAMPTZ;  -- NULL until the property's photos were indexed
+
+CREATE TABLE IF NOT EXISTS property_maintenance_issues (
+    id TEXT PRIMARY KEY,                 -- "<photo_id>-<n>", n = position in detected_issues
+    property_id TEXT NOT NULL,
+    photo_id TEXT NOT NULL,
+    photo_filename TEXT,
+    description TEXT,
+    severity TEXT DEFAULT 'medium',
+    type TEXT DEFAULT 'maintenance',
+    confidence DOUBLE PRECISION DEFAULT 0.8,
+    estimated_cost TEXT DEFAULT 'medium',
+    detected_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_property_maintenance_issues_property
+    ON property_maintenance_issues (property_id, detected_at DESC);
+CREATE INDEX IF NOT EXISTS idx_property_maintenance_issues_photo
+    ON property_maintenance_issues (photo_id);
+
+-- Keyset order for "recent photos"
+CREATE INDEX IF NOT EXISTS idx_property_photos_recent
+    ON property_photos (property_id, created_at DESC, id DESC);
+
+-- TG_ARGV[0]: the properties counter column the table feeds
+CREATE OR REPLACE FUNCTION bump_property_counter() RETURNS TRIGGER AS $$
+DECLARE
+    v_column TEXT := TG_ARGV[0];
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.property_id IS NOT DISTINCT FROM NEW.property_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.property_id IS NOT NULL THEN
+        EXECUTE format('UPDATE properties SET %1$I = GREATEST(%1$I - 1, 0) WHERE id::text = $1', v_column)
+            USING OLD.property_id::text;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.property_id IS NOT NULL THEN
+        EXECUTE format('UPDATE properties SET %1$I = %1$I + 1 WHERE id::text = $1', v_column)
+            USING NEW.property_id::text;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Deleting a photo (directly or with its property) drops its indexed issues
+CREATE OR REPLACE FUNCTION drop_photo_maintenance_issues() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM property_maintenance_issues WHERE photo_id = OLD.id::text;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_source RECORD;
+BEGIN
+    FOR v_source IN
+        SELECT * FROM (VALUES
+            ('property_rooms', 'room_count'),
+            ('property_photos', 'photo_count'),
+            ('property_assets', 'asset_count'),
+            ('property_maintenance_issues', 'maintenance_issue_count')
+        ) AS t(table_name, counter)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_property_counter ON %I', v_source.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER trg_property_counter AFTER INSERT OR UPDATE OF property_id OR DELETE ON %I '
+            'FOR EACH ROW EXECUTE FUNCTION bump_property_counter(%L)',
+            v_source.table_name, v_source.counter
+        );
+    END LOOP;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_drop_photo_maintenance_issues ON property_photos;
+CREATE TRIGGER trg_drop_photo_maintenance_issues
+    AFTER DELETE ON property_photos
+    FOR EACH ROW EXECUTE FUNCTION drop_photo_maintenance_issues();
+
+-- Backfill the counters for existing properties (issues are indexed lazily,
+-- on each property's first maintenance-issues read)
+UPDATE properties p SET
+    room_count = (SELECT COUNT(*) FROM property_rooms r WHERE r.property_id::text = p.id::text),
+    photo_count = (SELECT COUNT(*) FROM property_photos ph WHERE ph.property_id::text = p.id::text),
+    asset_count = (SELECT COUNT(*) FROM property_assets a WHERE a.property_id::text = p.id::text);
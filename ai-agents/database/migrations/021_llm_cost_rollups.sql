@@ -0,0 +1,174 @@
+-- LLM cost rollups
+-- Minute / hour / day buckets per (agent, provider, model) and running
+-- per-session totals, maintained by services/llm_cost_rollups.py through
+-- apply_llm_usage_rollup on every tracked call. The cost dashboards, alerts
+-- and live stream read these instead of aggregating the raw usage rows.
+
+CREATE TABLE IF NOT EXISTS llm_cost_rollups (
+    grain TEXT NOT NULL CHECK (grain IN ('minute', 'hour', 'day')),
+    bucket_start TIMESTAMPTZ NOT NULL,          -- UTC date_trunc(grain, call time)
+    agent_name TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0,
+    completion_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(14,6) NOT NULL DEFAULT 0,
+    duration_ms_sum BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (grain, bucket_start, agent_name, provider, model)
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cost_rollups_agent
+    ON llm_cost_rollups (grain, agent_name, bucket_start DESC);
+CREATE INDEX IF NOT EXISTS idx_llm_cost_rollups_model
+    ON llm_cost_rollups (grain, provider, model, bucket_start DESC);
+
+CREATE TABLE IF NOT EXISTS llm_session_costs (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    agents TEXT[] NOT NULL DEFAULT '{}',
+    calls INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0,
+    completion_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(14,6) NOT NULL DEFAULT 0,
+    first_call_at TIMESTAMPTZ,
+    last_call_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_session_costs_cost ON llm_session_costs (cost_usd DESC);
+
+-- Atomic upsert-increment of all three grains plus the session ('' = no session)
+CREATE OR REPLACE FUNCTION apply_llm_usage_rollup(
+    p_at TIMESTAMPTZ, p_agent_name TEXT, p_provider TEXT, p_model TEXT,
+    p_session_id TEXT, p_user_id TEXT, p_deltas JSONB
+) RETURNS VOID AS $$
+DECLARE
+    v_grain TEXT;
+    v_calls INTEGER := COALESCE((p_deltas->>'calls')::INTEGER, 0);
+    v_errors INTEGER := COALESCE((p_deltas->>'errors')::INTEGER, 0);
+    v_prompt BIGINT := COALESCE((p_deltas->>'prompt_tokens')::BIGINT, 0);
+    v_completion BIGINT := COALESCE((p_deltas->>'completion_tokens')::BIGINT, 0);
+    v_cost NUMERIC := COALESCE((p_deltas->>'cost_usd')::NUMERIC, 0);
+    v_duration BIGINT := COALESCE((p_deltas->>'duration_ms_sum')::BIGINT, 0);
+BEGIN
+    FOREACH v_grain IN ARRAY ARRAY['minute', 'hour', 'day'] LOOP
+        INSERT INTO llm_cost_rollups AS r (
+            grain, bucket_start, agent_name, provider, model,
+            calls, errors, prompt_tokens, completion_tokens, cost_usd, duration_ms_sum
+        ) VALUES (
+            v_grain, date_trunc(v_grain, p_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+            p_agent_name, p_provider, p_model,
+            v_calls, v_errors, v_prompt, v_completion, v_cost, v_duration
+        )
+        ON CONFLICT (grain, bucket_start, agent_name, provider, model) DO UPDATE SET
+            calls = r.calls + EXCLUDED.calls,
+            errors = r.errors + EXCLUDED.errors,
+            prompt_tokens = r.prompt_tokens + EXCLUDED.prompt_tokens,
+            completion_tokens = r.completion_tokens + EXCLUDED.completion_tokens,
+            cost_usd = r.cost_usd + EXCLUDED.cost_usd,
+            duration_ms_sum = r.duration_ms_sum + EXCLUDED.duration_ms_sum,
+            updated_at = NOW();
+    END LOOP;
+
+    IF COALESCE(p_session_id, '') <> '' THEN
+        INSERT INTO llm_session_costs AS s (
+            session_id, user_id, agents, calls, prompt_tokens, completion_tokens, cost_usd,
+            first_call_at, last_call_at
+        ) VALUES (
+            p_session_id, p_user_id, ARRAY[p_agent_name], v_calls, v_prompt, v_completion, v_cost, p_at, p_at
+        )
+        ON CONFLICT (session_id) DO UPDATE SET
+            user_id = COALESCE(s.user_id, EXCLUDED.user_id),
+            agents = CASE WHEN p_agent_name = ANY(s.agents) THEN s.agents
+                          ELSE array_append(s.agents, p_agent_name) END,
+            calls = s.calls + EXCLUDED.calls,
+            prompt_tokens = s.prompt_tokens + EXCLUDED.prompt_tokens,
+            completion_tokens = s.completion_tokens + EXCLUDED.completion_tokens,
+            cost_usd = s.cost_usd + EXCLUDED.cost_usd,
+            first_call_at = LEAST(s.first_call_at, EXCLUDED.first_call_at),
+            last_call_at = GREATEST(s.last_call_at, EXCLUDED.last_call_at);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Minute buckets only serve the live views; run from cron
+CREATE OR REPLACE FUNCTION prune_llm_minute_rollups(p_keep INTERVAL DEFAULT INTERVAL '2 days')
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM llm_cost_rollups WHERE grain = 'minute' AND bucket_start < NOW() - p_keep;
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One-time backfill from the existing usage rows (minute buckets only for the
+-- last two days). LLMCostTracker has always written llm_usage (input_tokens,
+-- output_tokens, total_cost, created_at, conversation_id); rows in the older
+-- llm_usage_log (migration 010) are unioned in when that table exists.
+-- Calls tracked while this runs may be counted twice, so apply the migration
+-- before enabling the new tracker code.
+DO $$
+DECLARE
+    v_sources TEXT[] := ARRAY[]::TEXT[];
+BEGIN
+    IF to_regclass('public.llm_usage') IS NOT NULL THEN
+        v_sources := v_sources || $src$
+            SELECT agent_name, provider, model,
+                   input_tokens AS prompt_tokens, output_tokens AS completion_tokens,
+                   total_cost AS cost_usd, duration_ms, error_occurred,
+                   created_at AS timestamp, user_id::text AS user_id,
+                   COALESCE(context->>'session_id', conversation_id::text) AS session_id
+            FROM llm_usage$src$;
+    END IF;
+    IF to_regclass('public.llm_usage_log') IS NOT NULL THEN
+        v_sources := v_sources || $src$
+            SELECT agent_name, provider, model,
+                   prompt_tokens, completion_tokens,
+                   cost_usd, duration_ms, error_occurred,
+                   timestamp, user_id::text AS user_id,
+                   session_id
+            FROM llm_usage_log$src$;
+    END IF;
+    IF cardinality(v_sources) = 0 THEN
+        RETURN;
+    END IF;
+
+    EXECUTE 'CREATE TEMP VIEW llm_usage_backfill AS ' || array_to_string(v_sources, ' UNION ALL ');
+
+    INSERT INTO llm_cost_rollups (
+        grain, bucket_start, agent_name, provider, model,
+        calls, errors, prompt_tokens, completion_tokens, cost_usd, duration_ms_sum
+    )
+    SELECT
+        g.grain,
+        date_trunc(g.grain, u.timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+        COALESCE(u.agent_name, 'unknown'), COALESCE(u.provider, 'unknown'), COALESCE(u.model, 'unknown'),
+        COUNT(*), COUNT(*) FILTER (WHERE u.error_occurred),
+        COALESCE(SUM(u.prompt_tokens), 0), COALESCE(SUM(u.completion_tokens), 0),
+        COALESCE(SUM(u.cost_usd), 0), COALESCE(SUM(u.duration_ms), 0)
+    FROM llm_usage_backfill u
+    CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g(grain)
+    WHERE u.timestamp IS NOT NULL
+      AND (g.grain <> 'minute' OR u.timestamp >= NOW() - INTERVAL '2 days')
+    GROUP BY 1, 2, 3, 4, 5
+    ON CONFLICT (grain, bucket_start, agent_name, provider, model) DO NOTHING;
+
+    INSERT INTO llm_session_costs (
+        session_id, user_id, agents, calls, prompt_tokens, completion_tokens, cost_usd, first_call_at, last_call_at
+    )
+    SELECT
+        session_id, MIN(user_id), ARRAY_AGG(DISTINCT COALESCE(agent_name, 'unknown')), COUNT(*),
+        COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(completion_tokens), 0), COALESCE(SUM(cost_usd), 0),
+        MIN(timestamp), MAX(timestamp)
+    FROM llm_usage_backfill
+    WHERE session_id IS NOT NULL AND session_id <> ''
+    GROUP BY session_id
+    ON CONFLICT (session_id) DO NOTHING;
+
+    DROP VIEW llm_usage_backfill;
+END;
+$$;
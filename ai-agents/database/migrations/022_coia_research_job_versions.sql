@@ -0,0 +1,8 @@
+-- Versioned writes for COIA research jobs
+-- Used by services/coia_research_jobs.py: every write patches only the fields
+-- it changed in one UPDATE ... WHERE id = $1 AND version = $2 and bumps
+-- version, so claiming an expired job succeeds for exactly one worker and a
+-- slow worker cannot overwrite status, progress or subscribers saved by another.
+
+ALTER TABLE coia_research_jobs
+    ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
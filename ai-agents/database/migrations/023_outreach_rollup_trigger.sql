@@ -0,0 +1,56 @@
+-- Outreach rollups maintained by the database
+-- Every insert, update or delete on bid_card_distributions applies its rollup
+-- delta (OLD contribution out, NEW contribution in) inside the same
+-- transaction as the write. The application no longer reads the old row and
+-- applies the difference afterwards, which drifted under concurrent events.
+-- Mirrors services/outreach_rollups.distribution_contribution.
+
+-- Counters one distribution row adds to its bucket, scaled by p_sign (+1 / -1)
+CREATE OR REPLACE FUNCTION outreach_rollup_contribution(p_row bid_card_distributions, p_sign INTEGER)
+RETURNS JSONB AS $$
+    SELECT jsonb_strip_nulls(jsonb_build_object(
+        'sent', p_sign,
+        'opened', CASE WHEN p_row.opened_at IS NOT NULL THEN p_sign END,
+        'responded', CASE WHEN p_row.responded_at IS NOT NULL THEN p_sign END,
+        'interest_' || CASE
+            WHEN p_row.interest_level IN ('high', 'medium', 'low', 'none') THEN p_row.interest_level
+            ELSE 'unknown'
+        END, p_sign,
+        'response_hours_sum', CASE WHEN p_row.responded_at IS NOT NULL THEN
+            p_sign * EXTRACT(EPOCH FROM (p_row.responded_at::TIMESTAMPTZ - p_row.distributed_at::TIMESTAMPTZ)) / 3600
+        END,
+        'response_hours_count', CASE WHEN p_row.responded_at IS NOT NULL THEN p_sign END
+    ));
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION apply_distribution_rollup() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.distributed_at IS NOT NULL THEN
+        PERFORM apply_outreach_rollup_delta(
+            (OLD.distributed_at::TIMESTAMPTZ AT TIME ZONE 'UTC')::DATE,
+            COALESCE(OLD.campaign_id::TEXT, ''),
+            COALESCE(OLD.bid_card_id::TEXT, ''),
+            COALESCE(NULLIF(OLD.distribution_method, ''), 'unknown'),
+            outreach_rollup_contribution(OLD, -1)
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.distributed_at IS NOT NULL THEN
+        PERFORM apply_outreach_rollup_delta(
+            (NEW.distributed_at::TIMESTAMPTZ AT TIME ZONE 'UTC')::DATE,
+            COALESCE(NEW.campaign_id::TEXT, ''),
+            COALESCE(NEW.bid_card_id::TEXT, ''),
+            COALESCE(NULLIF(NEW.distribution_method, ''), 'unknown'),
+            outreach_rollup_contribution(NEW, 1)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_bid_card_distributions_rollup ON bid_card_distributions;
+CREATE TRIGGER trg_bid_card_distributions_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF
+        distributed_at, opened_at, responded_at, interest_level,
+        campaign_id, bid_card_id, distribution_method
+    ON bid_card_distributions
+    FOR EACH ROW EXECUTE FUNCTION apply_distribution_rollup();
@@ -0,0 +1,16 @@
+-- Atomic follow-up counter for bid_card_distributions
+-- Used by BidDistributionTracker.record_follow_up. The increment happens in
+-- one UPDATE, so concurrent follow-up sends for the same distribution cannot
+-- overwrite each other's count the way a read-then-write could.
+
+-- Returns the new follow_up_count, or NULL when the distribution does not exist
+CREATE OR REPLACE FUNCTION increment_distribution_follow_up(
+    p_distribution_id TEXT, p_method TEXT
+) RETURNS INTEGER AS $$
+    UPDATE bid_card_distributions SET
+        follow_up_count = COALESCE(follow_up_count, 0) + 1,
+        last_follow_up_at = NOW(),
+        last_follow_up_method = p_method
+    WHERE id::text = p_distribution_id
+    RETURNING follow_up_count;
+$$ LANGUAGE sql;
@@ -0,0 +1,46 @@
+-- Maintenance-issue index maintained by the database
+-- Photos reach property_photos from several writers (property upload route,
+-- IRIS chat, IRIS photo manager). A trigger re-derives a photo's
+-- property_maintenance_issues rows whenever its AI analysis, property or
+-- filename is written, so every writer is indexed. Mirrors
+-- services/property_summary.issue_rows, which the per-property reindex of
+-- photos analyzed before migration 020 still uses.
+
+CREATE OR REPLACE FUNCTION index_photo_maintenance_issues() RETURNS TRIGGER AS $$
+DECLARE
+    v_issues JSONB := NEW.ai_classification::JSONB -> 'detected_issues';
+BEGIN
+    DELETE FROM property_maintenance_issues WHERE photo_id = NEW.id::TEXT;
+    IF NEW.property_id IS NULL OR jsonb_typeof(v_issues) IS DISTINCT FROM 'array' THEN
+        RETURN NULL;
+    END IF;
+
+    -- Issues are plain strings or detailed objects; anything else is skipped
+    INSERT INTO property_maintenance_issues (
+        id, property_id, photo_id, photo_filename, description,
+        severity, type, confidence, estimated_cost, detected_at
+    )
+    SELECT
+        NEW.id::TEXT || '-' || (i.position - 1),
+        NEW.property_id::TEXT,
+        NEW.id::TEXT,
+        COALESCE(NULLIF(NEW.original_filename, ''), 'unknown.jpg'),
+        CASE WHEN jsonb_typeof(i.issue) = 'string' THEN i.issue #>> '{}'
+             ELSE COALESCE(i.issue ->> 'description', i.issue::TEXT) END,
+        COALESCE(i.issue ->> 'severity', 'medium'),
+        COALESCE(i.issue ->> 'type', 'maintenance'),
+        CASE WHEN jsonb_typeof(i.issue -> 'confidence') = 'number'
+             THEN (i.issue ->> 'confidence')::DOUBLE PRECISION ELSE 0.8 END,
+        COALESCE(i.issue ->> 'estimated_cost', 'medium'),
+        COALESCE(NEW.created_at::TIMESTAMPTZ, NOW())
+    FROM jsonb_array_elements(v_issues) WITH ORDINALITY AS i(issue, position)
+    WHERE jsonb_typeof(i.issue) IN ('string', 'object');
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_index_photo_maintenance_issues ON property_photos;
+CREATE TRIGGER trg_index_photo_maintenance_issues
+    AFTER INSERT OR UPDATE OF ai_classification, property_id, original_filename ON property_photos
+    FOR EACH ROW EXECUTE FUNCTION index_photo_maintenance_issues();
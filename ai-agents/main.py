@@ -51,6 +51,10 @@ app = FastAPI(
 # Add timing middleware to track slow requests
 app.add_middleware(TimingMiddleware)
 
+# Request-scoped Supabase read batching/caching (DATALOADER_INSTRUMENT=1 logs query counts)
+from services.data_loader import DataLoaderMiddleware
+app.add_middleware(DataLoaderMiddleware)
+
 # CORS middleware - configured for both development and production
 # In production, update allow_origins with your actual domain
 app.add_middleware(
@@ -141,6 +145,7 @@ try:
     # Initialize CIA agent - OpenAI GPT-5 only
     from agents.cia.agent import CustomerInterfaceAgent
     from agents.cia.potential_bid_card_integration import PotentialBidCardManager
+    from services.potential_bid_card_patch import get_potential_bid_card_patcher
     from routers.cia_routes_unified import set_cia_agent  # Fixed streaming endpoint enabled
     
     # Initialize JAA agent
@@ -156,7 +161,8 @@ try:
     
     if openai_api_key:
         # Use OpenAI GPT-5 exclusively
-        potential_bid_card_manager = PotentialBidCardManager()
+        # Same process as the potential bid card API: patch the database directly, no HTTP loopback
+        potential_bid_card_manager = PotentialBidCardManager(patcher=get_potential_bid_card_patcher())
         cia_agent = CustomerInterfaceAgent(openai_api_key, bid_card_manager=potential_bid_card_manager)
         set_cia_agent(cia_agent)  # Fixed streaming endpoint enabled
         logger.info("CIA agent initialized successfully with OpenAI GPT-5 API key")
@@ -247,7 +253,7 @@ try:
     app.include_router(proposal_review_router, prefix="/api/proposal-review")  # Submitted proposals review
     
     # LLM Cost Monitoring System
-    from routers.llm_cost_api_simple import router as llm_cost_router
+    from routers.llm_cost_api import router as llm_cost_router
     app.include_router(llm_cost_router)  # LLM cost tracking and monitoring
     
     # Contractor API
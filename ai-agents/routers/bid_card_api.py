@@ -14,6 +14,7 @@ from pydantic import BaseModel
 
 # Import auth and database utilities from existing project structure
 from database_simple import db
+from services.bulk_mutations import select_winning_bid
 from agents.intelligent_messaging_agent import process_intelligent_message
 from config.service_urls import get_backend_url
 
@@ -960,7 +961,21 @@ async def select_winning_contractor(
             referrer_user_id=referrer_user_id
         )
         
-        # 4. Save connection fee to database
+        # 4. Record the winner and accept/reject every submitted bid in one write;
+        # only the request that wins this compare-and-set goes on to charge a fee
+        update_data = {
+            "winner_contractor_id": contractor_id,
+            "winner_selected_at": datetime.utcnow().isoformat(),
+            "connection_fee_id": None,
+            "winner_bid_amount": bid_amount,
+            "status": "contractor_selected"
+        }
+        
+        bid_statuses = select_winning_bid(db.client, bid_card_data, contractor_id, update_data)
+        if bid_statuses is None:
+            raise HTTPException(status_code=400, detail="A contractor has already been selected for this project")
+        
+        # 5. Save connection fee to database
         connection_fee_data = {
             "bid_card_id": bid_card_id,
             "contractor_id": contractor_id,
@@ -981,34 +996,14 @@ async def select_winning_contractor(
         
         fee_response = db.client.table("connection_fees").insert(connection_fee_data).execute()
         if not fee_response.data:
-            raise HTTPException(status_code=500, detail="Failed to save connection fee")
+            raise HTTPException(status_code=500, detail="Winner selected but failed to save connection fee")
         
         connection_fee_id = fee_response.data[0]["id"]
         
-        # 5. Update bid card with winner information
-        update_data = {
-            "winner_contractor_id": contractor_id,
-            "winner_selected_at": datetime.utcnow().isoformat(),
-            "connection_fee_id": connection_fee_id,
-            "winner_bid_amount": bid_amount,
-            "status": "contractor_selected"
-        }
-        
-        update_response = db.client.table("bid_cards").update(update_data).eq("id", bid_card_id).execute()
-        if not update_response.data:
-            raise HTTPException(status_code=500, detail="Failed to update bid card")
-        
-        # 6. Update bid status in submitted_bids
-        for bid in submitted_bids:
-            if bid.get("contractor_id") == contractor_id:
-                bid["status"] = "accepted"
-            else:
-                bid["status"] = "rejected"
-        
-        bid_document = bid_card_data.get("bid_document", {})
-        bid_document["submitted_bids"] = submitted_bids
-        
-        db.client.table("bid_cards").update({"bid_document": bid_document}).eq("id", bid_card_id).execute()
+        # 6. Link the fee to the bid card
+        db.client.table("bid_cards").update({"connection_fee_id": connection_fee_id}).eq(
+            "id", bid_card_id
+        ).eq("winner_contractor_id", contractor_id).execute()
         
         # 7. Create referral tracking if applicable
         if referral_code and referrer_user_id and fee_result["referrer_portion"] > 0:
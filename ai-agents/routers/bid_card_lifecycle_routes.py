@@ -2,15 +2,19 @@
 """
 Bid Card Lifecycle API Routes
 Complete bid card tracking system based on 41-table ecosystem analysis
+
+Lifecycle views are served from a materialized per-bid-card snapshot
+(services/bid_card_lifecycle_snapshot.py) that the loaders below build and refresh.
 """
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 
 from database_simple import db
+from services.bid_card_lifecycle_snapshot import SECTIONS, LifecycleSnapshot, LifecycleSnapshotStore
 
 
 router = APIRouter(prefix="/api/bid-cards", tags=["bid-card-lifecycle"])
@@ -26,6 +30,7 @@ class BidCardLifecycleResponse(BaseModel):
     timeline: list[dict[str, Any]]
     metrics: dict[str, Any]
     connection_fee: dict[str, Any]
+    snapshot: Optional[dict[str, Any]] = None  # version stamps of the materialized snapshot
 
 class ContractorDiscoveryData(BaseModel):
     """Contractor discovery and caching data"""
@@ -59,6 +64,38 @@ async def get_database():
     """Dependency to get database connection"""
     return db
 
+def get_snapshot_store(database) -> LifecycleSnapshotStore:
+    """Snapshot store whose section loaders are the (sync) table readers below, run on its loader pool"""
+    def load_bid_card(bid_card_id: str) -> Optional[dict[str, Any]]:
+        result = database.client.table("bid_cards").select("*").eq("id", bid_card_id).execute()
+        return result.data[0] if result.data else None
+
+    return LifecycleSnapshotStore(database.client, {
+        "bid_card": load_bid_card,
+        "discovery": lambda bid_card_id: get_discovery_data(bid_card_id, database),
+        "campaigns": lambda bid_card_id: get_campaign_data(bid_card_id, database),
+        "outreach": lambda bid_card_id: get_outreach_data(bid_card_id, database),
+        "engagement": lambda bid_card_id: get_engagement_data(bid_card_id, database),
+        "connection_fee": lambda bid_card_id: get_connection_fee_data(bid_card_id, database),
+    })
+
+async def get_lifecycle_snapshot(bid_card_id: str, database) -> LifecycleSnapshot:
+    """The bid card's lifecycle snapshot (built or refreshed as needed), 404 if there is no such bid card"""
+    snapshot = await get_snapshot_store(database).get(bid_card_id)
+    if snapshot is not None and snapshot.section("bid_card") is None and "bid_card" in snapshot.failed_sections:
+        raise HTTPException(status_code=503, detail="Bid card temporarily unavailable")
+    if snapshot is None or snapshot.section("bid_card") is None:
+        raise HTTPException(status_code=404, detail="Bid card not found")
+    return snapshot
+
+def snapshot_timeline(snapshot: LifecycleSnapshot) -> list[dict[str, Any]]:
+    return timeline_events(
+        snapshot.section("bid_card"),
+        snapshot.section("discovery").get("discovery_runs", []),
+        snapshot.section("campaigns"),
+        snapshot.section("outreach").get("outreach_attempts", [])
+    )
+
 @router.get("/{bid_card_id}/lifecycle", response_model=BidCardLifecycleResponse)
 async def get_bid_card_lifecycle(
     bid_card_id: str,
@@ -67,42 +104,15 @@ async def get_bid_card_lifecycle(
     """
     Get complete lifecycle data for a bid card
     Includes all 8 stages: Creation → Discovery → Campaign → Outreach → Engagement → Bids → Follow-up → Completion
+    Served from the bid card's lifecycle snapshot; bids, timeline and metrics are derived from it
     """
     try:
-        # Stage 1: Get core bid card data
-        bid_card_result = database.client.table("bid_cards").select("*").eq("id", bid_card_id).execute()
-        if not bid_card_result.data:
-            raise HTTPException(status_code=404, detail="Bid card not found")
-
-        bid_card = bid_card_result.data[0]
-
-        # Stage 2: Get discovery data
-        try:
-            discovery_data = await get_discovery_data(bid_card_id, database) or {}
-        except Exception as e:
-            print(f"Discovery data error: {e}")
-            discovery_data = {}
-
-        # Stage 3: Get campaign data
-        try:
-            campaign_data = await get_campaign_data(bid_card_id, database) or []
-        except Exception as e:
-            print(f"Campaign data error: {e}")
-            campaign_data = []
-
-        # Stage 4: Get outreach data
-        try:
-            outreach_data = await get_outreach_data(bid_card_id, database) or {}
-        except Exception as e:
-            print(f"Outreach data error: {e}")
-            outreach_data = {}
-
-        # Stage 5: Get engagement data
-        try:
-            engagement_data = await get_engagement_data(bid_card_id, database) or {}
-        except Exception as e:
-            print(f"Engagement data error: {e}")
-            engagement_data = {}
+        snapshot = await get_lifecycle_snapshot(bid_card_id, database)
+        bid_card = snapshot.section("bid_card")
+        discovery_data = snapshot.section("discovery")
+        campaign_data = snapshot.section("campaigns")
+        outreach_data = snapshot.section("outreach")
+        engagement_data = snapshot.section("engagement")
 
         # Stage 6: Get submitted bids
         try:
@@ -113,7 +123,7 @@ async def get_bid_card_lifecycle(
 
         # Stage 7: Get timeline
         try:
-            timeline_data = await build_timeline(bid_card_id, database) or []
+            timeline_data = snapshot_timeline(snapshot)
         except Exception as e:
             print(f"Timeline data error: {e}")
             timeline_data = []
@@ -125,13 +135,6 @@ async def get_bid_card_lifecycle(
             print(f"Metrics data error: {e}")
             metrics_data = {}
 
-        # Stage 9: Get connection fee data
-        try:
-            connection_fee_data = await get_connection_fee_data(bid_card_id, database) or {}
-        except Exception as e:
-            print(f"Connection fee data error: {e}")
-            connection_fee_data = {}
-
         return BidCardLifecycleResponse(
             bid_card=bid_card,
             discovery=discovery_data,
@@ -141,19 +144,36 @@ async def get_bid_card_lifecycle(
             bids=bids_data,
             timeline=timeline_data,
             metrics=metrics_data,
-            connection_fee=connection_fee_data
+            connection_fee=snapshot.section("connection_fee"),
+            snapshot=snapshot.stamp()
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving lifecycle data: {e!s}")
 
+@router.post("/{bid_card_id}/lifecycle/refresh")
+async def refresh_bid_card_lifecycle(
+    bid_card_id: str,
+    sections: Optional[list[str]] = Query(None, description="Sections to rebuild (all when omitted)"),
+    database = Depends(get_database)
+):
+    """Rebuild snapshot sections now, e.g. after writes that bypass the change triggers"""
+    store = get_snapshot_store(database)
+    store.mark_dirty(bid_card_id, sections or SECTIONS)
+    snapshot = await store.get(bid_card_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Bid card not found")
+    return {"success": True, "bid_card_id": bid_card_id, "snapshot": snapshot.stamp()}
+
 @router.get("/{bid_card_id}/discovery", response_model=ContractorDiscoveryData)
 async def get_bid_card_discovery(
     bid_card_id: str,
     database = Depends(get_database)
 ):
     """Get contractor discovery results and caching data"""
-    discovery_data = await get_discovery_data(bid_card_id, database)
+    discovery_data = (await get_lifecycle_snapshot(bid_card_id, database)).section("discovery")
 
     return ContractorDiscoveryData(
         discovery_runs=discovery_data.get("discovery_runs", []),
@@ -168,13 +188,13 @@ async def get_bid_card_campaigns(
     database = Depends(get_database)
 ):
     """Get campaign orchestration and progress data"""
-    campaign_data = await get_campaign_data(bid_card_id, db)
+    campaigns = (await get_lifecycle_snapshot(bid_card_id, database)).section("campaigns")
 
     return CampaignProgressData(
-        campaigns=campaign_data.get("campaigns", []),
-        check_ins=campaign_data.get("check_ins", []),
-        campaign_contractors=campaign_data.get("campaign_contractors", []),
-        manual_tasks=campaign_data.get("manual_tasks", [])
+        campaigns=campaigns,
+        check_ins=[row for campaign in campaigns for row in campaign.get("check_ins", [])],
+        campaign_contractors=[row for campaign in campaigns for row in campaign.get("campaign_contractors", [])],
+        manual_tasks=[row for campaign in campaigns for row in campaign.get("manual_tasks", [])]
     )
 
 @router.get("/{bid_card_id}/outreach", response_model=OutreachAnalysisData)
@@ -183,7 +203,7 @@ async def get_bid_card_outreach(
     database = Depends(get_database)
 ):
     """Get multi-channel outreach analysis"""
-    outreach_data = await get_outreach_data(bid_card_id, db)
+    outreach_data = (await get_lifecycle_snapshot(bid_card_id, database)).section("outreach")
 
     return OutreachAnalysisData(
         outreach_attempts=outreach_data.get("outreach_attempts", []),
@@ -198,7 +218,7 @@ async def get_bid_card_engagement(
     database = Depends(get_database)
 ):
     """Get engagement and interaction metrics"""
-    engagement_data = await get_engagement_data(bid_card_id, db)
+    engagement_data = (await get_lifecycle_snapshot(bid_card_id, database)).section("engagement")
 
     return EngagementMetrics(
         views=engagement_data.get("views", []),
@@ -213,8 +233,8 @@ async def get_bid_card_timeline(
     database = Depends(get_database)
 ):
     """Get complete chronological timeline"""
-    timeline = await build_timeline(bid_card_id, db)
-    return {"timeline": timeline}
+    snapshot = await get_lifecycle_snapshot(bid_card_id, database)
+    return {"timeline": snapshot_timeline(snapshot)}
 
 @router.get("/{bid_card_id}/change-history")
 async def get_bid_card_change_history(
@@ -299,7 +319,7 @@ async def approve_bid_card_change(
 
 # Helper functions for data retrieval
 
-async def get_discovery_data(bid_card_id: str, database) -> dict[str, Any]:
+def get_discovery_data(bid_card_id: str, database) -> dict[str, Any]:
     """Get contractor discovery data from multiple tables"""
 
     # Get discovery runs
@@ -345,7 +365,7 @@ async def get_discovery_data(bid_card_id: str, database) -> dict[str, Any]:
         "contractor_leads": contractor_leads
     }
 
-async def get_campaign_data(bid_card_id: str, database) -> list[dict[str, Any]]:
+def get_campaign_data(bid_card_id: str, database) -> list[dict[str, Any]]:
     """Get campaign orchestration data"""
 
     # Get outreach campaigns
@@ -370,7 +390,7 @@ async def get_campaign_data(bid_card_id: str, database) -> list[dict[str, Any]]:
 
     return campaigns
 
-async def get_outreach_data(bid_card_id: str, database) -> dict[str, Any]:
+def get_outreach_data(bid_card_id: str, database) -> dict[str, Any]:
     """Get multi-channel outreach data and analysis"""
 
     # Get all outreach attempts
@@ -413,7 +433,7 @@ async def get_outreach_data(bid_card_id: str, database) -> dict[str, Any]:
         "response_tracking": response_tracking
     }
 
-async def get_engagement_data(bid_card_id: str, database) -> dict[str, Any]:
+def get_engagement_data(bid_card_id: str, database) -> dict[str, Any]:
     """Get engagement and interaction data"""
 
     # Get bid card views
@@ -484,26 +504,42 @@ async def get_bids_data(bid_card: dict[str, Any]) -> list[dict[str, Any]]:
 async def build_timeline(bid_card_id: str, database) -> list[dict[str, Any]]:
     """Build complete chronological timeline from all related tables"""
 
+    bid_card = database.client.table("bid_cards").select("*").eq("id", bid_card_id).execute()
+    discovery_runs = database.client.table("discovery_runs").select("*").eq("bid_card_id", bid_card_id).execute()
+    campaigns = database.client.table("outreach_campaigns").select("*").eq("bid_card_id", bid_card_id).execute()
+    outreach = database.client.table("contractor_outreach_attempts").select("*").eq("bid_card_id", bid_card_id).execute()
+
+    return timeline_events(
+        bid_card.data[0] if bid_card.data else None,
+        discovery_runs.data or [],
+        campaigns.data or [],
+        outreach.data or []
+    )
+
+def timeline_events(bid_card: Optional[dict[str, Any]],
+                    discovery_runs: list[dict[str, Any]],
+                    campaigns: list[dict[str, Any]],
+                    outreach_attempts: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Chronological timeline from already-loaded rows"""
+
     timeline_events = []
 
-    # Get bid card creation
-    bid_card = database.client.table("bid_cards").select("*").eq("id", bid_card_id).execute()
-    if bid_card.data:
+    # Bid card creation
+    if bid_card:
         timeline_events.append({
-            "id": f"bid_card_created_{bid_card_id}",
-            "timestamp": bid_card.data[0]["created_at"],
+            "id": f"bid_card_created_{bid_card['id']}",
+            "timestamp": bid_card["created_at"],
             "event_type": "bid_card_created",
-            "description": f"Bid card {bid_card.data[0]['bid_card_number']} created",
+            "description": f"Bid card {bid_card['bid_card_number']} created",
             "details": {
-                "project_type": bid_card.data[0]["project_type"],
-                "urgency": bid_card.data[0]["urgency_level"],
-                "contractors_needed": bid_card.data[0]["contractor_count_needed"]
+                "project_type": bid_card["project_type"],
+                "urgency": bid_card["urgency_level"],
+                "contractors_needed": bid_card["contractor_count_needed"]
             }
         })
 
-    # Get discovery runs
-    discovery_runs = database.client.table("discovery_runs").select("*").eq("bid_card_id", bid_card_id).execute()
-    for run in discovery_runs.data or []:
+    # Discovery runs
+    for run in discovery_runs:
         timeline_events.append({
             "id": f"discovery_run_{run['id']}",
             "timestamp": run["created_at"],
@@ -515,9 +551,8 @@ async def build_timeline(bid_card_id: str, database) -> list[dict[str, Any]]:
             }
         })
 
-    # Get campaign events
-    campaigns = database.client.table("outreach_campaigns").select("*").eq("bid_card_id", bid_card_id).execute()
-    for campaign in campaigns.data or []:
+    # Campaign events
+    for campaign in campaigns:
         timeline_events.append({
             "id": f"campaign_created_{campaign['id']}",
             "timestamp": campaign["created_at"],
@@ -541,9 +576,8 @@ async def build_timeline(bid_card_id: str, database) -> list[dict[str, Any]]:
                 }
             })
 
-    # Get outreach attempts
-    outreach = database.client.table("contractor_outreach_attempts").select("*").eq("bid_card_id", bid_card_id).execute()
-    for attempt in outreach.data or []:
+    # Outreach attempts
+    for attempt in outreach_attempts:
         timeline_events.append({
             "id": f"outreach_{attempt['id']}",
             "timestamp": attempt["sent_at"],
@@ -556,9 +590,9 @@ async def build_timeline(bid_card_id: str, database) -> list[dict[str, Any]]:
             }
         })
 
-    # Get bid submissions from bid_document
-    if bid_card.data:
-        bid_document = bid_card.data[0].get("bid_document", {})
+    # Bid submissions from bid_document
+    if bid_card:
+        bid_document = bid_card.get("bid_document", {})
         submitted_bids = bid_document.get("submitted_bids", [])
 
         for i, bid in enumerate(submitted_bids):
@@ -583,7 +617,7 @@ async def build_timeline(bid_card_id: str, database) -> list[dict[str, Any]]:
 
     return timeline_events
 
-async def get_connection_fee_data(bid_card_id: str, database) -> dict[str, Any]:
+def get_connection_fee_data(bid_card_id: str, database) -> dict[str, Any]:
     """Get connection fee and winner selection data"""
     try:
         # Get connection fee data if it exists
@@ -12,6 +12,7 @@ from pydantic import BaseModel
 
 # Use the centralized database connection
 from database_simple import get_client
+from services.data_loader import get_loader
 
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -122,13 +123,14 @@ async def get_campaigns(
         # Get campaigns with bid card info
         result = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
 
+        # Get check-ins for every campaign on the page in one query
+        check_ins_by_campaign = get_loader(supabase).load_related_many(
+            "campaign_check_ins", "campaign_id", [c["id"] for c in result.data], order="check_in_percentage"
+        )
+
         campaigns = []
         for campaign in result.data:
-            # Get check-ins for this campaign
-            check_ins_result = supabase.table("campaign_check_ins")\
-                .select("*")\
-                .eq("campaign_id", campaign["id"])\
-                .order("check_in_percentage").execute()
+            check_ins = check_ins_by_campaign[campaign["id"]]
 
             # Format campaign data
             formatted_campaign = {
@@ -146,7 +148,7 @@ async def get_campaigns(
             }
 
             # Add check-in data
-            for check_in in check_ins_result.data:
+            for check_in in check_ins:
                 formatted_campaign["check_ins"].append({
                     "id": check_in["id"],
                     "check_in_percentage": check_in.get("check_in_percentage", 0),
@@ -15,6 +15,7 @@ from pydantic import BaseModel
 
 from database_simple import db
 from services.agent_orchestrator import orchestrator
+from services.data_loader import get_loader
 
 
 router = APIRouter(prefix="/api/campaign-management", tags=["campaign-management"])
@@ -141,50 +142,44 @@ async def get_all_campaigns(
         
         print(f"DEBUG: Found {len(campaigns_result.data) if campaigns_result.data else 0} campaigns")
         
-        for campaign in campaigns_result.data:
-            # Get campaign contractors count
-            contractors_result = db.client.table("campaign_contractors")\
-                .select("contractor_id", count="exact")\
-                .eq("campaign_id", campaign["id"])\
-                .execute()
-            
-            contractors_targeted = contractors_result.count if contractors_result.count else 0
-            
-            # Get response count (try different approaches)
-            contractors_responded = 0
-            bids_received = 0
-            
-            try:
-                # Try to get responses from contractor_responses table
-                responses_result = db.client.table("contractor_responses")\
-                    .select("id", count="exact")\
-                    .eq("campaign_id", campaign["id"])\
-                    .execute()
-                contractors_responded = responses_result.count if responses_result.count else 0
-            except Exception as e:
-                print(f"DEBUG: Could not query contractor_responses table: {e}")
-                # Try alternative approach - look for responses in outreach attempts
-                try:
-                    responses_result = db.client.table("contractor_outreach_attempts")\
-                        .select("id", count="exact")\
-                        .eq("campaign_id", campaign["id"])\
-                        .eq("status", "responded")\
-                        .execute()
-                    contractors_responded = responses_result.count if responses_result.count else 0
-                except Exception as e2:
-                    print(f"DEBUG: Could not query contractor_outreach_attempts table: {e2}")
-            
+        # Batch the per-campaign counts: one query per table instead of three per campaign
+        loader = get_loader(db.client)
+        campaign_ids = [campaign["id"] for campaign in campaigns_result.data]
+        contractors_by_campaign = loader.load_related_many(
+            "campaign_contractors", "campaign_id", campaign_ids, columns="contractor_id"
+        )
+        
+        try:
+            # Try to get responses from contractor_responses table
+            responses_by_campaign = loader.load_related_many(
+                "contractor_responses", "campaign_id", campaign_ids, columns="id"
+            )
+        except Exception as e:
+            print(f"DEBUG: Could not query contractor_responses table: {e}")
+            # Try alternative approach - look for responses in outreach attempts
             try:
-                # Try to get bids from contractor_bids table
-                bids_result = db.client.table("contractor_bids")\
-                    .select("id", count="exact")\
-                    .eq("campaign_id", campaign["id"])\
-                    .execute()
-                bids_received = bids_result.count if bids_result.count else 0
-            except Exception as e:
-                print(f"DEBUG: Could not query contractor_bids table: {e}")
-                # Use default value of 0
-                bids_received = 0
+                responses_by_campaign = loader.load_related_many(
+                    "contractor_outreach_attempts", "campaign_id", campaign_ids,
+                    columns="id", filters={"status": "responded"}
+                )
+            except Exception as e2:
+                print(f"DEBUG: Could not query contractor_outreach_attempts table: {e2}")
+                responses_by_campaign = {}
+        
+        try:
+            # Try to get bids from contractor_bids table
+            bids_by_campaign = loader.load_related_many(
+                "contractor_bids", "campaign_id", campaign_ids, columns="id"
+            )
+        except Exception as e:
+            print(f"DEBUG: Could not query contractor_bids table: {e}")
+            # Use default value of 0
+            bids_by_campaign = {}
+        
+        for campaign in campaigns_result.data:
+            contractors_targeted = len(contractors_by_campaign[campaign["id"]])
+            contractors_responded = len(responses_by_campaign.get(campaign["id"], []))
+            bids_received = len(bids_by_campaign.get(campaign["id"], []))
             
             # Calculate response rate
             response_rate = (contractors_responded / contractors_targeted * 100) if contractors_targeted > 0 else 0
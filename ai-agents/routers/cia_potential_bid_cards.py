@@ -14,6 +14,16 @@ from pydantic import BaseModel
 
 import database_simple
 from database_simple import db
+from services.potential_bid_card_patch import (
+    FIELD_MAPPING,
+    NICE_TO_HAVE_FIELDS,
+    REQUIRED_FIELDS,
+    FieldUpdate,
+    PotentialBidCardNotFound,
+    VersionConflict,
+    completion_info as _completion_info,
+    get_potential_bid_card_patcher,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -29,8 +39,15 @@ class CreatePotentialBidCardRequest(BaseModel):
 class UpdateFieldRequest(BaseModel):
     field_name: str
     field_value: Any
-    confidence: Optional[float] = 1.0
-    source: str = "conversation"  # "conversation" or "manual"
+    confidence: Optional[float] = None  # None: unspecified, stored as 1.0
+    # "conversation" values never overwrite a more confident stored value;
+    # "manual" (or any other explicit source) always applies
+    source: str = "conversation"
+
+class PatchFieldsRequest(BaseModel):
+    fields: List[UpdateFieldRequest]
+    expected_version: Optional[int] = None  # 409 if the card has moved on
+    source: str = "conversation"
 
 class PotentialBidCardResponse(BaseModel):
     id: str
@@ -42,51 +59,6 @@ class PotentialBidCardResponse(BaseModel):
     created_at: str
     updated_at: str
 
-# Field mapping for CIA conversation to potential_bid_cards
-FIELD_MAPPING = {
-    "project_type": "primary_trade",
-    "service_type": "secondary_trades",
-    "project_description": "user_scope_notes", 
-    "project_name": "title",
-    "zip_code": "zip_code",
-    "email_address": "email_address",
-    "timeline": "estimated_timeline",
-    "urgency_level": "urgency_level",
-    "contractor_size_preference": "contractor_size_preference",
-    "budget_context": "budget_context",
-    "materials": "materials_specified",
-    "special_requirements": "special_requirements",
-    "quality_expectations": "quality_expectations",
-    "timeline_flexibility": "timeline_flexibility",
-    # NEW: Exact date fields
-    "bid_collection_deadline": "bid_collection_deadline",
-    "project_completion_deadline": "project_completion_deadline", 
-    "deadline_hard": "deadline_hard",
-    "deadline_context": "deadline_context",
-    # Service complexity classification fields
-    "service_complexity": "service_complexity",
-    "trade_count": "trade_count",
-    "primary_trade": "primary_trade",
-    "secondary_trades": "secondary_trades"
-}
-
-# Required fields for completion
-REQUIRED_FIELDS = [
-    "primary_trade",      # project_type
-    "user_scope_notes",   # project_description  
-    "zip_code",           # location
-    "urgency_level",      # timeline
-]
-
-# Nice to have fields
-NICE_TO_HAVE_FIELDS = [
-    "contractor_size_preference",
-    "budget_context", 
-    "materials_specified",
-    "special_requirements",
-    "timeline_flexibility"
-]
-
 @router.post("/potential-bid-cards", response_model=PotentialBidCardResponse)
 async def create_potential_bid_card(request: CreatePotentialBidCardRequest):
     """
@@ -169,40 +141,12 @@ async def update_field(bid_card_id: str, request: UpdateFieldRequest):
     try:
         logger.info(f"Updating field {request.field_name} in bid card {bid_card_id}")
         
-        # Map CIA field names to database column names
-        db_field_name = FIELD_MAPPING.get(request.field_name, request.field_name)
-        
-        # Prepare update data
-        update_data = {
-            db_field_name: request.field_value,
-            "updated_at": datetime.utcnow().isoformat()
-        }
-        
-        # Handle special field types
-        if request.field_name in ["materials", "special_requirements"] and isinstance(request.field_value, str):
-            # Convert single string to array
-            update_data[db_field_name] = [request.field_value]
-        elif request.field_name == "service_type" and isinstance(request.field_value, str):
-            # Convert single service type to array
-            update_data[db_field_name] = [request.field_value]
-        
-        # Update the potential bid card
-        result = db.client.table("potential_bid_cards").update(update_data).eq("id", bid_card_id).execute()
-        
-        if not result.data:
-            raise HTTPException(status_code=404, detail="Potential bid card not found")
-        
-        # Calculate completion percentage
-        completion_info = await calculate_completion_percentage(bid_card_id)
-        
-        # Update completion percentage
-        db.client.table("potential_bid_cards").update({
-            "completion_percentage": completion_info["percentage"],
-            "ready_for_conversion": completion_info["ready_for_conversion"]
-        }).eq("id", bid_card_id).execute()
-        
-        # Update conversation tracking
-        await update_conversation_tracking(bid_card_id, request.field_name, completion_info)
+        result = get_potential_bid_card_patcher().apply(
+            bid_card_id,
+            [FieldUpdate(request.field_name, request.field_value, request.confidence)],
+            source=request.source
+        )
+        completion_info = result.completion
         
         logger.info(f"Updated field {request.field_name} in bid card {bid_card_id} - {completion_info['percentage']}% complete")
         
@@ -211,13 +155,49 @@ async def update_field(bid_card_id: str, request: UpdateFieldRequest):
             "field_updated": request.field_name,
             "completion_percentage": completion_info["percentage"],
             "ready_for_conversion": completion_info["ready_for_conversion"],
-            "missing_fields": completion_info["missing_fields"]
+            "missing_fields": completion_info["missing_fields"],
+            "version": result.version
         }
         
+    except PotentialBidCardNotFound:
+        raise HTTPException(status_code=404, detail="Potential bid card not found")
     except Exception as e:
         logger.error(f"Error updating field {request.field_name}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.patch("/potential-bid-cards/{bid_card_id}/fields")
+async def patch_fields(bid_card_id: str, request: PatchFieldsRequest):
+    """
+    Apply many fields (each with its own confidence) in one versioned write
+    """
+    try:
+        result = get_potential_bid_card_patcher().apply(
+            bid_card_id,
+            [FieldUpdate(f.field_name, f.field_value, f.confidence) for f in request.fields],
+            expected_version=request.expected_version,
+            source=request.source
+        )
+        
+        logger.info(f"Patched {len(result.applied)} fields in bid card {bid_card_id} (v{result.version})")
+        
+        return {
+            "success": True,
+            "fields_updated": result.applied,
+            "fields_skipped": result.skipped,
+            "version": result.version,
+            "completion_percentage": result.completion["percentage"],
+            "ready_for_conversion": result.completion["ready_for_conversion"],
+            "missing_fields": result.completion["missing_fields"]
+        }
+        
+    except PotentialBidCardNotFound:
+        raise HTTPException(status_code=404, detail="Potential bid card not found")
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail={"error": "version_conflict", "current_version": e.current_version})
+    except Exception as e:
+        logger.error(f"Error patching fields in bid card {bid_card_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/potential-bid-cards/{bid_card_id}")
 async def get_potential_bid_card(bid_card_id: str):
     """
@@ -652,71 +632,8 @@ async def calculate_completion_percentage(bid_card_id: str) -> Dict[str, Any]:
         if not result.data:
             return {"percentage": 0, "ready_for_conversion": False, "missing_fields": REQUIRED_FIELDS.copy()}
         
-        bid_card = result.data[0]
-        
-        # Check required fields
-        filled_required = 0
-        missing_required = []
-        
-        for field in REQUIRED_FIELDS:
-            value = bid_card.get(field)
-            if value is not None and value != "" and value != []:
-                filled_required += 1
-            else:
-                missing_required.append(field)
-        
-        # Check nice-to-have fields
-        filled_nice_to_have = 0
-        for field in NICE_TO_HAVE_FIELDS:
-            value = bid_card.get(field)
-            if value is not None and value != "" and value != []:
-                filled_nice_to_have += 1
-        
-        # Calculate percentage
-        total_fields = len(REQUIRED_FIELDS) + len(NICE_TO_HAVE_FIELDS)
-        filled_fields = filled_required + filled_nice_to_have
-        percentage = int((filled_fields / total_fields) * 100)
-        
-        # Ready for conversion if all required fields are filled
-        ready_for_conversion = len(missing_required) == 0
-        
-        return {
-            "percentage": percentage,
-            "ready_for_conversion": ready_for_conversion,
-            "missing_fields": missing_required,
-            "filled_required": filled_required,
-            "filled_optional": filled_nice_to_have
-        }
+        return _completion_info(result.data[0])
         
     except Exception as e:
         logger.error(f"Error calculating completion percentage: {e}")
         return {"percentage": 0, "ready_for_conversion": False, "missing_fields": REQUIRED_FIELDS.copy()}
-
-async def update_conversation_tracking(bid_card_id: str, field_name: str, completion_info: Dict[str, Any]):
-    """
-    Update conversation tracking with latest field update
-    """
-    try:
-        tracking_data = {
-            "last_field_updated": field_name,
-            "completion_percentage": completion_info["percentage"],
-            "updated_at": datetime.utcnow().isoformat()
-        }
-        
-        # Update fields_collected with current status
-        tracking_result = db.client.table("cia_conversation_tracking").select("fields_collected").eq("potential_bid_card_id", bid_card_id).execute()
-        
-        if tracking_result.data:
-            fields_collected = tracking_result.data[0].get("fields_collected", {})
-            fields_collected[field_name] = {
-                "updated_at": datetime.utcnow().isoformat(),
-                "source": "conversation"
-            }
-            tracking_data["fields_collected"] = fields_collected
-        
-        db.client.table("cia_conversation_tracking").update(tracking_data).eq("potential_bid_card_id", bid_card_id).execute()
-        
-    except Exception as e:
-        logger.error(f"Error updating conversation tracking: {e}")
-        # Don't fail the main operation if tracking fails
-        pass
\ No newline at end of file
@@ -16,6 +16,14 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter(tags=["COIA Landing"])
 
+from utils.ws_backplane import WebSocketBackplane, get_backplane, session_channel
+from services.coia_research_jobs import (
+    COMPLETED,
+    ResearchJob,
+    ResearchJobQueue,
+    get_research_job_store,
+)
+
 # Import Live Agent System
 from agents.coia.live_agent_system import (
     live_tracker, 
@@ -24,42 +32,73 @@ from agents.coia.live_agent_system import (
     ParallelAgentOrchestrator
 )
 
-# WebSocket connection manager for real-time updates
+COIA_BROADCAST_CHANNEL = "coia"
+
+
+# WebSocket connection manager for real-time updates (routed through the backplane, channel session:{id})
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, backplane: Optional[WebSocketBackplane] = None):
+        self._backplane = backplane
         self.active_connections: list[WebSocket] = []
         self.session_connections: dict[str, list[WebSocket]] = {}
+        self.connection_lock = asyncio.Lock()
+
+    @property
+    def backplane(self) -> WebSocketBackplane:
+        """Process-wide backplane unless one was injected"""
+        return self._backplane or get_backplane()
 
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        if session_id not in self.session_connections:
-            self.session_connections[session_id] = []
-        self.session_connections[session_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, session_id: str):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if session_id in self.session_connections and websocket in self.session_connections[session_id]:
-            self.session_connections[session_id].remove(websocket)
-            if not self.session_connections[session_id]:
-                del self.session_connections[session_id]
+        backplane = self.backplane
+        async with self.connection_lock:
+            if not self.active_connections:
+                await backplane.subscribe(COIA_BROADCAST_CHANNEL, self._deliver_broadcast)
+            self.active_connections.append(websocket)
+            if session_id not in self.session_connections:
+                self.session_connections[session_id] = []
+                await backplane.subscribe(session_channel(session_id), self._deliver_to_session)
+            self.session_connections[session_id].append(websocket)
+
+    async def disconnect(self, websocket: WebSocket, session_id: str):
+        backplane = self.backplane
+        async with self.connection_lock:
+            if websocket in self.active_connections:
+                self.active_connections.remove(websocket)
+                if not self.active_connections:
+                    await backplane.unsubscribe(COIA_BROADCAST_CHANNEL, self._deliver_broadcast)
+            if session_id in self.session_connections and websocket in self.session_connections[session_id]:
+                self.session_connections[session_id].remove(websocket)
+                if not self.session_connections[session_id]:
+                    del self.session_connections[session_id]
+                    await backplane.unsubscribe(session_channel(session_id), self._deliver_to_session)
 
     async def send_to_session(self, session_id: str, message: dict):
-        if session_id in self.session_connections:
-            for connection in self.session_connections[session_id]:
-                try:
-                    await connection.send_text(json.dumps(message))
-                except:
-                    # Connection closed, will be cleaned up
-                    pass
+        await self.backplane.publish(session_channel(session_id), message)
+
+    async def _deliver_to_session(self, channel: str, message: dict) -> int:
+        sent = 0
+        for connection in list(self.session_connections.get(channel.split(":", 1)[1], [])):
+            try:
+                await connection.send_text(json.dumps(message))
+                sent += 1
+            except:
+                # Connection closed, will be cleaned up
+                pass
+        return sent
 
     async def broadcast(self, message: dict):
+        await self.backplane.publish(COIA_BROADCAST_CHANNEL, message)
+
+    async def _deliver_broadcast(self, channel: str, message: dict) -> int:
+        sent = 0
         for connection in self.active_connections[:]:  # Copy list to avoid issues
             try:
                 await connection.send_text(json.dumps(message))
+                sent += 1
             except:
                 self.active_connections.remove(connection)
+        return sent
 
 # Global connection manager
 connection_manager = ConnectionManager()
@@ -81,90 +120,140 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 await websocket.send_text("pong")
             
     except WebSocketDisconnect:
-        connection_manager.disconnect(websocket, session_id)
+        await connection_manager.disconnect(websocket, session_id)
         logger.info(f"WebSocket disconnected for session: {session_id}")
     except Exception as e:
         logger.error(f"WebSocket error for session {session_id}: {e}")
-        connection_manager.disconnect(websocket, session_id)
+        await connection_manager.disconnect(websocket, session_id)
 
 
-async def run_research_in_background(
-    contractor_lead_id: str,
-    session_id: str,
-    company_name: str,
-    location_hint: Optional[str] = None
-):
+def _basic_profile(company_name: str, location_hint: Optional[str], google_data: Optional[dict]) -> dict[str, Any]:
+    """Build basic profile from Google data (skip AI extraction for speed)"""
+    google_data = google_data or {}
+    return {
+        "company_name": company_name,
+        "location": location_hint,
+        "website": google_data.get("website"),
+        "phone": google_data.get("phone"),
+        "address": google_data.get("address"),
+        "rating": google_data.get("rating"),
+    }
+
+
+async def _save_research_state(job: ResearchJob, subscribers: list[dict[str, str]],
+                               result: Optional[dict[str, Any]] = None) -> None:
+    """Save a research job's result (or its error when result is None) into each waiting lead's COIA memory"""
+    from agents.coia.memory_integration import save_coia_state
+
+    async def save(subscriber: dict[str, str]) -> None:
+        if result is not None:
+            state = {
+                "contractor_lead_id": subscriber["contractor_lead_id"],
+                "session_id": subscriber.get("session_id"),
+                "company_name": job.company_name,
+                "research_complete": True,
+                "research_data": result.get("research_data", {}),
+                "profile": result.get("profile", {}),
+                "research_job_id": job.id,
+                "timestamp": datetime.now().isoformat()
+            }
+        else:
+            state = {
+                "contractor_lead_id": subscriber["contractor_lead_id"],
+                "session_id": subscriber.get("session_id"),
+                "research_complete": False,
+                "research_error": job.error,
+                "research_job_id": job.id,
+                "timestamp": datetime.now().isoformat()
+            }
+        await save_coia_state(subscriber["contractor_lead_id"], state, subscriber.get("session_id"))
+
+    results = await asyncio.gather(*(save(s) for s in subscribers), return_exceptions=True)
+    for subscriber, outcome in zip(subscribers, results):
+        if isinstance(outcome, Exception):
+            logger.error(f"❌ Could not save research for lead {subscriber['contractor_lead_id']}: {outcome}")
+
+
+async def run_research_job(job: ResearchJob, progress) -> dict[str, Any]:
     """
-    Background research task that runs async after immediate response
+    Research job runner: Google, licenses and Tavily (as soon as the website is
+    known) run concurrently, then results are saved for every waiting session
     """
+    logger.info(f"🔍 Starting background research for {job.company_name}...")
+
+    # Import COIA tools for research
+    from agents.coia.deepagents_tools import coia_tools
+
     try:
-        logger.info(f"🔍 Starting background research for {company_name}...")
-        
-        # Import COIA tools for research
-        from agents.coia.deepagents_tools import coia_tools
-        
-        # Use async methods directly since we're already in async context
-        google_data = await coia_tools.search_google_business(company_name, location_hint)
-        logger.info(f"✅ Google search complete: {bool(google_data)}")
-        
-        # Try Tavily if enabled
-        tavily_data = {}
-        if coia_tools.tavily_search.use_tavily:
-            tavily_data = await coia_tools.tavily_search.discover_contractor_pages(
-                company_name, 
-                google_data.get("website", "") if google_data else "",
-                location_hint
-            )
-            logger.info(f"✅ Tavily search complete: {bool(tavily_data)}")
-        
-        research_data = {
-            "company_name": company_name,
-            "google_data": google_data or {},
-            "tavily_data": tavily_data,
-            "completeness": 50 if google_data else 10
-        }
-        
-        # Step 2: Build basic profile (skip AI extraction for speed)
-        profile = {
-            "company_name": company_name,
-            "location": location_hint,
-            "website": google_data.get("website") if google_data else None,
-            "phone": google_data.get("phone") if google_data else None,
-            "address": google_data.get("address") if google_data else None,
-            "rating": google_data.get("rating") if google_data else None,
-        }
-        
-        # Save research results to memory
-        from agents.coia.memory_integration import save_coia_state
-        
-        research_state = {
-            "contractor_lead_id": contractor_lead_id,
-            "session_id": session_id,
-            "company_name": company_name,
-            "research_complete": True,
-            "research_data": research_data,
-            "profile": profile,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        await save_coia_state(contractor_lead_id, research_state, session_id)
-        logger.info(f"✅ Background research saved for {company_name}")
-        
-        # TODO: Send WebSocket notification that research is complete
-        # await notify_research_complete(session_id, contractor_lead_id)
-        
+        research_data = await coia_tools.web_search_company(job.company_name, job.location, progress=progress)
     except Exception as e:
         logger.error(f"❌ Background research failed: {e}")
-        # Save error state
-        error_state = {
-            "contractor_lead_id": contractor_lead_id,
-            "session_id": session_id,
-            "research_complete": False,
-            "research_error": str(e),
+        job.error = str(e)
+        await _save_research_state(job, list(job.subscribers))
+        raise
+
+    google_data = research_data.get("google_data") or {}
+    logger.info(f"✅ Research sources complete for {job.company_name}: {research_data.get('data_sources')}")
+
+    result = {
+        "research_data": research_data,
+        "profile": _basic_profile(job.company_name, job.location, google_data),
+    }
+
+    # Sessions may have joined while research ran - save for all of them
+    await _save_research_state(job, list(job.subscribers), result)
+    logger.info(f"✅ Background research saved for {job.company_name}")
+    await progress("saved", leads=len(job.subscribers))
+    return result
+
+
+_research_queue: Optional[ResearchJobQueue] = None
+
+
+def get_research_queue() -> ResearchJobQueue:
+    """Process-wide research job queue, pushing progress to the COIA websocket"""
+    global _research_queue
+    if _research_queue is None:
+        _research_queue = ResearchJobQueue(
+            store=get_research_job_store(),
+            runner=run_research_job,
+            notifier=connection_manager.send_to_session
+        )
+    return _research_queue
+
+
+async def start_background_research(
+    contractor_lead_id: str,
+    session_id: str,
+    company_name: str,
+    location_hint: Optional[str] = None
+) -> ResearchJob:
+    """Queue research for a lead, joining or reusing any job for the same company"""
+    job = await get_research_queue().submit(company_name, location_hint, contractor_lead_id, session_id)
+    if job.status == COMPLETED:
+        # Fresh results already exist - apply them to this lead straight away
+        await _save_research_state(
+            job, [{"contractor_lead_id": contractor_lead_id, "session_id": session_id}], job.result or {}
+        )
+        await connection_manager.send_to_session(session_id, {
+            "type": "research_complete",
+            "job_id": job.id,
+            "company_name": job.company_name,
+            "status": job.status,
+            "result": job.result,
             "timestamp": datetime.now().isoformat()
-        }
-        from agents.coia.memory_integration import save_coia_state
-        await save_coia_state(contractor_lead_id, error_state, session_id)
+        })
+    return job
+
+
+async def resume_research_jobs() -> int:
+    """Pick up research jobs interrupted by a worker restart (called from app startup)"""
+    return await get_research_queue().resume_pending()
+
+
+async def shutdown_research_jobs() -> None:
+    if _research_queue is not None:
+        await _research_queue.shutdown()
 
 
 # Request/Response Models
@@ -344,6 +433,19 @@ async def landing_page_conversation(request: ChatRequest) -> CoIAResponse:
             
             parallel_orchestrator.set_conversation_handler(send_to_main_chat)
             
+            # Start background research before the agent runs, so the research-agent
+            # tool can reuse it instead of researching the same company again
+            if company_name != "your business":
+                try:
+                    await start_background_research(
+                        contractor_lead_id,
+                        request.session_id,
+                        company_name,
+                        location_hint
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Could not queue background research: {e}")
+            
             # Use DeepAgents for real conversation (slow but intelligent)
             logger.info("🤖 Calling DeepAgents for real conversation...")
             
@@ -473,15 +575,6 @@ This helps me match you with the best projects in your area."""
             
             logger.info(f"⚡ Fast template response generated ({len(response_message)} chars)")
         
-        # Start background research (non-blocking) - ONLY if using DeepAgents
-        if use_deepagents:
-            asyncio.create_task(run_research_in_background(
-                contractor_lead_id, 
-                request.session_id, 
-                company_name,
-                location_hint if 'location_hint' in locals() else None
-            ))
-        
         logger.info(f"✅ Response sent with research running in background for {company_name}")
         
         # Build response
@@ -530,6 +623,24 @@ async def get_agent_status(session_id: str) -> dict[str, Any]:
             "timestamp": datetime.now().isoformat()
         }
 
+# Research Job Status (for clients reconnecting after a missed websocket update)
+@router.get("/research-jobs/{job_id}")
+async def get_research_job(job_id: str) -> dict[str, Any]:
+    """Get the stored state of a background research job"""
+    job = await asyncio.to_thread(get_research_queue().store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Research job not found")
+    return {
+        "success": True,
+        "job_id": job.id,
+        "company_name": job.company_name,
+        "status": job.status,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "timestamp": datetime.now().isoformat()
+    }
+
 # Health Check
 @router.get("/health")
 async def health_check() -> dict[str, Any]:
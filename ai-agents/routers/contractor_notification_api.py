@@ -3,9 +3,11 @@ Contractor Notification API
 Provides endpoints for contractors to view and manage their notifications
 """
 
-from typing import Optional
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
 from database import SupabaseDB
+from services.notification_inbox import INBOX_MAX_PAGE_SIZE, get_notification_inbox
 
 # Create router
 router = APIRouter()
@@ -74,6 +76,52 @@ async def mark_notification_as_read(notification_id: str):
         raise HTTPException(500, f"Failed to mark notification as read: {str(e)}")
 
 
+class MarkReadRequest(BaseModel):
+    notification_ids: List[str] = []
+    through_cursor: Optional[int] = None
+
+
+@router.get("/contractor/{contractor_id}/inbox")
+async def get_contractor_inbox(
+    contractor_id: str,
+    cursor: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=INBOX_MAX_PAGE_SIZE)
+):
+    """Unread notifications after cursor, one page at a time (same pages as the WebSocket replay)"""
+    try:
+        page = await get_notification_inbox().replay(contractor_id, cursor, limit)
+        return {
+            "success": True,
+            "notifications": page.notifications,
+            "cursor": page.cursor,
+            "has_more": page.has_more
+        }
+        
+    except Exception as e:
+        print(f"Error loading contractor inbox: {e}")
+        raise HTTPException(500, f"Failed to load inbox: {str(e)}")
+
+
+@router.post("/contractor/{contractor_id}/mark-read")
+async def mark_contractor_notifications_read(contractor_id: str, request: MarkReadRequest):
+    """Mark many notifications read: the given ids, or everything up to through_cursor"""
+    if not request.notification_ids and request.through_cursor is None:
+        raise HTTPException(400, "notification_ids or through_cursor is required")
+    try:
+        marked = get_notification_inbox().mark_read(
+            contractor_id, request.notification_ids, request.through_cursor
+        )
+        return {
+            "success": True,
+            "marked": len(marked),
+            "notification_ids": marked
+        }
+        
+    except Exception as e:
+        print(f"Error marking notifications as read: {e}")
+        raise HTTPException(500, f"Failed to mark notifications as read: {str(e)}")
+
+
 @router.get("/contractor/{contractor_id}/all")
 async def get_all_contractor_notifications(contractor_id: str):
     """Get all notifications for a contractor (both bid card changes and other types)"""
@@ -1,15 +1,21 @@
 """
 Contractor WebSocket Routes - Real-time Notifications for Contractors
 Handles bid card change notifications and other real-time updates
+
+Messages go through the WebSocket backplane (channel contractor:{id}), so a
+notification produced on any worker reaches the worker holding the socket.
+On connect (and on {"type": "resume"}) unread notifications after the
+client's cursor are replayed as one notification_batch frame per page.
 """
 
 import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from database_simple import db
+from services.notification_inbox import InboxPage, NotificationInbox, get_notification_inbox, parse_cursor
+from utils.ws_backplane import WebSocketBackplane, contractor_channel, get_backplane
 
 logger = logging.getLogger(__name__)
 
@@ -23,23 +29,39 @@ connection_lock = asyncio.Lock()
 class ContractorWebSocketManager:
     """Manages WebSocket connections for contractors"""
     
-    def __init__(self):
+    def __init__(self, backplane: Optional[WebSocketBackplane] = None,
+                 inbox: Optional[NotificationInbox] = None):
+        self._backplane = backplane
+        self._inbox = inbox
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # Per-connection replay position (inbox_seq of the last notification sent)
+        self.cursors: Dict[WebSocket, int] = {}
         self.connection_lock = asyncio.Lock()
+
+    @property
+    def backplane(self) -> WebSocketBackplane:
+        """Process-wide backplane unless one was injected"""
+        return self._backplane or get_backplane()
+
+    @property
+    def inbox(self) -> NotificationInbox:
+        return self._inbox or get_notification_inbox()
     
-    async def connect(self, contractor_id: str, websocket: WebSocket):
+    async def connect(self, contractor_id: str, websocket: WebSocket, cursor: int = 0):
         """Add a new contractor WebSocket connection"""
         await websocket.accept()
         
+        # Subscribing under the lock keeps it ordered with a racing disconnect's unsubscribe
         async with self.connection_lock:
             if contractor_id not in self.active_connections:
                 self.active_connections[contractor_id] = set()
+                await self.backplane.subscribe(contractor_channel(contractor_id), self._deliver)
             self.active_connections[contractor_id].add(websocket)
         
         logger.info(f"Contractor {contractor_id} connected via WebSocket")
         
-        # Send initial connection confirmation
-        await self.send_personal_message(
+        # Send initial connection confirmation (this socket's worker only)
+        await self.send_local_message(
             contractor_id,
             {
                 "type": "connection_established",
@@ -48,86 +70,68 @@ class ContractorWebSocketManager:
             }
         )
         
-        # Send any pending notifications
-        await self.send_pending_notifications(contractor_id)
+        # Replay unread notifications after the client's last-seen cursor
+        await self.send_pending_notifications(contractor_id, websocket, cursor, always=False)
     
     async def disconnect(self, contractor_id: str, websocket: WebSocket):
         """Remove a contractor WebSocket connection"""
+        self.cursors.pop(websocket, None)
         async with self.connection_lock:
             if contractor_id in self.active_connections:
                 self.active_connections[contractor_id].discard(websocket)
                 if not self.active_connections[contractor_id]:
                     del self.active_connections[contractor_id]
+                    await self.backplane.unsubscribe(contractor_channel(contractor_id), self._deliver)
         
         logger.info(f"Contractor {contractor_id} disconnected from WebSocket")
     
-    async def send_personal_message(self, contractor_id: str, message: dict):
-        """Send a message to all connections for a specific contractor"""
+    async def send_personal_message(self, contractor_id: str, message: dict) -> int:
+        """Send a message to all connections for a specific contractor, on any worker"""
+        return await self.backplane.publish(contractor_channel(contractor_id), message)
+
+    async def _deliver(self, channel: str, message: dict) -> int:
+        return await self.send_local_message(channel.split(":", 1)[1], message)
+
+    async def send_local_message(self, contractor_id: str, message: dict) -> int:
+        """Send a message to the contractor's connections held by this worker"""
+        sent = 0
         if contractor_id in self.active_connections:
             disconnected = set()
-            for websocket in self.active_connections[contractor_id]:
+            for websocket in list(self.active_connections[contractor_id]):
                 try:
                     await websocket.send_json(message)
+                    sent += 1
                 except Exception as e:
                     logger.error(f"Error sending to contractor {contractor_id}: {e}")
                     disconnected.add(websocket)
             
             # Clean up disconnected websockets
-            if disconnected:
-                async with self.connection_lock:
-                    self.active_connections[contractor_id] -= disconnected
-                    if not self.active_connections[contractor_id]:
-                        del self.active_connections[contractor_id]
+            for websocket in disconnected:
+                await self.disconnect(contractor_id, websocket)
+        return sent
     
-    async def send_pending_notifications(self, contractor_id: str):
-        """Send all unread notifications to a contractor"""
+    async def send_pending_notifications(self, contractor_id: str, websocket: WebSocket,
+                                         cursor: Optional[int] = None, always: bool = True) -> Optional[InboxPage]:
+        """Replay one page of unread notifications after cursor to a single socket, as one frame"""
+        if cursor is None:
+            cursor = self.cursors.get(websocket, 0)
         try:
-            # Get contractor_lead_id if exists
-            lead_result = db.client.table("contractor_leads")\
-                .select("id")\
-                .eq("contractor_id", contractor_id)\
-                .limit(1)\
-                .execute()
-            
-            contractor_lead_id = lead_result.data[0]["id"] if lead_result.data else None
-            
-            # Get unread notifications
-            query = db.client.table("notifications")\
-                .select("*")\
-                .eq("is_read", False)\
-                .order("created_at", desc=True)
-            
-            # Add contractor filters
-            if contractor_lead_id:
-                query = query.or_(f"contractor_id.eq.{contractor_lead_id},metadata->>contractor_id.eq.{contractor_id}")
-            else:
-                query = query.eq("metadata->>contractor_id", contractor_id)
-            
-            notifications_result = query.execute()
-            
-            if notifications_result.data:
-                for notification in notifications_result.data:
-                    # Format notification for WebSocket
-                    ws_message = {
-                        "type": "notification",
-                        "notification": {
-                            "id": notification["id"],
-                            "title": notification["title"],
-                            "message": notification["message"],
-                            "notification_type": notification.get("metadata", {}).get("notification_type", "general"),
-                            "bid_card_id": notification.get("metadata", {}).get("bid_card_id"),
-                            "action_url": notification.get("action_url"),
-                            "created_at": notification["created_at"],
-                            "is_read": notification["is_read"]
-                        }
-                    }
-                    
-                    await self.send_personal_message(contractor_id, ws_message)
-                
-                logger.info(f"Sent {len(notifications_result.data)} pending notifications to contractor {contractor_id}")
-        
+            page = await self.inbox.replay(contractor_id, cursor)
         except Exception as e:
             logger.error(f"Error sending pending notifications to {contractor_id}: {e}")
+            return None
+
+        self.cursors[websocket] = page.cursor
+        if page.notifications or always:
+            try:
+                await websocket.send_json(page.to_frame())
+            except Exception as e:
+                logger.error(f"Error replaying notifications to contractor {contractor_id}: {e}")
+                await self.disconnect(contractor_id, websocket)
+                return None
+            logger.info(f"Replayed {len(page.notifications)} notifications to contractor {contractor_id}"
+                        f" after cursor {cursor}")
+        return page
     
     async def broadcast_bid_card_change(self, bid_card_id: str, engaged_contractors: list, change_details: dict):
         """Broadcast bid card change notification to engaged contractors"""
@@ -140,22 +144,48 @@ class ContractorWebSocketManager:
             "action_url": f"/bid-cards/{bid_card_id}"
         }
         
-        # Send to each engaged contractor
-        for contractor_id in engaged_contractors:
-            await self.send_personal_message(contractor_id, message)
+        # Send to all connected engaged contractors in one pass
+        await self.send_many(dict.fromkeys(engaged_contractors, message))
         
         logger.info(f"Broadcast bid card change for {bid_card_id} to {len(engaged_contractors)} contractors")
     
+    async def send_many(self, messages: Dict[str, dict]) -> int:
+        """Publish one message per contractor in one pass; returns sockets reached on this worker"""
+        backplane = self.backplane
+        delivered = await asyncio.gather(*(
+            backplane.publish(contractor_channel(contractor_id), message)
+            for contractor_id, message in messages.items()
+        ))
+        return sum(delivered)
+
+    async def mark_notifications_read(self, contractor_id: str,
+                                      notification_ids: Optional[List[str]] = None,
+                                      through_cursor: Optional[int] = None) -> List[str]:
+        """Bulk mark-read (ids or everything up to a cursor); every open tab gets one confirmation"""
+        try:
+            marked = await asyncio.to_thread(self.inbox.mark_read, contractor_id, notification_ids, through_cursor)
+        except Exception as e:
+            logger.error(f"Error marking notifications read for contractor {contractor_id}: {e}")
+            return []
+
+        if marked:
+            await self.send_personal_message(
+                contractor_id,
+                {
+                    "type": "notifications_marked_read",
+                    "notification_ids": marked,
+                    "through_cursor": through_cursor,
+                    "timestamp": datetime.now().isoformat()
+                }
+            )
+        return marked
+
     async def mark_notification_read(self, contractor_id: str, notification_id: str):
         """Mark a notification as read and send confirmation"""
         try:
-            # Update notification in database
-            result = db.client.table("notifications")\
-                .update({"is_read": True, "read_at": datetime.now().isoformat()})\
-                .eq("id", notification_id)\
-                .execute()
+            marked = await asyncio.to_thread(self.inbox.mark_read, contractor_id, [notification_id])
             
-            if result.data:
+            if marked:
                 # Send confirmation to contractor
                 await self.send_personal_message(
                     contractor_id,
@@ -179,10 +209,11 @@ contractor_ws_manager = ContractorWebSocketManager()
 @router.websocket("/ws/contractor/{contractor_id}")
 async def contractor_websocket_endpoint(
     websocket: WebSocket,
-    contractor_id: str
+    contractor_id: str,
+    cursor: Optional[str] = Query(None, description="Last inbox cursor this client has seen")
 ):
     """WebSocket endpoint for contractor real-time notifications"""
-    await contractor_ws_manager.connect(contractor_id, websocket)
+    await contractor_ws_manager.connect(contractor_id, websocket, parse_cursor(cursor))
     
     try:
         while True:
@@ -197,10 +228,24 @@ async def contractor_websocket_endpoint(
                     "timestamp": datetime.now().isoformat()
                 })
             
+            elif data.get("type") == "resume":
+                # Next page of unread notifications (from this connection's cursor unless given)
+                await contractor_ws_manager.send_pending_notifications(
+                    contractor_id,
+                    websocket,
+                    parse_cursor(data["cursor"]) if "cursor" in data else None
+                )
+            
             elif data.get("type") == "mark_read":
-                # Mark notification as read
+                # Mark notifications as read: a list, everything up to a cursor, or a single id
                 notification_id = data.get("notification_id")
-                if notification_id:
+                if data.get("notification_ids") or data.get("through_cursor") is not None:
+                    await contractor_ws_manager.mark_notifications_read(
+                        contractor_id,
+                        data.get("notification_ids"),
+                        parse_cursor(data["through_cursor"]) if data.get("through_cursor") is not None else None
+                    )
+                elif notification_id:
                     await contractor_ws_manager.mark_notification_read(
                         contractor_id, 
                         notification_id
@@ -227,6 +272,7 @@ async def contractor_websocket_endpoint(
 @router.get("/ws/contractor/{contractor_id}/status")
 async def get_contractor_ws_status(contractor_id: str):
     """Check if a contractor has active WebSocket connections"""
+    # Connections held by this worker only
     is_connected = contractor_id in contractor_ws_manager.active_connections
     connection_count = len(contractor_ws_manager.active_connections.get(contractor_id, set()))
     
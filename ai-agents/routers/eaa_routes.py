@@ -122,6 +122,29 @@ async def process_eaa_response(response_data: dict):
         print(f"[EAA RESPONSE ERROR] {e}")
         raise HTTPException(500, f"Failed to process response: {e!s}")
 
+@router.post("/response/process-batch")
+async def process_eaa_responses(batch_data: dict):
+    """Process a batch of contractor responses (inbound webhook / IMAP deliveries)"""
+    if not eaa_agent:
+        raise HTTPException(500, "EAA agent not initialized")
+
+    responses = batch_data.get("responses") or []
+    if not all(r.get("message_id") and r.get("response_content") and r.get("channel") for r in responses):
+        raise HTTPException(400, "every response needs message_id, response_content, and channel")
+
+    try:
+        results = eaa_agent.process_responses(responses)
+        return {
+            "success": True,
+            "processed": sum(1 for r in results if r["success"]),
+            "failed": sum(1 for r in results if not r["success"]),
+            "results": results
+        }
+
+    except Exception as e:
+        print(f"[EAA RESPONSE ERROR] {e}")
+        raise HTTPException(500, f"Failed to process responses: {e!s}")
+
 @router.post("/onboarding/start")
 async def start_eaa_onboarding(onboarding_data: dict):
     """Start contractor onboarding process"""
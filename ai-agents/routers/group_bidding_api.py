@@ -12,6 +12,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, Field
 
 from database_simple import get_client
+from services.group_pool_index import MAX_RADIUS_MILES, POOL_MATCH_RADIUS_MILES, GroupPoolIndex
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -122,35 +123,30 @@ async def get_service_categories(
 @router.get("/api/group-pools/local")
 async def get_local_pools(
     zip_code: str = Query(..., description="ZIP code to search for pools"),
-    category_id: Optional[str] = Query(None, description="Filter by category")
+    category_id: Optional[str] = Query(None, description="Filter by category"),
+    radius_miles: float = Query(POOL_MATCH_RADIUS_MILES, gt=0, le=MAX_RADIUS_MILES, description="Search radius")
 ):
-    """Get existing pools in a specific area"""
+    """Get forming pools within a radius of a ZIP code, nearest first"""
     try:
         supabase = get_client()
         
-        query = supabase.table("group_bidding_pools").select("""
+        nearby = GroupPoolIndex(supabase).nearby(zip_code, category_id, radius_miles, columns="""
             *,
             group_bidding_categories!inner(display_name, icon_name, primary_trade)
-        """).eq("zip_code", zip_code).eq("pool_status", "forming")
-        
-        if category_id:
-            query = query.eq("category_id", category_id)
-        
-        response = query.execute()
+        """)
         
         pools = []
-        if response.data:
-            for pool in response.data:
-                pool_data = {
-                    **pool,
-                    "category_name": pool["group_bidding_categories"]["display_name"],
-                    "category_icon": pool["group_bidding_categories"]["icon_name"],
-                    "primary_trade": pool["group_bidding_categories"]["primary_trade"]
-                }
-                pools.append(pool_data)
+        for pool in nearby:
+            pool_data = {
+                **pool,
+                "category_name": pool["group_bidding_categories"]["display_name"],
+                "category_icon": pool["group_bidding_categories"]["icon_name"],
+                "primary_trade": pool["group_bidding_categories"]["primary_trade"]
+            }
+            pools.append(pool_data)
         
-        logger.info(f"Found {len(pools)} local pools for ZIP {zip_code}")
-        return {"pools": pools, "zip_code": zip_code}
+        logger.info(f"Found {len(pools)} pools within {radius_miles} miles of ZIP {zip_code}")
+        return {"pools": pools, "zip_code": zip_code, "radius_miles": radius_miles}
     
     except Exception as e:
         logger.error(f"Error retrieving local pools: {str(e)}")
@@ -161,15 +157,13 @@ async def create_pool(request: CreatePoolRequest):
     """Create a new group pool or join an existing one"""
     try:
         supabase = get_client()
+        index = GroupPoolIndex(supabase)
         
-        # Check if pool already exists for this category and ZIP code
-        existing_pool = supabase.table("group_bidding_pools").select("*").eq(
-            "category_id", request.category_id
-        ).eq("zip_code", request.zip_code).eq("pool_status", "forming").execute()
+        # Join a forming pool nearby (not just in this ZIP) so neighbours share one pool
+        pool = index.find_joinable(request.category_id, request.zip_code)
         
-        if existing_pool.data:
+        if pool:
             # Join existing pool
-            pool = existing_pool.data[0]
             pool_id = pool["id"]
             
             # Check if user already joined this pool
@@ -221,7 +215,8 @@ async def create_pool(request: CreatePoolRequest):
                 "member_count": 1,
                 "target_member_count": 3,
                 "start_date": datetime.now().date().isoformat(),
-                "estimated_savings_percentage": 15.0
+                "estimated_savings_percentage": 15.0,
+                **index.location_fields(request.zip_code)
             }
             
             supabase.table("group_bidding_pools").insert(pool_data).execute()
@@ -356,24 +351,29 @@ async def get_pool_members(pool_id: str):
 @router.get("/api/group-categories/{category_id}/local-stats")
 async def get_category_local_stats(
     category_id: str,
-    zip_code: str = Query(..., description="ZIP code for local statistics")
+    zip_code: str = Query(..., description="ZIP code for local statistics"),
+    radius_miles: float = Query(POOL_MATCH_RADIUS_MILES, gt=0, le=MAX_RADIUS_MILES, description="Area radius")
 ):
     """Get local statistics for a specific service category"""
     try:
         supabase = get_client()
         
-        # Get active pools for this category and ZIP
-        pools = supabase.table("group_bidding_pools").select("*").eq(
-            "category_id", category_id
-        ).eq("zip_code", zip_code).eq("pool_status", "forming").execute()
-        
-        # Get completed pools for this category and ZIP (for success rate)
-        completed_pools = supabase.table("group_bidding_pools").select("*").eq(
-            "category_id", category_id
-        ).eq("zip_code", zip_code).eq("pool_status", "fulfilled").execute()
+        # Counters for the cells around the ZIP (maintained by the migration 019 trigger)
+        stats = GroupPoolIndex(supabase).area_stats(category_id, zip_code, radius_miles)
+        if stats is None:
+            # ZIP without coordinates: fall back to counting its own pools
+            pools = supabase.table("group_bidding_pools").select("pool_status, member_count").eq(
+                "category_id", category_id
+            ).eq("zip_code", zip_code).in_("pool_status", ["forming", "fulfilled"]).execute().data or []
+            forming = [pool for pool in pools if pool["pool_status"] == "forming"]
+            stats = {
+                "forming_pools": len(forming),
+                "forming_members": sum(pool["member_count"] or 0 for pool in forming),
+                "fulfilled_pools": len(pools) - len(forming),
+            }
         
-        total_active_members = sum(pool["member_count"] for pool in pools.data) if pools.data else 0
-        completed_count = len(completed_pools.data) if completed_pools.data else 0
+        total_active_members = stats["forming_members"]
+        completed_count = stats["fulfilled_pools"]
         
         # Calculate potential savings based on member count
         potential_savings = 15  # Base discount
@@ -385,7 +385,8 @@ async def get_category_local_stats(
         return {
             "category_id": category_id,
             "zip_code": zip_code,
-            "active_pools": len(pools.data) if pools.data else 0,
+            "radius_miles": radius_miles,
+            "active_pools": stats["forming_pools"],
             "total_active_members": total_active_members,
             "completed_pools": completed_count,
             "potential_savings_percentage": potential_savings,
@@ -25,13 +25,13 @@ def set_jaa_agent(agent: JobAssessmentAgent):
     jaa_agent = agent
 
 @router.post("/process/{thread_id}")
-async def process_with_jaa(thread_id: str):
-    """Process CIA conversation with JAA to generate bid card"""
+async def process_with_jaa(thread_id: str, rebuild: bool = False):
+    """Process CIA conversation with JAA to generate bid card (rebuild=true re-reads the whole thread)"""
     if not jaa_agent:
         raise HTTPException(500, "JAA agent not initialized")
 
     try:
-        result = await jaa_agent.process_conversation(thread_id)
+        result = await jaa_agent.process_conversation(thread_id, rebuild=rebuild)
 
         if result["success"]:
             return {
@@ -67,7 +67,8 @@ async def update_bid_card_with_jaa(bid_card_id: str, update_request: dict):
             change_type=determine_change_type(update_request),
             description=result.get("update_summary", "Project has been updated"),
             previous_value=result.get("previous_value"),
-            new_value=result.get("new_value")
+            new_value=result.get("new_value"),
+            segment_content=result["notification_content"].get("segments")
         )
 
         return {
@@ -84,6 +85,7 @@ async def update_bid_card_with_jaa(bid_card_id: str, update_request: dict):
                 "success": notification_result["success"],
                 "contractors_notified": notification_result.get("contractors_notified", 0),
                 "engagement_breakdown": notification_result.get("engagement_breakdown", {}),
+                "segments": notification_result.get("segments", {}),
                 "error": notification_result.get("error")
             }
         }
@@ -14,6 +14,14 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 
 from database import SupabaseDB
+from services import bulk_mutations
+from services.data_loader import get_loader
+from services.attachment_storage import (
+    ATTACHMENT_TABLE,
+    REFERENCE_COLUMNS,
+    AttachmentStorage,
+    attachment_reference,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,6 +47,17 @@ def ensure_uuid(value: Optional[str]) -> str:
         namespace_uuid = uuid.UUID("00000000-0000-0000-0000-000000000001")
         return str(uuid.uuid5(namespace_uuid, value))
 
+def attachments_by_message(supabase, message_ids: List[str], include_data: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+    """Fetch attachment references for many messages in one query"""
+    columns = f"{REFERENCE_COLUMNS}, file_data" if include_data else REFERENCE_COLUMNS
+    rows = get_loader(supabase).load_related_many(
+        ATTACHMENT_TABLE, "message_id", message_ids, columns=columns, order="created_at"
+    )
+    return {
+        message_id: [attachment_reference(att, include_data) for att in atts]
+        for message_id, atts in rows.items()
+    }
+
 # Pydantic models for unified conversation system
 class CreateConversationRequest(BaseModel):
     user_id: str
@@ -136,6 +155,14 @@ async def send_message(request: SendMessageRequest):
         # Ensure sender_id is valid UUID format if provided
         sender_uuid = ensure_uuid(request.sender_id) if request.sender_id else None
         
+        # Upload images first so a bad payload doesn't leave a message without its attachments
+        attachment_fields = []
+        if request.images:
+            try:
+                attachment_fields = await AttachmentStorage(supabase).attachment_fields_many(request.images)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
         # Create message record matching database schema
         message_data = {
             "id": message_id,
@@ -154,25 +181,26 @@ async def send_message(request: SendMessageRequest):
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to send message")
         
-        # Handle images if provided - save to unified_message_attachments
-        if request.images:
-            for i, image_data in enumerate(request.images):
-                attachment_id = str(uuid.uuid4())
-                attachment_data = {
-                    "id": attachment_id,
+        # Save attachment references (bytes live in the storage bucket) in one insert
+        if attachment_fields:
+            uploaded_at = datetime.utcnow().isoformat()
+            attachment_rows = [
+                {
+                    "id": str(uuid.uuid4()),
                     "message_id": message_id,
                     "attachment_type": "image",
-                    "file_data": image_data,  # base64 encoded
+                    **fields,
                     "metadata": {
                         "source": "user_upload",
                         "original_name": f"image_{i+1}.jpg",
-                        "uploaded_at": datetime.utcnow().isoformat()
+                        "uploaded_at": uploaded_at
                     },
-                    "created_at": datetime.utcnow().isoformat()
+                    "created_at": uploaded_at
                 }
-                
-                supabase.table("unified_message_attachments").insert(attachment_data).execute()
-                logger.info(f"Image attachment saved: {attachment_id}")
+                for i, fields in enumerate(attachment_fields)
+            ]
+            supabase.table(ATTACHMENT_TABLE).insert(attachment_rows).execute()
+            logger.info(f"Saved {len(attachment_rows)} attachment(s) for message {message_id}")
         
         # Update conversation updated_at
         supabase.table("unified_conversations").update({
@@ -185,6 +213,8 @@ async def send_message(request: SendMessageRequest):
             "data": result.data[0]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error sending message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -236,8 +266,8 @@ async def health_check():
     }
 
 @router.get("/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str):
-    """Get conversation with messages and attachments"""
+async def get_conversation(conversation_id: str, include_data: bool = False):
+    """Get conversation with messages and attachment references (include_data adds legacy inline bytes)"""
     try:
         supabase = db.client
         
@@ -251,31 +281,13 @@ async def get_conversation(conversation_id: str):
         # Get messages
         messages_result = supabase.table("unified_messages").select("*").eq("conversation_id", conversation_id).order("created_at").execute()
         
-        # Get attachments for each message
+        # Get attachment references for all messages at once
+        attachments = attachments_by_message(
+            supabase, [msg["id"] for msg in messages_result.data], include_data
+        )
         messages = []
         for msg in messages_result.data:
-            attachments_result = supabase.table("unified_message_attachments").select("*").eq("message_id", msg["id"]).execute()
-            
-            # Transform attachments to include public URLs for images
-            attachments = []
-            for att in attachments_result.data:
-                attachment = {
-                    "id": att["id"],
-                    "message_id": att["message_id"],
-                    "type": "image",  # Assume image type
-                    "mime_type": att.get("mime_type", "image/jpeg"),
-                    "file_size": att.get("file_size", 0),
-                    "storage_path": att.get("storage_path", ""),
-                    "created_at": att.get("created_at", ""),
-                }
-                
-                # Generate public URL from storage path
-                if att.get("storage_path"):
-                    attachment["url"] = f"https://xrhgrthdcaymxuqcgrmj.supabase.co/storage/v1/object/public/project-images/{att['storage_path']}"
-                
-                attachments.append(attachment)
-            
-            msg["attachments"] = attachments
+            msg["attachments"] = attachments[msg["id"]]
             messages.append(msg)
         
         # Get participants
@@ -297,7 +309,7 @@ async def get_conversation(conversation_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/conversations/{conversation_id}/messages-with-attachments")
-async def get_messages_with_attachments(conversation_id: str):
+async def get_messages_with_attachments(conversation_id: str, include_data: bool = False):
     """Get messages with properly formatted attachments for frontend display"""
     try:
         supabase = db.client
@@ -312,36 +324,14 @@ async def get_messages_with_attachments(conversation_id: str):
             }
         
         # Process each message and attach its attachments
+        attachments_lookup = attachments_by_message(
+            supabase, [msg["id"] for msg in messages_result.data], include_data
+        )
         processed_messages = []
         for msg in messages_result.data:
-            # Get attachments for this message
-            attachments_result = supabase.table("unified_message_attachments").select("*").eq("message_id", msg["id"]).execute()
-            
-            # Transform attachments for frontend consumption
-            attachments = []
-            for att in attachments_result.data:
-                attachment = {
-                    "id": att["id"],
-                    "message_id": att["message_id"],
-                    "type": "image",  # Default to image type
-                    "name": f"image_{len(attachments) + 1}.jpg",  # Default name
-                    "mime_type": att.get("mime_type", "image/jpeg"),
-                    "file_size": att.get("file_size", 0),
-                    "storage_path": att.get("storage_path", ""),
-                    "created_at": att.get("created_at", "")
-                }
-                
-                # Generate public URL from storage path if available
-                if att.get("storage_path"):
-                    attachment["url"] = f"https://xrhgrthdcaymxuqcgrmj.supabase.co/storage/v1/object/public/project-images/{att['storage_path']}"
-                else:
-                    attachment["url"] = ""
-                
-                # Include metadata if available
-                if att.get("metadata"):
-                    attachment["metadata"] = att["metadata"]
-                
-                attachments.append(attachment)
+            attachments = attachments_lookup[msg["id"]]
+            for index, attachment in enumerate(attachments):
+                attachment["name"] = f"image_{index + 1}.jpg"  # Default name
             
             # Add attachments to message
             message_with_attachments = {
@@ -458,51 +448,22 @@ async def migrate_anonymous_session(request: MigrateSessionRequest):
         # Ensure authenticated_user_id is valid UUID format
         authenticated_user_uuid = ensure_uuid(request.authenticated_user_id)
         
-        # Find all conversations with the anonymous session ID
-        conversations_result = supabase.table("unified_conversations").select("*").eq(
-            "metadata->>session_id", request.anonymous_session_id
-        ).execute()
+        # Re-own conversations, user messages and participants in one set-based operation
+        counts = bulk_mutations.migrate_anonymous_session(
+            supabase, request.anonymous_session_id, authenticated_user_uuid
+        )
+        migrated_conversations = counts["conversations"]
+        migrated_messages = counts["messages"]
         
-        if not conversations_result.data:
+        if not migrated_conversations:
             return {
                 "success": True,
                 "message": "No anonymous conversations found to migrate",
                 "migrated_conversations": 0,
-                "migrated_messages": 0
+                "migrated_messages": 0,
+                "migrated_participants": 0
             }
         
-        migrated_conversations = 0
-        migrated_messages = 0
-        
-        for conversation in conversations_result.data:
-            conversation_id = conversation["id"]
-            
-            # Update conversation to use authenticated user ID
-            supabase.table("unified_conversations").update({
-                "created_by": authenticated_user_uuid,
-                "entity_id": authenticated_user_uuid,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", conversation_id).execute()
-            
-            # Update all messages in this conversation to use authenticated user ID
-            messages_result = supabase.table("unified_messages").select("id").eq(
-                "conversation_id", conversation_id
-            ).execute()
-            
-            for message in messages_result.data:
-                message_id = message["id"]
-                supabase.table("unified_messages").update({
-                    "sender_id": authenticated_user_uuid
-                }).eq("id", message_id).eq("sender_type", "user").execute()
-                migrated_messages += 1
-            
-            # Update participant record
-            supabase.table("unified_conversation_participants").update({
-                "participant_id": authenticated_user_uuid
-            }).eq("conversation_id", conversation_id).execute()
-            
-            migrated_conversations += 1
-            
         logger.info(f"Migrated {migrated_conversations} conversations and {migrated_messages} messages for user {request.authenticated_user_id}")
         
         return {
@@ -510,6 +471,7 @@ async def migrate_anonymous_session(request: MigrateSessionRequest):
             "message": f"Successfully migrated {migrated_conversations} conversations",
             "migrated_conversations": migrated_conversations,
             "migrated_messages": migrated_messages,
+            "migrated_participants": counts["participants"],
             "user_id": authenticated_user_uuid
         }
         
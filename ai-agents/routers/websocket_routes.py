@@ -35,5 +35,5 @@ async def websocket_agent_activity(websocket: WebSocket):
                 "data": data
             }, websocket)
     except WebSocketDisconnect:
-        websocket_manager.disconnect(websocket, user_id)
+        await websocket_manager.disconnect(websocket, user_id)
         logger.info(f"Agent activity WebSocket disconnected for user: {user_id}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Backfill Script: Geo Cells for Group Bidding Pools
+Fills latitude/longitude/geo_cell on pools created before migration 019
+
+Run once after applying migration 019. The migration's trigger adds each pool
+to group_pool_cell_stats as its geo_cell is set, so no separate counter
+rebuild is needed. Pools whose ZIP has no known coordinates are left as they
+are and keep matching by exact ZIP.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database_simple import db
+from services.group_pool_index import GroupPoolIndex
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def backfill(client, dry_run: bool = False) -> dict:
+    index = GroupPoolIndex(client)
+    pools = client.table("group_bidding_pools").select("id, zip_code").is_("geo_cell", "null").execute().data or []
+
+    located, unknown = 0, []
+    for pool in pools:
+        fields = index.location_fields(pool.get("zip_code") or "")
+        if not fields:
+            unknown.append(pool.get("zip_code"))
+            continue
+        located += 1
+        if not dry_run:
+            client.table("group_bidding_pools").update(fields).eq("id", pool["id"]).execute()
+
+    if unknown:
+        logger.warning(f"No coordinates for {len(unknown)} pools (ZIPs: {sorted(set(map(str, unknown)))[:20]})")
+    logger.info(f"✅ {'Would locate' if dry_run else 'Located'} {located} of {len(pools)} pools")
+    return {"pools": len(pools), "located": located, "unknown": len(unknown), "written": not dry_run}
+
+
+def main():
+    """Backfill entry point"""
+    parser = argparse.ArgumentParser(description="Fill geo cells on group bidding pools")
+    parser.add_argument("--dry-run", action="store_true", help="Resolve coordinates without writing")
+    args = parser.parse_args()
+    backfill(db.client, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
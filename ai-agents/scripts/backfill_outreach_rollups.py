@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Backfill Script: Rebuild Outreach Analytics Rollups
+Recomputes outreach_rollups_daily and followup_rollups_daily from
+bid_card_distributions and followup_logs
+
+Run once after applying migrations 013 and 023, and again for any day range
+whose rollups are suspected to have drifted (e.g. writes made before the
+distribution trigger existed).
+Events tracked while a day is being rebuilt may be missed, so prefer
+quiet hours or re-run for the most recent days.
+"""
+
+import argparse
+import logging
+import sys
+from datetime import date
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database_simple import db
+from services.outreach_rollups import (
+    DISTRIBUTION_ROLLUP_COLUMNS,
+    FOLLOWUP_TABLE,
+    OUTREACH_TABLE,
+    OutreachRollups,
+    fold_distributions,
+    fold_followups,
+    summarize_outreach,
+)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+def iter_rows(client, table: str, columns: str, timestamp_column: str, since: date = None):
+    """Page through a table in timestamp order without loading it all at once"""
+    offset = 0
+    while True:
+        query = client.table(table).select(columns).order(timestamp_column).order("id")
+        if since:
+            query = query.gte(timestamp_column, since.isoformat())
+        rows = query.range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        offset += PAGE_SIZE
+
+
+def backfill(client, since: date = None, dry_run: bool = False) -> dict:
+    rollups = OutreachRollups(client)
+
+    outreach = fold_distributions(
+        iter_rows(client, "bid_card_distributions", DISTRIBUTION_ROLLUP_COLUMNS, "distributed_at", since)
+    )
+    followups = fold_followups(
+        iter_rows(client, "followup_logs", "id, strategy, channel, created_at", "created_at", since)
+    )
+    logger.info(f"Computed {len(outreach)} outreach buckets and {len(followups)} follow-up buckets")
+
+    if dry_run:
+        return {"outreach_buckets": len(outreach), "followup_buckets": len(followups), "written": False}
+
+    # Clear the rebuilt range first so buckets whose rows were deleted do not linger
+    first_day = (since or date.min).isoformat()
+    client.table(OUTREACH_TABLE).delete().gte("day", first_day).execute()
+    client.table(FOLLOWUP_TABLE).delete().gte("day", first_day).execute()
+
+    written_outreach = rollups.replace_outreach(outreach)
+    written_followups = rollups.replace_followups(followups)
+    logger.info(f"✅ Wrote {written_outreach} outreach and {written_followups} follow-up rollup rows")
+    return {"outreach_buckets": written_outreach, "followup_buckets": written_followups, "written": True}
+
+
+def verify(client, since: date = None) -> bool:
+    """Compare the stored rollups with a fresh scan of the raw rows"""
+    expected = summarize_outreach(
+        {"channel": bucket.channel, **counters}
+        for bucket, counters in fold_distributions(
+            iter_rows(client, "bid_card_distributions", DISTRIBUTION_ROLLUP_COLUMNS, "distributed_at", since)
+        ).items()
+    )
+    actual = summarize_outreach(OutreachRollups(client).fetch_outreach(start=since))
+    if expected == actual:
+        logger.info("✅ Rollups match raw distributions")
+        return True
+    logger.error(f"❌ Rollup drift detected:\n  expected={expected}\n  actual={actual}")
+    return False
+
+
+def main():
+    """Backfill entry point"""
+    parser = argparse.ArgumentParser(description="Rebuild outreach analytics rollups from raw rows")
+    parser.add_argument("--since", type=date.fromisoformat, help="Only rebuild days on/after YYYY-MM-DD")
+    parser.add_argument("--dry-run", action="store_true", help="Compute buckets without writing")
+    parser.add_argument("--verify", action="store_true", help="Compare stored rollups with raw rows and exit")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(0 if verify(db.client, args.since) else 1)
+    backfill(db.client, since=args.since, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Per-contractor vs vectorized CDA scoring
+Times ContractorScorer and BidSpecificScoringEngine at 1k/10k/100k candidates
+
+Usage:
+    python scripts/benchmark_cda_scoring.py [--sizes 1000 10000 100000] [--top-k 25]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.cda.batch_scoring import BatchBidSpecificScorer, BatchContractorScorer
+from agents.cda.bid_specific_scoring import BidCardPreferences, BidSpecificScoringEngine
+from agents.cda.scoring import ContractorScorer
+
+
+SPECIALTIES = [["roofing repair"], ["kitchen remodeling"], ["general contracting"], ["plumbing"], []]
+
+
+def make_contractors(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"c{i}",
+            "company_name": rng.choice(["Ace Roofing", "Family Kitchens", "Big Corp Builders"]),
+            "discovery_tier": rng.choice([1, 2, 3]),
+            "match_score": rng.uniform(0, 100),
+            "rating": rng.uniform(2.5, 5.0),
+            "total_projects": rng.randint(0, 400),
+            "min_project_size": rng.choice([0, 1000, 5000]),
+            "max_project_size": rng.choice([10000, 50000, 999999]),
+            "availability": rng.choice(["available", "busy", "unavailable"]),
+            "onboarded": rng.random() < 0.5,
+            "license_number": "FL123" if rng.random() < 0.6 else None,
+            "insurance_verified": rng.random() < 0.5,
+            "specialties": rng.choice(SPECIALTIES),
+            "zip_codes": [rng.choice(["33442", "33101"])],
+            "google_rating": rng.uniform(2.5, 5.0),
+            "google_review_count": rng.randint(0, 400),
+            "phone": "(555) 123-4567" if rng.random() < 0.8 else "",
+            "website": "example.com" if rng.random() < 0.5 else "",
+            "zip_code": rng.choice(["33442", "33401"]),
+        }
+        for i in range(count)
+    ]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--top-k", type=int, default=25)
+    args = parser.parse_args()
+
+    bid_data = {"project_type": "roofing", "budget_max": 15000, "location": {"full_location": "FL 33442"}}
+    prefs = BidCardPreferences(
+        project_type="roofing", budget_range=(5000, 15000), urgency_level="week",
+        complexity="moderate", preferred_contractor_size="mom_and_pop",
+        quality_vs_price="balanced", special_requirements=["licensed", "insured"],
+        location_preference="local_only",
+    )
+    bid_location = {"zip_code": "33442"}
+
+    legacy_scorer = ContractorScorer()
+    legacy_engine = BidSpecificScoringEngine()
+    batch_scorer = BatchContractorScorer()
+    batch_engine = BatchBidSpecificScorer(legacy_engine)
+
+    print(f"{'candidates':>10} | {'scorer legacy':>14} | {'scorer batch':>13} | {'bid legacy':>11} | {'bid batch':>10}")
+    print("-" * 72)
+    for size in args.sizes:
+        contractors = make_contractors(size)
+
+        scorer_legacy = timed(lambda: sorted(
+            (legacy_scorer._calculate_total_score(c, bid_data) for c in contractors), reverse=True
+        ))
+        scorer_batch = timed(lambda: batch_scorer.score_contractors(contractors, bid_data, top_k=args.top_k))
+        bid_legacy = timed(lambda: sorted(
+            (legacy_engine.calculate_bid_specific_score(c, prefs, bid_location)["match_score"] for c in contractors),
+            reverse=True,
+        ))
+        bid_batch = timed(lambda: batch_engine.score_contractors(contractors, prefs, bid_location, top_k=args.top_k))
+
+        print(f"{size:>10} | {scorer_legacy:>11.1f} ms | {scorer_batch:>10.1f} ms | "
+              f"{bid_legacy:>8.1f} ms | {bid_batch:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Migration Script: Move Inline Message Attachments to Storage
+Uploads base64 file_data from unified_message_attachments to the attachment
+bucket (content-addressed, deduplicated) and leaves a reference row behind
+
+Rows are streamed: ids are paged with a keyset cursor and each payload is
+fetched on its own, so at most one attachment is held in memory at a time.
+Safe to re-run; rows that already have a storage_path are skipped.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database_simple import db
+from services.attachment_storage import ATTACHMENT_TABLE, AttachmentStorage, decode_attachment
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def pending_ids(client, batch_size: int):
+    """Ids of rows still holding inline data, in id order"""
+    last_id = None
+    while True:
+        query = (
+            client.table(ATTACHMENT_TABLE)
+            .select("id")
+            .is_("storage_path", "null")
+            .not_.is_("file_data", "null")
+            .order("id")
+            .limit(batch_size)
+        )
+        if last_id:
+            query = query.gt("id", last_id)
+        rows = query.execute().data or []
+        for row in rows:
+            yield row["id"]
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def migrate_attachments(client, batch_size: int = 100, dry_run: bool = False, keep_data: bool = False) -> dict:
+    storage = AttachmentStorage(client)
+    stats = {"migrated": 0, "deduplicated": 0, "errors": 0, "bytes_moved": 0}
+
+    for attachment_id in pending_ids(client, batch_size):
+        try:
+            row = client.table(ATTACHMENT_TABLE).select("id, file_data").eq("id", attachment_id).execute().data[0]
+            raw, mime_type = decode_attachment(row["file_data"])
+            stats["bytes_moved"] += len(row["file_data"])
+            if dry_run:
+                stats["migrated"] += 1
+                continue
+
+            stored = storage.store(raw, mime_type)
+            update = stored.as_row()
+            if not keep_data:
+                update["file_data"] = None
+            client.table(ATTACHMENT_TABLE).update(update).eq("id", attachment_id).execute()
+
+            stats["migrated"] += 1
+            stats["deduplicated"] += int(stored.deduplicated)
+            if stats["migrated"] % 100 == 0:
+                logger.info(f"Migrated {stats['migrated']} attachments ({stats['bytes_moved']:,} bytes)")
+        except Exception as e:
+            logger.error(f"❌ Failed to migrate attachment {attachment_id}: {e}")
+            stats["errors"] += 1
+
+    return stats
+
+
+def main():
+    """Migration entry point"""
+    parser = argparse.ArgumentParser(description="Move inline message attachments to bucket storage")
+    parser.add_argument("--dry-run", action="store_true", help="Decode and count without uploading")
+    parser.add_argument("--batch-size", type=int, default=100, help="Ids fetched per page")
+    parser.add_argument("--keep-data", action="store_true", help="Leave file_data in place after upload")
+    args = parser.parse_args()
+
+    stats = migrate_attachments(db.client, args.batch_size, args.dry_run, args.keep_data)
+    mode = "DRY RUN - " if args.dry_run else ""
+    logger.info(
+        f"{mode}Migrated: {stats['migrated']} (deduplicated {stats['deduplicated']}), "
+        f"errors: {stats['errors']}, inline data moved: {stats['bytes_moved']:,} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+External API Response Cache
+Persistent TTL cache in front of the paid discovery APIs (Google Places, Tavily)
+
+- Requests are keyed on a normalized form: lower-cased, whitespace-collapsed
+  query text, a rounded geo cell instead of raw coordinates, the field mask,
+  or the place_id for details lookups
+- Entries live in a local SQLite file so they survive restarts and are
+  shared by every worker on the host
+- Each API has its own TTL, plus a shorter TTL for negative results
+  ("no such place", "site has no indexable pages") so misses are not re-paid
+- Transient failures are never cached
+- Hit rate and estimated spend saved are tracked per API
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "API_RESPONSE_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "instabids", "api_response_cache.sqlite3"),
+)
+
+DAY = 24 * 60 * 60
+
+# Geo cells are lat/lng rounded to 2 decimals (~1.1 km), so neighbouring
+# bid cards and repeated radius-expansion stages share entries
+GEO_CELL_PRECISION = 2
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """TTLs and approximate list price per call for one external API"""
+    ttl_seconds: float
+    negative_ttl_seconds: float
+    cost_per_call: float
+
+
+API_POLICIES: dict[str, CachePolicy] = {
+    # Places API (New): Text Search Pro $32/1000, Place Details Pro $17/1000
+    "google_places_search": CachePolicy(ttl_seconds=7 * DAY, negative_ttl_seconds=1 * DAY, cost_per_call=0.032),
+    "google_places_details": CachePolicy(ttl_seconds=30 * DAY, negative_ttl_seconds=3 * DAY, cost_per_call=0.017),
+    "coia_google_business": CachePolicy(ttl_seconds=7 * DAY, negative_ttl_seconds=1 * DAY, cost_per_call=0.032),
+    # Tavily: advanced search = 2 credits per query, advanced extract = 2 credits per 5 urls
+    "tavily_contractor_pages": CachePolicy(ttl_seconds=14 * DAY, negative_ttl_seconds=2 * DAY, cost_per_call=0.06),
+    "contractor_website_analysis": CachePolicy(ttl_seconds=14 * DAY, negative_ttl_seconds=2 * DAY, cost_per_call=0.05),
+}
+
+DEFAULT_POLICY = CachePolicy(ttl_seconds=1 * DAY, negative_ttl_seconds=60 * 60, cost_per_call=0.0)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lower-case and collapse whitespace so trivially different queries share a key"""
+    return _WHITESPACE_RE.sub(" ", str(value or "")).strip().lower()
+
+
+def normalize_domain(url: Optional[str]) -> str:
+    """Bare host for a website URL ('https://www.Acme.com/about' -> 'acme.com')"""
+    if not url:
+        return ""
+    parsed = urlparse(url if "//" in url else f"//{url}")
+    host = (parsed.netloc or parsed.path).lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def geo_cell(latitude: Optional[float], longitude: Optional[float], precision: int = GEO_CELL_PRECISION) -> str:
+    """Round coordinates to a grid cell id"""
+    if latitude is None or longitude is None:
+        return ""
+    return f"{round(float(latitude), precision):.{precision}f},{round(float(longitude), precision):.{precision}f}"
+
+
+def make_cache_key(api: str, **parts: Any) -> str:
+    """Stable key for an API request built from already-normalized parts"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{api}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    negative: bool
+    expires_at: float
+
+
+class SQLiteResponseStore:
+    """Disk-backed key/value store with per-entry expiry"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS api_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                api TEXT NOT NULL,
+                value TEXT NOT NULL,
+                negative INTEGER NOT NULL DEFAULT 0,
+                expires_at REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_api_response_cache_expires ON api_response_cache (expires_at)")
+
+    def get(self, key: str, now: float) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, negative, expires_at FROM api_response_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None or row[2] <= now:
+            return None
+        return CacheEntry(value=json.loads(row[0]), negative=bool(row[1]), expires_at=row[2])
+
+    def set(self, key: str, api: str, value: Any, negative: bool, expires_at: float, now: float) -> None:
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO api_response_cache (cache_key, api, value, negative, expires_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, api, payload, int(negative), expires_at, now),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM api_response_cache WHERE cache_key = ?", (key,))
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM api_response_cache WHERE expires_at <= ?", (now,)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class ApiCacheStats:
+    hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    negative_stores: int = 0
+    cost_saved: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class ApiResponseCache:
+    """TTL cache with negative caching and per-API metrics"""
+    store: Any = None
+    policies: dict[str, CachePolicy] = field(default_factory=lambda: dict(API_POLICIES))
+    clock: Callable[[], float] = time.time
+    enabled: bool = True
+
+    def __post_init__(self):
+        if self.store is None and self.enabled:
+            self.store = SQLiteResponseStore()
+        self._stats: dict[str, ApiCacheStats] = {}
+
+    def policy(self, api: str) -> CachePolicy:
+        return self.policies.get(api, DEFAULT_POLICY)
+
+    def _stats_for(self, api: str) -> ApiCacheStats:
+        return self._stats.setdefault(api, ApiCacheStats())
+
+    def get(self, api: str, key: str,
+            accept: Optional[Callable[[CacheEntry], bool]] = None) -> Optional[CacheEntry]:
+        """
+        Return a live entry (positive or negative) and record the lookup.
+
+        `accept` lets callers reject an entry that is live but not sufficient
+        for this request (e.g. fewer search pages than needed); that counts as a miss.
+        """
+        if not self.enabled:
+            return None
+        stats = self._stats_for(api)
+        try:
+            entry = self.store.get(key, self.clock())
+        except Exception as e:
+            logger.warning(f"[ApiCache] Lookup failed for {api}: {e}")
+            entry = None
+        if entry is not None and accept is not None and not accept(entry):
+            entry = None
+        if entry is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        stats.negative_hits += int(entry.negative)
+        stats.cost_saved += self.policy(api).cost_per_call
+        return entry
+
+    def set(self, api: str, key: str, value: Any, negative: bool = False) -> None:
+        if not self.enabled:
+            return
+        policy = self.policy(api)
+        now = self.clock()
+        ttl = policy.negative_ttl_seconds if negative else policy.ttl_seconds
+        try:
+            self.store.set(key, api, value, negative, now + ttl, now)
+        except Exception as e:
+            logger.warning(f"[ApiCache] Store failed for {api}: {e}")
+            return
+        stats = self._stats_for(api)
+        stats.stores += 1
+        stats.negative_stores += int(negative)
+
+    def invalidate(self, key: str) -> None:
+        if self.store is not None:
+            self.store.delete(key)
+
+    async def get_or_fetch(
+        self,
+        api: str,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        is_negative: Callable[[Any], bool] = lambda value: value is None,
+        is_cacheable: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        """
+        Return the cached response for `key` or call `fetch` and cache it.
+
+        `is_negative` marks "nothing found" answers (cached with the short TTL);
+        results failing `is_cacheable` (errors, fallbacks) are returned uncached.
+        Exceptions from `fetch` propagate and are never cached.
+        """
+        entry = await asyncio.to_thread(self.get, api, key)
+        if entry is not None:
+            return entry.value
+
+        value = await fetch()
+        if is_cacheable(value):
+            await asyncio.to_thread(self.set, api, key, value, is_negative(value))
+        return value
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Hit rate and estimated spend saved per API"""
+        return {
+            api: {
+                "hits": stats.hits,
+                "negative_hits": stats.negative_hits,
+                "misses": stats.misses,
+                "stores": stats.stores,
+                "negative_stores": stats.negative_stores,
+                "hit_rate": round(stats.hit_rate, 4),
+                "cost_saved_usd": round(stats.cost_saved, 4),
+            }
+            for api, stats in self._stats.items()
+        }
+
+
+_api_cache: Optional[ApiResponseCache] = None
+_api_cache_lock = threading.Lock()
+
+
+def get_api_response_cache() -> ApiResponseCache:
+    """Return the process-wide API response cache"""
+    global _api_cache
+    if _api_cache is None:
+        with _api_cache_lock:
+            if _api_cache is None:
+                enabled = os.getenv("API_RESPONSE_CACHE_ENABLED", "true").lower() != "false"
+                _api_cache = ApiResponseCache(enabled=enabled)
+    return _api_cache
@@ -0,0 +1,209 @@
+"""
+Message Attachment Storage
+Keeps unified_message_attachments rows small by storing attachment bytes in a bucket
+
+- Bytes are content-addressed (sha256) so the same image uploaded twice is
+  stored once and every row referencing it shares one object + thumbnail
+- Rows keep only storage_path / thumbnail_path / content_hash / size / mime
+- ATTACHMENT_STORAGE_MODE=inline keeps the legacy behaviour of writing the
+  base64 payload into file_data (also used as a fallback when an upload fails)
+- attachment_reference() is the single place responses are shaped, so fetch
+  endpoints never ship file_data unless explicitly asked to
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_TABLE = "unified_message_attachments"
+ATTACHMENT_BUCKET = os.getenv("MESSAGE_ATTACHMENT_BUCKET", "project-images")
+ATTACHMENT_STORAGE_MODE = os.getenv("ATTACHMENT_STORAGE_MODE", "bucket")
+PUBLIC_STORAGE_URL = os.getenv("SUPABASE_URL", "https://xrhgrthdcaymxuqcgrmj.supabase.co").rstrip("/")
+THUMBNAIL_SIZE = (300, 300)
+
+# Columns a fetch needs; file_data is deliberately left out
+REFERENCE_COLUMNS = (
+    "id, message_id, attachment_type, mime_type, file_size, storage_path, "
+    "thumbnail_path, content_hash, metadata, created_at"
+)
+
+_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "application/pdf": "pdf",
+}
+_MAGIC = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"%PDF", "application/pdf"),
+)
+
+
+def decode_attachment(data: str) -> tuple[bytes, str]:
+    """Decode a base64 payload (optionally a data: URL) into bytes and a mime type"""
+    mime_type = None
+    if data.startswith("data:"):
+        header, _, data = data.partition(",")
+        mime_type = header[5:].split(";")[0] or None
+    try:
+        raw = base64.b64decode("".join(data.split()), validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Attachment is not valid base64: {e}") from e
+    if not mime_type:
+        mime_type = next((mime for magic, mime in _MAGIC if raw.startswith(magic)), None)
+        if not mime_type and raw[:4] == b"RIFF" and raw[8:12] == b"WEBP":
+            mime_type = "image/webp"
+    return raw, mime_type or "image/jpeg"
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def object_paths(digest: str, mime_type: str) -> tuple[str, str]:
+    """Content-addressed object and thumbnail paths for a digest"""
+    extension = _EXTENSIONS.get(mime_type, "bin")
+    return (
+        f"attachments/{digest[:2]}/{digest}.{extension}",
+        f"attachments/thumbnails/{digest[:2]}/{digest}.jpg",
+    )
+
+
+def public_url(path: Optional[str], bucket: str = ATTACHMENT_BUCKET) -> str:
+    return f"{PUBLIC_STORAGE_URL}/storage/v1/object/public/{bucket}/{path}" if path else ""
+
+
+def make_thumbnail(raw: bytes, size: tuple[int, int] = THUMBNAIL_SIZE) -> Optional[bytes]:
+    """JPEG thumbnail for an image, or None when the bytes are not a readable image"""
+    try:
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(raw))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=80, optimize=True)
+        return buffer.getvalue()
+    except Exception as e:
+        logger.debug(f"Thumbnail skipped: {e}")
+        return None
+
+
+def attachment_reference(att: dict[str, Any], include_data: bool = False) -> dict[str, Any]:
+    """Response shape for one attachment row; inline bytes only with include_data"""
+    reference = {
+        "id": att["id"],
+        "message_id": att["message_id"],
+        "type": att.get("attachment_type") or "image",
+        "mime_type": att.get("mime_type") or "image/jpeg",
+        "file_size": att.get("file_size") or 0,
+        "storage_path": att.get("storage_path") or "",
+        "content_hash": att.get("content_hash"),
+        "url": public_url(att.get("storage_path")),
+        "thumbnail_url": public_url(att.get("thumbnail_path")) or None,
+        "created_at": att.get("created_at", ""),
+    }
+    if att.get("metadata"):
+        reference["metadata"] = att["metadata"]
+    if include_data and att.get("file_data"):
+        reference["data_url"] = f"data:{reference['mime_type']};base64,{att['file_data']}"
+    return reference
+
+
+@dataclass
+class StoredAttachment:
+    content_hash: str
+    storage_path: str
+    thumbnail_path: Optional[str]
+    mime_type: str
+    file_size: int
+    deduplicated: bool = False
+
+    def as_row(self) -> dict[str, Any]:
+        return {
+            "storage_path": self.storage_path,
+            "thumbnail_path": self.thumbnail_path,
+            "content_hash": self.content_hash,
+            "mime_type": self.mime_type,
+            "file_size": self.file_size,
+        }
+
+
+class AttachmentStorage:
+    """Content-addressed attachment uploads through a Supabase client"""
+
+    def __init__(self, supabase: Any, bucket: str = ATTACHMENT_BUCKET):
+        self.supabase = supabase
+        self.bucket = bucket
+
+    def _existing(self, digest: str) -> Optional[dict[str, Any]]:
+        result = (
+            self.supabase.table(ATTACHMENT_TABLE)
+            .select("storage_path, thumbnail_path")
+            .eq("content_hash", digest)
+            .not_.is_("storage_path", "null")
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    def _upload(self, path: str, raw: bytes, mime_type: str) -> None:
+        # upsert makes two concurrent uploads of the same content harmless
+        self.supabase.storage.from_(self.bucket).upload(
+            path, raw, {"content-type": mime_type, "upsert": "true"}
+        )
+
+    def store(self, raw: bytes, mime_type: str) -> StoredAttachment:
+        """Upload bytes unless an identical object is already referenced"""
+        digest = content_hash(raw)
+        existing = self._existing(digest)
+        if existing:
+            return StoredAttachment(
+                digest, existing["storage_path"], existing.get("thumbnail_path"), mime_type, len(raw), True
+            )
+
+        storage_path, thumbnail_path = object_paths(digest, mime_type)
+        self._upload(storage_path, raw, mime_type)
+        thumbnail = make_thumbnail(raw) if mime_type.startswith("image/") else None
+        if thumbnail:
+            try:
+                self._upload(thumbnail_path, thumbnail, "image/jpeg")
+            except Exception as e:
+                logger.warning(f"Thumbnail upload failed for {digest}: {e}")
+                thumbnail = None
+        return StoredAttachment(digest, storage_path, thumbnail_path if thumbnail else None, mime_type, len(raw))
+
+    def attachment_fields(self, data: str, mode: str = ATTACHMENT_STORAGE_MODE) -> dict[str, Any]:
+        """Columns to write for one base64 upload under the given storage mode"""
+        raw, mime_type = decode_attachment(data)
+        if mode != "inline":
+            try:
+                return self.store(raw, mime_type).as_row()
+            except Exception as e:
+                logger.warning(f"Attachment upload failed, storing inline: {e}")
+        return {
+            "file_data": data.partition(",")[2] if data.startswith("data:") else data,
+            "content_hash": content_hash(raw),
+            "mime_type": mime_type,
+            "file_size": len(raw),
+        }
+
+    async def attachment_fields_many(self, payloads: list[str],
+                                     mode: str = ATTACHMENT_STORAGE_MODE) -> list[dict[str, Any]]:
+        """attachment_fields for several uploads at once (the storage client is sync)"""
+        return list(await asyncio.gather(
+            *(asyncio.to_thread(self.attachment_fields, data, mode) for data in payloads)
+        ))
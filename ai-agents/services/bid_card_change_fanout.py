@@ -0,0 +1,300 @@
+"""
+Bid Card Change Fan-out
+Segmented notification fan-out when a bid card changes
+
+- resolve_engagement() classifies every contractor of a bid card with a
+  fixed number of grouped queries (outreach, bids, messages, views, unified
+  bid submissions, profiles), however many contractors there are
+- Each contractor lands in one segment: has_bid > messaging_only >
+  email_only > form_only
+- Notification content is generated once per segment (templates by default,
+  or a caller-supplied generator such as JAA's LLM copy)
+- notifications rows are bulk-inserted and the WebSocket push for all
+  connected contractors goes out concurrently in one pass
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from services.data_loader import get_loader
+
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS = ("has_bid", "messaging_only", "email_only", "form_only")
+NOTIFICATION_INSERT_CHUNK = 500
+
+CHANGE_TITLES = {
+    "budget_change": "💰 Project Budget Updated",
+    "scope_change": "🔧 Project Scope Changed",
+    "deadline_change": "⏰ Project Timeline Updated",
+    "location_change": "📍 Project Location Changed",
+    "requirements_change": "📋 Project Requirements Updated",
+    "general_update": "📢 Project Updated"
+}
+
+SEGMENT_CONTEXT = {
+    "has_bid": "Since you submitted a bid for this project, ",
+    "messaging_only": "Since you've been in communication about this project, ",
+    "email_only": "",
+    "form_only": "",
+}
+
+
+@dataclass
+class EngagedContractor:
+    contractor_id: str
+    contractor_type: str  # contractor_lead | contractor
+    segment: str = "form_only"
+    engagement_types: list[str] = field(default_factory=list)
+    channels_used: list[str] = field(default_factory=list)
+    company_name: Optional[str] = None
+    contact_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    contractor_lead_id: Optional[str] = None
+
+
+SegmentContent = Callable[[str, list[EngagedContractor], dict[str, Any], dict[str, Any]], Awaitable[dict[str, Any]]]
+Push = Callable[[dict[str, dict[str, Any]]], Awaitable[int]]
+
+
+def change_title(change_type: str) -> str:
+    """Notification title for a change type"""
+    return CHANGE_TITLES.get(change_type, CHANGE_TITLES["general_update"])
+
+
+def change_message(change_details: dict[str, Any], project_type: str, segment: str) -> str:
+    """Notification body for one engagement segment"""
+    change_type = change_details["change_type"]
+    description = change_details.get("description", "Project has been updated")
+    previous_value = change_details.get("previous_value")
+    new_value = change_details.get("new_value")
+
+    message = f"""{SEGMENT_CONTEXT.get(segment, "")}we wanted to notify you of an important update:
+
+PROJECT: {project_type}
+CHANGE: {change_type.replace('_', ' ').title()}
+
+{description}"""
+
+    # Add before/after details if available
+    if previous_value and new_value:
+        message += f"""
+
+PREVIOUS: {previous_value}
+NEW: {new_value}"""
+
+    message += """
+
+You can view the updated project details in your contractor portal. If you have questions about how this change affects your bid or interest in the project, please reach out.
+
+Thank you for your continued interest in InstaBids projects!"""
+
+    return message
+
+
+async def template_segment_content(segment: str,
+                                   contractors: list[EngagedContractor],
+                                   bid_card: dict[str, Any],
+                                   change_details: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "title": change_title(change_details["change_type"]),
+        "message": change_message(change_details, bid_card.get("project_type", "Project"), segment),
+    }
+
+
+def segment_of(engagement_types: list[str], channels_used: list[str]) -> str:
+    if "bid_submission" in engagement_types:
+        return "has_bid"
+    if "messaging" in engagement_types:
+        return "messaging_only"
+    return "email_only" if "email" in channels_used else "form_only"
+
+
+async def push_to_contractor_websockets(messages: dict[str, dict[str, Any]]) -> int:
+    from routers.contractor_websocket_routes import contractor_ws_manager
+    return await contractor_ws_manager.send_many(messages)
+
+
+class BidCardChangeFanout:
+    """Resolves, segments and notifies every contractor engaged with a bid card"""
+
+    def __init__(self, client: Any, push: Optional[Push] = None):
+        self.client = client
+        self.push = push or push_to_contractor_websockets
+
+    def resolve_engagement(self, bid_card_id: str) -> list[EngagedContractor]:
+        """All engaged contractors of a bid card, segmented, in grouped queries"""
+        engaged: dict[str, EngagedContractor] = {}
+
+        def touch(contractor_id: str, contractor_type: str, engagement_type: str) -> EngagedContractor:
+            contractor = engaged.setdefault(contractor_id, EngagedContractor(contractor_id, contractor_type))
+            if engagement_type not in contractor.engagement_types:
+                contractor.engagement_types.append(engagement_type)
+            return contractor
+
+        outreach = self.client.table("contractor_outreach_attempts").select(
+            "contractor_lead_id, channel"
+        ).eq("bid_card_id", bid_card_id).execute()
+        for attempt in outreach.data or []:
+            if attempt.get("contractor_lead_id"):
+                contractor = touch(attempt["contractor_lead_id"], "contractor_lead", "outreach")
+                if attempt.get("channel") and attempt["channel"] not in contractor.channels_used:
+                    contractor.channels_used.append(attempt["channel"])
+
+        bids = self.client.table("contractor_bids").select("contractor_id").eq("bid_card_id", bid_card_id).execute()
+        for bid in bids.data or []:
+            touch(bid["contractor_id"], "contractor", "bid_submission")
+
+        # Bid submissions made through the unified messaging system
+        unified = self.client.table("unified_messages").select("metadata").contains(
+            "metadata", {"message_type": "bid_submission", "bid_data": {"bid_card_id": bid_card_id}}
+        ).execute()
+        for message in unified.data or []:
+            contractor_id = ((message.get("metadata") or {}).get("bid_data") or {}).get("contractor_id")
+            if contractor_id:
+                touch(contractor_id, "contractor", "bid_submission")
+
+        messages = self.client.table("bid_card_messages").select("sender_id").eq(
+            "bid_card_id", bid_card_id
+        ).eq("sender_type", "contractor").execute()
+        for message in messages.data or []:
+            if message.get("sender_id"):
+                touch(message["sender_id"], "contractor", "messaging")
+
+        views = self.client.table("bid_card_views").select("contractor_id").eq(
+            "bid_card_id", bid_card_id
+        ).not_.is_("contractor_id", "null").execute()
+        for view in views.data or []:
+            touch(view["contractor_id"], "contractor", "viewed")
+
+        self._attach_profiles(list(engaged.values()))
+        for contractor in engaged.values():
+            contractor.segment = segment_of(contractor.engagement_types, contractor.channels_used)
+        return list(engaged.values())
+
+    def _attach_profiles(self, contractors: list[EngagedContractor]) -> None:
+        """Contact details and contractor_leads ids for everyone, one query per table"""
+        if not contractors:
+            return
+        loader = get_loader(self.client)
+        ids = [c.contractor_id for c in contractors]
+        leads = loader.load_many("contractor_leads", ids, columns="id, company_name, contact_name, email, phone")
+        profiles = loader.load_many("contractors", [i for i in ids if not leads.get(i)],
+                                    columns="id, company_name, email")
+
+        # contractors and contractor_leads are not unified yet; match leads by company name
+        names = {p["company_name"] for p in profiles.values() if p and p.get("company_name")}
+        leads_by_name = loader.load_many("contractor_leads", names, column="company_name", columns="id, company_name")
+
+        for contractor in contractors:
+            lead = leads.get(contractor.contractor_id)
+            if lead:
+                contractor.contractor_type = "contractor_lead"
+                contractor.contractor_lead_id = lead["id"]
+                contractor.company_name = lead.get("company_name")
+                contractor.contact_name = lead.get("contact_name")
+                contractor.email = lead.get("email")
+                contractor.phone = lead.get("phone")
+                continue
+            profile = profiles.get(contractor.contractor_id) or {}
+            contractor.company_name = profile.get("company_name")
+            contractor.email = profile.get("email")
+            matched = leads_by_name.get(profile.get("company_name"))
+            contractor.contractor_lead_id = matched["id"] if matched else None
+
+    async def fan_out(self,
+                      bid_card_id: str,
+                      change_details: dict[str, Any],
+                      content_for_segment: Optional[SegmentContent] = None,
+                      contractors: Optional[list[EngagedContractor]] = None) -> dict[str, Any]:
+        """Notify every engaged contractor: one content per segment, one bulk insert, one push pass"""
+        if contractors is None:
+            contractors = self.resolve_engagement(bid_card_id)
+        if not contractors:
+            return {
+                "success": True,
+                "contractors_notified": 0,
+                "message": "No engaged contractors to notify"
+            }
+
+        bid_card = get_loader(self.client).load_many("bid_cards", [bid_card_id]).get(bid_card_id) or {}
+
+        by_segment: dict[str, list[EngagedContractor]] = defaultdict(list)
+        for contractor in contractors:
+            by_segment[contractor.segment].append(contractor)
+        generate = content_for_segment or template_segment_content
+        segments = list(by_segment)
+        contents = await asyncio.gather(*(
+            generate(segment, by_segment[segment], bid_card, change_details) for segment in segments
+        ))
+        content_by_segment = dict(zip(segments, contents))
+
+        created_at = datetime.utcnow().isoformat()
+        notifications = []
+        for contractor in contractors:
+            content = content_by_segment[contractor.segment]
+            notifications.append({
+                "id": str(uuid.uuid4()),
+                "user_id": contractor.contractor_id,
+                "contractor_id": contractor.contractor_lead_id,  # May be null - that's OK
+                "bid_card_id": bid_card_id,
+                "notification_type": "bid_card_change",
+                "title": content.get("title") or change_title(change_details["change_type"]),
+                "message": content.get("message", ""),
+                "action_url": f"/contractor/bid-cards/{bid_card_id}",
+                "is_read": False,
+                "is_archived": False,
+                "channels": {
+                    "email": True,
+                    "in_app": True,
+                    "sms": False
+                },
+                "delivered_channels": {"in_app": True},
+                "created_at": created_at
+            })
+
+        for start in range(0, len(notifications), NOTIFICATION_INSERT_CHUNK):
+            result = self.client.table("notifications").insert(
+                notifications[start:start + NOTIFICATION_INSERT_CHUNK]
+            ).execute()
+            if not result.data:
+                return {"success": False, "error": "Failed to create notifications"}
+
+        pushed = 0
+        try:
+            pushed = await self.push({
+                n["user_id"]: {
+                    "type": "bid_card_change",
+                    "bid_card_id": bid_card_id,
+                    "change_type": change_details.get("change_type", "update"),
+                    "description": change_details.get("description", "Bid card has been updated"),
+                    "notification": {"id": n["id"], "title": n["title"], "message": n["message"]},
+                    "timestamp": created_at,
+                    "action_url": f"/bid-cards/{bid_card_id}"
+                }
+                for n in notifications
+            })
+        except Exception as ws_error:
+            logger.warning(f"Could not send WebSocket notifications: {ws_error}")
+
+        logger.info(f"Bid card {bid_card_id} change fanned out to {len(notifications)} contractors "
+                    f"({len(segments)} segments, {pushed} pushed live)")
+        return {
+            "success": True,
+            "contractors_notified": len(contractors),
+            "notification_ids": [n["id"] for n in notifications],
+            "segments": {segment: len(members) for segment, members in by_segment.items()},
+            "realtime_delivered": pushed,
+            "engagement_breakdown": {
+                "bid_submissions": sum("bid_submission" in c.engagement_types for c in contractors),
+                "messaging": sum("messaging" in c.engagement_types for c in contractors),
+                "views": sum("viewed" in c.engagement_types for c in contractors),
+            }
+        }
@@ -4,12 +4,16 @@ Notifies contractors who have engaged with bid cards when changes occur
 Integrated with JAA service for automatic notifications
 """
 
-import uuid
-import asyncio
 import logging
-from datetime import datetime
 from typing import Dict, List, Any, Optional
 from database import SupabaseDB
+from services.bid_card_change_fanout import (
+    BidCardChangeFanout,
+    change_message,
+    change_title,
+    segment_of,
+    template_segment_content,
+)
 db = SupabaseDB()
 
 logger = logging.getLogger(__name__)
@@ -119,92 +123,18 @@ class BidCardChangeNotificationService:
     async def notify_engaged_contractors(
         self, 
         bid_card_id: str, 
-        change_details: Dict[str, Any]
+        change_details: Dict[str, Any],
+        segment_content: Optional[Dict[str, Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
-        """Notify contractors who have engaged with the bid card about changes"""
-        
+        """Notify contractors who have engaged with the bid card about changes (segmented fan-out)"""
+
+        async def content_for_segment(segment, contractors, bid_card, details):
+            if segment_content and segment_content.get(segment):
+                return segment_content[segment]
+            return await template_segment_content(segment, contractors, bid_card, details)
+
         try:
-            # Get engaged contractors
-            engaged_contractors = await self.get_engaged_contractors(bid_card_id)
-            
-            if not engaged_contractors:
-                return {
-                    "success": True,
-                    "contractors_notified": 0,
-                    "message": "No engaged contractors to notify"
-                }
-            
-            # Get bid card info for context
-            bid_card = await self._get_bid_card_info(bid_card_id)
-            
-            notifications = []
-            for contractor in engaged_contractors:
-                # Try to get contractor_leads ID, but proceed even if not found
-                contractor_lead_id = await self._get_contractor_lead_id(contractor["contractor_id"])
-                
-                notification = {
-                    "id": str(uuid.uuid4()),
-                    "user_id": contractor["contractor_id"],
-                    "contractor_id": contractor_lead_id,  # May be null - that's OK
-                    "bid_card_id": bid_card_id,
-                    "notification_type": "bid_card_change",
-                    "title": self._generate_change_title(change_details["change_type"]),
-                    "message": self._generate_change_message(
-                        change_details,
-                        bid_card.get("project_type", "Project"),
-                        contractor["engagement_types"]
-                    ),
-                    "action_url": f"/contractor/bid-cards/{bid_card_id}",
-                    "is_read": False,
-                    "is_archived": False,
-                    "channels": {
-                        "email": True,
-                        "in_app": True,
-                        "sms": False
-                    },
-                    "delivered_channels": {"in_app": True},
-                    "created_at": datetime.utcnow().isoformat()
-                }
-                notifications.append(notification)
-            
-            # Batch insert notifications
-            result = db.client.table("notifications").insert(notifications).execute()
-            
-            if not result.data:
-                return {
-                    "success": False,
-                    "error": "Failed to create notifications"
-                }
-            
-            # Send real-time WebSocket notifications if contractors are connected
-            try:
-                from routers.contractor_websocket_routes import broadcast_bid_card_change_to_contractors
-                contractor_ids = [c["contractor_id"] for c in engaged_contractors]
-                await broadcast_bid_card_change_to_contractors(
-                    bid_card_id=bid_card_id,
-                    engaged_contractors=contractor_ids,
-                    change_details=change_details
-                )
-                logger.info(f"Sent real-time notifications for bid card {bid_card_id}")
-            except Exception as ws_error:
-                logger.warning(f"Could not send WebSocket notifications: {ws_error}")
-            
-            # TODO: Add email notifications via MCP tools
-            
-            return {
-                "success": True,
-                "contractors_notified": len(engaged_contractors),
-                "notification_ids": [n["id"] for n in notifications],
-                "engagement_breakdown": {
-                    "bid_submissions": len([c for c in engaged_contractors 
-                                         if "bid_submission" in c["engagement_types"]]),
-                    "messaging": len([c for c in engaged_contractors 
-                                   if "messaging" in c["engagement_types"]]),
-                    "views": len([c for c in engaged_contractors 
-                                if "viewed" in c["engagement_types"]])
-                }
-            }
-            
+            return await BidCardChangeFanout(db.client).fan_out(bid_card_id, change_details, content_for_segment)
         except Exception as e:
             return {
                 "success": False,
@@ -213,15 +143,7 @@ class BidCardChangeNotificationService:
     
     def _generate_change_title(self, change_type: str) -> str:
         """Generate notification title based on change type"""
-        titles = {
-            "budget_change": "💰 Project Budget Updated",
-            "scope_change": "🔧 Project Scope Changed", 
-            "deadline_change": "⏰ Project Timeline Updated",
-            "location_change": "📍 Project Location Changed",
-            "requirements_change": "📋 Project Requirements Updated",
-            "general_update": "📢 Project Updated"
-        }
-        return titles.get(change_type, "📢 Project Updated")
+        return change_title(change_type)
     
     def _generate_change_message(
         self, 
@@ -230,69 +152,7 @@ class BidCardChangeNotificationService:
         engagement_types: List[str]
     ) -> str:
         """Generate personalized notification message"""
-        
-        change_type = change_details["change_type"]
-        description = change_details.get("description", "Project has been updated")
-        previous_value = change_details.get("previous_value")
-        new_value = change_details.get("new_value")
-        
-        # Personalize based on engagement type
-        if "bid_submission" in engagement_types:
-            engagement_context = "Since you submitted a bid for this project, "
-        elif "messaging" in engagement_types:
-            engagement_context = "Since you've been in communication about this project, "
-        elif "viewed" in engagement_types:
-            engagement_context = "Since you viewed this project, "
-        else:
-            engagement_context = ""
-        
-        message = f"""{engagement_context}we wanted to notify you of an important update:
-
-PROJECT: {project_type}
-CHANGE: {change_type.replace('_', ' ').title()}
-
-{description}"""
-        
-        # Add before/after details if available
-        if previous_value and new_value:
-            message += f"""
-
-PREVIOUS: {previous_value}
-NEW: {new_value}"""
-        
-        message += f"""
-
-You can view the updated project details in your contractor portal. If you have questions about how this change affects your bid or interest in the project, please reach out.
-
-Thank you for your continued interest in InstaBids projects!"""
-        
-        return message
-    
-    async def _get_contractor_lead_id(self, contractor_id: str) -> Optional[str]:
-        """Get contractor_leads ID for a contractor (handles contractors vs contractor_leads table issue)"""
-        try:
-            # First try contractor_leads table directly
-            result = db.client.table("contractor_leads").select("id").eq("id", contractor_id).execute()
-            if result.data:
-                return result.data[0]["id"]
-            
-            # If not found, try to find matching contractor_lead via company name or other data
-            # This is a workaround until Agent 4 unifies the tables
-            contractor_result = db.client.table("contractors").select("company_name, email").eq("id", contractor_id).execute()
-            if contractor_result.data:
-                contractor_data = contractor_result.data[0]
-                company_name = contractor_data.get("company_name")
-                
-                if company_name:
-                    # Try to find matching contractor_lead by company name
-                    lead_result = db.client.table("contractor_leads").select("id").eq("company_name", company_name).execute()
-                    if lead_result.data:
-                        return lead_result.data[0]["id"]
-            
-            return None
-        except Exception as e:
-            print(f"Error getting contractor_leads ID: {e}")
-            return None
+        return change_message(change_details, project_type, segment_of(engagement_types, []))
     
     async def _get_bid_card_info(self, bid_card_id: str) -> Dict[str, Any]:
         """Get bid card information for context"""
@@ -309,11 +169,12 @@ async def notify_contractors_of_bid_card_change(
     change_type: str,
     description: str,
     previous_value: Optional[str] = None,
-    new_value: Optional[str] = None
+    new_value: Optional[str] = None,
+    segment_content: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """
     Convenience function for notifying contractors of bid card changes
-    Designed for integration with JAA service
+    Designed for integration with JAA service (segment_content: JAA's copy per engagement segment)
     """
     service = BidCardChangeNotificationService()
     
@@ -324,7 +185,7 @@ async def notify_contractors_of_bid_card_change(
         "new_value": new_value
     }
     
-    return await service.notify_engaged_contractors(bid_card_id, change_details)
+    return await service.notify_engaged_contractors(bid_card_id, change_details, segment_content)
 
 
 # Test function to check engagement
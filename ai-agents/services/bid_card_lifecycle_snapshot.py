@@ -0,0 +1,238 @@
+"""
+Bid Card Lifecycle Snapshots
+One materialized lifecycle document per bid card, refreshed section by section
+
+- Stored sections (bid_card, discovery, campaigns, outreach, engagement,
+  connection_fee) live in bid_card_lifecycle_snapshots.document; bids,
+  timeline and metrics are derived from them when serving, without reads
+- A cold build runs every section loader concurrently: sync loaders (the
+  sync Supabase client) on threads from a dedicated pool, coroutine loaders
+  awaited on the current event loop
+- A section whose loader fails is not stored: it stays dirty (or missing) so
+  the next read retries it, and only this response serves the previously
+  stored value or the section default
+- Triggers from migration 018 append the affected sections to dirty_sections
+  and bump version when a related row changes; the next read rebuilds only
+  those sections (SOURCE_SECTIONS mirrors the trigger wiring)
+- Sections fed by tables that have no bid_card_id (potential_contractors,
+  email_tracking_events) are also rebuilt once older than SNAPSHOT_MAX_AGE
+- Writes are conditional on version, so a refresh never overwrites a newer
+  snapshot or clears dirty marks it did not rebuild
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TABLE = "bid_card_lifecycle_snapshots"
+SNAPSHOT_MAX_AGE = timedelta(seconds=int(os.getenv("LIFECYCLE_SNAPSHOT_MAX_AGE_SECONDS", "900")))
+MAX_WRITE_ATTEMPTS = 2
+LOADER_THREADS = int(os.getenv("LIFECYCLE_SNAPSHOT_LOADER_THREADS", "12"))
+
+SECTION_DEFAULTS: dict[str, Any] = {
+    "bid_card": None,
+    "discovery": {},
+    "campaigns": [],
+    "outreach": {},
+    "engagement": {},
+    "connection_fee": {},
+}
+SECTIONS = tuple(SECTION_DEFAULTS)
+
+# Related table -> sections to rebuild when one of its rows changes
+SOURCE_SECTIONS: dict[str, tuple[str, ...]] = {
+    "bid_cards": ("bid_card", "connection_fee"),
+    "discovery_runs": ("discovery",),
+    "contractor_discovery_cache": ("discovery",),
+    "contractor_leads": ("discovery",),
+    "outreach_campaigns": ("campaigns",),
+    "campaign_check_ins": ("campaigns",),
+    "campaign_contractors": ("campaigns",),
+    "manual_followup_tasks": ("campaigns",),
+    "contractor_outreach_attempts": ("outreach", "discovery"),
+    "contractor_responses": ("outreach", "engagement"),
+    "bid_card_views": ("engagement",),
+    "bid_card_engagement_events": ("engagement",),
+    "connection_fees": ("connection_fee",),
+}
+
+# Sections that no trigger can see every change of; they expire instead
+AGING_SECTIONS = ("discovery", "engagement")
+
+# Own pool so a cold build is never queued behind other to_thread work
+_loader_pool = ThreadPoolExecutor(max_workers=LOADER_THREADS, thread_name_prefix="lifecycle-loader")
+
+# A loader takes a bid card id and returns the section (sync, or a coroutine)
+SectionLoader = Callable[[str], Any]
+
+
+def sections_for(tables: Iterable[str]) -> set[str]:
+    return {section for table in tables for section in SOURCE_SECTIONS.get(table, ())}
+
+
+async def _run_loader(loader: SectionLoader, bid_card_id: str) -> Any:
+    if asyncio.iscoroutinefunction(loader):
+        return await loader(bid_card_id)
+    result = await asyncio.get_running_loop().run_in_executor(_loader_pool, loader, bid_card_id)
+    if inspect.isawaitable(result):
+        # A sync callable that hands back a coroutine (e.g. a lambda around an async reader)
+        result = await result
+    return result
+
+
+@dataclass
+class LifecycleSnapshot:
+    bid_card_id: str
+    document: dict[str, Any]
+    version: int = 0
+    section_versions: dict[str, int] = field(default_factory=dict)
+    section_built_at: dict[str, str] = field(default_factory=dict)
+    dirty_sections: list[str] = field(default_factory=list)
+    built_at: Optional[str] = None
+    # Sections whose loader failed while serving this snapshot (never stored)
+    failed_sections: set[str] = field(default_factory=set)
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "LifecycleSnapshot":
+        return cls(
+            bid_card_id=row["bid_card_id"],
+            document=row.get("document") or {},
+            version=row.get("version") or 0,
+            section_versions=row.get("section_versions") or {},
+            section_built_at=row.get("section_built_at") or {},
+            dirty_sections=list(row.get("dirty_sections") or []),
+            built_at=row.get("built_at"),
+        )
+
+    def stale_sections(self, now: Optional[datetime] = None) -> set[str]:
+        now = now or datetime.utcnow()
+        stale = set(self.dirty_sections) | {s for s in SECTIONS if s not in self.document}
+        for section in AGING_SECTIONS:
+            built_at = self.section_built_at.get(section)
+            if not built_at or now - datetime.fromisoformat(built_at) > SNAPSHOT_MAX_AGE:
+                stale.add(section)
+        return stale & set(SECTIONS)
+
+    def section(self, name: str) -> Any:
+        value = self.document.get(name)
+        return SECTION_DEFAULTS[name] if value is None else value
+
+    def stamp(self) -> dict[str, Any]:
+        """Version information returned alongside served data"""
+        return {
+            "version": self.version,
+            "section_versions": self.section_versions,
+            "built_at": self.built_at,
+        }
+
+
+class LifecycleSnapshotStore:
+    """Reads, builds and incrementally refreshes lifecycle snapshots"""
+
+    def __init__(self, client: Any, loaders: dict[str, SectionLoader]):
+        self.client = client
+        self.loaders = loaders
+
+    async def get(self, bid_card_id: str) -> Optional[LifecycleSnapshot]:
+        """The bid card's snapshot: one read when it is fresh; None if the bid card does not exist"""
+        for _ in range(MAX_WRITE_ATTEMPTS):
+            snapshot = self._read(bid_card_id)
+            if snapshot is None:
+                snapshot = LifecycleSnapshot(bid_card_id, {})
+                stale = set(SECTIONS)
+            else:
+                stale = snapshot.stale_sections()
+                if not stale:
+                    return snapshot
+
+            fresh, failed = await self._load_sections(bid_card_id, stale)
+            snapshot.failed_sections = failed
+            cold = snapshot.version == 0 and not snapshot.document
+            if cold and "bid_card" not in failed and fresh.get("bid_card") is None:
+                return None
+            if not fresh or (cold and "bid_card" in failed):
+                # Nothing worth storing; serve defaults for the failed sections this once
+                return snapshot
+            if self._write(snapshot, fresh):
+                return snapshot
+            logger.info(f"Lifecycle snapshot for {bid_card_id} changed during refresh, re-reading")
+
+        # Still racing other writers: serve what we built without storing it
+        return snapshot
+
+    def mark_dirty(self, bid_card_id: str, sections: Iterable[str]) -> bool:
+        """Flag sections for rebuild on the next read (for writers not covered by triggers)"""
+        snapshot = self._read(bid_card_id)
+        if snapshot is None:
+            return False
+        dirty = sorted(set(snapshot.dirty_sections) | (set(sections) & set(SECTIONS)))
+        result = self.client.table(SNAPSHOT_TABLE).update({
+            "dirty_sections": dirty,
+            "version": snapshot.version + 1,
+        }).eq("bid_card_id", bid_card_id).eq("version", snapshot.version).execute()
+        return bool(result.data)
+
+    def _read(self, bid_card_id: str) -> Optional[LifecycleSnapshot]:
+        result = self.client.table(SNAPSHOT_TABLE).select("*").eq("bid_card_id", bid_card_id).limit(1).execute()
+        return LifecycleSnapshot.from_row(result.data[0]) if result.data else None
+
+    async def _load_sections(self, bid_card_id: str,
+                             sections: Iterable[str]) -> tuple[dict[str, Any], set[str]]:
+        """Run the loaders for sections concurrently; returns the rebuilt sections and the failed ones"""
+        names = [s for s in SECTIONS if s in set(sections)]
+        results = await asyncio.gather(
+            *(_run_loader(self.loaders[name], bid_card_id) for name in names),
+            return_exceptions=True
+        )
+        fresh, failed = {}, set()
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Lifecycle {name} loader failed for {bid_card_id}: {result}")
+                failed.add(name)
+                continue
+            fresh[name] = SECTION_DEFAULTS[name] if result is None else result
+        return fresh, failed
+
+    def _write(self, snapshot: LifecycleSnapshot, fresh: dict[str, Any]) -> bool:
+        """Fold rebuilt sections into the snapshot and store it if nobody wrote in between"""
+        now = datetime.utcnow().isoformat()
+        version = snapshot.version + 1
+        document = {**snapshot.document, **fresh}
+        section_versions = {**snapshot.section_versions, **dict.fromkeys(fresh, version)}
+        section_built_at = {**snapshot.section_built_at, **dict.fromkeys(fresh, now)}
+        dirty = [s for s in snapshot.dirty_sections if s not in fresh]
+        row = {
+            "document": document,
+            "version": version,
+            "section_versions": section_versions,
+            "section_built_at": section_built_at,
+            "dirty_sections": dirty,
+            "updated_at": now,
+        }
+
+        table = self.client.table(SNAPSHOT_TABLE)
+        try:
+            if snapshot.version == 0 and not snapshot.document:
+                written = table.insert({"bid_card_id": snapshot.bid_card_id, "built_at": now, **row}).execute()
+            else:
+                written = table.update(row).eq("bid_card_id", snapshot.bid_card_id).eq(
+                    "version", snapshot.version
+                ).execute()
+        except Exception as e:
+            # e.g. a concurrent cold build inserted first
+            logger.info(f"Lifecycle snapshot write for {snapshot.bid_card_id} lost a race: {e}")
+            written = None
+
+        snapshot.document, snapshot.version = document, version
+        snapshot.section_versions, snapshot.section_built_at = section_versions, section_built_at
+        snapshot.dirty_sections = dirty
+        snapshot.built_at = snapshot.built_at or now
+        return bool(written and written.data)
@@ -0,0 +1,136 @@
+"""
+Bulk Mutations
+Set-based fan-out updates instead of one round trip per row
+
+- Each operation first calls a server-side function (migration 015) that
+  does all the writes in one transaction
+- If the function is not deployed yet, it falls back to set-based PostgREST
+  updates (UPDATE ... WHERE key IN (...)), a handful of requests regardless
+  of how many rows they touch; any other RPC error is raised, never retried
+  through the non-transactional fallback
+- bulk_update() is the shared primitive for other fan-out rewrites
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Keys per IN (...) filter; keeps PostgREST request URLs well under proxy limits
+IN_CHUNK_SIZE = 200
+
+MIGRATE_SESSION_RPC = "migrate_anonymous_session"
+SELECT_WINNING_BID_RPC = "select_winning_bid"
+
+# PostgREST "function not in schema cache" and Postgres undefined_function
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+
+def bulk_update(client: Any,
+                table: str,
+                values: dict[str, Any],
+                column: str,
+                keys: Iterable[Any],
+                extra_filters: Optional[Callable[[Any], Any]] = None) -> int:
+    """UPDATE table SET values WHERE column IN keys, chunked; returns rows updated"""
+    keys = list(dict.fromkeys(keys))
+    updated = 0
+    for start in range(0, len(keys), IN_CHUNK_SIZE):
+        query = client.table(table).update(values).in_(column, keys[start:start + IN_CHUNK_SIZE])
+        if extra_filters:
+            query = extra_filters(query)
+        updated += len(query.execute().data or [])
+    return updated
+
+
+def _missing_function(error: Exception) -> bool:
+    if getattr(error, "code", None) in MISSING_FUNCTION_CODES:
+        return True
+    message = str(error)
+    return "Could not find the function" in message or any(code in message for code in MISSING_FUNCTION_CODES)
+
+
+def _call_rpc(client: Any, name: str, params: dict[str, Any]) -> Optional[Any]:
+    """Run a bulk function; None means it is not deployed and the caller should fall back"""
+    try:
+        return client.rpc(name, params).execute().data
+    except Exception as e:
+        if not _missing_function(e):
+            raise
+        logger.info(f"[BulkMutations] {name} unavailable, using set-based fallback: {e}")
+        return None
+
+
+def migrate_anonymous_session(client: Any, session_id: str, user_id: str) -> dict[str, int]:
+    """Re-own an anonymous session's conversations, user messages and participants"""
+    result = _call_rpc(client, MIGRATE_SESSION_RPC, {"p_session_id": session_id, "p_user_id": user_id})
+    if isinstance(result, list):
+        result = result[0] if result else None
+    if isinstance(result, dict):
+        return {key: int(result.get(key) or 0) for key in ("conversations", "messages", "participants")}
+
+    conversations = client.table("unified_conversations").select("id").eq(
+        "metadata->>session_id", session_id
+    ).execute().data or []
+    conversation_ids = [c["id"] for c in conversations]
+    if not conversation_ids:
+        return {"conversations": 0, "messages": 0, "participants": 0}
+
+    return {
+        "conversations": bulk_update(client, "unified_conversations", {
+            "created_by": user_id,
+            "entity_id": user_id,
+            "updated_at": datetime.utcnow().isoformat()
+        }, "id", conversation_ids),
+        "messages": bulk_update(
+            client, "unified_messages", {"sender_id": user_id}, "conversation_id", conversation_ids,
+            lambda query: query.eq("sender_type", "user"),
+        ),
+        "participants": bulk_update(
+            client, "unified_conversation_participants", {"participant_id": user_id},
+            "conversation_id", conversation_ids,
+        ),
+    }
+
+
+def rewrite_bid_statuses(submitted_bids: list[dict[str, Any]], winner_contractor_id: str) -> list[dict[str, Any]]:
+    """submitted_bids with the winner accepted and every other bid rejected"""
+    return [
+        {**bid, "status": "accepted" if bid.get("contractor_id") == winner_contractor_id else "rejected"}
+        for bid in submitted_bids
+    ]
+
+
+def select_winning_bid(client: Any,
+                       bid_card: dict[str, Any],
+                       contractor_id: str,
+                       winner_fields: dict[str, Any]) -> Optional[dict[str, int]]:
+    """
+    Record the winner and rewrite every submitted bid's status in one write
+
+    Only applies while the bid card has no winner yet; returns None when
+    another request selected a winner first.
+    """
+    result = _call_rpc(client, SELECT_WINNING_BID_RPC, {
+        "p_bid_card_id": bid_card["id"],
+        "p_contractor_id": contractor_id,
+        "p_winner": winner_fields,
+    })
+    if isinstance(result, list):
+        result = result[0] if result else None
+    if isinstance(result, dict):
+        if not result.get("selected"):
+            return None
+        return {"accepted": int(result.get("accepted") or 0), "rejected": int(result.get("rejected") or 0)}
+
+    bid_document = dict(bid_card.get("bid_document") or {})
+    bid_document["submitted_bids"] = rewrite_bid_statuses(bid_document.get("submitted_bids", []), contractor_id)
+    updated = client.table("bid_cards").update({**winner_fields, "bid_document": bid_document}).eq(
+        "id", bid_card["id"]
+    ).is_("winner_contractor_id", "null").execute()
+    if not updated.data:
+        return None
+    accepted = sum(1 for bid in bid_document["submitted_bids"] if bid["status"] == "accepted")
+    return {"accepted": accepted, "rejected": len(bid_document["submitted_bids"]) - accepted}
@@ -0,0 +1,535 @@
+"""
+COIA Research Job Queue
+Durable background jobs for landing-page company research
+
+- Jobs are persisted to the coia_research_jobs table, so queued or running
+  research survives a worker restart and is picked up again on startup
+- One active job per (company, location): a second request for the same
+  company joins the running job instead of paying for the research twice
+- Running jobs hold a lease that is renewed while they work; a job whose
+  lease expired (worker crashed) can be claimed by any other worker
+- Every write patches only the fields it changed and is conditional on the
+  row's version, so a claim succeeds for exactly one worker and a slow writer
+  never overwrites status, progress or subscribers saved by another
+- Progress is pushed to every subscribed session as the job advances
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from services.api_response_cache import normalize_text
+
+
+logger = logging.getLogger(__name__)
+
+JOB_TABLE = "coia_research_jobs"
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+LEASE_SECONDS = float(os.getenv("COIA_RESEARCH_LEASE_SECONDS", "120"))
+RESEARCH_CONCURRENCY = int(os.getenv("COIA_RESEARCH_CONCURRENCY", "4"))
+# A completed job this recent is handed back instead of researching again
+RESEARCH_REUSE_SECONDS = float(os.getenv("COIA_RESEARCH_REUSE_SECONDS", "3600"))
+MAX_ATTEMPTS = 3
+MAX_PATCH_RETRIES = 5
+
+OWNER_FIELDS = ("worker_id", "lease_expires_at", "status")
+
+ProgressCallback = Callable[..., Awaitable[None]]
+JobRunner = Callable[["ResearchJob", ProgressCallback], Awaitable[dict[str, Any]]]
+SessionNotifier = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+
+def research_job_key(company_name: str, location: Optional[str]) -> str:
+    """De-duplication key: the same company and location share one job"""
+    return f"{normalize_text(company_name)}|{normalize_text(location)}"
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _epoch(value: Any) -> float:
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+@dataclass
+class ResearchJob:
+    """One company research request and everyone waiting on it"""
+    id: str
+    job_key: str
+    company_name: str
+    location: Optional[str]
+    subscribers: list[dict[str, str]] = field(default_factory=list)
+    status: str = QUEUED
+    progress: list[dict[str, Any]] = field(default_factory=list)
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    lease_expires_at: float = 0.0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    version: int = 0
+
+    @property
+    def session_ids(self) -> list[str]:
+        return [s["session_id"] for s in self.subscribers if s.get("session_id")]
+
+    def subscribe(self, contractor_lead_id: str, session_id: Optional[str]) -> bool:
+        """Add a waiting session; returns False if it was already subscribed"""
+        entry = {"contractor_lead_id": contractor_lead_id, "session_id": session_id}
+        if entry in self.subscribers:
+            return False
+        self.subscribers.append(entry)
+        return True
+
+    def merge_subscribers(self, stored: list[dict[str, str]]) -> None:
+        """Keep subscribers another worker saved alongside the ones added here"""
+        self.subscribers = list(stored) + [s for s in self.subscribers if s not in stored]
+
+    def to_row(self) -> dict[str, Any]:
+        row = asdict(self)
+        row["lease_expires_at"] = _iso(self.lease_expires_at)
+        row["created_at"] = _iso(self.created_at)
+        row["updated_at"] = _iso(self.updated_at)
+        return row
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "ResearchJob":
+        return cls(
+            id=row["id"],
+            job_key=row["job_key"],
+            company_name=row["company_name"],
+            location=row.get("location"),
+            subscribers=list(row.get("subscribers") or []),
+            status=row.get("status", QUEUED),
+            progress=list(row.get("progress") or []),
+            result=row.get("result"),
+            error=row.get("error"),
+            attempts=row.get("attempts") or 0,
+            worker_id=row.get("worker_id"),
+            lease_expires_at=_epoch(row.get("lease_expires_at")),
+            created_at=_epoch(row.get("created_at")),
+            updated_at=_epoch(row.get("updated_at")),
+            version=row.get("version") or 0,
+        )
+
+
+class SupabaseResearchJobStore:
+    """Job persistence in the coia_research_jobs table"""
+
+    def __init__(self, db_client: Any):
+        self.db_client = db_client
+
+    def create(self, job: ResearchJob) -> ResearchJob:
+        """Insert a job; if another worker already has an active job for the key, return that one"""
+        try:
+            self.db_client.table(JOB_TABLE).insert(job.to_row()).execute()
+            return job
+        except Exception as e:
+            # The partial unique index on job_key rejects a second active job
+            existing = self.find_active(job.job_key)
+            if existing is None:
+                raise
+            logger.info(f"[ResearchJobs] Joined job {existing.id} created concurrently: {e}")
+            return existing
+
+    def find_active(self, job_key: str) -> Optional[ResearchJob]:
+        result = self.db_client.table(JOB_TABLE).select("*").eq("job_key", job_key).in_(
+            "status", list(ACTIVE_STATUSES)
+        ).limit(1).execute()
+        return ResearchJob.from_row(result.data[0]) if result.data else None
+
+    def find_latest(self, job_key: str) -> Optional[ResearchJob]:
+        result = self.db_client.table(JOB_TABLE).select("*").eq("job_key", job_key).order(
+            "created_at", desc=True
+        ).limit(1).execute()
+        return ResearchJob.from_row(result.data[0]) if result.data else None
+
+    def get(self, job_id: str) -> Optional[ResearchJob]:
+        result = self.db_client.table(JOB_TABLE).select("*").eq("id", job_id).limit(1).execute()
+        return ResearchJob.from_row(result.data[0]) if result.data else None
+
+    def update(self, job: ResearchJob, fields: tuple[str, ...]) -> bool:
+        """
+        Write only `fields`, if the row is still at job.version (migration 022).
+
+        Returns False, leaving the row untouched, when another worker wrote first.
+        """
+        row = job.to_row()
+        patch = {name: row[name] for name in fields}
+        patch["version"] = job.version + 1
+        result = self.db_client.table(JOB_TABLE).update(patch).eq("id", job.id).eq(
+            "version", job.version
+        ).execute()
+        if len(result.data or []) != 1:
+            return False
+        job.version += 1
+        return True
+
+    def list_active(self) -> list[ResearchJob]:
+        result = self.db_client.table(JOB_TABLE).select("*").in_("status", list(ACTIVE_STATUSES)).execute()
+        return [ResearchJob.from_row(row) for row in result.data or []]
+
+
+class InMemoryResearchJobStore:
+    """Process-local job store for tests and deployments without Supabase"""
+
+    def __init__(self):
+        self._rows: dict[str, dict[str, Any]] = {}
+
+    def create(self, job: ResearchJob) -> ResearchJob:
+        existing = self.find_active(job.job_key)
+        if existing is not None:
+            return existing
+        self._rows[job.id] = job.to_row()
+        return job
+
+    def find_active(self, job_key: str) -> Optional[ResearchJob]:
+        for row in self._rows.values():
+            if row["job_key"] == job_key and row["status"] in ACTIVE_STATUSES:
+                return ResearchJob.from_row(row)
+        return None
+
+    def find_latest(self, job_key: str) -> Optional[ResearchJob]:
+        rows = [row for row in self._rows.values() if row["job_key"] == job_key]
+        return ResearchJob.from_row(max(rows, key=lambda r: _epoch(r["created_at"]))) if rows else None
+
+    def get(self, job_id: str) -> Optional[ResearchJob]:
+        row = self._rows.get(job_id)
+        return ResearchJob.from_row(row) if row else None
+
+    def update(self, job: ResearchJob, fields: tuple[str, ...]) -> bool:
+        row = self._rows.get(job.id)
+        if row is None or row["version"] != job.version:
+            return False
+        source = job.to_row()
+        row.update({name: source[name] for name in fields}, version=job.version + 1)
+        job.version += 1
+        return True
+
+    def list_active(self) -> list[ResearchJob]:
+        return [ResearchJob.from_row(row) for row in self._rows.values() if row["status"] in ACTIVE_STATUSES]
+
+
+class ResearchJobQueue:
+    """
+    Runs research jobs in the background with de-duplication and crash recovery.
+
+    `runner(job, progress)` does the actual research and returns the result
+    stored on the job; `await progress(step, **data)` records a step and
+    pushes it to every subscribed session through `notifier`.
+    """
+
+    def __init__(self,
+                 store: Any,
+                 runner: JobRunner,
+                 notifier: Optional[SessionNotifier] = None,
+                 concurrency: int = RESEARCH_CONCURRENCY,
+                 lease_seconds: float = LEASE_SECONDS,
+                 reuse_seconds: float = RESEARCH_REUSE_SECONDS,
+                 clock: Callable[[], float] = time.time,
+                 worker_id: Optional[str] = None):
+        self.store = store
+        self.runner = runner
+        self.notifier = notifier
+        self.lease_seconds = lease_seconds
+        self.reuse_seconds = reuse_seconds
+        self.clock = clock
+        self.worker_id = worker_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._jobs: dict[str, ResearchJob] = {}  # job_key -> job owned by this worker
+        self._tasks: dict[str, asyncio.Task] = {}  # job_id -> task
+
+    async def submit(self,
+                     company_name: str,
+                     location: Optional[str],
+                     contractor_lead_id: str,
+                     session_id: Optional[str] = None) -> ResearchJob:
+        """
+        Start research for a company, or join the job already researching it.
+
+        A recently completed job is returned as-is (status COMPLETED); the
+        caller is responsible for applying its result to the new session.
+        """
+        job_key = research_job_key(company_name, location)
+
+        local = self._jobs.get(job_key)
+        if local is not None:
+            if local.subscribe(contractor_lead_id, session_id):
+                await self._save(local, "subscribers")
+                if session_id:
+                    await self._notify(local, {"type": "research_joined", "progress": local.progress},
+                                       session_ids=[session_id])
+            logger.info(f"[ResearchJobs] {company_name}: joined running job {local.id}")
+            return local
+
+        now = self.clock()
+        existing = await asyncio.to_thread(self.store.find_active, job_key)
+        if existing is not None and existing.lease_expires_at > now:
+            # Another worker owns it and is alive
+            if existing.subscribe(contractor_lead_id, session_id):
+                await self._save(existing, "subscribers")
+            logger.info(f"[ResearchJobs] {company_name}: joined job {existing.id} on worker {existing.worker_id}")
+            return existing
+
+        if existing is None and self.reuse_seconds > 0:
+            latest = await asyncio.to_thread(self.store.find_latest, job_key)
+            if latest is not None and latest.status == COMPLETED and now - latest.updated_at < self.reuse_seconds:
+                logger.info(f"[ResearchJobs] {company_name}: reusing completed job {latest.id}")
+                return latest
+
+        if existing is not None:
+            logger.info(f"[ResearchJobs] {company_name}: taking over job {existing.id} with expired lease")
+            existing.subscribe(contractor_lead_id, session_id)
+            claimed = await self._claim(existing, "subscribers")
+            if claimed is not None:
+                return claimed
+            # Another worker claimed it first; join its job
+            current = await asyncio.to_thread(self.store.get, existing.id)
+            if current is not None and current.subscribe(contractor_lead_id, session_id):
+                await self._save(current, "subscribers")
+            return current or existing
+
+        job = ResearchJob(
+            id=str(uuid.uuid4()),
+            job_key=job_key,
+            company_name=company_name,
+            location=location,
+            worker_id=self.worker_id,
+            lease_expires_at=now + self.lease_seconds,
+            created_at=now,
+            updated_at=now,
+        )
+        job.subscribe(contractor_lead_id, session_id)
+        stored = await asyncio.to_thread(self.store.create, job)
+        if stored.id != job.id:
+            # Lost the race to another worker; join its job
+            if stored.subscribe(contractor_lead_id, session_id):
+                await self._save(stored, "subscribers")
+            return stored
+
+        self._start(job)
+        return job
+
+    async def resume_pending(self) -> int:
+        """Claim queued/running jobs whose owner stopped renewing the lease (call on startup)"""
+        now = self.clock()
+        resumed = 0
+        for job in await asyncio.to_thread(self.store.list_active):
+            if job.lease_expires_at > now or job.job_key in self._jobs:
+                continue
+            if await self._claim(job) is not None:
+                resumed += 1
+        if resumed:
+            logger.info(f"[ResearchJobs] Resumed {resumed} interrupted research jobs")
+        return resumed
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[ResearchJob]:
+        """Wait for a job this worker is running; returns the stored job"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def shutdown(self) -> None:
+        """Stop local jobs; their leases lapse and another worker resumes them"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _claim(self, job: ResearchJob, *fields: str) -> Optional[ResearchJob]:
+        """
+        Take over a job read with an expired lease in one conditional write.
+
+        Only the worker whose write matches the version it read wins; everyone
+        else gets None and must not run the job.
+        """
+        job.worker_id = self.worker_id
+        job.lease_expires_at = self.clock() + self.lease_seconds
+        job.updated_at = self.clock()
+        gave_up = job.attempts >= MAX_ATTEMPTS
+        if gave_up:
+            job.status = FAILED
+            job.error = job.error or f"Gave up after {job.attempts} attempts"
+            fields += ("error",)
+        else:
+            job.status = QUEUED
+        try:
+            claimed = await asyncio.to_thread(self.store.update, job, OWNER_FIELDS + fields + ("updated_at",))
+        except Exception as e:
+            logger.warning(f"[ResearchJobs] Could not claim job {job.id}: {e}")
+            return None
+        if not claimed:
+            logger.info(f"[ResearchJobs] Job {job.id} was claimed by another worker")
+            return None
+        if gave_up:
+            await self._notify(job, {"type": "research_failed", "error": job.error})
+        else:
+            self._start(job)
+        return job
+
+    def _start(self, job: ResearchJob) -> None:
+        self._jobs[job.job_key] = job
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.id] = task
+
+        def _done(_task: asyncio.Task) -> None:
+            self._tasks.pop(job.id, None)
+            if self._jobs.get(job.job_key) is job:
+                del self._jobs[job.job_key]
+
+        task.add_done_callback(_done)
+
+    async def _run(self, job: ResearchJob) -> None:
+        async with self._semaphore:
+            job.status = RUNNING
+            job.attempts += 1
+            job.lease_expires_at = self.clock() + self.lease_seconds
+            await self._save(job, "status", "attempts", "lease_expires_at")
+            await self._notify(job, {"type": "research_started"})
+            heartbeat = asyncio.create_task(self._heartbeat(job))
+
+            async def progress(step: str, **data: Any) -> None:
+                entry = {"step": step, "at": _iso(self.clock()), **data}
+                job.progress.append(entry)
+                await self._save(job, "progress")
+                await self._notify(job, {"type": "research_progress", **entry})
+
+            try:
+                result = await self.runner(job, progress)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ResearchJobs] Job {job.id} for {job.company_name} failed: {e}")
+                job.status = FAILED
+                job.error = str(e)
+                await self._save(job, "status", "error")
+                await self._notify(job, {"type": "research_failed", "error": job.error})
+                return
+            finally:
+                heartbeat.cancel()
+
+            job.status = COMPLETED
+            job.result = result
+            job.error = None
+            await self._save(job, "status", "result", "error")
+            await self._notify(job, {"type": "research_complete", "result": result})
+
+    async def _heartbeat(self, job: ResearchJob) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            job.lease_expires_at = self.clock() + self.lease_seconds
+            await self._save(job, "lease_expires_at")
+
+    async def _save(self, job: ResearchJob, *fields: str) -> bool:
+        """
+        Patch `fields` of a job with a version check.
+
+        On a conflict the other fields are refreshed from the stored row
+        (subscribers are merged) and the patch is retried; a worker that lost
+        the job to another one stops writing it.
+        """
+        fields += ("updated_at",)
+        for _ in range(MAX_PATCH_RETRIES):
+            job.updated_at = self.clock()
+            try:
+                if await asyncio.to_thread(self.store.update, job, fields):
+                    return True
+                current = await asyncio.to_thread(self.store.get, job.id)
+            except Exception as e:
+                logger.warning(f"[ResearchJobs] Could not persist job {job.id}: {e}")
+                return False
+            if current is None:
+                return False
+            if job.worker_id == self.worker_id and current.worker_id != self.worker_id:
+                logger.warning(f"[ResearchJobs] Job {job.id} was taken over by {current.worker_id}, not saving")
+                return False
+            for name in ResearchJob.__dataclass_fields__:
+                if name == "subscribers" and name in fields:
+                    job.merge_subscribers(current.subscribers)
+                elif name not in fields:
+                    setattr(job, name, getattr(current, name))
+        logger.warning(f"[ResearchJobs] Job {job.id} kept changing, gave up saving {fields}")
+        return False
+
+    async def _notify(self, job: ResearchJob, message: dict[str, Any],
+                      session_ids: Optional[list[str]] = None) -> None:
+        if self.notifier is None:
+            return
+        payload = {
+            "job_id": job.id,
+            "company_name": job.company_name,
+            "status": job.status,
+            "timestamp": _iso(self.clock()),
+            **message,
+        }
+        for session_id in session_ids or job.session_ids:
+            try:
+                await self.notifier(session_id, payload)
+            except Exception as e:
+                logger.debug(f"[ResearchJobs] Notify {session_id} failed: {e}")
+
+
+def wait_for_research(store: Any,
+                      company_name: str,
+                      location: Optional[str],
+                      timeout: float,
+                      max_age: float = RESEARCH_REUSE_SECONDS,
+                      poll_interval: float = 0.5,
+                      clock: Callable[[], float] = time.time) -> Optional[ResearchJob]:
+    """
+    Blocking lookup for sync callers (DeepAgents tools run in worker threads):
+    return a fresh completed job for the company, waiting up to `timeout` for an
+    active one to finish. Returns None when there is nothing to reuse.
+    """
+    job_key = research_job_key(company_name, location)
+    deadline = clock() + timeout
+    while True:
+        job = store.find_latest(job_key)
+        if job is None or job.status == FAILED:
+            return None
+        if job.status == COMPLETED:
+            return job if clock() - job.updated_at < max_age else None
+        if clock() >= deadline:
+            return None
+        time.sleep(poll_interval)
+
+
+def _default_store() -> Any:
+    """Supabase-backed store when the database is configured, in-memory otherwise"""
+    try:
+        from database_simple import db
+        if db.is_available():
+            return SupabaseResearchJobStore(db.client)
+    except Exception as e:
+        logger.warning(f"[ResearchJobs] Supabase unavailable, jobs will not survive restarts: {e}")
+    return InMemoryResearchJobStore()
+
+
+_job_store: Optional[Any] = None
+
+
+def get_research_job_store() -> Any:
+    """Return the process-wide research job store"""
+    global _job_store
+    if _job_store is None:
+        _job_store = _default_store()
+    return _job_store
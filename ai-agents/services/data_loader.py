@@ -0,0 +1,174 @@
+"""
+Request-Scoped Supabase Loader
+DataLoader-style batching and caching for Supabase reads
+
+- load_many()/load_related_many() resolve a whole key list with one `in_`
+  query per chunk of keys; keys are de-duplicated and results cached for the
+  rest of the request
+- Every batch is read in PAGE_SIZE pages, so related rows past PostgREST's
+  max-rows cap are not silently dropped (callers count them)
+- DataLoaderMiddleware gives every HTTP request its own loaders; outside a
+  request get_loader() returns a fresh, uncached-across-calls loader
+- DATALOADER_INSTRUMENT=1 logs the Supabase query count per request and sets
+  an X-Query-Count header, so N+1 regressions show up in logs
+"""
+
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterable, Iterator, Optional
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from services.bulk_mutations import IN_CHUNK_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENT = os.getenv("DATALOADER_INSTRUMENT", "").lower() in ("1", "true", "yes")
+QUERY_WARN_THRESHOLD = int(os.getenv("DATALOADER_QUERY_WARN", "25"))
+# Rows per request; must not exceed PostgREST's db-max-rows (1000 by default)
+PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class _Spec:
+    """What a batch query looks like apart from its keys"""
+    table: str
+    column: str
+    columns: str
+    filters: tuple[tuple[str, Any], ...]
+    order: Optional[str]
+    many: bool
+
+    def select_columns(self) -> str:
+        if self.columns == "*" or self.column in (c.strip() for c in self.columns.split(",")):
+            return self.columns
+        return f"{self.columns}, {self.column}"
+
+
+def _spec(table: str, column: str, columns: str, filters: Optional[dict[str, Any]],
+          order: Optional[str], many: bool) -> _Spec:
+    return _Spec(table, column, columns, tuple(sorted((filters or {}).items())), order, many)
+
+
+class SupabaseLoader:
+    """Batches and caches key lookups against one Supabase client"""
+
+    def __init__(self, client: Any):
+        self.client = client
+        self._cache: dict[_Spec, dict[Hashable, Any]] = {}
+        self.query_count = 0
+        self.queries_by_table: Counter = Counter()
+
+    def _fetch(self, spec: _Spec, keys: Iterable[Hashable]) -> dict[Hashable, Any]:
+        """Resolve keys for a spec, querying only the ones not cached yet"""
+        cache = self._cache.setdefault(spec, {})
+        missing = [key for key in dict.fromkeys(keys) if key not in cache]
+        for start in range(0, len(missing), IN_CHUNK_SIZE):
+            chunk = missing[start:start + IN_CHUNK_SIZE]
+            rows = self._fetch_chunk(spec, chunk)
+            for key in chunk:
+                cache[key] = [] if spec.many else None
+            for row in rows:
+                key = row.get(spec.column)
+                if spec.many:
+                    cache.setdefault(key, []).append(row)
+                elif cache.get(key) is None:
+                    cache[key] = row
+        return {key: cache[key] for key in keys}
+
+    def _fetch_chunk(self, spec: _Spec, chunk: list[Hashable]) -> list[dict[str, Any]]:
+        """Every row matching one IN (...) chunk, paged in a stable order"""
+        rows: list[dict[str, Any]] = []
+        while True:
+            query = self.client.table(spec.table).select(spec.select_columns()).in_(spec.column, chunk)
+            for name, value in spec.filters:
+                query = query.eq(name, value)
+            if spec.order:
+                column, _, direction = spec.order.partition(".")
+                query = query.order(column, desc=direction == "desc")
+            else:
+                query = query.order(spec.column)
+            page = query.order("id").range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data or []
+            self.query_count += 1
+            self.queries_by_table[spec.table] += 1
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+
+    def load_many(self, table: str, keys: Iterable[Hashable], column: str = "id",
+                  columns: str = "*", filters: Optional[dict[str, Any]] = None) -> dict[Hashable, Optional[dict]]:
+        """Row per key (None when missing) in at most one query per chunk of keys"""
+        return self._fetch(_spec(table, column, columns, filters, None, False), list(keys))
+
+    def load_related_many(self, table: str, column: str, keys: Iterable[Hashable], columns: str = "*",
+                          filters: Optional[dict[str, Any]] = None,
+                          order: Optional[str] = None) -> dict[Hashable, list[dict]]:
+        """All rows whose `column` matches each key; order is "column" or "column.desc" """
+        return self._fetch(_spec(table, column, columns, filters, order, True), list(keys))
+
+    def prime(self, table: str, row: dict[str, Any], column: str = "id", columns: str = "*") -> None:
+        """Seed the cache with a row the caller already has"""
+        self._cache.setdefault(_spec(table, column, columns, None, None, False), {})[row[column]] = row
+
+    def clear(self, table: Optional[str] = None) -> None:
+        """Drop cached rows (after writes that would make them stale)"""
+        for spec in list(self._cache):
+            if table is None or spec.table == table:
+                del self._cache[spec]
+
+
+# ---- request scope ------------------------------------------------------
+
+_request_loaders: ContextVar[Optional[dict[int, SupabaseLoader]]] = ContextVar("request_loaders", default=None)
+
+
+def get_loader(client: Any) -> SupabaseLoader:
+    """The current request's loader for this client (a fresh one outside a request scope)"""
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return SupabaseLoader(client)
+    loader = loaders.get(id(client))
+    if loader is None:
+        loader = loaders[id(client)] = SupabaseLoader(client)
+    return loader
+
+
+@contextmanager
+def request_scope() -> Iterator[dict[int, SupabaseLoader]]:
+    """Share loaders (and their caches) inside the block; joins an already active scope"""
+    loaders = _request_loaders.get()
+    if loaders is not None:
+        yield loaders
+        return
+    token = _request_loaders.set({})
+    try:
+        yield _request_loaders.get()
+    finally:
+        _request_loaders.reset(token)
+
+
+def scope_query_counts(loaders: dict[int, SupabaseLoader]) -> tuple[int, Counter]:
+    by_table: Counter = Counter()
+    for loader in loaders.values():
+        by_table.update(loader.queries_by_table)
+    return sum(by_table.values()), by_table
+
+
+class DataLoaderMiddleware(BaseHTTPMiddleware):
+    """Gives each request its own loader cache; optionally reports loader query counts"""
+
+    async def dispatch(self, request: Request, call_next):
+        with request_scope() as loaders:
+            response = await call_next(request)
+            if INSTRUMENT:
+                total, by_table = scope_query_counts(loaders)
+                response.headers["X-Query-Count"] = str(total)
+                log = logger.warning if total > QUERY_WARN_THRESHOLD else logger.info
+                log(f"[DataLoader] {request.method} {request.url.path}: {total} batched queries {dict(by_table)}")
+            return response
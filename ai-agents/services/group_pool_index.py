@@ -0,0 +1,118 @@
+"""
+Group Pool Index
+Radius matching of group bidding pools through geo cells
+
+- Forming pools carry latitude/longitude and a geo_cell (a CELL_DEGREES grid
+  square); (category_id, geo_cell) is indexed for forming pools (migration 019)
+- nearby() turns a ZIP + radius into the handful of cells covering it, reads
+  those cells in one query and keeps pools actually within the radius, so
+  lookups cost the same in every metro and never scan by ZIP
+- find_joinable() prefers the fullest pool in range, so neighbours in
+  adjacent ZIPs end up in one pool instead of each starting their own
+- group_pool_cell_stats holds per-cell counters maintained by triggers;
+  area_stats() sums the covering cells' rows instead of summing pool rows
+- ZIPs without coordinates fall back to exact ZIP matching
+"""
+
+import logging
+import math
+import os
+from typing import Any, Callable, Optional
+
+from utils.simple_radius_search import haversine_distance
+
+
+logger = logging.getLogger(__name__)
+
+CELL_DEGREES = 0.1  # ~7 miles north-south
+POOL_MATCH_RADIUS_MILES = float(os.getenv("GROUP_POOL_MATCH_RADIUS_MILES", "5"))
+MAX_RADIUS_MILES = 50.0
+MILES_PER_DEGREE_LAT = 69.0
+
+Coordinates = tuple[float, float]
+
+
+def zip_coordinates(zip_code: str) -> Optional[Coordinates]:
+    """Coordinates from the uszipcode database when installed, else the built-in table"""
+    try:
+        from utils.radius_search import get_zip_coordinates
+    except ImportError:
+        from utils.simple_radius_search import get_zip_coordinates
+    return get_zip_coordinates(zip_code)
+
+
+def geo_cell(latitude: float, longitude: float) -> str:
+    return f"{math.floor(latitude / CELL_DEGREES)}:{math.floor(longitude / CELL_DEGREES)}"
+
+
+def covering_cells(latitude: float, longitude: float, radius_miles: float) -> list[str]:
+    """Every cell that intersects the radius' bounding box"""
+    radius_miles = min(radius_miles, MAX_RADIUS_MILES)
+    dlat = radius_miles / MILES_PER_DEGREE_LAT
+    dlng = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 0.01))
+    lat_range = range(math.floor((latitude - dlat) / CELL_DEGREES), math.floor((latitude + dlat) / CELL_DEGREES) + 1)
+    lng_range = range(math.floor((longitude - dlng) / CELL_DEGREES), math.floor((longitude + dlng) / CELL_DEGREES) + 1)
+    return [f"{lat}:{lng}" for lat in lat_range for lng in lng_range]
+
+
+class GroupPoolIndex:
+    """Cell-bucketed lookups over group_bidding_pools"""
+
+    def __init__(self, client: Any, locate: Callable[[str], Optional[Coordinates]] = zip_coordinates):
+        self.client = client
+        self.locate = locate
+
+    def location_fields(self, zip_code: str) -> dict[str, Any]:
+        """latitude/longitude/geo_cell to store on a new pool ({} for unknown ZIPs)"""
+        coordinates = self.locate(zip_code)
+        if not coordinates:
+            return {}
+        latitude, longitude = coordinates
+        return {"latitude": latitude, "longitude": longitude, "geo_cell": geo_cell(latitude, longitude)}
+
+    def nearby(self,
+               zip_code: str,
+               category_id: Optional[str] = None,
+               radius_miles: float = POOL_MATCH_RADIUS_MILES,
+               columns: str = "*") -> list[dict[str, Any]]:
+        """Forming pools within radius_miles of a ZIP, nearest first, with distance_miles"""
+        center = self.locate(zip_code)
+        query = self.client.table("group_bidding_pools").select(columns).eq("pool_status", "forming")
+        if category_id:
+            query = query.eq("category_id", category_id)
+        if not center:
+            pools = query.eq("zip_code", zip_code).execute().data or []
+            return [{**pool, "distance_miles": 0.0} for pool in pools]
+
+        pools = query.in_("geo_cell", covering_cells(*center, radius_miles)).execute().data or []
+        in_range = []
+        for pool in pools:
+            if pool.get("latitude") is None or pool.get("longitude") is None:
+                continue
+            distance = haversine_distance(center[0], center[1], pool["latitude"], pool["longitude"])
+            if distance <= radius_miles:
+                in_range.append({**pool, "distance_miles": round(distance, 2)})
+        in_range.sort(key=lambda pool: pool["distance_miles"])
+        return in_range
+
+    def find_joinable(self, category_id: str, zip_code: str,
+                      radius_miles: float = POOL_MATCH_RADIUS_MILES) -> Optional[dict[str, Any]]:
+        """The forming pool a new homeowner should join: fullest in range, then nearest"""
+        pools = self.nearby(zip_code, category_id, radius_miles)
+        if not pools:
+            return None
+        return min(pools, key=lambda pool: (-(pool.get("member_count") or 0), pool["distance_miles"]))
+
+    def area_stats(self, category_id: str, zip_code: str,
+                   radius_miles: float = POOL_MATCH_RADIUS_MILES) -> Optional[dict[str, int]]:
+        """Counter totals over the cells covering the radius; None when the ZIP has no coordinates"""
+        center = self.locate(zip_code)
+        if not center:
+            return None
+        rows = self.client.table("group_pool_cell_stats").select(
+            "forming_pools, forming_members, fulfilled_pools"
+        ).eq("category_id", category_id).in_("geo_cell", covering_cells(*center, radius_miles)).execute().data or []
+        return {
+            key: sum(row.get(key) or 0 for row in rows)
+            for key in ("forming_pools", "forming_members", "fulfilled_pools")
+        }
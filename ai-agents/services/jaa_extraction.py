@@ -0,0 +1,326 @@
+"""
+JAA Extraction
+Single structured-output extraction for JAA bid card generation
+
+- One LLM call returns the project analysis, the structured fields, the
+  contractor type ids and the timeline phrases (JAAExtraction schema)
+- Validation, defaults, complexity scoring and deadline parsing run
+  locally with SimpleDateParser, no further LLM round trips
+- build_project_data() produces the complete bid_cards row including the
+  bid_document, so a bid card is written with a single insert
+"""
+
+import json
+import re
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+from utils.date_parser import SimpleDateParser
+
+
+DEFAULT_CONTRACTOR_TYPE_IDS = [127, 219]  # handyman, general contractor
+EXTRACTION_METHOD = "IntelligentJAA_StructuredExtraction"
+
+# Sentences worth handing to the local date parser when the model found no phrases
+_DATE_HINT = re.compile(
+    r"\b(?:by|before|until|deadline|asap|urgent|wedding|graduation|party|event|"
+    r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    r"sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?|christmas|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b|\d{1,2}/\d{1,2}|\d{4}-\d\d-\d\d",
+    re.IGNORECASE,
+)
+_SENTENCE = re.compile(r"[^.!?\n]+")
+
+
+class ExtractedLocation(BaseModel):
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = None
+    property_type: Optional[str] = Field(None, description="house|condo|apartment|commercial")
+
+
+class ExtractedHomeowner(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    communication_preference: Optional[str] = Field(None, description="email|phone|text")
+
+
+class ExtractedContractorRequirements(BaseModel):
+    count_needed: Optional[int] = Field(None, description="3-6 contractors")
+    specialties_required: list[str] = []
+    license_requirements: list[str] = []
+
+
+class JAAExtraction(BaseModel):
+    """Everything JAA needs from a CIA conversation, produced by one model call"""
+    project_analysis: str = Field(
+        "", description="Short analysis: goal, scope, urgency, budget sensitivity, complexity, homeowner seriousness"
+    )
+    project_type: Optional[str] = Field(
+        None, description="kitchen|bathroom|roofing|flooring|plumbing|electrical|hvac|painting|landscaping|general"
+    )
+    service_type: Optional[str] = Field(None, description="installation|repair|maintenance|renovation|new_construction")
+    project_description: Optional[str] = Field(None, description="Detailed description of work needed")
+    budget_min: Optional[int] = Field(None, description="Minimum budget in dollars")
+    budget_max: Optional[int] = Field(None, description="Maximum budget in dollars")
+    budget_confidence: Optional[str] = Field(None, description="high|medium|low")
+    urgency_level: Optional[str] = Field(None, description="emergency|urgent|week|month|flexible")
+    timeline_start: Optional[str] = None
+    timeline_duration: Optional[str] = None
+    location: ExtractedLocation = ExtractedLocation()
+    materials_specified: list[str] = []
+    special_requirements: list[str] = []
+    homeowner_info: ExtractedHomeowner = ExtractedHomeowner()
+    contractor_requirements: ExtractedContractorRequirements = ExtractedContractorRequirements()
+    complexity_factors: list[str] = []
+    quality_expectations: Optional[str] = Field(None, description="basic|standard|premium")
+    intention_score: Optional[int] = Field(None, description="1-10, how serious the homeowner is")
+    contractor_type_ids: list[int] = Field([], description="Contractor type ids needed (see mapping)")
+    date_phrases: list[str] = Field(
+        [], description='Exact phrases mentioning deadlines or dates, e.g. "by Friday", "wedding June 15th"'
+    )
+
+
+EXTRACTION_SYSTEM_PROMPT = "You are a project analyst and data extraction specialist for InstaBids contractor marketplace."
+
+CONTRACTOR_TYPE_GUIDE = """Contractor type id mappings:
+- Plumbing work: [33, 207] (plumbing, plumber)
+- Electrical work: [48, 208] (electrical, electrician)
+- General construction: [127, 219] (handyman, general contractor)
+- HVAC work: [156, 234] (hvac, hvac contractor)
+- Roofing: [89, 223] (roofing, roofer)
+- Flooring: [67, 198] (flooring, flooring installer)
+- Kitchen remodel: [33, 48, 127, 207, 208, 219] (plumbing, electrical, general)
+- Bathroom remodel: [33, 48, 127, 207, 208, 219] (plumbing, electrical, general)"""
+
+
+def message_text(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("content") or ""
+    return getattr(message, "content", "") or ""
+
+
+def user_messages(messages: Iterable[Any]) -> list[str]:
+    return [message_text(m) for m in messages if isinstance(m, dict) and m.get("role") == "user"]
+
+
+def build_extraction_prompt(conversation: str, collected_info: dict[str, Any]) -> str:
+    return f"""
+Analyze this homeowner conversation and extract the project details.
+
+CONVERSATION:
+{conversation}
+
+COLLECTED INFO FROM CIA:
+{json.dumps(collected_info or {}, indent=2, default=str)}
+
+{CONTRACTOR_TYPE_GUIDE}
+
+IMPORTANT:
+- Only extract data that is clearly mentioned or strongly implied
+- Use null for unknown values
+- Be conservative with budget estimates
+- Consider urgency carefully based on language used
+- Assess intention score based on specificity and commitment level
+- Copy timeline and deadline phrases verbatim into date_phrases
+"""
+
+
+def calculate_complexity_score(extracted_data: dict[str, Any]) -> int:
+    """Project complexity score (1-10) from extracted data"""
+    score = 5  # Base score
+
+    # Budget impact
+    budget_max = extracted_data.get("budget_max") or 0
+    if budget_max > 100000:
+        score += 4
+    elif budget_max > 50000:
+        score += 3
+    elif budget_max > 25000:
+        score += 2
+    elif budget_max > 10000:
+        score += 1
+    elif budget_max < 2000:
+        score -= 2
+
+    # Urgency impact
+    urgency = extracted_data.get("urgency_level", "flexible")
+    if urgency == "emergency":
+        score += 3
+    elif urgency == "urgent":
+        score += 2
+
+    # Special requirements and complexity factors
+    score += len(extracted_data.get("special_requirements") or [])
+    score += len(extracted_data.get("complexity_factors") or []) * 0.5
+
+    # License requirements indicate complexity
+    score += len((extracted_data.get("contractor_requirements") or {}).get("license_requirements") or [])
+
+    return max(1, min(10, int(score)))
+
+
+def validate_extraction(extracted: dict[str, Any]) -> dict[str, Any]:
+    """Fill defaults, check contractor types and score complexity (in place, returns extracted)"""
+    if not extracted.get("project_type"):
+        extracted["project_type"] = "general"
+
+    if not extracted.get("budget_min") or extracted["budget_min"] < 100:
+        extracted["budget_min"] = 5000
+
+    if not extracted.get("budget_max") or extracted["budget_max"] < extracted["budget_min"]:
+        extracted["budget_max"] = max(extracted["budget_min"] * 2, 15000)
+
+    if not extracted.get("urgency_level"):
+        extracted["urgency_level"] = "flexible"
+
+    requirements = extracted.get("contractor_requirements") or {}
+    if not requirements.get("count_needed"):
+        extracted["contractor_requirements"] = {
+            "count_needed": 4,
+            "specialties_required": requirements.get("specialties_required") or [],
+            "license_requirements": requirements.get("license_requirements") or [],
+        }
+
+    type_ids = extracted.get("contractor_type_ids")
+    if not type_ids or not all(isinstance(x, int) and not isinstance(x, bool) for x in type_ids):
+        extracted["contractor_type_ids"] = list(DEFAULT_CONTRACTOR_TYPE_IDS)
+
+    extracted["complexity_score"] = calculate_complexity_score(extracted)
+    return extracted
+
+
+def _as_datetime(value: date) -> datetime:
+    return value if isinstance(value, datetime) else datetime.combine(value, datetime.min.time())
+
+
+def extract_dates(extracted: dict[str, Any],
+                  texts: Iterable[str],
+                  date_parser: Optional[SimpleDateParser] = None,
+                  now: Optional[datetime] = None) -> dict[str, Any]:
+    """
+    Deadline fields parsed locally from the model's date phrases, falling
+    back to date-looking sentences of the conversation
+
+    Dates are returned as ISO strings (JSON- and insert-safe). May override
+    extracted["urgency_level"] when the deadline is close.
+    """
+    date_parser = date_parser or SimpleDateParser()
+    now = now or datetime.now()
+
+    phrases = [p for p in extracted.get("date_phrases") or [] if p]
+    if not phrases:
+        phrases = [
+            sentence.strip() for text in texts for sentence in _SENTENCE.findall(text or "")
+            if _DATE_HINT.search(sentence)
+        ]
+
+    best: Optional[dict[str, Any]] = None
+    for phrase in phrases:
+        result = date_parser.parse_natural_language_date(phrase, now)
+        if result["parsed_date"] and (best is None or result["confidence"] > best["confidence"]):
+            best = result
+    if best is None:
+        return {}
+
+    deadline = _as_datetime(best["parsed_date"])
+    urgency = extracted.get("urgency_level") or "week"
+    calculated_urgency = date_parser.determine_campaign_duration(deadline, now)
+    if calculated_urgency != urgency:
+        print(f"[JAA EXTRACTION] Overriding urgency: {urgency} → {calculated_urgency} (based on deadline)")
+        extracted["urgency_level"] = calculated_urgency
+
+    return {
+        "project_completion_deadline": deadline.date().isoformat(),
+        "bid_collection_deadline": date_parser.calculate_bid_collection_deadline(deadline, urgency).date().isoformat(),
+        "deadline_hard": best["deadline_hard"],
+        "deadline_context": best["deadline_context"],
+        "confidence": best["confidence"],
+    }
+
+
+def build_bid_card_data(extracted: dict[str, Any]) -> dict[str, Any]:
+    """Bid card view of the validated extraction"""
+    requirements = extracted.get("contractor_requirements") or {}
+    return {
+        # Core project info
+        "project_type": extracted.get("project_type", "general"),
+        "service_type": extracted.get("service_type") or "installation",
+        "project_description": extracted.get("project_description") or "Project details to be discussed",
+
+        # Budget and timeline
+        "budget_min": extracted.get("budget_min", 5000),
+        "budget_max": extracted.get("budget_max", 15000),
+        "budget_confidence": extracted.get("budget_confidence") or "medium",
+        "urgency_level": extracted.get("urgency_level", "flexible"),
+        "timeline_start": extracted.get("timeline_start"),
+        "timeline_duration": extracted.get("timeline_duration"),
+
+        # Location
+        "location": extracted.get("location") or {},
+
+        # Requirements
+        "materials_specified": extracted.get("materials_specified") or [],
+        "special_requirements": extracted.get("special_requirements") or [],
+
+        # Contractor needs
+        "contractor_count_needed": requirements.get("count_needed", 4),
+        "specialties_required": requirements.get("specialties_required") or [],
+        "license_requirements": requirements.get("license_requirements") or [],
+        "contractor_type_ids": extracted.get("contractor_type_ids") or [],
+
+        # InstaBids metrics
+        "complexity_score": extracted.get("complexity_score", 5),
+        "intention_score": extracted.get("intention_score") or 7,
+        "quality_expectations": extracted.get("quality_expectations") or "standard",
+
+        # Homeowner info
+        "homeowner_info": extracted.get("homeowner_info") or {},
+
+        # AI generated insights
+        "ai_insights": {
+            "project_analysis": extracted.get("project_analysis"),
+            "complexity_factors": extracted.get("complexity_factors") or [],
+            "generated_by": EXTRACTION_METHOD,
+            "generated_at": datetime.now().isoformat()
+        }
+    }
+
+
+def build_project_data(thread_id: str, bid_card_data: dict[str, Any], extracted: dict[str, Any]) -> dict[str, Any]:
+    """Input for create_bid_card_with_defaults, bid_document included"""
+    location = bid_card_data.get("location") or {}
+    project_type = bid_card_data.get("project_type", "general_renovation")
+    return {
+        "project_type": project_type,
+        "title": bid_card_data.get("title") or f"{project_type.replace('_', ' ').title()} Project",
+        "description": bid_card_data.get("project_description", ""),
+        "urgency_level": bid_card_data.get("urgency_level", "week"),
+        "complexity_score": bid_card_data.get("complexity_score", 3),
+        "contractor_count_needed": bid_card_data.get("contractor_count_needed", 3),
+        "budget_min": bid_card_data.get("budget_min"),
+        "budget_max": bid_card_data.get("budget_max"),
+        "requirements": bid_card_data.get("special_requirements") or None,
+        "location_address": location.get("address"),
+        "location_city": location.get("city"),
+        "location_state": location.get("state"),
+        "location_zip": location.get("zip_code"),
+        "cia_thread_id": thread_id[-20:],  # Truncate to fit VARCHAR(20)
+        "timeline_start": bid_card_data.get("timeline_start"),
+        "bid_collection_deadline": extracted.get("bid_collection_deadline"),
+        "project_completion_deadline": extracted.get("project_completion_deadline"),
+        "deadline_hard": extracted.get("deadline_hard"),
+        "deadline_context": extracted.get("deadline_context"),
+        "bid_document": {
+            "full_cia_thread_id": thread_id,
+            "all_extracted_data": extracted,
+            "ai_analysis": bid_card_data,
+            "generated_at": datetime.now().isoformat(),
+            "extraction_method": EXTRACTION_METHOD,
+            "instabids_version": "3.0"
+        },
+    }
@@ -0,0 +1,300 @@
+"""
+JAA Incremental Extraction
+Per-thread extraction state so JAA only reads what CIA added since last time
+
+- The merged extraction, per-field confidence and a message watermark are
+  kept in unified_conversation_memory under the "jaa_extraction" key
+- new_messages() reads only unified_messages after the watermark, so the
+  delta prompt (current facts + new user turns) grows with new content,
+  not with the length of the conversation
+- merge_extraction() folds a delta into the current facts: empty values
+  never erase, lists are unioned, nested objects merge per subfield, and a
+  newer value wins unless its confidence is clearly lower
+- Fields CIA has already recorded in collected_info are merged in at full
+  confidence without an LLM call
+"""
+
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from pydantic import Field
+
+from services.jaa_extraction import CONTRACTOR_TYPE_GUIDE, JAAExtraction
+
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_MEMORY_KEY = "jaa_extraction"
+CIA_MEMORY_KEY = "cia_state"
+
+# A newer value replaces an older one unless it is this much less confident
+MERGE_CONFIDENCE_MARGIN = 0.2
+DEFAULT_DELTA_CONFIDENCE = 0.7
+
+LIST_FIELDS = frozenset({
+    "materials_specified", "special_requirements", "complexity_factors", "contractor_type_ids", "date_phrases",
+})
+NESTED_FIELDS = frozenset({"location", "homeowner_info", "contractor_requirements"})
+
+# CIA collected_info key -> extraction field ("parent.child" for nested fields)
+CIA_FIELD_MAP = {
+    "project_type": "project_type",
+    "service_type": "service_type",
+    "project_description": "project_description",
+    "budget_min": "budget_min",
+    "budget_max": "budget_max",
+    "urgency_level": "urgency_level",
+    "timeline_start": "timeline_start",
+    "materials": "materials_specified",
+    "special_requirements": "special_requirements",
+    "quality_expectations": "quality_expectations",
+    "address": "location.address",
+    "city": "location.city",
+    "state": "location.state",
+    "zip_code": "location.zip_code",
+    "location_zip": "location.zip_code",
+    "property_type": "location.property_type",
+    "email": "homeowner_info.email",
+    "phone": "homeowner_info.phone",
+    "communication_preference": "homeowner_info.communication_preference",
+}
+
+
+class JAADeltaExtraction(JAAExtraction):
+    """Facts stated or changed in the new messages only; unknown or unchanged fields stay empty"""
+    confidence: dict[str, float] = Field(
+        {}, description="0-1 confidence for each top-level field you filled in"
+    )
+
+
+@dataclass
+class ExtractionState:
+    """Merged JAA extraction for one conversation and how far it has read"""
+    conversation_id: str
+    extracted: dict[str, Any] = field(default_factory=dict)
+    confidence: dict[str, float] = field(default_factory=dict)
+    watermark: Optional[str] = None  # created_at of the newest processed message
+    watermark_ids: list[str] = field(default_factory=list)  # processed messages sharing that timestamp
+    messages_processed: int = 0
+    memory_id: Optional[str] = None
+
+    def to_memory_value(self) -> dict[str, Any]:
+        return {
+            "extracted": self.extracted,
+            "confidence": self.confidence,
+            "watermark": self.watermark,
+            "watermark_ids": self.watermark_ids,
+            "messages_processed": self.messages_processed,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    def advance(self, messages: list[dict[str, Any]]) -> None:
+        """Move the watermark past messages (as returned by new_messages)"""
+        if not messages:
+            return
+        newest = messages[-1]["created_at"]
+        same_instant = [m["id"] for m in messages if m.get("created_at") == newest]
+        self.watermark_ids = (self.watermark_ids if newest == self.watermark else []) + same_instant
+        self.watermark = newest
+        self.messages_processed += len(messages)
+
+
+@dataclass
+class ConversationSnapshot:
+    conversation_id: str
+    collected_info: dict[str, Any]
+    state: Optional[ExtractionState]
+
+
+def _is_empty(value: Any) -> bool:
+    if isinstance(value, dict):
+        return all(_is_empty(v) for v in value.values())
+    return value is None or value == "" or value == []
+
+
+def _wins(new_confidence: float, old_confidence: float) -> bool:
+    return new_confidence >= old_confidence - MERGE_CONFIDENCE_MARGIN
+
+
+def merge_extraction(current: dict[str, Any],
+                     confidence: dict[str, float],
+                     delta: dict[str, Any],
+                     delta_confidence: Optional[dict[str, float]] = None,
+                     default_confidence: float = DEFAULT_DELTA_CONFIDENCE) -> list[str]:
+    """
+    Fold delta into current (in place) and return the fields that changed
+
+    Nested objects are tracked as "parent.child" in confidence.
+    """
+    delta_confidence = delta_confidence or {}
+    changed = []
+    for name, value in delta.items():
+        if name == "confidence" or _is_empty(value):
+            continue
+        new_confidence = float(delta_confidence.get(name, default_confidence))
+        old = current.get(name)
+
+        if name in LIST_FIELDS and isinstance(value, list):
+            merged = list(dict.fromkeys([*(old or []), *value]))
+            if merged != old:
+                current[name] = merged
+                confidence[name] = max(confidence.get(name, 0.0), new_confidence)
+                changed.append(name)
+
+        elif name in NESTED_FIELDS and isinstance(value, dict):
+            merged = dict(old or {})
+            for key, sub_value in value.items():
+                path = f"{name}.{key}"
+                sub_confidence = float(delta_confidence.get(path, new_confidence))
+                if _is_empty(sub_value) or merged.get(key) == sub_value:
+                    continue
+                if isinstance(sub_value, list):
+                    sub_value = list(dict.fromkeys([*(merged.get(key) or []), *sub_value]))
+                elif not (_is_empty(merged.get(key)) or _wins(sub_confidence, confidence.get(path, 0.0))):
+                    continue
+                merged[key] = sub_value
+                confidence[path] = sub_confidence
+                changed.append(path)
+            current[name] = merged
+
+        elif old != value and (_is_empty(old) or _wins(new_confidence, confidence.get(name, 0.0))):
+            current[name] = value
+            confidence[name] = new_confidence
+            changed.append(name)
+
+    return changed
+
+
+def cia_facts(collected_info: dict[str, Any]) -> dict[str, Any]:
+    """Extraction-shaped view of the fields CIA has already recorded"""
+    facts: dict[str, Any] = {}
+    for key, target in CIA_FIELD_MAP.items():
+        value = (collected_info or {}).get(key)
+        if _is_empty(value):
+            continue
+        if target in LIST_FIELDS and not isinstance(value, list):
+            value = [value]
+        if "." in target:
+            parent, child = target.split(".", 1)
+            facts.setdefault(parent, {})[child] = value
+        else:
+            facts[target] = value
+    return facts
+
+
+def merge_cia_facts(state: ExtractionState, collected_info: dict[str, Any]) -> list[str]:
+    facts = cia_facts(collected_info)
+    paths = [f"{k}.{c}" for k, v in facts.items() if isinstance(v, dict) for c in v] + list(facts)
+    return merge_extraction(state.extracted, state.confidence, facts, dict.fromkeys(paths, 1.0))
+
+
+def build_delta_prompt(current: dict[str, Any], new_user_messages: Iterable[str]) -> str:
+    known = {k: v for k, v in current.items() if not _is_empty(v) and k != "project_analysis"}
+    conversation = "\n".join(new_user_messages)
+    return f"""
+Update the project details for this homeowner from their NEW messages only.
+
+KNOWN PROJECT DETAILS:
+{json.dumps(known, default=str)}
+
+NEW MESSAGES:
+{conversation}
+
+{CONTRACTOR_TYPE_GUIDE}
+
+IMPORTANT:
+- Fill in only fields the new messages add or change; leave everything else null or empty
+- Use confidence to rate each field you fill in (1.0 = stated explicitly)
+- Copy timeline and deadline phrases verbatim into date_phrases
+- Update project_analysis only if the new messages change the picture
+"""
+
+
+def _format_message(row: dict[str, Any]) -> Optional[dict[str, Any]]:
+    role = {"user": "user", "agent": "assistant"}.get(row.get("sender_type"))
+    if role is None:
+        return None
+    return {"role": role, "content": row.get("content") or "", "id": row.get("id"), "created_at": row.get("created_at")}
+
+
+class ExtractionStateStore:
+    """Reads conversation deltas and persists ExtractionState in unified memory"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def load(self, thread_id: str) -> Optional[ConversationSnapshot]:
+        """Conversation id, CIA collected_info and the saved extraction state (two queries)"""
+        conversation = self.client.table("unified_conversations").select("id").eq(
+            "metadata->>session_id", thread_id
+        ).limit(1).execute()
+        if not conversation.data:
+            return None
+        conversation_id = conversation.data[0]["id"]
+
+        memories = self.client.table("unified_conversation_memory").select(
+            "id, memory_key, memory_value"
+        ).eq("conversation_id", conversation_id).in_(
+            "memory_key", [CIA_MEMORY_KEY, EXTRACTION_MEMORY_KEY]
+        ).execute()
+        by_key = {row["memory_key"]: row for row in memories.data or []}
+
+        cia_state = (by_key.get(CIA_MEMORY_KEY) or {}).get("memory_value") or {}
+        if isinstance(cia_state, str):
+            cia_state = json.loads(cia_state)
+        collected_info = (cia_state.get("state") or cia_state).get("collected_info") or {}
+
+        state = None
+        saved = by_key.get(EXTRACTION_MEMORY_KEY)
+        if saved:
+            value = saved["memory_value"]
+            if isinstance(value, str):
+                value = json.loads(value)
+            state = ExtractionState(
+                conversation_id=conversation_id,
+                extracted=value.get("extracted") or {},
+                confidence=value.get("confidence") or {},
+                watermark=value.get("watermark"),
+                watermark_ids=value.get("watermark_ids") or [],
+                messages_processed=value.get("messages_processed") or 0,
+                memory_id=saved["id"],
+            )
+        return ConversationSnapshot(conversation_id, collected_info, state)
+
+    def new_messages(self, conversation_id: str, state: Optional[ExtractionState] = None) -> list[dict[str, Any]]:
+        """User and agent messages after the state's watermark (all of them without a state)"""
+        query = self.client.table("unified_messages").select(
+            "id, sender_type, content, created_at"
+        ).eq("conversation_id", conversation_id)
+        if state and state.watermark:
+            query = query.gte("created_at", state.watermark)
+        rows = query.order("created_at", desc=False).execute().data or []
+
+        seen = set(state.watermark_ids) if state else set()
+        rows = sorted((r for r in rows if r.get("id") not in seen), key=lambda r: r.get("created_at") or "")
+        return [m for m in map(_format_message, rows) if m]
+
+    def save(self, state: ExtractionState) -> None:
+        value = state.to_memory_value()
+        if state.memory_id:
+            self.client.table("unified_conversation_memory").update({
+                "memory_value": value, "updated_at": value["updated_at"],
+            }).eq("id", state.memory_id).execute()
+            return
+
+        memory_id = str(uuid.uuid4())
+        self.client.table("unified_conversation_memory").insert({
+            "id": memory_id,
+            "conversation_id": state.conversation_id,
+            "memory_type": "agent_state",
+            "memory_key": EXTRACTION_MEMORY_KEY,
+            "memory_value": value,
+            "created_at": value["updated_at"],
+            "updated_at": value["updated_at"],
+        }).execute()
+        state.memory_id = memory_id
+        logger.info("Saved JAA extraction state for conversation %s", state.conversation_id)
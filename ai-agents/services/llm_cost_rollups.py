@@ -0,0 +1,245 @@
+"""
+LLM Cost Rollups
+Pre-aggregated LLM usage behind the cost dashboards, alerts and live stream
+
+- llm_cost_rollups holds minute, hour and day buckets per (agent, provider,
+  model) with calls, errors, tokens, cost and duration sums; dashboards read
+  O(buckets) rows instead of scanning llm_usage
+- llm_session_costs keeps running totals per session for the expensive
+  sessions view and per-conversation limits
+- LLMCostTracker records every call through one atomic upsert-increment RPC
+  (apply_llm_usage_rollup, migration 021) that updates all three grains and
+  the session row, then publishes the call on LLM_COST_CHANNEL of the
+  pub/sub backplane so live views are pushed instead of polling
+- Minute buckets are only kept for MINUTE_RETENTION (prune_llm_minute_rollups)
+- Reads are paged (PAGE_SIZE rows per request), so monthly views and alert
+  windows are not cut off at PostgREST's max-rows cap
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from services.outreach_rollups import parse_timestamp
+
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "llm_cost_rollups"
+SESSION_TABLE = "llm_session_costs"
+ROLLUP_RPC = "apply_llm_usage_rollup"
+LLM_COST_CHANNEL = "llm-costs"
+
+GRAINS = ("minute", "hour", "day")
+MINUTE_RETENTION = timedelta(days=2)
+# Rows per request; must not exceed PostgREST's db-max-rows (1000 by default)
+PAGE_SIZE = 1000
+COUNTERS = ("calls", "errors", "prompt_tokens", "completion_tokens", "cost_usd", "duration_ms_sum")
+
+# Dashboard time ranges: (window, grain the trend is read at)
+TIME_RANGES: dict[str, tuple[timedelta, str]] = {
+    "hourly": (timedelta(hours=24), "hour"),
+    "daily": (timedelta(days=1), "hour"),
+    "weekly": (timedelta(days=7), "day"),
+    "monthly": (timedelta(days=30), "day"),
+}
+
+
+def bucket_start(value: Any, grain: str) -> datetime:
+    """Start of the UTC minute/hour/day containing value (date_trunc in the RPC)"""
+    moment = parse_timestamp(value).astimezone(timezone.utc)
+    if grain == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if grain == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def usage_deltas(call: dict[str, Any]) -> dict[str, Any]:
+    """Counter increments one tracked call adds to its buckets"""
+    return {
+        "calls": 1,
+        "errors": 1 if call.get("error_occurred") else 0,
+        "prompt_tokens": call.get("prompt_tokens") or 0,
+        "completion_tokens": call.get("completion_tokens") or 0,
+        "cost_usd": float(call.get("cost_usd") or 0),
+        "duration_ms_sum": call.get("duration_ms") or 0,
+    }
+
+
+def summarize(rows: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Totals, per-agent/model breakdown, per-model comparison and trend from rollup rows"""
+    totals = dict.fromkeys(COUNTERS, 0)
+    agents: dict[str, dict[str, Any]] = {}
+    models: dict[tuple[str, str], dict[str, float]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    trend: dict[str, dict[str, float]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    for row in rows:
+        values = {name: float(row.get(name) or 0) for name in COUNTERS}
+        tokens = values["prompt_tokens"] + values["completion_tokens"]
+        for name, value in values.items():
+            totals[name] += value
+            models[(row["provider"], row["model"])][name] += value
+            trend[row["bucket_start"]][name] += value
+
+        agent = agents.setdefault(row["agent_name"], {"cost": 0, "calls": 0, "tokens": 0, "models": {}})
+        agent["cost"] += values["cost_usd"]
+        agent["calls"] += int(values["calls"])
+        agent["tokens"] += int(tokens)
+        model = agent["models"].setdefault(row["model"], {"cost": 0, "calls": 0})
+        model["cost"] += values["cost_usd"]
+        model["calls"] += int(values["calls"])
+
+    calls = int(totals["calls"])
+    tokens = int(totals["prompt_tokens"] + totals["completion_tokens"])
+    comparison = []
+    for (provider, model), values in models.items():
+        model_calls = int(values["calls"])
+        model_tokens = int(values["prompt_tokens"] + values["completion_tokens"])
+        comparison.append({
+            "provider": provider,
+            "model": model,
+            "total_calls": model_calls,
+            "total_cost": round(values["cost_usd"], 6),
+            "total_tokens": model_tokens,
+            "avg_cost_per_call": round(values["cost_usd"] / model_calls, 6) if model_calls else 0,
+            "avg_tokens_per_call": round(model_tokens / model_calls) if model_calls else 0,
+            "avg_duration_ms": round(values["duration_ms_sum"] / model_calls) if model_calls else 0,
+            "cost_per_1k_tokens": round(values["cost_usd"] / model_tokens * 1000, 6) if model_tokens else 0,
+        })
+    comparison.sort(key=lambda item: item["total_cost"], reverse=True)
+
+    return {
+        "summary": {
+            "total_cost_usd": round(totals["cost_usd"], 4),
+            "total_calls": calls,
+            "total_tokens": tokens,
+            "error_count": int(totals["errors"]),
+            "average_cost_per_call": round(totals["cost_usd"] / calls, 6) if calls else 0,
+        },
+        "agent_breakdown": agents,
+        "model_comparison": comparison,
+        "trend_data": [
+            {
+                "date": bucket,
+                "daily_cost": round(values["cost_usd"], 4),
+                "daily_calls": int(values["calls"]),
+                "daily_tokens": int(values["prompt_tokens"] + values["completion_tokens"]),
+            }
+            for bucket, values in sorted(trend.items(), reverse=True)
+        ],
+    }
+
+
+class LLMCostRollups:
+    """Records tracked calls into the rollups and answers parameterized reads"""
+
+    def __init__(self, supabase: Any):
+        self.supabase = supabase
+
+    # ---- writes -------------------------------------------------------
+
+    def record(self, call: dict[str, Any]) -> bool:
+        """Add one tracked call to its minute/hour/day buckets and session; never raises"""
+        at = call.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        try:
+            self.supabase.rpc(ROLLUP_RPC, {
+                "p_at": at,
+                "p_agent_name": call.get("agent_name") or "unknown",
+                "p_provider": call.get("provider") or "unknown",
+                "p_model": call.get("model") or "unknown",
+                "p_session_id": call.get("session_id") or "",
+                "p_user_id": call.get("user_id"),
+                "p_deltas": usage_deltas(call),
+            }).execute()
+            return True
+        except Exception as e:
+            # The dashboards miss this call; tracking itself must not fail
+            logger.warning(f"[LLMCostRollups] Failed to record usage: {e}")
+            return False
+
+    # ---- reads --------------------------------------------------------
+
+    def fetch(self,
+              grain: str,
+              start: Any,
+              end: Any = None,
+              agent_name: Optional[str] = None,
+              provider: Optional[str] = None,
+              model: Optional[str] = None) -> list[dict[str, Any]]:
+        """Rollup rows of one grain whose bucket starts in [start's bucket, end], newest first"""
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain {grain!r}, expected one of {GRAINS}")
+        rows: list[dict[str, Any]] = []
+        while True:
+            query = self.supabase.table(ROLLUP_TABLE).select("*").eq("grain", grain).gte(
+                "bucket_start", bucket_start(start, grain).isoformat()
+            )
+            if end is not None:
+                query = query.lte("bucket_start", parse_timestamp(end).astimezone(timezone.utc).isoformat())
+            if agent_name:
+                query = query.eq("agent_name", agent_name)
+            if provider:
+                query = query.eq("provider", provider)
+            if model:
+                query = query.eq("model", model)
+            # Primary key order keeps the pages stable
+            page = query.order("bucket_start", desc=True).order("agent_name").order("provider").order(
+                "model"
+            ).range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+
+    def dashboard(self, time_range: str = "daily", agent_name: Optional[str] = None,
+                  now: Optional[datetime] = None) -> dict[str, Any]:
+        """Summary, breakdowns and trend for a TIME_RANGES window, read at its trend grain"""
+        window, grain = TIME_RANGES.get(time_range, TIME_RANGES["daily"])
+        now = now or datetime.now(timezone.utc)
+        return {"time_range": time_range, "grain": grain,
+                **summarize(self.fetch(grain, now - window, agent_name=agent_name))}
+
+    def window_cost(self, since: Any, grain: str = "minute") -> float:
+        """Total cost of the buckets starting at or after since"""
+        return round(sum(float(row.get("cost_usd") or 0) for row in self.fetch(grain, since)), 6)
+
+    def today_cost(self, now: Optional[datetime] = None) -> float:
+        return self.window_cost(now or datetime.now(timezone.utc), grain="day")
+
+    def session_cost(self, session_id: str) -> float:
+        result = self.supabase.table(SESSION_TABLE).select("cost_usd").eq("session_id", session_id).limit(1).execute()
+        return float(result.data[0]["cost_usd"] or 0) if result.data else 0.0
+
+    def expensive_sessions(self, limit: int = 10, min_cost: float = 0) -> list[dict[str, Any]]:
+        """Sessions costing at least min_cost, most expensive first"""
+        rows = self.supabase.table(SESSION_TABLE).select("*").gte("cost_usd", min_cost).order(
+            "cost_usd", desc=True
+        ).limit(limit).execute().data or []
+        sessions = []
+        for row in rows:
+            first, last = parse_timestamp(row.get("first_call_at")), parse_timestamp(row.get("last_call_at"))
+            sessions.append({
+                "session_id": row["session_id"],
+                "user_id": row.get("user_id"),
+                "agents_used": len(row.get("agents") or []),
+                "session_cost": round(float(row.get("cost_usd") or 0), 6),
+                "total_calls": row.get("calls") or 0,
+                "total_tokens": (row.get("prompt_tokens") or 0) + (row.get("completion_tokens") or 0),
+                "session_start": row.get("first_call_at"),
+                "session_end": row.get("last_call_at"),
+                "duration_minutes": round((last - first).total_seconds() / 60, 1) if first and last else 0,
+            })
+        return sorted(sessions, key=lambda session: session["session_cost"], reverse=True)
+
+
+_rollups: Optional[LLMCostRollups] = None
+
+
+def get_llm_cost_rollups() -> LLMCostRollups:
+    """Return the process-wide rollups over the shared Supabase client"""
+    global _rollups
+    if _rollups is None:
+        from database_simple import db
+        _rollups = LLMCostRollups(db.client)
+    return _rollups
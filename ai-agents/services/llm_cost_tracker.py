@@ -6,7 +6,7 @@ Captures EVERY token, calculates EXACT costs, stores in database
 import asyncio
 import time
 from typing import Dict, Any, Optional, Union
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 import os
 from decimal import Decimal
@@ -14,6 +14,7 @@ from decimal import Decimal
 from openai import AsyncOpenAI, OpenAI
 from anthropic import AsyncAnthropic, Anthropic
 from database_simple import SupabaseDB
+from services.llm_cost_rollups import LLM_COST_CHANNEL, LLMCostRollups
 
 
 class LLMCostCalculator:
@@ -99,6 +100,7 @@ class LLMCostTracker:
         """Initialize the cost tracking system"""
         self.db = SupabaseDB()
         self.calculator = LLMCostCalculator()
+        self.rollups = LLMCostRollups(self.db.client)
         self.daily_totals = {}  # Cache for daily totals
         
         # Cost alert thresholds
@@ -177,10 +179,29 @@ class LLMCostTracker:
             "context": context or {}
         }
         
+        context = context or {}
+        usage = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "agent_name": agent_name,
+            "provider": provider,
+            "model": model,
+            "session_id": context.get("session_id") or context.get("conversation_id"),
+            "user_id": context.get("user_id"),
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "cost_usd": cost_usd,
+            "duration_ms": duration_ms,
+            "error_occurred": error_occurred,
+        }
+        
         # Store in database (async, non-blocking)
         try:
             await self._store_to_database(tracking_record)
             
+            # Roll up before the threshold checks so they include this call
+            self.rollups.record(usage)
+            await self._publish_usage(usage)
+            
             # Check cost thresholds
             await self._check_cost_alerts(agent_name, cost_usd, context)
             
@@ -220,6 +241,14 @@ class LLMCostTracker:
         except Exception as e:
             print(f"[LLM_TRACKER] Database storage error: {e}")
     
+    async def _publish_usage(self, usage: Dict[str, Any]):
+        """Push the call to live cost views on every worker"""
+        try:
+            from utils.ws_backplane import get_backplane
+            await get_backplane().publish(LLM_COST_CHANNEL, {"type": "llm_call", **usage})
+        except Exception as e:
+            print(f"[LLM_TRACKER] Failed to publish usage: {e}")
+    
     async def _check_cost_alerts(self, agent_name: str, cost: float, context: Dict[str, Any]):
         """Check if cost thresholds are exceeded and trigger alerts"""
         
@@ -254,25 +283,15 @@ class LLMCostTracker:
     async def get_daily_total(self) -> float:
         """Get today's total LLM spend"""
         try:
-            result = await self.db.client.from_("llm_usage_log")\
-                .select("cost_usd")\
-                .gte("timestamp", datetime.utcnow().date().isoformat())\
-                .execute()
-            
-            return sum(row["cost_usd"] for row in result.data)
-        except:
+            return self.rollups.today_cost()
+        except Exception:
             return 0.0
     
     async def get_session_cost(self, session_id: str) -> float:
         """Get total cost for a specific session"""
         try:
-            result = await self.db.client.from_("llm_usage_log")\
-                .select("cost_usd")\
-                .eq("session_id", session_id)\
-                .execute()
-            
-            return sum(row["cost_usd"] for row in result.data)
-        except:
+            return self.rollups.session_cost(session_id)
+        except Exception:
             return 0.0
 
 
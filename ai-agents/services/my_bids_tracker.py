@@ -7,6 +7,7 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from database_simple import get_client
+from services.data_loader import get_loader
 
 logger = logging.getLogger(__name__)
 
@@ -164,6 +165,17 @@ class MyBidsTracker:
                 return []
             
             results = []
+            if include_full_details:
+                # One query per table for all tracked bids instead of three per bid
+                loader = get_loader(self.supabase)
+                bid_card_ids = [bid_tracking['bid_card_id'] for bid_tracking in my_bids.data]
+                bid_cards = loader.load_many('bid_cards', bid_card_ids)
+                messages = loader.load_related_many(
+                    'messages', 'bid_card_id', bid_card_ids, filters={'sender_id': contractor_id}
+                )
+                proposals = loader.load_related_many(
+                    'contractor_proposals', 'bid_card_id', bid_card_ids, filters={'contractor_id': contractor_id}
+                )
             
             for bid_tracking in my_bids.data:
                 bid_data = {
@@ -178,27 +190,11 @@ class MyBidsTracker:
                 }
                 
                 if include_full_details:
-                    # Get full bid card details
-                    bid_card = self.supabase.table('bid_cards').select('*').eq(
-                        'id', bid_tracking['bid_card_id']
-                    ).execute()
-                    
-                    if bid_card.data:
-                        bid_data['bid_card'] = bid_card.data[0]
-                    
-                    # Get messages for this bid card
-                    messages = self.supabase.table('messages').select('*').eq(
-                        'bid_card_id', bid_tracking['bid_card_id']
-                    ).eq('sender_id', contractor_id).execute()
-                    
-                    bid_data['messages'] = messages.data if messages.data else []
-                    
-                    # Get proposals/quotes for this bid card
-                    proposals = self.supabase.table('contractor_proposals').select('*').eq(
-                        'bid_card_id', bid_tracking['bid_card_id']
-                    ).eq('contractor_id', contractor_id).execute()
-                    
-                    bid_data['proposals'] = proposals.data if proposals.data else []
+                    bid_card = bid_cards[bid_tracking['bid_card_id']]
+                    if bid_card:
+                        bid_data['bid_card'] = bid_card
+                    bid_data['messages'] = messages[bid_tracking['bid_card_id']]
+                    bid_data['proposals'] = proposals[bid_tracking['bid_card_id']]
                 
                 results.append(bid_data)
             
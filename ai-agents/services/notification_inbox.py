@@ -0,0 +1,163 @@
+"""
+Notification Inbox
+Cursor-paged replay and bulk read-marking of a contractor's notifications
+
+- Rows are addressed by the indexed recipient_id column (contractor id, see
+  migration 016) and ordered by inbox_seq, which doubles as the resume cursor
+- A contractor's recipient keys (own id plus any contractor_leads ids) are
+  cached per process, so reconnects do not repeat the lead lookup
+- replay() returns one page of unread notifications after a cursor; concurrent
+  replays of the same page (reconnect storms, several tabs) share one query
+- mark_read() marks an explicit id list or everything up to a cursor with one
+  UPDATE per chunk instead of one per notification
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from services.bulk_mutations import IN_CHUNK_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+INBOX_PAGE_SIZE = int(os.getenv("NOTIFICATION_INBOX_PAGE_SIZE", "50"))
+INBOX_MAX_PAGE_SIZE = 200
+RECIPIENT_CACHE_SECONDS = float(os.getenv("NOTIFICATION_RECIPIENT_CACHE_SECONDS", "600"))
+
+INBOX_COLUMNS = "id, inbox_seq, title, message, notification_type, bid_card_id, action_url, metadata, created_at, is_read"
+
+
+def parse_cursor(value: Any) -> int:
+    """Client-supplied cursor as an inbox_seq; anything unusable starts from the beginning"""
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def inbox_item(row: dict[str, Any]) -> dict[str, Any]:
+    """A notifications row in the shape the contractor portal renders"""
+    metadata = row.get("metadata") or {}
+    return {
+        "id": row["id"],
+        "cursor": row.get("inbox_seq"),
+        "title": row.get("title"),
+        "message": row.get("message"),
+        "notification_type": metadata.get("notification_type") or row.get("notification_type") or "general",
+        "bid_card_id": row.get("bid_card_id") or metadata.get("bid_card_id"),
+        "action_url": row.get("action_url"),
+        "created_at": row.get("created_at"),
+        "is_read": row.get("is_read", False),
+    }
+
+
+@dataclass
+class InboxPage:
+    notifications: list[dict[str, Any]]
+    cursor: int  # inbox_seq of the last notification in the page (the request cursor when empty)
+    has_more: bool
+
+    def to_frame(self) -> dict[str, Any]:
+        """The whole page as one WebSocket message"""
+        return {
+            "type": "notification_batch",
+            "notifications": self.notifications,
+            "cursor": self.cursor,
+            "has_more": self.has_more,
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+class NotificationInbox:
+    """Unread notification replay and read-marking keyed by recipient_id"""
+
+    def __init__(self, client: Any,
+                 page_size: int = INBOX_PAGE_SIZE,
+                 recipient_ttl: float = RECIPIENT_CACHE_SECONDS):
+        self.client = client
+        self.page_size = page_size
+        self.recipient_ttl = recipient_ttl
+        self._recipients: dict[str, tuple[float, list[str]]] = {}
+        self._inflight: dict[tuple[str, int, int], asyncio.Future] = {}
+
+    def recipients(self, contractor_id: str) -> list[str]:
+        """recipient_id values that belong to a contractor: its own id and its contractor_leads ids"""
+        cached = self._recipients.get(contractor_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        leads = self.client.table("contractor_leads").select("id").eq("contractor_id", contractor_id).execute()
+        ids = [contractor_id] + [lead["id"] for lead in leads.data or [] if lead.get("id")]
+        self._recipients[contractor_id] = (time.monotonic() + self.recipient_ttl, ids)
+        return ids
+
+    def page(self, contractor_id: str, cursor: int = 0, limit: Optional[int] = None) -> InboxPage:
+        """Unread notifications after cursor, oldest first"""
+        limit = min(limit or self.page_size, INBOX_MAX_PAGE_SIZE)
+        result = self.client.table("notifications").select(INBOX_COLUMNS).in_(
+            "recipient_id", self.recipients(contractor_id)
+        ).eq("is_read", False).gt("inbox_seq", cursor).order("inbox_seq").limit(limit + 1).execute()
+
+        rows = sorted(result.data or [], key=lambda row: row["inbox_seq"])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return InboxPage(
+            notifications=[inbox_item(row) for row in rows],
+            cursor=rows[-1]["inbox_seq"] if rows else cursor,
+            has_more=has_more,
+        )
+
+    async def replay(self, contractor_id: str, cursor: int = 0, limit: Optional[int] = None) -> InboxPage:
+        """page() off the event loop; identical concurrent requests share one query"""
+        key = (contractor_id, cursor, limit or self.page_size)
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(self.page, contractor_id, cursor, limit))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one socket going away must not cancel the query others are waiting on
+        return await asyncio.shield(pending)
+
+    def mark_read(self, contractor_id: str,
+                  notification_ids: Optional[Iterable[str]] = None,
+                  through_cursor: Optional[int] = None) -> list[str]:
+        """
+        Mark notifications read in bulk and return the ids that changed
+
+        Either the given ids or every unread notification up to through_cursor;
+        only the contractor's own notifications are touched.
+        """
+        recipients = self.recipients(contractor_id)
+        values = {"is_read": True, "read_at": datetime.now().isoformat()}
+        table = self.client.table
+
+        if through_cursor is not None:
+            result = table("notifications").update(values).in_("recipient_id", recipients).eq(
+                "is_read", False
+            ).lte("inbox_seq", through_cursor).execute()
+            return [row["id"] for row in result.data or []]
+
+        ids = list(dict.fromkeys(notification_ids or []))
+        marked = []
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            result = table("notifications").update(values).in_("recipient_id", recipients).in_(
+                "id", ids[start:start + IN_CHUNK_SIZE]
+            ).execute()
+            marked.extend(row["id"] for row in result.data or [])
+        return marked
+
+
+_inbox: Optional[NotificationInbox] = None
+
+
+def get_notification_inbox() -> NotificationInbox:
+    """Return the process-wide notification inbox"""
+    global _inbox
+    if _inbox is None:
+        from database_simple import db
+        _inbox = NotificationInbox(db.client)
+    return _inbox
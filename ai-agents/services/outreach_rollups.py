@@ -0,0 +1,252 @@
+"""
+Outreach Analytics Rollups
+Pre-aggregated daily counters behind ResponseMonitor and FollowUpAutomation analytics
+
+- outreach_rollups_daily is keyed by (day, campaign, bid card, channel) and
+  holds sent / opened / responded counts, the interest breakdown and the
+  response-time sum, so analytics read O(buckets) rows instead of every
+  bid_card_distributions row
+- Distributions are bucketed by the day they were sent (a cohort view), which
+  matches the distributed_at filter the row-scan analytics used
+- A trigger on bid_card_distributions (migration 023) applies the difference
+  between a row's contribution before and after each write, in the same
+  transaction, through the atomic upsert-increment apply_outreach_rollup_delta;
+  distribution_contribution below is the Python mirror used by the backfill
+- followup_rollups_daily counts follow-ups by (day, strategy, channel)
+- scripts/backfill_outreach_rollups.py rebuilds both tables from the raw rows
+- Analytics only read the rollups once OUTREACH_ROLLUPS_ENABLED=true is set
+  (after the backfill has run); a window with no rollup rows still falls back
+  to the raw tables, since it may predate the backfill
+"""
+
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+OUTREACH_TABLE = "outreach_rollups_daily"
+FOLLOWUP_TABLE = "followup_rollups_daily"
+FOLLOWUP_DELTA_RPC = "apply_followup_rollup_delta"
+
+INTEREST_LEVELS = ("high", "medium", "low", "none", "unknown")
+OUTREACH_COUNTERS = (
+    "sent", "opened", "responded",
+    *(f"interest_{level}" for level in INTEREST_LEVELS),
+    "response_hours_sum", "response_hours_count",
+)
+
+def outreach_rollups_enabled() -> bool:
+    """Analytics read the rollups only when opted in (the tables are empty until backfilled)"""
+    return os.getenv("OUTREACH_ROLLUPS_ENABLED", "false").lower() == "true"
+
+
+# Columns a distribution row needs for its rollup contribution
+DISTRIBUTION_ROLLUP_COLUMNS = (
+    "id, bid_card_id, campaign_id, distribution_method, distributed_at, "
+    "opened_at, responded_at, interest_level"
+)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a Supabase timestamp; naive values are taken as UTC"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _day(value: Any) -> Optional[str]:
+    parsed = parse_timestamp(value)
+    return parsed.astimezone(timezone.utc).date().isoformat() if parsed else None
+
+
+def _day_bound(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value.isoformat()
+    return _day(value)
+
+
+@dataclass(frozen=True)
+class OutreachBucket:
+    day: str
+    campaign_id: str
+    bid_card_id: str
+    channel: str
+
+    def as_params(self) -> dict[str, str]:
+        return {
+            "p_day": self.day,
+            "p_campaign_id": self.campaign_id,
+            "p_bid_card_id": self.bid_card_id,
+            "p_channel": self.channel,
+        }
+
+
+def distribution_contribution(row: Optional[dict[str, Any]]) -> Optional[tuple[OutreachBucket, dict[str, float]]]:
+    """The bucket and counters one bid_card_distributions row adds to the rollup"""
+    if not row or not row.get("distributed_at"):
+        return None
+    bucket = OutreachBucket(
+        day=_day(row["distributed_at"]),
+        campaign_id=str(row.get("campaign_id") or ""),
+        bid_card_id=str(row.get("bid_card_id") or ""),
+        channel=row.get("distribution_method") or "unknown",
+    )
+    level = row.get("interest_level") or "unknown"
+    if level not in INTEREST_LEVELS:
+        level = "unknown"
+    counters = {
+        "sent": 1,
+        "opened": 1 if row.get("opened_at") else 0,
+        "responded": 1 if row.get("responded_at") else 0,
+        f"interest_{level}": 1,
+    }
+    if row.get("responded_at"):
+        sent_at = parse_timestamp(row["distributed_at"])
+        responded_at = parse_timestamp(row["responded_at"])
+        counters["response_hours_sum"] = (responded_at - sent_at).total_seconds() / 3600
+        counters["response_hours_count"] = 1
+    return bucket, counters
+
+
+def fold_distributions(rows: Iterable[dict[str, Any]]) -> dict[OutreachBucket, dict[str, float]]:
+    """Aggregate raw distribution rows into rollup buckets (used by the backfill)"""
+    buckets: dict[OutreachBucket, dict[str, float]] = defaultdict(lambda: dict.fromkeys(OUTREACH_COUNTERS, 0))
+    for row in rows:
+        contribution = distribution_contribution(row)
+        if contribution is None:
+            continue
+        bucket, counters = contribution
+        for name, value in counters.items():
+            buckets[bucket][name] += value
+    return dict(buckets)
+
+
+def fold_followups(rows: Iterable[dict[str, Any]]) -> dict[tuple[str, str, str], int]:
+    """Aggregate followup_logs rows into (day, strategy, channel) counts"""
+    buckets: dict[tuple[str, str, str], int] = defaultdict(int)
+    for row in rows:
+        day = _day(row.get("created_at"))
+        if day:
+            buckets[(day, row.get("strategy") or "unknown", row.get("channel") or "unknown")] += 1
+    return dict(buckets)
+
+
+def summarize_outreach(buckets: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Summary, interest breakdown and channel stats from rollup rows"""
+    totals = dict.fromkeys(OUTREACH_COUNTERS, 0)
+    channel_stats: dict[str, dict[str, int]] = {}
+    for bucket in buckets:
+        for name in OUTREACH_COUNTERS:
+            totals[name] += bucket.get(name) or 0
+        stats = channel_stats.setdefault(
+            bucket.get("channel") or "unknown", {"sent": 0, "opened": 0, "responded": 0, "interested": 0}
+        )
+        stats["sent"] += bucket.get("sent") or 0
+        stats["opened"] += bucket.get("opened") or 0
+        stats["responded"] += bucket.get("responded") or 0
+        stats["interested"] += bucket.get("interest_high") or 0
+
+    sent, opened, responded = totals["sent"], totals["opened"], totals["responded"]
+    response_count = totals["response_hours_count"]
+    avg_response_time = totals["response_hours_sum"] / response_count if response_count else 0
+    return {
+        "summary": {
+            "total_sent": sent,
+            "total_opened": opened,
+            "total_responded": responded,
+            "open_rate": (opened / sent * 100) if sent > 0 else 0,
+            "response_rate": (responded / sent * 100) if sent > 0 else 0,
+            "avg_response_time_hours": round(avg_response_time, 1)
+        },
+        "interest_breakdown": {level: totals[f"interest_{level}"] for level in INTEREST_LEVELS},
+        "channel_performance": channel_stats,
+    }
+
+
+def summarize_followups(buckets: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Follow-up counts by strategy from rollup rows"""
+    strategy_stats: dict[str, dict[str, int]] = {}
+    total = 0
+    for bucket in buckets:
+        count = bucket.get("followups") or 0
+        stats = strategy_stats.setdefault(bucket["strategy"], {"count": 0, "responses": 0, "conversions": 0})
+        stats["count"] += count
+        total += count
+    return {"total_followups": total, "by_strategy": strategy_stats}
+
+
+class OutreachRollups:
+    """Reads and increments the rollup tables through a Supabase client"""
+
+    def __init__(self, supabase: Any):
+        self.supabase = supabase
+
+    # ---- writes -------------------------------------------------------
+
+    def record_followup(self, created_at: Any, strategy: str, channel: str, count: int = 1) -> None:
+        try:
+            self.supabase.rpc(FOLLOWUP_DELTA_RPC, {
+                "p_day": _day(created_at),
+                "p_strategy": strategy,
+                "p_channel": channel,
+                "p_count": count,
+            }).execute()
+        except Exception as e:
+            logger.warning(f"[Rollups] Failed to record follow-up: {e}")
+
+    def replace_outreach(self, buckets: dict[OutreachBucket, dict[str, float]], batch_size: int = 500) -> int:
+        """Overwrite outreach buckets with absolute values (backfill)"""
+        rows = [
+            {"day": b.day, "campaign_id": b.campaign_id, "bid_card_id": b.bid_card_id, "channel": b.channel, **counters}
+            for b, counters in buckets.items()
+        ]
+        for start in range(0, len(rows), batch_size):
+            self.supabase.table(OUTREACH_TABLE).upsert(
+                rows[start:start + batch_size], on_conflict="day,campaign_id,bid_card_id,channel"
+            ).execute()
+        return len(rows)
+
+    def replace_followups(self, buckets: dict[tuple[str, str, str], int], batch_size: int = 500) -> int:
+        """Overwrite follow-up buckets with absolute values (backfill)"""
+        rows = [
+            {"day": day, "strategy": strategy, "channel": channel, "followups": count}
+            for (day, strategy, channel), count in buckets.items()
+        ]
+        for start in range(0, len(rows), batch_size):
+            self.supabase.table(FOLLOWUP_TABLE).upsert(
+                rows[start:start + batch_size], on_conflict="day,strategy,channel"
+            ).execute()
+        return len(rows)
+
+    # ---- reads --------------------------------------------------------
+
+    def fetch_outreach(self,
+                       bid_card_id: Optional[str] = None,
+                       campaign_id: Optional[str] = None,
+                       start: Any = None,
+                       end: Any = None) -> list[dict[str, Any]]:
+        """Rollup rows matching the filters; date bounds are whole days, inclusive"""
+        query = self.supabase.table(OUTREACH_TABLE).select("*")
+        if bid_card_id:
+            query = query.eq("bid_card_id", bid_card_id)
+        if campaign_id:
+            query = query.eq("campaign_id", campaign_id)
+        if start is not None:
+            query = query.gte("day", _day_bound(start))
+        if end is not None:
+            query = query.lte("day", _day_bound(end))
+        return query.execute().data or []
+
+    def fetch_followups(self, since: Any) -> list[dict[str, Any]]:
+        return self.supabase.table(FOLLOWUP_TABLE).select("*").gte("day", _day_bound(since)).execute().data or []
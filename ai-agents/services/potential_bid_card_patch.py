@@ -0,0 +1,250 @@
+"""
+Potential Bid Card Patching
+Applies many CIA fields to a potential bid card in one versioned write
+
+- All fields of a patch, their per-field confidence, completion percentage
+  and ready_for_conversion go out in a single UPDATE
+- Writes are conditional on the row's version (migration 017); when another
+  writer got there first the row is re-read and the patch re-applied, or,
+  with expected_version, the caller gets a VersionConflict
+- A conversation value (source="conversation") does not overwrite one stored
+  with higher confidence; any other source (a user's manual edit, an API
+  client) is an explicit edit and always applies. Manual edits are stored at
+  confidence 1.0
+- A confidence of None means unspecified and counts as 1.0; an explicit 0.0
+  stays 0.0
+- Used in-process by PotentialBidCardManager and behind the
+  PATCH /potential-bid-cards/{id}/fields endpoint
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+MAX_VERSION_RETRIES = 3
+CONVERSATION_SOURCE = "conversation"
+
+# CIA conversation field -> potential_bid_cards column
+FIELD_MAPPING = {
+    "project_type": "primary_trade",
+    "service_type": "secondary_trades",
+    "project_description": "user_scope_notes",
+    "project_name": "title",
+    "zip_code": "zip_code",
+    "email_address": "email_address",
+    "timeline": "estimated_timeline",
+    "urgency_level": "urgency_level",
+    "contractor_size_preference": "contractor_size_preference",
+    "budget_context": "budget_context",
+    "materials": "materials_specified",
+    "special_requirements": "special_requirements",
+    "quality_expectations": "quality_expectations",
+    "timeline_flexibility": "timeline_flexibility",
+    # NEW: Exact date fields
+    "bid_collection_deadline": "bid_collection_deadline",
+    "project_completion_deadline": "project_completion_deadline",
+    "deadline_hard": "deadline_hard",
+    "deadline_context": "deadline_context",
+    # Service complexity classification fields
+    "service_complexity": "service_complexity",
+    "trade_count": "trade_count",
+    "primary_trade": "primary_trade",
+    "secondary_trades": "secondary_trades"
+}
+
+# Fields stored as arrays even when CIA sends a single string
+ARRAY_FIELDS = {"materials", "special_requirements", "service_type"}
+
+# Required fields for completion
+REQUIRED_FIELDS = [
+    "primary_trade",      # project_type
+    "user_scope_notes",   # project_description
+    "zip_code",           # location
+    "urgency_level",      # timeline
+]
+
+# Nice to have fields
+NICE_TO_HAVE_FIELDS = [
+    "contractor_size_preference",
+    "budget_context",
+    "materials_specified",
+    "special_requirements",
+    "timeline_flexibility"
+]
+
+
+class PotentialBidCardNotFound(LookupError):
+    pass
+
+
+class VersionConflict(Exception):
+    """The bid card changed since the version the caller read"""
+
+    def __init__(self, bid_card_id: str, current_version: int):
+        super().__init__(f"Potential bid card {bid_card_id} is at version {current_version}")
+        self.bid_card_id = bid_card_id
+        self.current_version = current_version
+
+
+@dataclass
+class FieldUpdate:
+    field_name: str
+    field_value: Any
+    confidence: Optional[float] = None  # None: unspecified, stored as 1.0
+
+
+@dataclass
+class PatchResult:
+    bid_card_id: str
+    version: int
+    applied: list[str] = field(default_factory=list)  # CIA field names written
+    skipped: list[str] = field(default_factory=list)  # kept a higher-confidence stored value
+    completion: dict[str, Any] = field(default_factory=dict)
+    retries: int = 0
+
+
+def _filled(value: Any) -> bool:
+    return value is not None and value != "" and value != []
+
+
+def completion_info(bid_card: dict[str, Any]) -> dict[str, Any]:
+    """Completion percentage and conversion readiness of a potential_bid_cards row"""
+    missing_required = [f for f in REQUIRED_FIELDS if not _filled(bid_card.get(f))]
+    filled_required = len(REQUIRED_FIELDS) - len(missing_required)
+    filled_nice_to_have = sum(_filled(bid_card.get(f)) for f in NICE_TO_HAVE_FIELDS)
+
+    total_fields = len(REQUIRED_FIELDS) + len(NICE_TO_HAVE_FIELDS)
+    return {
+        "percentage": int((filled_required + filled_nice_to_have) / total_fields * 100),
+        # Ready for conversion if all required fields are filled
+        "ready_for_conversion": not missing_required,
+        "missing_fields": missing_required,
+        "filled_required": filled_required,
+        "filled_optional": filled_nice_to_have
+    }
+
+
+def column_value(field_name: str, value: Any) -> tuple[str, Any]:
+    """Database column and stored value for a CIA field"""
+    column = FIELD_MAPPING.get(field_name, field_name)
+    if field_name in ARRAY_FIELDS and isinstance(value, str):
+        value = [value]
+    return column, value
+
+
+class PotentialBidCardPatcher:
+    """Versioned multi-field writes to potential_bid_cards"""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def apply(self,
+              bid_card_id: str,
+              updates: Iterable[FieldUpdate],
+              expected_version: Optional[int] = None,
+              source: str = CONVERSATION_SOURCE) -> PatchResult:
+        """Write all updates at once; last write per field wins within the batch"""
+        latest: dict[str, FieldUpdate] = {}
+        for update in updates:
+            latest[column_value(update.field_name, None)[0]] = update
+
+        for attempt in range(MAX_VERSION_RETRIES + 1):
+            card = self._load(bid_card_id)
+            version = card.get("version") or 0
+            if expected_version is not None and version != expected_version:
+                raise VersionConflict(bid_card_id, version)
+
+            changes, confidence, applied, skipped = self._merge(card, latest.values(), source)
+            completion = completion_info({**card, **changes})
+            result = PatchResult(bid_card_id, version, applied, skipped, completion, retries=attempt)
+            if not changes:
+                return result
+
+            now = datetime.utcnow().isoformat()
+            written = self.client.table("potential_bid_cards").update({
+                **changes,
+                "field_confidence": confidence,
+                "completion_percentage": completion["percentage"],
+                "ready_for_conversion": completion["ready_for_conversion"],
+                "version": version + 1,
+                "updated_at": now
+            }).eq("id", bid_card_id).eq("version", version).execute()
+
+            if written.data:
+                result.version = version + 1
+                self._track(bid_card_id, applied, completion, source, now)
+                return result
+            if expected_version is not None:
+                raise VersionConflict(bid_card_id, self._load(bid_card_id).get("version") or 0)
+            logger.info(f"Potential bid card {bid_card_id} changed during patch (v{version}), retrying")
+
+        raise VersionConflict(bid_card_id, self._load(bid_card_id).get("version") or 0)
+
+    def _load(self, bid_card_id: str) -> dict[str, Any]:
+        result = self.client.table("potential_bid_cards").select("*").eq("id", bid_card_id).execute()
+        if not result.data:
+            raise PotentialBidCardNotFound(bid_card_id)
+        return result.data[0]
+
+    @staticmethod
+    def _merge(card: dict[str, Any], updates: Iterable[FieldUpdate], source: str):
+        """Column changes and the new field_confidence map for one attempt"""
+        confidence = dict(card.get("field_confidence") or {})
+        changes, applied, skipped = {}, [], []
+        for update in updates:
+            column, value = column_value(update.field_name, update.field_value)
+            stored = card.get(column)
+            if source == "manual" or update.confidence is None:
+                new_confidence = 1.0
+            else:
+                new_confidence = float(update.confidence)
+            # Only conversation extractions defer to a more confident stored value
+            if (source == CONVERSATION_SOURCE and _filled(stored) and stored != value
+                    and new_confidence < confidence.get(column, 0.0)):
+                skipped.append(update.field_name)
+                continue
+            if stored != value or confidence.get(column) != new_confidence:
+                changes[column] = value
+                confidence[column] = new_confidence
+            applied.append(update.field_name)
+        return changes, confidence, applied, skipped
+
+    def _track(self, bid_card_id: str, field_names: list[str], completion: dict[str, Any],
+               source: str, now: str) -> None:
+        """One cia_conversation_tracking update for the whole patch"""
+        try:
+            tracking = self.client.table("cia_conversation_tracking").select("fields_collected").eq(
+                "potential_bid_card_id", bid_card_id
+            ).execute()
+            tracking_data = {
+                "last_field_updated": field_names[-1],
+                "completion_percentage": completion["percentage"],
+                "updated_at": now
+            }
+            if tracking.data:
+                fields_collected = tracking.data[0].get("fields_collected") or {}
+                for name in field_names:
+                    fields_collected[name] = {"updated_at": now, "source": source}
+                tracking_data["fields_collected"] = fields_collected
+            self.client.table("cia_conversation_tracking").update(tracking_data).eq(
+                "potential_bid_card_id", bid_card_id
+            ).execute()
+        except Exception as e:
+            # Don't fail the patch if tracking fails
+            logger.error(f"Error updating conversation tracking: {e}")
+
+
+_patcher: Optional[PotentialBidCardPatcher] = None
+
+
+def get_potential_bid_card_patcher() -> PotentialBidCardPatcher:
+    """Return the process-wide patcher over the shared Supabase client"""
+    global _patcher
+    if _patcher is None:
+        from database_simple import db
+        _patcher = PotentialBidCardPatcher(db.client)
+    return _patcher
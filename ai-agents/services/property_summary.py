@@ -0,0 +1,117 @@
+"""
+Property Summary
+Cheap reads for the property dashboard and maintenance issues
+
+- Room, photo, asset and maintenance issue counts are columns on the
+  properties row, kept exact by the migration 020 triggers; the dashboard is
+  that row plus the latest photos (keyset-ordered, index-backed)
+- Maintenance issues found by photo analysis are indexed one row per issue in
+  property_maintenance_issues by a property_photos trigger (migration 025),
+  whichever code path wrote the photo
+- Properties analyzed before the index existed are indexed on their first
+  read (issues_indexed_at is NULL until then)
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from services.bulk_mutations import IN_CHUNK_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+ISSUES_TABLE = "property_maintenance_issues"
+COUNT_COLUMNS = ("room_count", "photo_count", "asset_count", "maintenance_issue_count")
+RECENT_PHOTOS_LIMIT = 5
+RECENT_PHOTO_COLUMNS = "id, photo_url, original_filename, room_id, ai_description, photo_type, created_at"
+ISSUE_SOURCE_COLUMNS = "id, property_id, original_filename, ai_classification, created_at"
+
+
+def issue_rows(photo: dict[str, Any]) -> list[dict[str, Any]]:
+    """Index rows for the issues in a photo's AI analysis (plain strings or detailed objects)"""
+    detected = (photo.get("ai_classification") or {}).get("detected_issues") or []
+    rows = []
+    for position, issue in enumerate(detected):
+        if isinstance(issue, str):
+            issue = {"description": issue}
+        elif not isinstance(issue, dict):
+            continue
+        rows.append({
+            "id": f"{photo['id']}-{position}",
+            "property_id": photo["property_id"],
+            "photo_id": photo["id"],
+            "photo_filename": photo.get("original_filename") or "unknown.jpg",
+            "description": issue.get("description", str(issue)),
+            "severity": issue.get("severity", "medium"),
+            "type": issue.get("type", "maintenance"),
+            "confidence": issue.get("confidence", 0.8),
+            "estimated_cost": issue.get("estimated_cost", "medium"),
+            "detected_at": photo.get("created_at") or datetime.utcnow().isoformat(),
+        })
+    return rows
+
+
+class PropertySummaryService:
+    """Dashboard and maintenance issue reads backed by counters and the issue index"""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def dashboard(self, property_id: str, recent_limit: int = RECENT_PHOTOS_LIMIT) -> Optional[dict[str, Any]]:
+        """Property, counts and latest photos in two queries; None if the property does not exist"""
+        result = self.client.table("properties").select("*").eq("id", property_id).limit(1).execute()
+        if not result.data:
+            return None
+        property_data = result.data[0]
+        stats = {column: property_data.get(column) or 0 for column in COUNT_COLUMNS}
+        return {
+            "property": property_data,
+            "stats": stats,
+            "recent_photos": self.recent_photos(property_id, recent_limit),
+            "setup_complete": stats["room_count"] > 0 and stats["photo_count"] > 0,
+        }
+
+    def recent_photos(self, property_id: str, limit: int = RECENT_PHOTOS_LIMIT) -> list[dict[str, Any]]:
+        """Newest photos first, read through idx_property_photos_recent"""
+        return self.client.table("property_photos").select(RECENT_PHOTO_COLUMNS).eq(
+            "property_id", property_id
+        ).order("created_at", desc=True).order("id", desc=True).limit(limit).execute().data or []
+
+    def reindex_property(self, property_id: str) -> int:
+        """Rebuild a property's issue index from its photos (the only full photo scan)"""
+        photos = self.client.table("property_photos").select(ISSUE_SOURCE_COLUMNS).eq(
+            "property_id", property_id
+        ).execute().data or []
+        rows = [row for photo in photos for row in issue_rows(photo)]
+
+        self.client.table(ISSUES_TABLE).delete().eq("property_id", property_id).execute()
+        for start in range(0, len(rows), IN_CHUNK_SIZE):
+            self.client.table(ISSUES_TABLE).insert(rows[start:start + IN_CHUNK_SIZE]).execute()
+        self.client.table("properties").update({
+            "issues_indexed_at": datetime.utcnow().isoformat()
+        }).eq("id", property_id).execute()
+        logger.info(f"Indexed {len(rows)} maintenance issues from {len(photos)} photos of property {property_id}")
+        return len(rows)
+
+    def maintenance_issues(self, property_id: str) -> list[dict[str, Any]]:
+        """Indexed issues, newest first, with their photo URLs"""
+        state = self.client.table("properties").select("issues_indexed_at").eq("id", property_id).limit(1).execute()
+        if state.data and not state.data[0].get("issues_indexed_at"):
+            self.reindex_property(property_id)
+
+        issues = self.client.table(ISSUES_TABLE).select("*").eq("property_id", property_id).order(
+            "detected_at", desc=True
+        ).execute().data or []
+        if not issues:
+            return []
+
+        # Photo URLs are not copied into the index (uploads may be data URLs)
+        photo_ids = sorted({issue["photo_id"] for issue in issues})
+        urls = {}
+        for start in range(0, len(photo_ids), IN_CHUNK_SIZE):
+            photos = self.client.table("property_photos").select("id, photo_url").in_(
+                "id", photo_ids[start:start + IN_CHUNK_SIZE]
+            ).execute().data or []
+            urls.update((photo["id"], photo.get("photo_url") or "") for photo in photos)
+        return [{**issue, "photo_url": urls.get(issue["photo_id"], "")} for issue in issues]
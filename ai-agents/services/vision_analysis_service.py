@@ -0,0 +1,358 @@
+"""
+Shared Vision Analysis Service
+Content-addressed cache in front of GPT-4o vision calls for CIA, IRIS and bid card uploads
+
+- Images are hashed on their decoded bytes, so the same photo uploaded to
+  different agents or sessions resolves to the same cache entry
+- Analyses are keyed by (content hash, prompt variant, model) and persisted to
+  the vision_analysis_cache table so they survive restarts
+- Images are downscaled to the model's effective resolution before encoding
+- Multiple images are analyzed concurrently with a bounded semaphore
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from openai import AsyncOpenAI, OpenAI
+
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:  # pragma: no cover - Pillow is in requirements.txt
+    Image = None
+    PIL_AVAILABLE = False
+
+
+DEFAULT_VISION_MODEL = "gpt-4o"
+
+# GPT-4o "high" detail fits the image into 2048x2048, then scales the short
+# side down to 768px. Anything above that is paid for in upload size only.
+MAX_LONG_SIDE = 2048
+MAX_SHORT_SIDE = 768
+JPEG_QUALITY = 85
+
+CACHE_TABLE = "vision_analysis_cache"
+
+
+@dataclass
+class PreparedImage:
+    """An image normalized for the vision model, identified by its content hash"""
+    content_hash: str
+    data_url: str
+    original_bytes: int
+    encoded_bytes: int
+    downscaled: bool = False
+
+
+def _decode_image_data(image_data: str) -> tuple[bytes, str]:
+    """Decode a data URL or raw base64 string into bytes and a media type"""
+    media_type = "image/jpeg"
+    payload = image_data
+    if image_data.startswith("data:"):
+        header, payload = image_data.split(",", 1)
+        media_type = header[5:].split(";", 1)[0] or media_type
+    return base64.b64decode(payload), media_type
+
+
+def prepare_image(image_data: str) -> PreparedImage:
+    """
+    Hash an image on its content and downscale it to the model's effective resolution.
+
+    The hash is taken over the decoded original bytes so that the same photo
+    hits the cache regardless of how it was wrapped (data URL vs raw base64).
+    """
+    try:
+        raw, media_type = _decode_image_data(image_data)
+    except (binascii.Error, ValueError):
+        # Not decodable - hash the text itself and send it through unchanged
+        digest = hashlib.sha256(image_data.encode("utf-8")).hexdigest()
+        return PreparedImage(digest, image_data, len(image_data), len(image_data))
+
+    digest = hashlib.sha256(raw).hexdigest()
+    encoded = raw
+    downscaled = False
+
+    if PIL_AVAILABLE:
+        try:
+            with Image.open(io.BytesIO(raw)) as img:
+                width, height = img.size
+                scale = min(
+                    1.0,
+                    MAX_LONG_SIDE / max(width, height),
+                    MAX_SHORT_SIDE / min(width, height),
+                )
+                if scale < 1.0:
+                    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                    resized = img.convert("RGB").resize(size, Image.LANCZOS)
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+                    encoded = buffer.getvalue()
+                    media_type = "image/jpeg"
+                    downscaled = True
+        except Exception as e:
+            logger.debug(f"Could not downscale image {digest[:12]}: {e}")
+
+    data_url = f"data:{media_type};base64,{base64.b64encode(encoded).decode('utf-8')}"
+    return PreparedImage(digest, data_url, len(raw), len(encoded), downscaled)
+
+
+def prompt_variant(name: str, prompt: str) -> str:
+    """Build a cache variant from a prompt family name and the exact prompt text"""
+    return f"{name}:{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:16]}"
+
+
+class VisionAnalysisCache:
+    """Two-level cache: in-process LRU backed by the vision_analysis_cache table"""
+
+    def __init__(self, db_client: Any = None, max_entries: int = 512):
+        self.db_client = db_client
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self.stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def make_key(content_hash: str, variant: str, model: str) -> str:
+        return f"{model}:{variant}:{content_hash}"
+
+    def get(self, content_hash: str, variant: str, model: str) -> Optional[str]:
+        key = self.make_key(content_hash, variant, model)
+        cached = self._recall(key)
+        if cached is None and self.db_client is not None:
+            cached = self._found(key, self._load(key))
+        if cached is None:
+            self.stats["misses"] += 1
+        return cached
+
+    async def aget(self, content_hash: str, variant: str, model: str) -> Optional[str]:
+        """get() for async callers; the table lookup runs on a worker thread"""
+        key = self.make_key(content_hash, variant, model)
+        cached = self._recall(key)
+        if cached is None and self.db_client is not None:
+            cached = self._found(key, await asyncio.to_thread(self._load, key))
+        if cached is None:
+            self.stats["misses"] += 1
+        return cached
+
+    def set(self, content_hash: str, variant: str, model: str, response_text: str) -> None:
+        self._remember(self.make_key(content_hash, variant, model), response_text)
+        self.stats["writes"] += 1
+        if self.db_client is not None:
+            self._store(content_hash, variant, model, response_text)
+
+    async def aset(self, content_hash: str, variant: str, model: str, response_text: str) -> None:
+        """set() for async callers; the table write runs on a worker thread"""
+        self._remember(self.make_key(content_hash, variant, model), response_text)
+        self.stats["writes"] += 1
+        if self.db_client is not None:
+            await asyncio.to_thread(self._store, content_hash, variant, model, response_text)
+
+    def _recall(self, key: str) -> Optional[str]:
+        if key not in self._memory:
+            return None
+        self._memory.move_to_end(key)
+        self.stats["memory_hits"] += 1
+        return self._memory[key]
+
+    def _found(self, key: str, text: Optional[str]) -> Optional[str]:
+        if text is not None:
+            self._remember(key, text)
+            self.stats["persistent_hits"] += 1
+        return text
+
+    def _load(self, key: str) -> Optional[str]:
+        try:
+            result = self.db_client.table(CACHE_TABLE).select("response_text").eq(
+                "cache_key", key
+            ).limit(1).execute()
+            if result.data:
+                return result.data[0]["response_text"]
+        except Exception as e:
+            logger.warning(f"Vision cache lookup failed: {e}")
+        return None
+
+    def _store(self, content_hash: str, variant: str, model: str, response_text: str) -> None:
+        try:
+            self.db_client.table(CACHE_TABLE).upsert({
+                "cache_key": self.make_key(content_hash, variant, model),
+                "content_hash": content_hash,
+                "prompt_variant": variant,
+                "model": model,
+                "response_text": response_text,
+                "created_at": datetime.utcnow().isoformat(),
+            }, on_conflict="cache_key").execute()
+        except Exception as e:
+            logger.warning(f"Vision cache write failed: {e}")
+
+    def _remember(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+class VisionAnalysisService:
+    """
+    Single entry point for GPT-4o image analysis across agents.
+
+    Callers pass their own prompt and a variant name; the raw model response
+    text is cached so each caller keeps its own parsing logic.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[VisionAnalysisCache] = None,
+        async_client: Optional[AsyncOpenAI] = None,
+        sync_client: Optional[OpenAI] = None,
+        model: str = DEFAULT_VISION_MODEL,
+        max_concurrency: int = 4,
+    ):
+        api_key = os.getenv("OPENAI_API_KEY")
+        self.async_client = async_client or (AsyncOpenAI(api_key=api_key) if api_key else None)
+        self.sync_client = sync_client or (OpenAI(api_key=api_key) if api_key else None)
+        self.cache = cache if cache is not None else VisionAnalysisCache(_default_db_client())
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    def _build_messages(self, prompt: str, prepared: PreparedImage) -> list[dict[str, Any]]:
+        return [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": prepared.data_url}},
+            ],
+        }]
+
+    async def analyze(
+        self,
+        image_data: str,
+        prompt: str,
+        variant: str,
+        max_tokens: int = 1000,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """Analyze one image, returning the raw model response text"""
+        prepared = await asyncio.to_thread(prepare_image, image_data)
+        cache_variant = prompt_variant(variant, prompt)
+
+        cached = await self.cache.aget(prepared.content_hash, cache_variant, self.model)
+        if cached is not None:
+            return cached
+
+        # Collapse concurrent requests for the same photo/prompt into one call
+        key = VisionAnalysisCache.make_key(prepared.content_hash, cache_variant, self.model)
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        if not self.async_client:
+            raise RuntimeError("OpenAI client not configured for vision analysis")
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            kwargs: dict[str, Any] = {"max_tokens": max_tokens}
+            if temperature is not None:
+                kwargs["temperature"] = temperature
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt, prepared),
+                **kwargs,
+            )
+            text = response.choices[0].message.content or ""
+            await self.cache.aset(prepared.content_hash, cache_variant, self.model, text)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiters that never arrive don't log a warning
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def analyze_many(
+        self,
+        images: list[str],
+        prompt: str,
+        variant: str,
+        max_tokens: int = 1000,
+        temperature: Optional[float] = None,
+    ) -> list[Any]:
+        """
+        Analyze several images concurrently.
+
+        Returns one entry per image in input order: the response text, or the
+        exception raised for that image.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _run(image_data: str) -> str:
+            async with semaphore:
+                return await self.analyze(image_data, prompt, variant, max_tokens, temperature)
+
+        return await asyncio.gather(*(_run(img) for img in images), return_exceptions=True)
+
+    def analyze_sync(
+        self,
+        image_data: str,
+        prompt: str,
+        variant: str,
+        max_tokens: int = 1000,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """Blocking variant for the synchronous IRIS services"""
+        prepared = prepare_image(image_data)
+        cache_variant = prompt_variant(variant, prompt)
+
+        cached = self.cache.get(prepared.content_hash, cache_variant, self.model)
+        if cached is not None:
+            return cached
+
+        if not self.sync_client:
+            raise RuntimeError("OpenAI client not configured for vision analysis")
+
+        kwargs: dict[str, Any] = {"max_tokens": max_tokens}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        response = self.sync_client.chat.completions.create(
+            model=self.model,
+            messages=self._build_messages(prompt, prepared),
+            **kwargs,
+        )
+        text = response.choices[0].message.content or ""
+        self.cache.set(prepared.content_hash, cache_variant, self.model, text)
+        return text
+
+
+def _default_db_client() -> Any:
+    """Use the shared Supabase client for the persistent cache when available"""
+    try:
+        from database_simple import db
+        return db.client if db.is_available() else None
+    except Exception as e:
+        logger.warning(f"Vision cache running memory-only: {e}")
+        return None
+
+
+_vision_service: Optional[VisionAnalysisService] = None
+
+
+def get_vision_service() -> VisionAnalysisService:
+    """Return the process-wide vision analysis service"""
+    global _vision_service
+    if _vision_service is None:
+        _vision_service = VisionAnalysisService()
+    return _vision_service
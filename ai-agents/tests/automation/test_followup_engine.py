@@ -0,0 +1,151 @@
+import json
+import re
+import time
+
+import pytest
+
+from agents.automation import followup_automation
+from agents.automation.followup_automation import FollowUpAutomation
+from utils.rate_limiter import AsyncTokenBucket
+
+
+class FakeTracker:
+    def __init__(self, candidates):
+        self.candidates, self.recorded = candidates, []
+
+    def get_follow_up_candidates(self, days_since_sent, max_follow_ups):
+        return {"success": True, "candidates": self.candidates}
+
+    def record_follow_up(self, distribution_id, method):
+        self.recorded.append((distribution_id, method))
+        return {"success": True}
+
+
+class FakeRollups:
+    def __init__(self):
+        self.calls = []
+
+    def record_followup(self, created_at, strategy, channel, count=1):
+        self.calls.append((strategy, channel, count))
+
+
+def candidate(n, bid_card_id, match_score, follow_up_count=0):
+    return {
+        "distribution_id": f"d{n}", "contractor_id": f"k{n}", "bid_card_id": bid_card_id,
+        "company_name": f"Co {n}", "follow_up_count": follow_up_count, "days_since_sent": 2,
+        "last_method": "email", "match_score": match_score,
+    }
+
+
+@pytest.fixture
+def automation(fake_supabase, monkeypatch):
+    monkeypatch.setattr(followup_automation, "_channel_limiters", {})
+    fake_supabase.tables.update({
+        "potential_contractors": [
+            {"id": f"k{n}", "company_name": f"Co {n}", "primary_email": f"k{n}@example.com", "phone": "555"}
+            for n in range(12)
+        ],
+        "bid_cards": [
+            {"id": bc, "project_type": "roofing", "location": {"city": "Austin"}, "bid_document": {}}
+            for bc in ("bc-1", "bc-2")
+        ],
+    })
+    automation = FollowUpAutomation()
+    automation.supabase = fake_supabase
+    automation.rollups = FakeRollups()
+    return automation
+
+
+def test_campaign_batches_prompts_per_bid_card_and_logs_in_bulk(automation, fake_supabase, monkeypatch):
+    monkeypatch.setattr(followup_automation, "FOLLOWUP_LLM_BATCH_SIZE", 4)
+    candidates = [candidate(n, "bc-1" if n < 6 else "bc-2", 90) for n in range(10)]
+    candidates += [candidate(10, "bc-1", 50), candidate(11, "bc-2", 50, follow_up_count=1)]
+    automation._bid_tracker = FakeTracker(candidates)
+
+    prompts = []
+
+    def complete(prompt, max_tokens):
+        prompts.append(prompt)
+        ids = re.findall(r"^ID: (\S+)", prompt, re.M)
+        return json.dumps({i: {"email": f"mail {i}", "sms": f"sms {i}", "form": f"form {i}"} for i in ids})
+
+    automation._complete = complete
+    fake_supabase.executed = 0
+    result = automation.run_followup_campaign(batch_size=20)
+
+    assert result["success"] and result["results"]["follow_ups_sent"] == 12
+    # bc-1 has 6 personalized candidates (two prompts), bc-2 has 4 (one prompt)
+    assert sorted(len(re.findall(r"^ID:", p, re.M)) for p in prompts) == [2, 4, 4]
+    logs = fake_supabase.tables["followup_logs"]
+    assert len(logs) == 12 and {log["channel"] for log in logs} == {"email", "sms"}
+    assert next(log for log in logs if log["distribution_id"] == "d3")["content_preview"] == "mail d3"
+    # two bulk reads + one log insert + one followup_attempts insert per send
+    assert fake_supabase.executed == 2 + 1 + 12
+    assert sorted(automation.rollups.calls) == [("different_channel", "sms", 1), ("gentle_reminder", "email", 1),
+                                                ("personalized", "email", 10)]
+    assert ("d11", "sms") in automation._bid_tracker.recorded
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_respect_the_concurrency_cap_and_fall_back_to_templates(automation, monkeypatch):
+    monkeypatch.setattr(followup_automation, "FOLLOWUP_LLM_BATCH_SIZE", 1)
+    monkeypatch.setattr(followup_automation, "FOLLOWUP_LLM_CONCURRENCY", 2)
+    automation._bid_tracker = FakeTracker([candidate(n, "bc-1", 95) for n in range(6)])
+
+    in_flight, peak = 0, 0
+
+    def complete(prompt, max_tokens):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        time.sleep(0.02)
+        in_flight -= 1
+        return "not json"
+
+    automation._complete = complete
+    result = await automation.run_followup_campaign_async()
+
+    assert peak == 2
+    assert result["results"]["follow_ups_sent"] == 6
+    assert result["results"]["strategies_used"] == {"personalized": 6}
+
+
+@pytest.mark.asyncio
+async def test_sends_wait_on_the_channel_rate_limiter(automation, monkeypatch):
+    clock = [0.0]
+    limiter = AsyncTokenBucket(rate=1, capacity=2, clock=lambda: clock[0])
+    monkeypatch.setattr(followup_automation, "_channel_limiters", {"email": limiter})
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(followup_automation.asyncio, "sleep", fake_sleep)
+    automation._bid_tracker = FakeTracker([candidate(n, "bc-1", 10) for n in range(4)])
+
+    result = await automation.run_followup_campaign_async()
+
+    assert result["results"]["follow_ups_sent"] == 4
+    assert limiter.total_acquired == 4 and sorted(waits) == [1.0, 2.0]
+
+
+def test_record_follow_up_increments_in_one_rpc(fake_supabase):
+    from agents.tracking.bid_distribution_tracker import FOLLOW_UP_INCREMENT_RPC, BidDistributionTracker
+
+    fake_supabase.tables["bid_card_distributions"] = [{"id": "d1", "follow_up_count": 1}]
+
+    def increment(client, params):
+        row = next((r for r in client.tables["bid_card_distributions"] if r["id"] == params["p_distribution_id"]), None)
+        if row is None:
+            return None
+        row.update(follow_up_count=row["follow_up_count"] + 1, last_follow_up_method=params["p_method"])
+        return row["follow_up_count"]
+
+    fake_supabase.functions[FOLLOW_UP_INCREMENT_RPC] = increment
+    tracker = BidDistributionTracker.__new__(BidDistributionTracker)
+    tracker.supabase = fake_supabase
+
+    assert tracker.record_follow_up("d1", "sms") == {"success": True, "follow_up_count": 2}
+    assert tracker.record_follow_up("missing", "sms")["success"] is False
+    # No read of the current count before writing it back
+    assert fake_supabase.selects == [] and fake_supabase.rpc_calls == [FOLLOW_UP_INCREMENT_RPC] * 2
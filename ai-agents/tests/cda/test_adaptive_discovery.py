@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from agents.cda.adaptive_discovery import AdaptiveDiscoverySystem, contractor_identifiers
+
+
+class FakeGeocoder:
+    """ZIP coverage per radius; 40 and 60 miles reach no new ZIPs"""
+
+    coverage = {
+        15: ["33442", "33441"],
+        25: ["33442", "33441", "33064"],
+        40: ["33442", "33441", "33064"],
+        60: ["33442", "33441", "33064"],
+        100: ["33442", "33441", "33064", "33101"],
+    }
+
+    def get_nearby_zips(self, center_zip, radius):
+        return self.coverage[radius]
+
+
+def _contractor(n, **extra):
+    return {"company_name": f"Contractor {n}", "place_id": f"p{n}", **extra}
+
+
+@pytest.fixture
+def system():
+    return AdaptiveDiscoverySystem(geocoder=FakeGeocoder())
+
+
+def test_rings_carry_only_new_zips(system):
+    rings = system.plan_rings("33442")
+
+    assert [(r.inner_radius, r.outer_radius) for r in rings] == [(0, 15), (15, 25), (25, 40), (40, 60), (60, 100)]
+    assert [r.new_zips for r in rings] == [["33441", "33442"], ["33064"], [], [], ["33101"]]
+    assert rings[1].area_ratio == pytest.approx(1 - (15 / 25) ** 2)
+
+
+def test_ring_plan_is_cached_per_center_zip():
+    lookups = []
+
+    class CountingGeocoder(FakeGeocoder):
+        def get_nearby_zips(self, center_zip, radius):
+            lookups.append((center_zip, radius))
+            return super().get_nearby_zips(center_zip, radius)
+
+    system = AdaptiveDiscoverySystem(geocoder=CountingGeocoder())
+
+    assert system.plan_rings("33442") is system.plan_rings("33442")
+    assert len(lookups) == 5
+    system.plan_rings("33064")
+    assert len(lookups) == 10
+
+
+def test_identifiers_ignore_shared_hosts():
+    ids = contractor_identifiers({
+        "company_name": "Ace Roofing", "google_place_id": "abc",
+        "phone": "+1 (561) 555-0100", "website": "https://www.AceRoof.com/contact",
+    })
+    assert ids == {"place:abc", "phone:5615550100", "domain:aceroof.com", "name:ace roofing"}
+    assert "domain:facebook.com" not in contractor_identifiers({"website": "facebook.com/ace"})
+
+
+@pytest.mark.asyncio
+async def test_expansion_skips_empty_rings_and_excludes_seen_places(system):
+    calls = []
+
+    async def discover(location, radius_miles, target_count, ring, exclude_place_ids):
+        calls.append((radius_miles, ring.inner_radius, set(exclude_place_ids)))
+        batches = {
+            15: [_contractor(1), _contractor(2)],
+            25: [_contractor(2), {"company_name": "Renamed LLC", "phone": "561-555-0001", "place_id": "p9"},
+                 _contractor(3, phone="5615550001")],
+            100: [_contractor(4), _contractor(5, website="https://contractor1.com")],
+        }
+        return {"success": True, "contractors": batches.get(radius_miles, []), "api_calls": {"searches": 1}}
+
+    result = await system.discover_with_expansion(discover, {"zip_code": "33442"}, target_count=10)
+
+    assert [c[0] for c in calls] == [15, 25, 100]
+    assert calls[1] == (25, 15, {"p1", "p2"})
+    assert calls[2][2] == {"p1", "p2", "p9"}
+    # p2 is a repeat place id, Contractor 3 shares a phone with Renamed LLC
+    assert [c["place_id"] for c in result["contractors"]] == ["p1", "p2", "p9", "p4", "p5"]
+    assert result["skipped_rings"] == 2
+    assert result["total_api_calls"] == 3
+    assert result["final_radius"] == 100
+
+
+@pytest.mark.asyncio
+async def test_legacy_discovery_functions_still_work(system):
+    seen_kwargs = []
+
+    async def discover(location, radius_miles, target_count, project_type=None):
+        seen_kwargs.append(project_type)
+        return {"success": True, "contractors": [_contractor(radius_miles)]}
+
+    result = await system.discover_with_expansion(
+        discover, {"city": "Boca Raton"}, target_count=2, min_acceptable=2, project_type="roofing"
+    )
+
+    # No ZIP, so no ring can be proven empty
+    assert seen_kwargs == ["roofing", "roofing"]
+    assert len(result["contractors"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_next_ring_runs_while_current_is_scored_and_is_cancelled_when_not_needed(system):
+    started = []
+    cancelled = []
+    scoring_done = asyncio.Event()
+
+    async def discover(location, radius_miles, target_count, **kwargs):
+        started.append(radius_miles)
+        if radius_miles == 15:
+            return {"success": True, "contractors": [_contractor(1)]}
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(radius_miles)
+            raise
+
+    async def score(contractors):
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert started == [15, 25]  # ring 2 already in flight
+        scoring_done.set()
+        return len(contractors)
+
+    result = await system.discover_with_expansion(
+        discover, {"zip_code": "33442"}, target_count=2, min_acceptable=1, on_results=score
+    )
+    await asyncio.sleep(0)
+
+    assert scoring_done.is_set()
+    assert result["success"] and result["expansion_stages_used"] == 1
+    assert cancelled == [25]
@@ -0,0 +1,123 @@
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from agents.cda.batch_scoring import BatchBidSpecificScorer, BatchContractorScorer, top_k_indices
+from agents.cda.bid_specific_scoring import BidCardPreferences, BidSpecificScoringEngine
+from agents.cda.scoring import ContractorScorer
+
+
+SPECIALTIES = [
+    ["roofing repair"], ["kitchen remodeling", "cabinets"], ["general contracting"],
+    ["plumbing", "drain cleaning"], [], ["Kitchen"], ["lawn care", "turf"],
+]
+NAMES = ["Ace Roofing", "Family Kitchens", "Local Bath Co", "National Builders Corp", "Bob's Plumbing", "Green Turf"]
+
+
+def _random_contractor(rng: random.Random, i: int) -> dict:
+    return {
+        "id": f"c{i}",
+        "company_name": rng.choice(NAMES),
+        "discovery_tier": rng.choice([1, 2, 3, 4]),
+        "match_score": rng.choice([0, 12.5, 33.3, 47, 88.8, 100]),
+        "rating": rng.choice([0, 2.9, 3.0, 3.5, 3.99, 4.0, 4.5, 4.79, 4.8, 5.0]),
+        "total_projects": rng.choice([0, 4, 5, 10, 19, 20, 50, 100, 150, 200, 500]),
+        "min_project_size": rng.choice([0, 1000, 5000, 20000]),
+        "max_project_size": rng.choice([2000, 10000, 50000, 999999]),
+        "availability": rng.choice(["available", "busy", "unavailable", ""]),
+        "onboarded": rng.random() < 0.5,
+        "license_number": rng.choice([None, "", "FL123"]),
+        "insurance_verified": rng.random() < 0.5,
+        "reengagement_data": {"last_response": rng.choice(["interested", "pending", "no", None])},
+        "specialties": rng.choice(SPECIALTIES),
+        "zip_codes": rng.choice([["33442"], ["33101", "33102"], []]),
+        "google_rating": rng.choice([0, 2.5, 3.5, 4.0, 4.5, 4.6, 4.8, 4.9]),
+        "google_review_count": rng.choice([0, 5, 19, 20, 45, 60, 120, 250]),
+        "phone": rng.choice(["", "(555) 123-4567"]),
+        "email": rng.choice(["", "a@b.com"]),
+        "website": rng.choice(["", "familyroofing.com", "bigcorp.com"]),
+        "zip_code": rng.choice(["", "33442", "33401", "90210"]),
+        "google_types": rng.choice([["roofing_contractor"], ["plumber"], []]),
+        "bonded": rng.random() < 0.3,
+    }
+
+
+@pytest.fixture
+def contractors():
+    rng = random.Random(1234)
+    return [_random_contractor(rng, i) for i in range(600)]
+
+
+@pytest.mark.parametrize("project_type", ["kitchen", "roofing", "general", ""])
+@pytest.mark.parametrize("budget_max", [0, 3000, 15000, 60000])
+def test_contractor_scorer_parity(contractors, project_type, budget_max):
+    bid_data = {
+        "project_type": project_type,
+        "budget_max": budget_max,
+        "location": {"full_location": "Coconut Creek, FL 33442"},
+    }
+    scorer = ContractorScorer()
+    comps = BatchContractorScorer().score_components(contractors, bid_data)
+
+    for i, contractor in enumerate(contractors):
+        assert comps["final_score"][i] == scorer._calculate_total_score(contractor, bid_data)
+        expected = scorer._get_score_breakdown(contractor, bid_data)
+        for key, value in expected.items():
+            assert comps[key][i] == value, (i, key)
+
+
+def test_contractor_scorer_ranking_matches_stable_sort(contractors):
+    bid_data = {"project_type": "kitchen", "budget_max": 15000, "location": {"full_location": "FL 33442"}}
+    legacy = ContractorScorer()
+    expected = sorted(
+        contractors, key=lambda c: legacy._calculate_total_score(c, bid_data), reverse=True
+    )
+
+    ranked = ContractorScorer().score_contractors(copy.deepcopy(contractors), bid_data)
+    assert [c["id"] for c in ranked] == [c["id"] for c in expected]
+
+    top = ContractorScorer().score_contractors(copy.deepcopy(contractors), bid_data, top_k=25)
+    assert [c["id"] for c in top] == [c["id"] for c in expected[:25]]
+
+
+@pytest.mark.parametrize("size", ["mom_and_pop", "medium", "large", "any"])
+@pytest.mark.parametrize("urgency", ["emergency", "week", "flexible"])
+@pytest.mark.parametrize("quality", ["quality_first", "budget_conscious", "balanced"])
+@pytest.mark.parametrize("budget", [(1000, 4000), (5000, 15000), (30000, 60000)])
+def test_bid_specific_parity(contractors, size, urgency, quality, budget):
+    prefs = BidCardPreferences(
+        project_type="roofing",
+        budget_range=budget,
+        urgency_level=urgency,
+        complexity="moderate",
+        preferred_contractor_size=size,
+        quality_vs_price=quality,
+        special_requirements=["licensed", "insured", "bonded", "licensed"],
+        location_preference="local_only",
+    )
+    bid_location = {"zip_code": "33442"}
+    engine = BidSpecificScoringEngine()
+    sample = contractors[:150]
+    results = engine.score_many(sample, prefs, bid_location)
+
+    assert len(results) == len(sample)
+    for result in results:
+        expected = engine.calculate_bid_specific_score(result["contractor"], prefs, bid_location)
+        actual = {k: v for k, v in result.items() if k != "contractor"}
+        assert actual == expected
+
+
+def test_top_k_indices_breaks_ties_by_input_order():
+    scores = np.array([5.0, 9.0, 5.0, 9.0, 1.0, 5.0])
+    assert top_k_indices(scores).tolist() == [1, 3, 0, 2, 5, 4]
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 0]
+    assert top_k_indices(scores, 0).tolist() == []
+
+
+def test_batch_scorer_handles_empty_pool():
+    assert BatchContractorScorer().score_contractors([], {"project_type": "x"}) == []
+    assert BatchBidSpecificScorer().score_contractors(
+        [], BidCardPreferences("x", (0, 0), "week", "simple", "any", "balanced", [], "any"), {}
+    ) == []
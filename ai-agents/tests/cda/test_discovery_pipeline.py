@@ -0,0 +1,152 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from agents.cda.discovery_pipeline import IncrementalDeduplicator, TierDiscoveryPipeline
+
+
+def _contractors(*names):
+    return [{"company_name": name} for name in names]
+
+
+def _sequential_dedup(*tiers):
+    seen, unique = set(), []
+    for contractor in itertools.chain(*tiers):
+        name = contractor.get("company_name", "").lower().strip()
+        if name and name not in seen:
+            seen.add(name)
+            unique.append(contractor)
+    return unique
+
+
+def test_incremental_dedup_matches_sequential_in_any_arrival_order():
+    tier1 = _contractors("Ace Roofing", "Bob's Plumbing", "ace roofing ")
+    tier2 = _contractors("Bob's Plumbing", "Coastal Kitchens", "")
+    tier3 = _contractors("coastal kitchens", "Delta Decks", "Ace Roofing")
+    expected = _sequential_dedup(tier1, tier2, tier3)
+
+    for order in itertools.permutations([(0, tier1), (1, tier2), (2, tier3)]):
+        dedup = IncrementalDeduplicator()
+        for priority, tier in order:
+            dedup.add(tier, priority)
+        assert [id(c) for c in dedup.unique()] == [id(c) for c in expected]
+
+
+def test_incremental_dedup_reports_superseded_entries():
+    dedup = IncrementalDeduplicator()
+    tier2 = _contractors("Ace Roofing")
+    tier1 = _contractors("ACE ROOFING")
+    dedup.add(tier2, 1)
+    accepted, superseded = dedup.add(tier1, 0)
+    assert accepted == tier1
+    assert superseded == tier2
+
+
+@pytest.mark.asyncio
+async def test_early_tiers_run_concurrently_and_stream_to_scoring():
+    scored = []
+
+    async def tier1():
+        await asyncio.sleep(0.05)
+        return _contractors("A", "B")
+
+    async def tier2():
+        await asyncio.sleep(0.05)
+        return _contractors("B", "C")
+
+    async def score(contractor):
+        scored.append(contractor["company_name"])
+        contractor["match_score"] = 1
+
+    start = time.perf_counter()
+    result = await TierDiscoveryPipeline(3, score_candidate=score).run({"tier1": tier1, "tier2": tier2})
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.09
+    assert [c["company_name"] for c in result.contractors] == ["A", "B", "C"]
+    assert sorted(scored) == ["A", "B", "C"]
+    assert result.tier_counts == {"tier1": 2, "tier2": 2}
+    assert set(result.tier_latency_ms) == {"tier1", "tier2"}
+    assert not result.tier3_started
+
+
+@pytest.mark.asyncio
+async def test_tier3_starts_speculatively_when_early_tier_is_short():
+    tier3_requests = []
+    tier3_started_at = []
+    start = time.perf_counter()
+
+    async def tier1():
+        return _contractors("A")
+
+    async def tier2():
+        await asyncio.sleep(0.1)
+        return _contractors("B")
+
+    async def tier3(remaining):
+        tier3_started_at.append(time.perf_counter() - start)
+        tier3_requests.append(remaining)
+        return _contractors("C", "D", "A")
+
+    result = await TierDiscoveryPipeline(10).run({"tier1": tier1, "tier2": tier2}, tier3=tier3)
+
+    assert tier3_requests == [9]
+    assert tier3_started_at[0] < 0.05
+    assert result.tier3_speculative
+    assert not result.tier3_cancelled
+    assert [c["company_name"] for c in result.contractors] == ["A", "B", "C", "D"]
+
+
+@pytest.mark.asyncio
+async def test_speculative_tier3_cancelled_when_early_tiers_fill_target():
+    async def tier1():
+        return _contractors("A")
+
+    async def tier2():
+        await asyncio.sleep(0.02)
+        return _contractors("B", "C", "D")
+
+    async def tier3(remaining):
+        await asyncio.sleep(1)
+        return _contractors("Z")
+
+    result = await TierDiscoveryPipeline(4).run({"tier1": tier1, "tier2": tier2}, tier3=tier3)
+
+    assert result.tier3_speculative
+    assert result.tier3_cancelled
+    assert [c["company_name"] for c in result.contractors] == ["A", "B", "C", "D"]
+    assert "tier3" not in result.tier_counts
+
+
+@pytest.mark.asyncio
+async def test_tier3_waits_for_early_tiers_when_not_trending_short():
+    async def tier1():
+        return _contractors("A", "B", "C")
+
+    async def tier2():
+        await asyncio.sleep(0.02)
+        return []
+
+    async def tier3(remaining):
+        return _contractors(*[f"W{i}" for i in range(remaining)])
+
+    result = await TierDiscoveryPipeline(5).run({"tier1": tier1, "tier2": tier2}, tier3=tier3)
+
+    assert result.tier3_started
+    assert not result.tier3_speculative
+    assert result.tier_counts["tier3"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_tier_does_not_abort_discovery():
+    async def tier1():
+        raise RuntimeError("supabase down")
+
+    async def tier2():
+        return _contractors("A")
+
+    result = await TierDiscoveryPipeline(1).run({"tier1": tier1, "tier2": tier2})
+    assert [c["company_name"] for c in result.contractors] == ["A"]
+    assert result.tier_counts["tier1"] == 0
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from agents.cda.adaptive_discovery import AdaptiveDiscoverySystem
+from agents.cda.google_places_unified import GooglePlacesOptimized
+from services.api_response_cache import ApiResponseCache, SQLiteResponseStore
+from utils.rate_limiter import AsyncTokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = AsyncTokenBucket(rate=10, capacity=3, clock=clock)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.1)
+    assert bucket.reserve() == pytest.approx(0.2)
+
+    clock.now = 1.0
+    assert bucket.available == pytest.approx(3)
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        AsyncTokenBucket(rate=0)
+
+
+def _places(start, count):
+    return [
+        {"id": f"p{i}", "displayName": {"text": f"Place {i}"}, "rating": 4.5, "userRatingCount": 100 - i}
+        for i in range(start, start + count)
+    ]
+
+
+class StubPlacesApi:
+    """httpx transport that mimics searchText paging and Place Details"""
+
+    def __init__(self, pages, missing=(), detail_delay=0.02):
+        self.pages = pages
+        self.missing = set(missing)
+        self.detail_delay = detail_delay
+        self.search_calls = 0
+        self.detail_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("places:searchText"):
+            body = json.loads(request.content)
+            page = int(body.get("pageToken", 0))
+            self.search_calls += 1
+            payload = {"places": self.pages[page]}
+            if page + 1 < len(self.pages):
+                payload["nextPageToken"] = str(page + 1)
+            return httpx.Response(200, json=payload)
+
+        place_id = request.url.path.rsplit("/", 1)[-1]
+        self.detail_calls.append(place_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.detail_delay)
+        finally:
+            self.in_flight -= 1
+        if place_id in self.missing:
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json={"id": place_id, "displayName": {"text": place_id}})
+
+
+def _places_client(api, monkeypatch, concurrency=4):
+    monkeypatch.setenv("GOOGLE_PLACES_API_KEY", "test-key")
+    client = GooglePlacesOptimized(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(api)),
+        rate_limiter=AsyncTokenBucket(rate=1000, capacity=1000),
+        enrichment_concurrency=concurrency,
+        cache=ApiResponseCache(store=SQLiteResponseStore(":memory:")),
+    )
+
+    async def search_area(location, radius_miles):
+        return {}
+
+    monkeypatch.setattr(client, "_calculate_search_area", search_area)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_cheapest_enriches_concurrently_and_keeps_ranked_order(monkeypatch):
+    api = StubPlacesApi([_places(0, 20), _places(20, 20)], missing={"p1"})
+    client = _places_client(api, monkeypatch)
+
+    start = time.perf_counter()
+    result = await client.discover_contractors("plumbing", {"city": "Boca Raton", "state": "FL"}, target_count=5)
+    elapsed = time.perf_counter() - start
+
+    assert [c["place_id"] for c in result["contractors"]] == ["p0", "p2", "p3", "p4", "p5"]
+    # 10-place shortlist filled from the first page; no second search call
+    assert api.search_calls == 1
+    assert result["api_calls"]["searches"] == 1
+    assert 1 < api.max_in_flight <= 4
+    assert len(api.detail_calls) < 10
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_cheapest_pages_until_shortlist_is_full(monkeypatch):
+    api = StubPlacesApi([_places(0, 5), _places(5, 5), _places(10, 5)], detail_delay=0)
+    client = _places_client(api, monkeypatch)
+
+    result = await client.discover_contractors("roofing", {"city": "Boca Raton", "state": "FL"}, target_count=5)
+
+    assert api.search_calls == 2
+    assert result["total_discovered"] == 10
+    assert len(result["contractors"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_outer_ring_returns_new_places_after_inner_ring_filled_shortlist(monkeypatch):
+    api = StubPlacesApi([_places(0, 20), _places(20, 20), _places(40, 20)], detail_delay=0)
+    client = _places_client(api, monkeypatch)
+
+    class Geocoder:
+        def get_nearby_zips(self, center_zip, radius):
+            return [f"{radius:05d}"]
+
+    async def discover(location, radius_miles, target_count, exclude_place_ids):
+        return await client.discover_contractors(
+            "plumbing", location, target_count=target_count, radius_miles=radius_miles,
+            exclude_place_ids=exclude_place_ids
+        )
+
+    async def accept_two(contractors):
+        return min(2, len(contractors))
+
+    system = AdaptiveDiscoverySystem(geocoder=Geocoder())
+    result = await system.discover_with_expansion(
+        discover, {"zip_code": "33442", "city": "Boca Raton", "state": "FL"},
+        target_count=4, min_acceptable=4, on_results=accept_two
+    )
+
+    first, second = result["expansion_history"][:2]
+    assert first["found"] == 4
+    # Inner-ring places are skipped in the search, so the outer ring is all new
+    assert second["found"] == 2
+    place_ids = [c["place_id"] for c in result["contractors"]]
+    assert len(set(place_ids)) == len(place_ids) == 4
+
+
+@pytest.mark.asyncio
+async def test_requests_go_through_shared_limiter(monkeypatch):
+    api = StubPlacesApi([_places(0, 4)], detail_delay=0)
+    client = _places_client(api, monkeypatch)
+    client.rate_limiter = AsyncTokenBucket(rate=1000, capacity=1000)
+
+    await client.discover_contractors("plumbing", {"city": "Boca Raton", "state": "FL"}, target_count=2)
+
+    assert client.rate_limiter.total_acquired == api.search_calls + len(api.detail_calls)
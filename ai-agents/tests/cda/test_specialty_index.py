@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from agents.cda.bid_specific_scoring import BidSpecificScoringEngine
+from agents.cda.specialty_index import SpecialtyIndex, get_specialty_index, normalize_terms
+
+
+@pytest.fixture
+def index():
+    return SpecialtyIndex(["kitchen_renovation", "turf_installation"])
+
+
+def test_trade_words_share_ids():
+    assert normalize_terms("Plumber") == normalize_terms("plumbing")
+    assert normalize_terms("electrician") == normalize_terms("Electrical")
+    assert set(normalize_terms("bathroom")) >= set(normalize_terms("bath"))
+
+
+@pytest.mark.parametrize(
+    ("project_type", "specialties", "expected"),
+    [
+        ("roofing", ["Roof Repair", "Gutters"], True),
+        ("kitchen remodel", ["Cabinet installation"], True),
+        ("bathroom renovation", ["Tile work"], True),
+        ("electrical", ["Panel upgrades"], True),
+        ("plumbing", ["Drain cleaning"], True),
+        ("roofing", ["Interior painting"], False),
+        ("electrical", ["Lawn care"], False),
+    ],
+)
+def test_specialty_matching(index, project_type, specialties, expected):
+    assert index.matches(project_type, specialties) is expected
+
+
+def test_filter_keeps_contractors_without_specialties(index):
+    contractors = [
+        {"id": 1, "specialties": ["roofing"]},
+        {"id": 2, "specialties": ["painting"]},
+        {"id": 3, "specialties": []},
+    ]
+    assert [c["id"] for c in index.filter_contractors("roofing", contractors)] == [1, 3]
+
+
+def test_bid_specific_specialization_tiers():
+    engine = BidSpecificScoringEngine()
+    assert engine._calculate_specialization_match({"company_name": "Ace Roofing LLC"}, "roofing") == 10.0
+    assert engine._calculate_specialization_match(
+        {"company_name": "Ace Co", "specialties": ["shingle repair"]}, "roofing"
+    ) == 8.0
+    assert engine._calculate_specialization_match(
+        {"company_name": "Ace Co", "google_types": ["roofing_contractor"]}, "roofing"
+    ) == 6.0
+    assert engine._calculate_specialization_match({"company_name": "Ace Co"}, "roofing") == 0.0
+
+
+def test_ten_thousand_contractors_match_quickly():
+    index = get_specialty_index()
+    trades = [["roofing repair"], ["interior painting"], ["drain cleaning", "pipe repair"], ["lawn care"]]
+    contractors = [{"id": i, "specialties": trades[i % len(trades)]} for i in range(10_000)]
+
+    index.filter_contractors("roofing", contractors)  # warm contractor bitsets
+    start = time.perf_counter()
+    matched = index.filter_contractors("roofing", contractors)
+    elapsed = time.perf_counter() - start
+
+    assert len(matched) == 2_500
+    assert elapsed < 0.1
+
+
+def test_vocabulary_and_memos_stay_bounded():
+    index = SpecialtyIndex(["kitchen_renovation"], memo_size=32)
+    trades = index.trade_count
+
+    for i in range(500):
+        index.bits_for_text(f"Acme Holdings {i} LLC")
+        index.bits_for_list([f"widget{i}", "roof repair"])
+
+    assert index.trade_count == trades
+    assert index.bits_for_text("zzyzx") == 0
+    assert index.matches("roofing", ["widget7", "roof repair"])
+    assert len(index._text_bits) <= 32 and len(index._list_bits) <= 32
@@ -144,6 +144,13 @@ def stub_bid_card_manager(monkeypatch):
             )
             return True
 
+        async def update_bid_card_fields(self, *, bid_card_id: str, fields: dict, confidence: float):
+            for field_name, field_value in fields.items():
+                await self.update_bid_card_field(
+                    bid_card_id=bid_card_id, field_name=field_name, field_value=field_value, confidence=confidence
+                )
+            return len(fields)
+
         async def get_bid_card_status(self, bid_card_id: str):
             self.status_queries.append(bid_card_id)
             return {"id": bid_card_id, "completion_percentage": 64}
@@ -1,6 +1,7 @@
 import json
 import sys
 import uuid
+from types import SimpleNamespace
 from pathlib import Path
 
 import httpx
@@ -123,3 +124,51 @@ async def test_in_memory_fallback_operations():
     official_id = await manager.convert_to_official_bid_card(bid_card_id, "user-789")
     assert official_id is not None
     assert official_id != ""
+
+
+@pytest.mark.asyncio
+async def test_turn_fields_send_one_batched_patch():
+    """A CIA turn's field updates reach the API as a single PATCH."""
+
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content.decode())
+        requests.append((request.method, request.url.path, body))
+        return httpx.Response(200, json={"fields_updated": [f["field_name"] for f in body["fields"]], "version": 1})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://testserver") as client:
+        manager = PotentialBidCardManager(base_url="http://testserver/api/cia/potential-bid-cards", client=client)
+
+        updated = await manager.update_bid_card_fields(
+            "card-1",
+            {"urgency": "emergency", "zip_code": "94107", "phone_number": "555"},  # phone_number is ignored
+            {"urgency": 0.9},
+        )
+
+    assert updated == 2 and len(requests) == 1
+    method, path, body = requests[0]
+    assert (method, path) == ("PATCH", "/api/cia/potential-bid-cards/card-1/fields")
+    fields = {f["field_name"]: (f["field_value"], f["confidence"]) for f in body["fields"]}
+    assert fields == {"urgency_level": ("emergency", 0.9), "zip_code": ("94107", 1.0)}
+
+
+@pytest.mark.asyncio
+async def test_in_process_patcher_skips_http():
+    """With a patcher the manager writes directly instead of calling its own API."""
+
+    calls = []
+
+    class RecordingPatcher:
+        def apply(self, bid_card_id, updates):
+            calls.append((bid_card_id, [(u.field_name, u.field_value, u.confidence) for u in updates]))
+            return SimpleNamespace(applied=[u.field_name for u in updates], version=len(calls))
+
+    manager = PotentialBidCardManager(base_url="http://unreachable.invalid", patcher=RecordingPatcher())
+
+    assert await manager.update_bid_card_fields("card-1", {"materials": ["oak"], "title": "Deck"}, confidence=0.8) == 2
+    assert await manager.update_bid_card_field("card-1", "project_description", "New deck") is True
+    assert calls == [
+        ("card-1", [("materials_specified", ["oak"], 0.8), ("title", "Deck", 0.8)]),
+        ("card-1", [("description", "New deck", 1.0)]),
+    ]
@@ -5,7 +5,10 @@ from __future__ import annotations
 import os
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock
+
+import pytest
 import supabase
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -20,3 +23,145 @@ os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
 # Ensure any call to `create_client` during imports returns a harmless mock.
 if not isinstance(supabase.create_client, MagicMock):
     supabase.create_client = MagicMock(return_value=MagicMock())
+
+
+def _field(row, column):
+    """Row value for a column, following PostgREST json paths like metadata->>session_id"""
+    if "->>" in column:
+        column, key = column.split("->>", 1)
+        value = (row.get(column) or {}).get(key)
+        return None if value is None else str(value)
+    return row.get(column)
+
+
+def _contains(document, subset):
+    """jsonb @> for dicts"""
+    if isinstance(subset, dict):
+        return isinstance(document, dict) and all(_contains(document.get(k), v) for k, v in subset.items())
+    return document == subset
+
+
+class FakeQuery:
+    """Just enough of the PostgREST query builder for service tests"""
+
+    def __init__(self, client, table):
+        self.client, self.table = client, table
+        self.filters, self.columns, self.negate = [], "*", False
+        self.payload, self.action, self._limit, self._range = None, "select", None, None
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def _filter(self, test):
+        negate, self.negate = self.negate, False
+        self.filters.append((lambda row: not test(row)) if negate else test)
+        return self
+
+    def select(self, columns="*"):
+        self.columns = columns
+        return self
+
+    def eq(self, column, value):
+        return self._filter(lambda row: _field(row, column) == value)
+
+    def neq(self, column, value):
+        return self._filter(lambda row: _field(row, column) != value)
+
+    def in_(self, column, values):
+        return self._filter(lambda row: _field(row, column) in values)
+
+    def is_(self, column, value):
+        return self._filter(lambda row: _field(row, column) is None)
+
+    def gt(self, column, value):
+        return self._filter(lambda row: _field(row, column) > value)
+
+    def gte(self, column, value):
+        return self._filter(lambda row: _field(row, column) >= value)
+
+    def lte(self, column, value):
+        return self._filter(lambda row: _field(row, column) <= value)
+
+    def contains(self, column, value):
+        return self._filter(lambda row: _contains(row.get(column), value))
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def execute(self):
+        self.client.executed += 1
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.action == "insert":
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            rows.extend(dict(row) for row in new_rows)
+            return SimpleNamespace(data=new_rows)
+        self.client.selects.append((self.table, self.columns))
+        matched = sorted((r for r in rows if all(f(r) for f in self.filters)), key=lambda r: r.get("id", ""))
+        if self.action == "update":
+            for row in matched:
+                row.update(self.payload)
+        if self.action == "delete":
+            rows[:] = [r for r in rows if not any(r is m for m in matched)]
+        if self._range:
+            matched = matched[self._range[0]:self._range[1] + 1]
+        if self._limit:
+            matched = matched[:self._limit]
+        if self.client.max_rows and self.action == "select":
+            matched = matched[:self.client.max_rows]
+        if self.columns != "*":
+            wanted = [c.strip() for c in self.columns.split(",")]
+            matched = [{c: r.get(c) for c in wanted} for r in matched]
+        return SimpleNamespace(data=matched)
+
+
+class FakeSupabase:
+    """In-memory stand-in for the sync Supabase client (tables, storage uploads, rpc)"""
+
+    def __init__(self, fail_uploads=False, max_rows=None):
+        self.tables, self.selects, self.uploads = {}, [], []
+        self.max_rows = max_rows  # PostgREST db-max-rows cap on select responses
+        self.fail_uploads = fail_uploads
+        self.storage = SimpleNamespace(from_=lambda bucket: SimpleNamespace(upload=self._upload))
+        self.functions, self.rpc_calls = {}, []
+        self.executed = 0
+
+    def rpc(self, name, params):
+        self.rpc_calls.append(name)
+        if name not in self.functions:
+            raise RuntimeError(f"Could not find the function public.{name}")
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.functions[name](self, params)))
+
+    def _upload(self, path, data, options):
+        if self.fail_uploads:
+            raise RuntimeError("storage unavailable")
+        self.uploads.append(path)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+@pytest.fixture
+def fake_supabase():
+    return FakeSupabase()
@@ -0,0 +1,133 @@
+import re
+
+import pytest
+
+from agents.eaa.response_tracking.keyword_automaton import KeywordAutomaton
+from agents.eaa.response_tracking.response_parser import ResponseParser
+
+
+CORPUS = [
+    "Yes",
+    "y",
+    "N",
+    "no",
+    "STOP",
+    "Unsubscribe me please",
+    "remove me from your list",
+    "opt out",
+    "Sounds good, count me in!",
+    "Not interested, thanks.",
+    "I'm not interested right now, we're booked through March.",
+    "What's the timeline? And how much is the budget?",
+    "Can you send more info about the materials and specifications?",
+    "Tell me more",
+    "We are too far away from that area, sorry",
+    "Happy to take a look. When can I visit the site?",
+    "Absolutely! We would love to bid on this. Call me at (512) 555-0199.",
+    "Busy this month, maybe next month",
+    "ok",
+    "k thx",
+    "Great project, but we are unavailable until next week",
+    "Can't do it, not my specialty",
+    "We cannot take it on, outside area",
+    "Perfect. Email me at bob@builders.com - Bob, Bob's Construction LLC",
+    "decline",
+    "pass",
+    "I will not be available",
+    "I'd love to. Ready whenever you are.",
+    "Definitely interested!!",
+    "Excellent opportunity. Let's do it.",
+    "Hmm, tell me what about permits",
+    "Who is the homeowner",
+    "",
+    "   ",
+    "On Mon, Jan 5, 2026 at 9:00 AM Instabids wrote:\n> Are you interested?\nSure thing",
+    "Thanks!\n\nSent from my iPhone",
+    "No problem, we can do that",
+    "We're swamped, won't be able to",
+    "Great great great",
+    "I am free this friday, open to a call",
+    "Rooftop Builders Inc here. Questions on the requirements?",
+    "Clarification needed: is the schedule flexible? Need to know by Thursday.",
+    "This is a spam test with the letter zed only",
+    "Mixed feelings: great job but too far",
+]
+
+
+class LegacyParser(ResponseParser):
+    """The original substring-scan implementation, kept as the regression reference"""
+
+    def _classify_intent(self, content, scan=None):
+        if not content:
+            return "no_response"
+        if any(keyword in content for keyword in ["yes", "y", "yeah", "yep", "sure"]):
+            return "interested"
+        if any(keyword in content for keyword in ["no", "n", "nope", "not interested", "pass"]):
+            return "not_interested"
+        if any(keyword in content for keyword in self.info_request_keywords):
+            return "need_info"
+        if any(keyword in content for keyword in ["stop", "unsubscribe", "remove", "opt out"]):
+            return "opt_out"
+        positive_count = sum(1 for keyword in self.positive_keywords if keyword in content)
+        negative_count = sum(1 for keyword in self.negative_keywords if keyword in content)
+        if positive_count > negative_count and positive_count > 0:
+            return "interested"
+        elif negative_count > positive_count and negative_count > 0:
+            return "not_interested"
+        elif positive_count == 0 and negative_count == 0:
+            return "neutral"
+        else:
+            return "mixed"
+
+    def _calculate_sentiment(self, content, scan=None):
+        if not content:
+            return 0.0
+        words = content.split()
+        if not words:
+            return 0.0
+        positive_count = sum(1 for word in words if any(keyword in word for keyword in self.positive_keywords))
+        negative_count = sum(1 for word in words if any(keyword in word for keyword in self.negative_keywords))
+        return max(-1.0, min(1.0, (positive_count - negative_count) / len(words) * 5))
+
+
+def without_timestamps(result):
+    return {key: value for key, value in result.items() if key != "processed_at"}
+
+
+def test_compiled_matcher_classifies_the_corpus_identically():
+    legacy, compiled = LegacyParser(strict=False), ResponseParser(strict=False)
+
+    expected = [without_timestamps(legacy.parse_response(text, channel))
+                for text in CORPUS for channel in ("email", "sms")]
+    actual = compiled.parse_many([(text, channel) for text in CORPUS for channel in ("email", "sms")])
+
+    assert [without_timestamps(result) for result in actual] == expected
+
+
+def test_automaton_reports_overlapping_and_prefix_keywords():
+    automaton = KeywordAutomaton(["no", "not", "not interested", "interested", "rest"])
+
+    hits = [(hit.keyword, hit.start) for hit in automaton.hits("i'm not interested")]
+
+    assert hits == [("not interested", 4), ("not", 4), ("no", 4), ("interested", 8), ("rest", 12)]
+
+
+def test_strict_matching_uses_word_boundaries_and_negation_windows():
+    parser = ResponseParser(strict=True)
+
+    # "y" inside "already" and "interested" inside "not interested" no longer count
+    assert parser.parse_response("Already booked, not interested", "sms")["intent"] == "not_interested"
+    assert parser.parse_response("No problem, happy to help", "sms")["intent"] == "interested"
+    assert parser.parse_response("We are not really available", "email")["intent"] == "not_interested"
+    assert parser.parse_response("I'm not busy next week", "email")["intent"] == "interested"
+    # The default matcher keeps the substring behaviour
+    assert ResponseParser(strict=False).parse_response("Already booked", "sms")["intent"] == "interested"
+
+
+@pytest.mark.parametrize("text", ["stop", "y", "sure"])
+def test_single_parse_and_batch_parse_agree(text):
+    parser = ResponseParser()
+    single = parser.parse_response(text, "sms")
+    [batched] = parser.parse_many([(text, "sms")])
+    assert without_timestamps(single) == without_timestamps(batched)
+    assert re.match(r"\d{4}-\d\d-\d\d", batched["processed_at"])
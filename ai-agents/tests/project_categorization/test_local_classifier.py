@@ -0,0 +1,88 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agents.project_categorization import simple_categorization_tool
+from agents.project_categorization.local_classifier import ProjectTypeClassifier, tokenize
+
+
+CATALOG = [
+    {"id": 45, "name": "Kitchen Sink Installation", "service_category": "Installation"},
+    {"id": 89, "name": "Bathroom Remodel", "service_category": "Renovation"},
+    {"id": 122, "name": "Toilet Repair", "service_category": "Repair"},
+    {"id": 123, "name": "Toilet Installation", "service_category": "Installation"},
+    {"id": 156, "name": "Lawn Care", "service_category": "Ongoing Service"},
+    {"id": 201, "name": "Roof Repair", "service_category": "Repair"},
+    {"id": 202, "name": "Roof Replacement", "service_category": "Replacement"},
+    {"id": 203, "name": "Fence Installation", "service_category": "Installation"},
+    {"id": 204, "name": "Deck Installation", "service_category": "Installation"},
+    {"id": 205, "name": "Pool Cleaning", "service_category": "Ongoing Service"},
+]
+# Types past the old 50-item window must still be reachable
+CATALOG += [
+    {"id": 300 + i, "name": f"Specialty Service {i}", "service_category": "Other"} for i in range(60)
+]
+CATALOG.append({"id": 999, "name": "Holiday Lighting Installation", "service_category": "Installation"})
+
+
+def test_tokenize_normalizes_names_and_descriptions():
+    assert sorted(tokenize("holiday_lighting_installation")) == sorted(tokenize("Installing holiday lights"))
+
+
+def test_confident_local_match_reaches_beyond_first_fifty():
+    result = ProjectTypeClassifier(CATALOG).classify("We want holiday lighting installed on the house")
+    assert result.confident
+    assert result.best["id"] == 999
+
+
+def test_ambiguous_description_is_not_confident():
+    result = ProjectTypeClassifier(CATALOG).classify("something is wrong with the roof")
+    assert not result.confident
+    assert {pt["id"] for pt, _ in result.candidates[:2]} == {201, 202}
+
+
+def test_classification_is_memoized():
+    classifier = ProjectTypeClassifier(CATALOG)
+    first = classifier.classify("Need a new fence installation")
+    assert classifier.classify("need a new   FENCE installation") is first
+
+
+@pytest.mark.asyncio
+async def test_llm_fallback_only_sees_top_candidates(monkeypatch):
+    prompts = []
+
+    class StubCompletions:
+        async def create(self, **kwargs):
+            prompts.append(kwargs["messages"][1]["content"])
+            content = json.dumps({"project_type_id": 202, "confidence": 80, "reasoning": "old roof"})
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    class StubAsyncOpenAI:
+        def __init__(self, *args, **kwargs):
+            self.chat = SimpleNamespace(completions=StubCompletions())
+
+    monkeypatch.setattr(simple_categorization_tool.openai, "AsyncOpenAI", StubAsyncOpenAI)
+
+    match = await simple_categorization_tool._find_matching_project_type(
+        "something is wrong with the roof", "", CATALOG
+    )
+
+    assert match["id"] == 202
+    assert len(prompts) == 1
+    assert "Roof Replacement" in prompts[0]
+    assert "Specialty Service" not in prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_confident_match_skips_llm(monkeypatch):
+    class FailingAsyncOpenAI:
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("LLM should not be called for confident matches")
+
+    monkeypatch.setattr(simple_categorization_tool.openai, "AsyncOpenAI", FailingAsyncOpenAI)
+
+    match = await simple_categorization_tool._find_matching_project_type(
+        "Looking for weekly pool cleaning", "", CATALOG
+    )
+    assert match["id"] == 205
@@ -0,0 +1,199 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agents.cda.google_places_unified import GooglePlacesOptimized
+from agents.coia.tools.google_api.places import GooglePlacesTool
+from services.api_response_cache import (
+    ApiResponseCache,
+    CachePolicy,
+    SQLiteResponseStore,
+    geo_cell,
+    make_cache_key,
+    normalize_domain,
+    normalize_text,
+)
+from utils.rate_limiter import AsyncTokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    policies = {"test_api": CachePolicy(ttl_seconds=100, negative_ttl_seconds=10, cost_per_call=0.5)}
+    return ApiResponseCache(store=SQLiteResponseStore(str(tmp_path / "cache.sqlite3")), policies=policies, clock=clock)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Local stand-in for places.googleapis.com"""
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.calls.append(("search", request.get("textQuery") or request.get("pageToken")))
+        if server.fail_search:
+            return self._reply(500, {"error": "backend"})
+        if "Nobody" in (request.get("textQuery") or ""):
+            return self._reply(200, {})
+        places = [
+            {"id": f"place-{i}", "displayName": {"text": f"Contractor {i}"}, "rating": 4.6, "userRatingCount": 50 - i}
+            for i in range(4)
+        ]
+        return self._reply(200, {"places": places})
+
+    def do_GET(self):
+        place_id = self.path.rsplit("/", 1)[-1]
+        self.server.calls.append(("details", place_id))
+        if place_id == "place-3":
+            return self._reply(404, {})
+        return self._reply(200, {"id": place_id, "displayName": {"text": place_id}, "rating": 4.6})
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.calls = []
+    server.fail_search = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_request_keys_are_normalized():
+    assert normalize_text("  Ace   ROOFING\tBoca ") == "ace roofing boca"
+    assert normalize_domain("https://www.Acme.com/about?x=1") == "acme.com"
+    assert normalize_domain("acme.com") == "acme.com"
+    assert geo_cell(26.36831, -80.12894) == geo_cell(26.3712, -80.1251) == "26.37,-80.13"
+    assert make_cache_key("api", a=1, b="x") == make_cache_key("api", b="x", a=1)
+    assert make_cache_key("api", a=1) != make_cache_key("other", a=1)
+
+
+def test_positive_and_negative_ttls(cache, clock):
+    cache.set("test_api", "hit", {"ok": True})
+    cache.set("test_api", "none", None, negative=True)
+
+    clock.now += 50
+    assert cache.get("test_api", "hit").value == {"ok": True}
+    assert cache.get("test_api", "none") is None  # negative TTL (10s) elapsed
+
+    clock.now += 60
+    assert cache.get("test_api", "hit") is None
+
+    stats = cache.stats()["test_api"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["cost_saved_usd"] == 0.5
+
+
+def test_entries_survive_a_new_process(tmp_path, clock):
+    path = str(tmp_path / "shared.sqlite3")
+    ApiResponseCache(store=SQLiteResponseStore(path), clock=clock).set("google_places_details", "k", {"id": "p"})
+
+    reopened = ApiResponseCache(store=SQLiteResponseStore(path), clock=clock)
+    assert reopened.get("google_places_details", "k").value == {"id": "p"}
+
+
+@pytest.mark.asyncio
+async def test_get_or_fetch_skips_uncacheable_results_and_errors(cache):
+    calls = []
+
+    async def fetch_error_payload():
+        calls.append(1)
+        return {"error": "quota"}
+
+    for _ in range(2):
+        await cache.get_or_fetch("test_api", "k", fetch_error_payload, is_cacheable=lambda r: "error" not in r)
+    assert len(calls) == 2
+
+    async def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("test_api", "k2", boom)
+    assert cache.get("test_api", "k2") is None
+
+
+@pytest.mark.asyncio
+async def test_google_places_discovery_is_served_from_cache(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("GOOGLE_PLACES_API_KEY", "test-key")
+    cache = ApiResponseCache(store=SQLiteResponseStore(str(tmp_path / "places.sqlite3")))
+    places = GooglePlacesOptimized(rate_limiter=AsyncTokenBucket(rate=1000, capacity=1000), cache=cache)
+    places.base_url = f"http://127.0.0.1:{stub_server.server_address[1]}/v1"
+
+    async def search_area(location, radius_miles):
+        return {"circle": {"center": {"latitude": 26.36831, "longitude": -80.12894}, "radius": radius_miles * 1609.34}}
+
+    monkeypatch.setattr(places, "_calculate_search_area", search_area)
+    location = {"city": "Boca Raton", "state": "FL", "zip": "33442"}
+
+    first = await places.discover_contractors("plumbing", location, target_count=4)
+    paid_calls = len(stub_server.calls)
+    assert [c["place_id"] for c in first["contractors"]] == ["place-0", "place-1", "place-2"]
+    assert ("details", "place-3") in stub_server.calls
+
+    # Same search from a neighbouring bid card in the same geo cell
+    async def search_area_near(location, radius_miles):
+        return {"circle": {"center": {"latitude": 26.3712, "longitude": -80.1251}, "radius": radius_miles * 1609.34}}
+
+    monkeypatch.setattr(places, "_calculate_search_area", search_area_near)
+
+    second = await places.discover_contractors("Plumbing", location, target_count=4)
+    assert len(stub_server.calls) == paid_calls
+    assert [c["place_id"] for c in second["contractors"]] == [c["place_id"] for c in first["contractors"]]
+    assert second["api_calls"]["searches"] == 0
+
+    stats = cache.stats()
+    assert stats["google_places_search"]["hits"] == 1
+    assert stats["google_places_details"]["negative_hits"] == 1
+    assert stats["google_places_details"]["cost_saved_usd"] > 0
+
+
+@pytest.mark.asyncio
+async def test_coia_business_lookup_caches_matches_and_misses_but_not_errors(stub_server, cache, monkeypatch):
+    monkeypatch.setenv("GOOGLE_MAPS_API_KEY", "test-key")
+    tool = GooglePlacesTool(cache=cache)
+    tool.places_search_url = f"http://127.0.0.1:{stub_server.server_address[1]}/v1/places:searchText"
+
+    found = await tool.search_google_business("Contractor Co", "Boca Raton FL")
+    again = await tool.search_google_business("contractor  co", "boca raton fl")
+    assert found["google_place_id"] == again["google_place_id"] == "place-0"
+    assert len(stub_server.calls) == 1
+
+    async def no_web(query, max_results=5):
+        return None
+
+    monkeypatch.setattr(tool, "_search_business_web", no_web)
+    await tool.search_google_business("Nobody Here", "FL")
+    await tool.search_google_business("Nobody Here", "FL")
+    assert len(stub_server.calls) == 2
+
+    stub_server.fail_search = True
+    await tool.search_google_business("Flaky Co", "FL")
+    await tool.search_google_business("Flaky Co", "FL")
+    assert len(stub_server.calls) == 4
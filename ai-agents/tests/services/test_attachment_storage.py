@@ -0,0 +1,86 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+import routers.unified_conversation_api as conversation_api
+from scripts.migrate_message_attachments_to_storage import migrate_attachments
+from services.attachment_storage import AttachmentStorage, decode_attachment
+
+
+def _png(color="red"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), color).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+@pytest.fixture
+def supabase(monkeypatch, fake_supabase):
+    monkeypatch.setattr(conversation_api.db, "client", fake_supabase)
+    return fake_supabase
+
+
+def test_decode_handles_data_urls_and_sniffs_mime():
+    raw, mime = decode_attachment(f"data:image/webp;base64,{base64.b64encode(b'abc').decode()}")
+    assert (raw, mime) == (b"abc", "image/webp")
+    assert decode_attachment(_png())[1] == "image/png"
+    with pytest.raises(ValueError):
+        decode_attachment("data:image/png;base64,!!!")
+
+
+@pytest.mark.asyncio
+async def test_messages_store_references_and_dedup_content(supabase):
+    image = _png()
+    for n in range(2):
+        await conversation_api.send_message(conversation_api.SendMessageRequest(
+            conversation_id="conv-1", sender_type="user", content=f"photo {n}", images=[image],
+        ))
+
+    rows = supabase.tables["unified_message_attachments"]
+    assert len(rows) == 2 and all(row.get("file_data") is None for row in rows)
+    assert rows[0]["storage_path"] == rows[1]["storage_path"]
+    assert rows[0]["storage_path"].endswith(".png") and rows[0]["thumbnail_path"]
+    assert len(supabase.uploads) == 2  # original + thumbnail, once
+
+    supabase.selects.clear()
+    response = await conversation_api.get_messages_with_attachments("conv-1")
+
+    attachment_selects = [cols for table, cols in supabase.selects if table == "unified_message_attachments"]
+    assert len(attachment_selects) == 1 and "file_data" not in attachment_selects[0]
+    attachment = response["messages"][1]["attachments"][0]
+    assert attachment["url"].endswith(rows[0]["storage_path"])
+    assert attachment["thumbnail_url"] and attachment["name"] == "image_1.jpg"
+    assert "data_url" not in attachment
+
+
+@pytest.mark.asyncio
+async def test_upload_failure_falls_back_to_inline_data(supabase):
+    supabase.fail_uploads = True
+    image = _png("blue")
+    await conversation_api.send_message(conversation_api.SendMessageRequest(
+        conversation_id="conv-2", sender_type="user", content="photo", images=[f"data:image/png;base64,{image}"],
+    ))
+
+    row = supabase.tables["unified_message_attachments"][0]
+    assert row["file_data"] == image and row.get("storage_path") is None
+
+    response = await conversation_api.get_messages_with_attachments("conv-2", include_data=True)
+    assert response["messages"][0]["attachments"][0]["data_url"] == f"data:image/png;base64,{image}"
+
+
+def test_migration_moves_inline_rows_to_storage(fake_supabase):
+    client = fake_supabase
+    image = _png("green")
+    client.tables["unified_message_attachments"] = [
+        {"id": f"a{n}", "message_id": f"m{n}", "file_data": image} for n in range(3)
+    ] + [{"id": "a9", "message_id": "m9", "file_data": None, "storage_path": "already/there.png"}]
+
+    stats = migrate_attachments(client, batch_size=2)
+
+    assert stats == {"migrated": 3, "deduplicated": 2, "errors": 0, "bytes_moved": 3 * len(image)}
+    rows = client.tables["unified_message_attachments"]
+    assert all(row["file_data"] is None and row["storage_path"] for row in rows)
+    assert len(client.uploads) == 2
+    assert migrate_attachments(client)["migrated"] == 0
+    assert AttachmentStorage(client).store(base64.b64decode(image), "image/png").deduplicated
@@ -0,0 +1,92 @@
+import pytest
+
+from services.bid_card_change_fanout import BidCardChangeFanout
+
+
+def seed(fake_supabase, leads=20):
+    fake_supabase.tables.update({
+        "bid_cards": [{"id": "bc-1", "project_type": "kitchen"}],
+        "contractor_outreach_attempts": [
+            {"bid_card_id": "bc-1", "contractor_lead_id": f"lead-{n}", "channel": "email" if n % 2 else "website_form"}
+            for n in range(leads)
+        ] + [{"bid_card_id": "bc-2", "contractor_lead_id": "lead-x", "channel": "email"}],
+        "contractor_leads": [
+            {"id": f"lead-{n}", "company_name": f"Lead Co {n}", "contact_name": "Pat", "email": f"l{n}@x.com",
+             "phone": "555"} for n in range(leads)
+        ] + [{"id": "lead-bob", "company_name": "Bob Builders"}],
+        "contractors": [{"id": "c-bob", "company_name": "Bob Builders", "email": "bob@x.com"},
+                        {"id": "c-amy", "company_name": "Amy Co"}],
+        "contractor_bids": [{"bid_card_id": "bc-1", "contractor_id": "lead-0"}],
+        "bid_card_messages": [{"bid_card_id": "bc-1", "sender_type": "contractor", "sender_id": "lead-1"}],
+        "bid_card_views": [{"bid_card_id": "bc-1", "contractor_id": "c-amy"}],
+        "unified_messages": [
+            {"metadata": {"message_type": "bid_submission", "bid_data": {"bid_card_id": "bc-1", "contractor_id": "c-bob"}}},
+            {"metadata": {"message_type": "bid_submission", "bid_data": {"bid_card_id": "bc-2", "contractor_id": "c-amy"}}},
+        ],
+    })
+
+
+def test_engagement_is_resolved_and_segmented_with_grouped_queries(fake_supabase):
+    seed(fake_supabase, leads=20)
+    fanout = BidCardChangeFanout(fake_supabase)
+
+    contractors = {c.contractor_id: c for c in fanout.resolve_engagement("bc-1")}
+    queries = fake_supabase.executed
+
+    assert contractors["lead-0"].segment == "has_bid" and contractors["c-bob"].segment == "has_bid"
+    assert contractors["lead-1"].segment == "messaging_only"
+    assert contractors["lead-3"].segment == "email_only" and contractors["lead-2"].segment == "form_only"
+    assert contractors["c-amy"].segment == "form_only" and "lead-x" not in contractors
+    assert contractors["lead-3"].email == "l3@x.com" and contractors["lead-3"].contractor_lead_id == "lead-3"
+    assert contractors["c-bob"].contractor_lead_id == "lead-bob"  # matched by company name
+
+    seed(fake_supabase, leads=60)
+    fake_supabase.executed = 0
+    fanout.resolve_engagement("bc-1")
+    assert fake_supabase.executed == queries  # query count does not grow with contractors
+
+
+@pytest.mark.asyncio
+async def test_fan_out_generates_once_per_segment_and_writes_in_one_pass(fake_supabase):
+    seed(fake_supabase, leads=40)
+    pushes, generated = [], []
+
+    async def push(messages):
+        pushes.append(messages)
+        return 3
+
+    async def content(segment, contractors, bid_card, change_details):
+        generated.append((segment, len(contractors)))
+        return {"title": f"{segment} update", "message": f"{bid_card['project_type']} changed"}
+
+    fanout = BidCardChangeFanout(fake_supabase, push=push)
+    contractors = fanout.resolve_engagement("bc-1")
+    fake_supabase.executed = 0
+
+    result = await fanout.fan_out("bc-1", {"change_type": "budget_change", "description": "More budget"}, content,
+                                  contractors=contractors)
+
+    assert result["success"] and result["contractors_notified"] == 42
+    assert sorted(generated) == [("email_only", 19), ("form_only", 20), ("has_bid", 2), ("messaging_only", 1)]
+    assert fake_supabase.executed == 2  # bid card read + one notifications insert
+    rows = {row["user_id"]: row for row in fake_supabase.tables["notifications"]}
+    assert rows["lead-1"]["title"] == "messaging_only update" and rows["c-bob"]["contractor_id"] == "lead-bob"
+    assert len(pushes) == 1 and len(pushes[0]) == 42 and result["realtime_delivered"] == 3
+
+
+@pytest.mark.asyncio
+async def test_default_templates_personalize_by_segment(fake_supabase):
+    seed(fake_supabase, leads=2)
+
+    async def push(messages):
+        return 0
+
+    result = await BidCardChangeFanout(fake_supabase, push=push).fan_out(
+        "bc-1", {"change_type": "deadline_change", "description": "Moved up a week"}
+    )
+
+    rows = {row["user_id"]: row for row in fake_supabase.tables["notifications"]}
+    assert result["segments"] == {"has_bid": 2, "messaging_only": 1, "form_only": 1}
+    assert rows["lead-0"]["message"].startswith("Since you submitted a bid")
+    assert rows["c-amy"]["message"].startswith("we wanted to notify you")
+    assert rows["lead-0"]["title"] == "⏰ Project Timeline Updated"
@@ -0,0 +1,132 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.bid_card_lifecycle_snapshot import SECTIONS, LifecycleSnapshotStore, sections_for
+
+
+def make_loaders(calls, barrier=None):
+    def loader(section, value):
+        def load(bid_card_id):
+            if barrier:
+                barrier.wait()  # only passes when every loader is running at once
+            calls.append(section)
+            return value
+        return load
+
+    async def campaigns(bid_card_id):
+        calls.append("campaigns")
+        return [{"id": "camp-1", "check_ins": []}]
+
+    def load_campaigns(bid_card_id):
+        if barrier:
+            barrier.wait()
+        return campaigns(bid_card_id)  # the returned coroutine is awaited on the event loop
+
+    return {
+        "bid_card": loader("bid_card", {"id": "bc-1", "status": "active"}),
+        "discovery": loader("discovery", {"discovery_runs": []}),
+        "campaigns": load_campaigns,
+        "outreach": loader("outreach", {"outreach_attempts": [{"id": "o-1"}]}),
+        "engagement": loader("engagement", {"views": []}),
+        "connection_fee": loader("connection_fee", {"winner_selected": False}),
+    }
+
+
+@pytest.mark.asyncio
+async def test_cold_build_runs_loaders_concurrently_then_serves_in_one_read(fake_supabase):
+    calls = []
+    store = LifecycleSnapshotStore(fake_supabase, make_loaders(calls, threading.Barrier(len(SECTIONS), timeout=5)))
+
+    snapshot = await store.get("bc-1")
+
+    assert sorted(calls) == sorted(SECTIONS) and snapshot.version == 1
+    assert snapshot.section("campaigns") == [{"id": "camp-1", "check_ins": []}]
+    assert snapshot.section_versions == dict.fromkeys(SECTIONS, 1)
+
+    store.loaders = make_loaders(calls)
+    fake_supabase.executed, calls[:] = 0, []
+    served = await store.get("bc-1")
+    assert fake_supabase.executed == 1 and calls == [] and served.document == snapshot.document
+
+
+@pytest.mark.asyncio
+async def test_dirty_sections_are_rebuilt_incrementally(fake_supabase):
+    calls = []
+    store = LifecycleSnapshotStore(fake_supabase, make_loaders(calls))
+    await store.get("bc-1")
+    row = fake_supabase.tables["bid_card_lifecycle_snapshots"][0]
+
+    # What the migration 018 trigger does when an outreach attempt is inserted
+    row.update(dirty_sections=sorted(sections_for(["contractor_outreach_attempts"])), version=row["version"] + 1)
+    store.loaders["outreach"] = lambda bid_card_id: {"outreach_attempts": [{"id": "o-1"}, {"id": "o-2"}]}
+    calls[:] = []
+
+    snapshot = await store.get("bc-1")
+
+    assert calls == ["discovery"] and row["dirty_sections"] == [] and row["version"] == 3
+    assert len(snapshot.section("outreach")["outreach_attempts"]) == 2
+    assert snapshot.section_versions["outreach"] == 3 and snapshot.section_versions["bid_card"] == 1
+
+    # Sections fed by tables without triggers expire on their own
+    row["section_built_at"]["engagement"] = (datetime.utcnow() - timedelta(hours=2)).isoformat()
+    calls[:] = []
+    await store.get("bc-1")
+    assert calls == ["engagement"]
+
+
+@pytest.mark.asyncio
+async def test_missing_bid_card_is_not_materialized(fake_supabase):
+    loaders = make_loaders([])
+    loaders["bid_card"] = lambda bid_card_id: None
+    store = LifecycleSnapshotStore(fake_supabase, loaders)
+
+    assert await store.get("nope") is None
+    assert not fake_supabase.tables.get("bid_card_lifecycle_snapshots")
+    assert store.mark_dirty("nope", ["outreach"]) is False
+
+
+@pytest.mark.asyncio
+async def test_failed_sections_are_not_stored_and_stay_dirty(fake_supabase):
+    calls = []
+    store = LifecycleSnapshotStore(fake_supabase, make_loaders(calls))
+
+    def down(bid_card_id):
+        raise RuntimeError("connection reset")
+
+    # A failing bid_card loader on a cold build materializes nothing and is not a 404
+    loaders = make_loaders(calls)
+    loaders["bid_card"] = down
+    snapshot = await LifecycleSnapshotStore(fake_supabase, loaders).get("bc-1")
+    assert snapshot is not None and snapshot.failed_sections == {"bid_card"}
+    assert not fake_supabase.tables.get("bid_card_lifecycle_snapshots")
+
+    await store.get("bc-1")
+    row = fake_supabase.tables["bid_card_lifecycle_snapshots"][0]
+    row.update(dirty_sections=["engagement", "outreach"], version=row["version"] + 1)
+    store.loaders["outreach"] = down
+    store.loaders["engagement"] = lambda bid_card_id: {"views": [{"id": "v-1"}]}
+
+    served = await store.get("bc-1")
+    assert served.failed_sections == {"outreach"}
+    assert served.section("outreach") == {"outreach_attempts": [{"id": "o-1"}]}  # previous value, this response only
+    assert row["dirty_sections"] == ["outreach"] and row["document"]["engagement"] == {"views": [{"id": "v-1"}]}
+
+    store.loaders["outreach"] = lambda bid_card_id: {"outreach_attempts": []}
+    assert (await store.get("bc-1")).section("outreach") == {"outreach_attempts": []}
+    assert row["dirty_sections"] == []
+
+
+@pytest.mark.asyncio
+async def test_coroutine_loaders_run_on_the_event_loop(fake_supabase):
+    loop_thread, threads = threading.get_ident(), []
+    loaders = make_loaders([])
+
+    async def engagement(bid_card_id):
+        threads.append(threading.get_ident())
+        return {"views": []}
+
+    loaders["engagement"] = engagement
+    await LifecycleSnapshotStore(fake_supabase, loaders).get("bc-1")
+    assert threads == [loop_thread]
@@ -0,0 +1,91 @@
+import pytest
+
+from services import bulk_mutations
+from services.bulk_mutations import bulk_update, migrate_anonymous_session, select_winning_bid
+
+
+@pytest.fixture
+def session_tables(fake_supabase):
+    fake_supabase.tables.update({
+        "unified_conversations": [
+            {"id": "c1", "created_by": "anon", "metadata": {"session_id": "s-1"}},
+            {"id": "c2", "created_by": "anon", "metadata": {"session_id": "s-1"}},
+            {"id": "c3", "created_by": "other", "metadata": {"session_id": "s-2"}},
+        ],
+        "unified_messages": [
+            {"id": f"m{n}", "conversation_id": f"c{n % 3 + 1}", "sender_type": "user" if n % 2 else "agent",
+             "sender_id": "anon"}
+            for n in range(600)
+        ],
+        "unified_conversation_participants": [
+            {"id": "p1", "conversation_id": "c1", "participant_id": "anon"},
+            {"id": "p3", "conversation_id": "c3", "participant_id": "other"},
+        ],
+    })
+    return fake_supabase
+
+
+def test_session_migration_is_set_based_without_the_rpc(session_tables):
+    counts = migrate_anonymous_session(session_tables, "s-1", "user-9")
+
+    messages = session_tables.tables["unified_messages"]
+    migrated = [m for m in messages if m["sender_id"] == "user-9"]
+    assert counts == {"conversations": 2, "messages": len(migrated), "participants": 1}
+    assert all(m["sender_type"] == "user" and m["conversation_id"] in ("c1", "c2") for m in migrated)
+    assert session_tables.tables["unified_conversations"][2]["created_by"] == "other"
+    # one select plus one update per table, however long the chat was
+    assert session_tables.executed == 4
+
+
+def test_session_migration_prefers_the_transactional_function(session_tables):
+    session_tables.functions["migrate_anonymous_session"] = lambda client, params: {
+        "conversations": 2, "messages": 200, "participants": 1
+    }
+
+    counts = migrate_anonymous_session(session_tables, "s-1", "user-9")
+
+    assert counts == {"conversations": 2, "messages": 200, "participants": 1}
+    assert session_tables.executed == 0
+
+
+def test_bulk_update_chunks_long_key_lists(fake_supabase, monkeypatch):
+    monkeypatch.setattr(bulk_mutations, "IN_CHUNK_SIZE", 100)
+    fake_supabase.tables["contractor_bids"] = [{"id": f"b{n}", "status": "pending"} for n in range(250)]
+
+    updated = bulk_update(fake_supabase, "contractor_bids", {"status": "rejected"}, "id",
+                          [f"b{n}" for n in range(250)] + ["b0"])
+
+    assert updated == 250 and fake_supabase.executed == 3
+    assert {b["status"] for b in fake_supabase.tables["contractor_bids"]} == {"rejected"}
+
+
+def test_winning_bid_rewrites_statuses_once(fake_supabase):
+    bid_card = {
+        "id": "bc-1", "winner_contractor_id": None,
+        "bid_document": {"submitted_bids": [{"contractor_id": f"k{n}", "bid_amount": 100 * n} for n in range(5)]},
+    }
+    fake_supabase.tables["bid_cards"] = [dict(bid_card)]
+    winner = {"winner_contractor_id": "k2", "status": "contractor_selected"}
+
+    assert select_winning_bid(fake_supabase, bid_card, "k2", winner) == {"accepted": 1, "rejected": 4}
+    stored = fake_supabase.tables["bid_cards"][0]
+    assert [b["status"] for b in stored["bid_document"]["submitted_bids"]] == ["rejected"] * 2 + ["accepted"] + ["rejected"] * 2
+    assert stored["winner_contractor_id"] == "k2"
+
+    # A second selection racing the first does not overwrite the winner
+    assert select_winning_bid(fake_supabase, bid_card, "k3", {"winner_contractor_id": "k3"}) is None
+    assert fake_supabase.tables["bid_cards"][0]["winner_contractor_id"] == "k2"
+
+
+def test_rpc_errors_other_than_a_missing_function_are_raised(fake_supabase):
+    fake_supabase.tables["bid_cards"] = [{"id": "bc-1", "winner_contractor_id": None, "bid_document": {}}]
+
+    def timeout(client, params):
+        raise RuntimeError("canceling statement due to statement timeout")
+
+    fake_supabase.functions["select_winning_bid"] = timeout
+
+    with pytest.raises(RuntimeError, match="statement timeout"):
+        select_winning_bid(fake_supabase, {"id": "bc-1"}, "k1", {"winner_contractor_id": "k1"})
+    # No fallback write raced the function
+    assert fake_supabase.tables["bid_cards"][0]["winner_contractor_id"] is None
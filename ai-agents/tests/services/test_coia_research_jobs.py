@@ -0,0 +1,220 @@
+import asyncio
+import time
+
+import pytest
+
+from agents.coia.tools import COIATools
+from services.coia_research_jobs import (
+    COMPLETED,
+    FAILED,
+    RUNNING,
+    InMemoryResearchJobStore,
+    ResearchJob,
+    ResearchJobQueue,
+    research_job_key,
+    wait_for_research,
+)
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, session_id, message):
+        self.messages.append((session_id, message["type"]))
+
+    def types_for(self, session_id):
+        return [t for s, t in self.messages if s == session_id]
+
+
+@pytest.fixture
+def store():
+    return InMemoryResearchJobStore()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_same_company_share_one_job(store):
+    calls = []
+    release = asyncio.Event()
+    notifier = Recorder()
+
+    async def runner(job, progress):
+        calls.append(job.company_name)
+        await progress("google_business", found=True)
+        await release.wait()
+        return {"research_data": {"company_name": job.company_name}}
+
+    queue = ResearchJobQueue(store, runner, notifier=notifier)
+    first = await queue.submit("JM Holiday Lighting", "Fort Lauderdale", "lead-1", "s1")
+    while not first.progress:
+        await asyncio.sleep(0.01)
+    second = await queue.submit("  jm holiday  LIGHTING ", "fort lauderdale", "lead-2", "s2")
+    assert second.id == first.id
+
+    release.set()
+    done = await queue.wait(first.id, timeout=1)
+
+    assert calls == ["JM Holiday Lighting"]
+    assert done.status == COMPLETED
+    assert [s["contractor_lead_id"] for s in done.subscribers] == ["lead-1", "lead-2"]
+    assert notifier.types_for("s1") == ["research_started", "research_progress", "research_complete"]
+    assert notifier.types_for("s2") == ["research_joined", "research_complete"]
+
+    # A later request is served from the completed job
+    again = await queue.submit("JM Holiday Lighting", "Fort Lauderdale", "lead-3", "s3")
+    assert again.id == first.id and again.status == COMPLETED
+    assert calls == ["JM Holiday Lighting"]
+
+
+@pytest.mark.asyncio
+async def test_jobs_from_a_dead_worker_are_resumed(store):
+    now = time.time()
+
+    def orphan(name, lease_expires_at, attempts=1):
+        job = ResearchJob(
+            id=f"job-{name}", job_key=research_job_key(name, "Miami"), company_name=name, location="Miami",
+            subscribers=[{"contractor_lead_id": "lead", "session_id": "s"}], status=RUNNING,
+            attempts=attempts, worker_id="dead-worker", lease_expires_at=lease_expires_at,
+            created_at=now - 300, updated_at=now - 300,
+        )
+        store.create(job)
+        return job
+
+    orphan("Expired Roofing", now - 1)
+    orphan("Live Roofing", now + 60)
+    orphan("Cursed Roofing", now - 1, attempts=3)
+
+    ran = []
+
+    async def runner(job, progress):
+        ran.append(job.company_name)
+        return {"ok": True}
+
+    queue = ResearchJobQueue(store, runner)
+    assert await queue.resume_pending() == 2
+    resumed = await queue.wait("job-Expired Roofing", timeout=1)
+
+    assert ran == ["Expired Roofing"]
+    assert resumed.status == COMPLETED and resumed.attempts == 2
+    assert resumed.worker_id == queue.worker_id
+    assert store.get("job-Live Roofing").status == RUNNING
+    assert store.get("job-Cursed Roofing").status == FAILED
+
+
+@pytest.mark.asyncio
+async def test_failed_research_is_recorded_and_not_reused(store):
+    notifier = Recorder()
+
+    async def runner(job, progress):
+        raise RuntimeError("google down")
+
+    queue = ResearchJobQueue(store, runner, notifier=notifier)
+    job = await queue.submit("Flaky Co", "Tampa", "lead-1", "s1")
+    failed = await queue.wait(job.id, timeout=1)
+
+    assert failed.status == FAILED and failed.error == "google down"
+    assert notifier.types_for("s1")[-1] == "research_failed"
+    assert wait_for_research(store, "Flaky Co", "Tampa", timeout=0) is None
+
+    retry = await queue.submit("Flaky Co", "Tampa", "lead-1", "s1")
+    assert retry.id != job.id
+
+
+@pytest.mark.asyncio
+async def test_sync_callers_wait_for_the_running_job(store):
+    async def runner(job, progress):
+        await asyncio.sleep(0.1)
+        return {"research_data": {"google_data": {"name": "Ace"}}}
+
+    queue = ResearchJobQueue(store, runner)
+    await queue.submit("Ace Roofing", "Boca Raton", "lead-1", "s1")
+
+    job = await asyncio.to_thread(wait_for_research, store, "ace roofing", "Boca Raton", 2, poll_interval=0.01)
+    assert job.status == COMPLETED
+    assert job.result["research_data"]["google_data"]["name"] == "Ace"
+
+
+@pytest.mark.asyncio
+async def test_google_and_license_lookups_run_concurrently(monkeypatch):
+    tools = COIATools()
+
+    async def google(company_name, location=None):
+        await asyncio.sleep(0.1)
+        return {"name": company_name}
+
+    async def licenses(company_name, state="FL"):
+        await asyncio.sleep(0.1)
+        return {"success": True, "licenses": [{"state": state}]}
+
+    monkeypatch.setattr(tools, "search_google_business", google)
+    monkeypatch.setattr(tools, "search_contractor_licenses", licenses)
+    steps = []
+
+    async def progress(step, **data):
+        steps.append(step)
+
+    start = time.perf_counter()
+    result = await tools.research_business("Ace Roofing", "Austin, TX", progress=progress)
+
+    assert time.perf_counter() - start < 0.18
+    assert result["data_sources"] == ["google_business", "license_search"]
+    assert result["license_data"]["licenses"] == [{"state": "TX"}]
+    assert steps == ["google_business"]
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_claims_an_expired_job(fake_supabase):
+    from services.coia_research_jobs import SupabaseResearchJobStore
+
+    store = SupabaseResearchJobStore(fake_supabase)
+    now = time.time()
+    store.create(ResearchJob(
+        id="job-1", job_key=research_job_key("Ace", "Miami"), company_name="Ace", location="Miami",
+        status=RUNNING, attempts=1, worker_id="dead-worker", lease_expires_at=now - 1,
+        created_at=now - 300, updated_at=now - 300,
+    ))
+    ran = []
+    release = asyncio.Event()
+
+    async def runner(job, progress):
+        ran.append(job.id)
+        await release.wait()
+        return {"ok": True}
+
+    # Both workers read the job before either claims it
+    first, second = ResearchJobQueue(store, runner), ResearchJobQueue(store, runner)
+    stale = store.list_active()
+    store.list_active = lambda: [ResearchJob.from_row(job.to_row()) for job in stale]
+
+    assert await first.resume_pending() + await second.resume_pending() == 1
+    release.set()
+    done = await first.wait("job-1", timeout=1)
+    assert ran == ["job-1"] and done.worker_id == first.worker_id and done.status == COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_owner_writes_keep_subscribers_added_by_other_workers(fake_supabase):
+    from services.coia_research_jobs import SupabaseResearchJobStore
+
+    store = SupabaseResearchJobStore(fake_supabase)
+    release = asyncio.Event()
+
+    async def runner(job, progress):
+        await release.wait()
+        await progress("google_business", found=True)
+        return {"ok": True}
+
+    owner = ResearchJobQueue(store, runner)
+    job = await owner.submit("Ace Roofing", "Tampa", "lead-1", "s1")
+    while store.get(job.id).status != RUNNING:
+        await asyncio.sleep(0.01)
+
+    # Another worker joins the live job with its own copy of the row
+    other = ResearchJobQueue(store, runner)
+    joined = await other.submit("Ace Roofing", "Tampa", "lead-2", "s2")
+    assert joined.id == job.id
+
+    release.set()
+    done = await owner.wait(job.id, timeout=1)
+    assert done.status == COMPLETED and [p["step"] for p in done.progress] == ["google_business"]
+    assert [s["contractor_lead_id"] for s in done.subscribers] == ["lead-1", "lead-2"]
@@ -0,0 +1,99 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import data_loader
+from services.data_loader import DataLoaderMiddleware, SupabaseLoader, get_loader, request_scope
+from services.my_bids_tracker import MyBidsTracker
+
+
+@pytest.fixture
+def client(fake_supabase):
+    fake_supabase.tables.update({
+        "bid_cards": [{"id": f"bc-{n}", "title": f"Job {n}"} for n in range(4)],
+        "messages": [
+            {"id": f"msg-{n}", "bid_card_id": f"bc-{n % 2}", "sender_id": "k1" if n < 3 else "k2"}
+            for n in range(5)
+        ],
+        "contractor_proposals": [{"id": "p1", "bid_card_id": "bc-1", "contractor_id": "k1"}],
+        "contractor_my_bids": [
+            {"bid_card_id": f"bc-{n}", "contractor_id": "k1", "status": "viewed", "first_interaction": "x",
+             "last_interaction": "2026-01-01T00:00:00", "interaction_count": 1, "last_interaction_type": "view"}
+            for n in range(4)
+        ],
+    })
+    return fake_supabase
+
+
+def test_batch_loads_dedupe_keys_and_cache_rows(client):
+    loader = SupabaseLoader(client)
+
+    cards = loader.load_many("bid_cards", ["bc-0", "bc-2", "bc-0", "missing"])
+
+    assert {key: c and c["title"] for key, c in cards.items()} == {"bc-0": "Job 0", "bc-2": "Job 2", "missing": None}
+    assert loader.query_count == 1
+    assert loader.load_many("bid_cards", ["bc-2"])["bc-2"]["title"] == "Job 2"
+    assert loader.query_count == 1
+
+
+def test_related_loads_group_rows_per_key_with_filters(client):
+    loader = SupabaseLoader(client)
+
+    messages = loader.load_related_many("messages", "bid_card_id", ["bc-0", "bc-1", "bc-3"],
+                                        filters={"sender_id": "k1"})
+
+    assert [m["id"] for m in messages["bc-0"]] == ["msg-0", "msg-2"]
+    assert [m["id"] for m in messages["bc-1"]] == ["msg-1"]
+    assert messages["bc-3"] == [] and loader.query_count == 1
+
+
+@pytest.mark.asyncio
+async def test_my_bids_details_use_one_query_per_table(client):
+    tracker = MyBidsTracker(supabase_client=client)
+
+    with request_scope():
+        bids = await tracker.get_contractor_my_bids("k1")
+        client.executed = 0
+        again = await tracker.get_contractor_my_bids("k1")
+
+    assert len(bids) == 4 and bids[1]["bid_card"]["title"] == "Job 1"
+    assert [m["id"] for m in bids[0]["messages"]] == ["msg-0", "msg-2"]
+    assert [p["id"] for p in bids[1]["proposals"]] == ["p1"]
+    # Second call in the same request only re-reads contractor_my_bids
+    assert again == bids and client.executed == 1
+
+
+def test_middleware_scopes_loaders_per_request_and_reports_counts(client, monkeypatch):
+    monkeypatch.setattr(data_loader, "INSTRUMENT", True)
+    app = FastAPI()
+    app.add_middleware(DataLoaderMiddleware)
+
+    @app.get("/cards")
+    async def cards():
+        loader = get_loader(client)
+        first = loader.load_many("bid_cards", ["bc-0", "bc-1"])
+        loader.load_many("bid_cards", ["bc-1"])
+        return {"titles": [card["title"] for card in first.values()]}
+
+    with TestClient(app) as http:
+        responses = [http.get("/cards") for _ in range(2)]
+
+    assert [r.headers["X-Query-Count"] for r in responses] == ["1", "1"]
+    assert responses[0].json() == {"titles": ["Job 0", "Job 1"]}
+
+
+def test_related_rows_are_paged_past_the_max_rows_cap(fake_supabase, monkeypatch):
+    monkeypatch.setattr(data_loader, "PAGE_SIZE", 50)
+    capped = fake_supabase
+    capped.max_rows = 50
+    capped.tables["campaign_contractors"] = [
+        {"id": f"cc-{n:04d}", "campaign_id": f"camp-{n % 2}", "contractor_id": f"k{n}"} for n in range(180)
+    ]
+    loader = SupabaseLoader(capped)
+
+    targeted = loader.load_related_many("campaign_contractors", "campaign_id", ["camp-0", "camp-1"],
+                                        columns="contractor_id")
+
+    assert {key: len(rows) for key, rows in targeted.items()} == {"camp-0": 90, "camp-1": 90}
+    assert loader.query_count == 4
+
@@ -0,0 +1,62 @@
+from services.group_pool_index import GroupPoolIndex, covering_cells, geo_cell
+from utils.simple_radius_search import get_zip_coordinates
+
+
+def pool(pool_id, zip_code, category_id="lawn", member_count=1, pool_status="forming"):
+    index = GroupPoolIndex(None, locate=get_zip_coordinates)
+    return {"id": pool_id, "category_id": category_id, "zip_code": zip_code, "pool_status": pool_status,
+            "member_count": member_count, **index.location_fields(zip_code)}
+
+
+def test_nearby_finds_pools_in_adjacent_zips_from_covering_cells_only(fake_supabase):
+    fake_supabase.tables["group_bidding_pools"] = [
+        pool("p-1", "94107"),
+        pool("p-2", "94105"),
+        pool("p-3", "33139"),                       # Miami Beach
+        pool("p-4", "94102", category_id="pool"),
+        pool("p-5", "94102", pool_status="active"),
+    ]
+    index = GroupPoolIndex(fake_supabase, locate=get_zip_coordinates)
+    fake_supabase.executed = 0
+
+    nearby = index.nearby("94102", "lawn", radius_miles=5)
+
+    assert fake_supabase.executed == 1
+    assert [p["id"] for p in nearby] == ["p-2", "p-1"]
+    assert 0 < nearby[0]["distance_miles"] < nearby[1]["distance_miles"] < 5
+    assert len(covering_cells(37.7849, -122.4094, 5)) <= 9
+
+
+def test_homeowners_in_nearby_zips_join_the_fullest_pool(fake_supabase):
+    fake_supabase.tables["group_bidding_pools"] = [pool("p-1", "94105", member_count=1),
+                                                   pool("p-2", "94107", member_count=2)]
+    index = GroupPoolIndex(fake_supabase, locate=get_zip_coordinates)
+
+    assert index.find_joinable("lawn", "94102")["id"] == "p-2"
+    assert index.find_joinable("lawn", "33139") is None
+
+    # Unknown ZIPs keep the exact-match behaviour
+    fake_supabase.tables["group_bidding_pools"].append({"id": "p-3", "category_id": "lawn", "zip_code": "00000",
+                                                        "pool_status": "forming", "member_count": 1})
+    assert index.find_joinable("lawn", "00000")["id"] == "p-3"
+    assert index.location_fields("00000") == {}
+
+
+def test_area_stats_read_cell_counters(fake_supabase):
+    sf_cell = geo_cell(*get_zip_coordinates("94102"))
+    fake_supabase.tables["group_pool_cell_stats"] = [
+        {"category_id": "lawn", "geo_cell": sf_cell, "forming_pools": 2, "forming_members": 5, "fulfilled_pools": 1},
+        {"category_id": "lawn", "geo_cell": geo_cell(*get_zip_coordinates("94107")), "forming_pools": 1,
+         "forming_members": 2, "fulfilled_pools": 0},
+        {"category_id": "lawn", "geo_cell": geo_cell(*get_zip_coordinates("33139")), "forming_pools": 9,
+         "forming_members": 30, "fulfilled_pools": 4},
+        {"category_id": "pool", "geo_cell": sf_cell, "forming_pools": 7, "forming_members": 7, "fulfilled_pools": 7},
+    ]
+    index = GroupPoolIndex(fake_supabase, locate=get_zip_coordinates)
+    fake_supabase.executed = 0
+
+    stats = index.area_stats("lawn", "94102")
+
+    assert fake_supabase.executed == 1
+    assert stats == {"forming_pools": 3, "forming_members": 7, "fulfilled_pools": 1}
+    assert index.area_stats("lawn", "00000") is None
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+
+import bid_card_utils
+from services.jaa_extraction import (
+    JAAExtraction,
+    build_bid_card_data,
+    build_project_data,
+    extract_dates,
+    validate_extraction,
+)
+
+
+NOW = datetime(2026, 6, 1, 9, 0)
+
+
+def test_validation_is_local_and_fills_defaults():
+    extracted = JAAExtraction(
+        project_type="roofing", budget_min=50, contractor_type_ids=[],
+        special_requirements=["permit"], complexity_factors=["steep", "two-story"],
+    ).model_dump()
+
+    validate_extraction(extracted)
+
+    assert extracted["budget_min"] == 5000 and extracted["budget_max"] == 15000
+    assert extracted["urgency_level"] == "flexible"
+    assert extracted["contractor_requirements"]["count_needed"] == 4
+    assert extracted["contractor_type_ids"] == [127, 219]
+    assert extracted["complexity_score"] == 8
+
+
+def test_dates_are_parsed_locally_from_model_phrases_or_sentences():
+    extracted = {"urgency_level": "flexible", "date_phrases": ["need it done by Friday"]}
+
+    dates = extract_dates(extracted, [], now=NOW)
+
+    assert dates["project_completion_deadline"] == "2026-06-05"
+    assert dates["bid_collection_deadline"] == "2026-06-03"
+    assert dates["deadline_hard"] is True
+    assert extracted["urgency_level"] == "week"
+
+    fallback = extract_dates({"urgency_level": "month"}, ["Hi there. Our wedding June 20th is the deadline!"], now=NOW)
+    assert fallback["project_completion_deadline"] == "2026-06-20"
+    assert extract_dates({}, ["No rush at all"], now=NOW) == {}
+
+
+def test_bid_card_and_bid_document_are_written_in_one_insert(fake_supabase, monkeypatch):
+    monkeypatch.setattr(bid_card_utils.database_simple, "get_client", lambda: fake_supabase)
+    extracted = validate_extraction(JAAExtraction(
+        project_type="bathroom", project_description="Redo the shower",
+        location={"city": "Austin", "state": "TX", "zip_code": "78701"},
+    ).model_dump())
+    extracted.update(extract_dates({**extracted, "date_phrases": ["wedding June 20th"]}, [], now=NOW))
+
+    result = bid_card_utils.create_bid_card_with_defaults(
+        build_project_data("session_1234567890_thread_abcdefghijk", build_bid_card_data(extracted), extracted)
+    )
+
+    assert result["success"] and fake_supabase.executed == 1
+    [row] = fake_supabase.tables["bid_cards"]
+    assert row["location_city"] == "Austin" and row["description"] == "Redo the shower"
+    assert row["project_completion_deadline"] == "2026-06-20"
+    assert row["bid_document"]["bid_card_number"] == result["bid_card_number"]
+    assert row["bid_document"]["full_cia_thread_id"] == "session_1234567890_thread_abcdefghijk"
+    json.dumps(row)  # insert payload must be JSON-serializable
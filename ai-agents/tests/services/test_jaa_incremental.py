@@ -0,0 +1,78 @@
+from services.jaa_incremental import (
+    ExtractionState,
+    ExtractionStateStore,
+    build_delta_prompt,
+    merge_cia_facts,
+    merge_extraction,
+)
+
+
+def message(n, created_at, sender_type="user"):
+    return {"id": f"m{n}", "conversation_id": "conv-1", "sender_type": sender_type,
+            "content": f"turn {n}", "created_at": created_at}
+
+
+def test_merge_keeps_confident_facts_unions_lists_and_merges_nested_fields():
+    current = {"budget_max": 20000, "materials_specified": ["tile"], "location": {"city": "Austin", "zip_code": None}}
+    confidence = {"budget_max": 1.0, "materials_specified": 0.9, "location.city": 0.9}
+
+    changed = merge_extraction(current, confidence, {
+        "budget_max": 25000, "urgency_level": "week", "project_type": None,
+        "materials_specified": ["tile", "grout"], "location": {"city": None, "zip_code": "78701"},
+    }, {"budget_max": 0.5, "urgency_level": 0.8})
+
+    assert current["budget_max"] == 20000  # a much less confident guess does not overwrite
+    assert current["urgency_level"] == "week" and "project_type" not in current
+    assert current["materials_specified"] == ["tile", "grout"]
+    assert current["location"] == {"city": "Austin", "zip_code": "78701"}
+    assert sorted(changed) == ["location.zip_code", "materials_specified", "urgency_level"]
+
+    merge_extraction(current, confidence, {"budget_max": 30000}, {"budget_max": 0.85})
+    assert current["budget_max"] == 30000 and confidence["budget_max"] == 0.85
+
+    merge_cia_facts(ExtractionState("conv-1", current, confidence), {"budget_max": 18000, "zip_code": "78702"})
+    assert current["budget_max"] == 18000 and current["location"]["zip_code"] == "78702"
+
+
+def test_store_reads_only_messages_after_the_watermark(fake_supabase):
+    fake_supabase.tables.update({
+        "unified_conversations": [{"id": "conv-1", "metadata": {"session_id": "thread-1"}}],
+        "unified_conversation_memory": [{
+            "id": "mem-1", "conversation_id": "conv-1", "memory_key": "cia_state",
+            "memory_value": {"state": {"collected_info": {"project_type": "bathroom"}}},
+        }],
+        "unified_messages": [message(1, "2026-06-01T10:00"), message(2, "2026-06-01T10:01", "agent"),
+                             message(3, "2026-06-01T10:02")],
+    })
+    store = ExtractionStateStore(fake_supabase)
+
+    snapshot = store.load("thread-1")
+    assert snapshot.state is None and snapshot.collected_info == {"project_type": "bathroom"}
+    first = store.new_messages("conv-1")
+    assert [m["role"] for m in first] == ["user", "assistant", "user"]
+
+    state = ExtractionState("conv-1", {"project_type": "bathroom"}, {"project_type": 1.0})
+    state.advance(first)
+    store.save(state)
+
+    # A message with the same timestamp as the watermark and a later one
+    fake_supabase.tables["unified_messages"] += [message(4, "2026-06-01T10:02"), message(5, "2026-06-01T10:05")]
+    saved = store.load("thread-1").state
+    assert saved.extracted == {"project_type": "bathroom"} and saved.messages_processed == 3
+    delta = store.new_messages("conv-1", saved)
+    assert [m["id"] for m in delta] == ["m4", "m5"]
+
+    saved.advance(delta)
+    store.save(saved)
+    assert store.new_messages("conv-1", store.load("thread-1").state) == []
+    assert len(fake_supabase.tables["unified_conversation_memory"]) == 2
+
+
+def test_delta_prompt_grows_with_new_turns_not_history():
+    facts = {"project_type": "roofing", "budget_max": 12000, "project_analysis": "long analysis " * 50,
+             "materials_specified": []}
+
+    prompt = build_delta_prompt(facts, ["Actually make it metal roofing"])
+
+    assert "Actually make it metal roofing" in prompt and '"budget_max": 12000' in prompt
+    assert "long analysis" not in prompt and "materials_specified" not in prompt
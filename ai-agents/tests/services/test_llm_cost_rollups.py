@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import routers.llm_cost_api as llm_cost_api
+from services.llm_cost_rollups import GRAINS, LLM_COST_CHANNEL, LLMCostRollups, bucket_start
+from services.llm_cost_tracker import LLMCostTracker
+from utils.ws_backplane import InProcessBackplane, set_backplane
+
+NOW = datetime(2026, 10, 18, 14, 37, 12, tzinfo=timezone.utc)
+
+
+def apply_llm_usage_rollup(client, params):
+    """What the migration 021 function does"""
+    deltas = params["p_deltas"]
+    rows = client.tables.setdefault("llm_cost_rollups", [])
+    for grain in GRAINS:
+        key = {"grain": grain, "bucket_start": bucket_start(params["p_at"], grain).isoformat(),
+               "agent_name": params["p_agent_name"], "provider": params["p_provider"], "model": params["p_model"]}
+        row = next((r for r in rows if all(r[k] == v for k, v in key.items())), None)
+        if row is None:
+            row = {**key, **dict.fromkeys(deltas, 0)}
+            rows.append(row)
+        for name, value in deltas.items():
+            row[name] += value
+    if params["p_session_id"]:
+        sessions = client.tables.setdefault("llm_session_costs", [])
+        session = next((s for s in sessions if s["session_id"] == params["p_session_id"]), None)
+        if session is None:
+            session = {"session_id": params["p_session_id"], "user_id": params["p_user_id"], "agents": [],
+                       "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0,
+                       "first_call_at": params["p_at"], "last_call_at": params["p_at"]}
+            sessions.append(session)
+        if params["p_agent_name"] not in session["agents"]:
+            session["agents"].append(params["p_agent_name"])
+        for name in ("calls", "prompt_tokens", "completion_tokens", "cost_usd"):
+            session[name] += deltas[name]
+        session["last_call_at"] = max(session["last_call_at"], params["p_at"])
+
+
+@pytest.fixture
+def rollups(fake_supabase):
+    fake_supabase.functions["apply_llm_usage_rollup"] = apply_llm_usage_rollup
+    return LLMCostRollups(fake_supabase)
+
+
+def call(minutes_ago, agent="CIA", model="gpt-4o", cost=0.01, session_id=None, error=False):
+    return {"timestamp": (NOW - timedelta(minutes=minutes_ago)).isoformat(), "agent_name": agent,
+            "provider": "openai", "model": model, "session_id": session_id, "user_id": "u-1",
+            "prompt_tokens": 100, "completion_tokens": 50, "cost_usd": cost, "duration_ms": 200,
+            "error_occurred": error}
+
+
+def test_calls_roll_up_into_every_grain_and_dashboards_read_buckets(rollups, fake_supabase):
+    for minutes_ago in (0, 1, 1, 90, 60 * 30):
+        assert rollups.record(call(minutes_ago))
+    rollups.record(call(2, agent="IRIS", model="claude-3-haiku", cost=0.5, error=True))
+
+    rows = fake_supabase.tables["llm_cost_rollups"]
+    assert sum(r["calls"] for r in rows if r["grain"] == "day") == 6
+    assert len([r for r in rows if r["grain"] == "minute" and r["agent_name"] == "CIA"]) == 4
+
+    fake_supabase.executed = 0
+    dashboard = rollups.dashboard("daily", now=NOW)
+    assert fake_supabase.executed == 1
+    assert dashboard["summary"]["total_calls"] == 5 and dashboard["summary"]["error_count"] == 1
+    assert dashboard["summary"]["total_cost_usd"] == 0.54
+    assert dashboard["agent_breakdown"]["IRIS"]["models"]["claude-3-haiku"] == {"cost": 0.5, "calls": 1}
+    assert dashboard["model_comparison"][0]["model"] == "claude-3-haiku"
+    assert rollups.dashboard("weekly", agent_name="CIA", now=NOW)["summary"]["total_calls"] == 5
+
+    assert rollups.window_cost(NOW - timedelta(minutes=5)) == pytest.approx(0.53)
+    with pytest.raises(ValueError):
+        rollups.fetch("week", NOW)
+
+
+def test_monthly_views_are_paged_past_the_max_rows_cap(rollups, fake_supabase, monkeypatch):
+    monkeypatch.setattr("services.llm_cost_rollups.PAGE_SIZE", 20)
+    fake_supabase.max_rows = 20
+    for day in range(25):
+        for agent in ("CIA", "IRIS"):
+            rollups.record(call(60 * 24 * day, agent=agent))
+
+    fake_supabase.executed = 0
+    monthly = rollups.dashboard("monthly", now=NOW)
+    assert monthly["summary"]["total_calls"] == 50 and fake_supabase.executed == 3
+
+
+def test_sessions_keep_running_totals(rollups):
+    rollups.record(call(10, session_id="s-1", cost=0.2))
+    rollups.record(call(4, agent="JAA", session_id="s-1", cost=0.3))
+    rollups.record(call(3, session_id="s-2", cost=0.05))
+
+    assert rollups.session_cost("s-1") == pytest.approx(0.5)
+    sessions = rollups.expensive_sessions(limit=5, min_cost=0.1)
+    assert [s["session_id"] for s in sessions] == ["s-1"]
+    assert sessions[0]["agents_used"] == 2 and sessions[0]["total_calls"] == 2
+    assert sessions[0]["duration_minutes"] == 6
+
+
+@pytest.mark.asyncio
+async def test_dashboard_reads_run_off_the_event_loop(rollups, monkeypatch):
+    threads = []
+    read = rollups.dashboard
+    monkeypatch.setattr(rollups, "dashboard", lambda *a, **kw: threads.append(threading.get_ident()) or read(*a, **kw))
+    monkeypatch.setattr(llm_cost_api, "get_llm_cost_rollups", lambda: rollups)
+
+    response = await llm_cost_api.get_cost_dashboard(time_range="daily", agent_name=None)
+
+    assert response["success"] is True
+    assert threads and threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_tracked_calls_are_rolled_up_and_pushed_to_the_live_stream(rollups, fake_supabase, monkeypatch):
+    backplane = InProcessBackplane()
+    set_backplane(backplane)
+    monkeypatch.setattr(llm_cost_api, "get_llm_cost_rollups", lambda: rollups)
+    tracker = LLMCostTracker()
+    tracker.db = SimpleNamespace(client=fake_supabase)
+    tracker.rollups = rollups
+    fake_supabase.tables["llm_usage"] = []
+    try:
+        response = await llm_cost_api.stream_realtime_costs()
+        stream = response.body_iterator
+        snapshot = json.loads((await stream.__anext__())[len("data: "):])
+        assert snapshot["type"] == "snapshot" and snapshot["five_minute_summary"]["total_calls"] == 0
+
+        await tracker.track_llm_call("CIA", "openai", "gpt-4o", 1000, 500, 300,
+                                     context={"conversation_id": "conv-1"})
+
+        pushed = json.loads((await asyncio.wait_for(stream.__anext__(), 1))[len("data: "):])
+        assert pushed["type"] == "llm_call" and pushed["session_id"] == "conv-1"
+        assert await tracker.get_session_cost("conv-1") == pytest.approx(pushed["cost_usd"])
+        assert await tracker.get_daily_total() == pytest.approx(pushed["cost_usd"])
+
+        await stream.aclose()
+        assert LLM_COST_CHANNEL not in backplane.channels
+    finally:
+        set_backplane(None)
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from routers.contractor_websocket_routes import ContractorWebSocketManager
+from services.notification_inbox import NotificationInbox
+from utils.ws_backplane import InProcessBackplane
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def seed(fake_supabase, count=7):
+    fake_supabase.tables.update({
+        "contractor_leads": [{"id": "lead-9", "contractor_id": "c-1"}],
+        "notifications": [
+            {"id": f"n-{seq:03d}", "inbox_seq": seq, "recipient_id": "lead-9" if seq % 3 == 0 else "c-1",
+             "title": f"Update {seq}", "message": "m", "notification_type": "bid_card_change",
+             "bid_card_id": "bc-1", "created_at": f"2026-01-01T00:00:{seq:02d}", "is_read": seq == 2}
+            for seq in range(1, count + 1)
+        ] + [{"id": "n-other", "inbox_seq": 4, "recipient_id": "c-2", "title": "Not yours", "is_read": False}],
+    })
+
+
+def test_pages_follow_the_cursor_and_recipients_are_cached(fake_supabase):
+    seed(fake_supabase)
+    inbox = NotificationInbox(fake_supabase, page_size=3)
+
+    first = inbox.page("c-1")
+    second = inbox.page("c-1", first.cursor)
+
+    assert [n["id"] for n in first.notifications] == ["n-001", "n-003", "n-004"] and first.has_more
+    assert [n["cursor"] for n in second.notifications] == [5, 6, 7] and not second.has_more
+    assert inbox.page("c-1", second.cursor).notifications == []
+    assert [table for table, _ in fake_supabase.selects].count("contractor_leads") == 1
+
+
+def test_mark_read_is_bulk_and_scoped_to_the_contractor(fake_supabase):
+    seed(fake_supabase)
+    inbox = NotificationInbox(fake_supabase)
+    inbox.recipients("c-1")
+    fake_supabase.executed = 0
+
+    assert sorted(inbox.mark_read("c-1", ["n-001", "n-003", "n-other"])) == ["n-001", "n-003"]
+    assert sorted(inbox.mark_read("c-1", through_cursor=5)) == ["n-004", "n-005"]
+    assert fake_supabase.executed == 2
+    unread = {n["id"] for n in fake_supabase.tables["notifications"] if not n["is_read"]}
+    assert unread == {"n-006", "n-007", "n-other"}
+
+
+@pytest.mark.asyncio
+async def test_reconnects_replay_one_frame_from_their_cursor(fake_supabase):
+    seed(fake_supabase, count=12)
+    manager = ContractorWebSocketManager(InProcessBackplane(), NotificationInbox(fake_supabase, page_size=5))
+    tabs = [FakeSocket() for _ in range(3)]
+
+    await asyncio.gather(*(manager.connect("c-1", tab, cursor=4) for tab in tabs))
+
+    frames = [tab.sent[-1] for tab in tabs]
+    assert all(frame["type"] == "notification_batch" for frame in frames)
+    assert [n["cursor"] for n in frames[0]["notifications"]] == [5, 6, 7, 8, 9] and frames[0]["has_more"]
+    assert [table for table, _ in fake_supabase.selects].count("notifications") == 1  # shared by all tabs
+
+    await manager.send_pending_notifications("c-1", tabs[0])
+    assert [n["cursor"] for n in tabs[0].sent[-1]["notifications"]] == [10, 11, 12]
+
+    marked = await manager.mark_notifications_read("c-1", through_cursor=tabs[0].sent[-1]["cursor"])
+    assert len(marked) == 11 and all(tab.sent[-1]["type"] == "notifications_marked_read" for tab in tabs)
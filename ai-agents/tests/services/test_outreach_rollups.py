@@ -0,0 +1,101 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from agents.automation.followup_automation import FollowUpAutomation
+from agents.monitoring.response_monitor import ResponseMonitor
+from services.outreach_rollups import (
+    OutreachRollups,
+    fold_distributions,
+    fold_followups,
+    outreach_rollups_enabled,
+    summarize_followups,
+    summarize_outreach,
+)
+
+
+def _distributions(count=300, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    rows = []
+    for n in range(count):
+        sent = start + timedelta(hours=rng.randint(0, 24 * 20))
+        opened = sent + timedelta(hours=rng.randint(1, 48)) if rng.random() < 0.6 else None
+        responded = opened + timedelta(hours=rng.randint(1, 72)) if opened and rng.random() < 0.5 else None
+        rows.append({
+            "id": f"d{n}",
+            "bid_card_id": rng.choice(["bc-1", "bc-2", "bc-3"]),
+            "campaign_id": rng.choice(["camp-a", "camp-b", None]),
+            "distribution_method": rng.choice(["email", "sms", "website_form", None]),
+            "distributed_at": sent.isoformat(),
+            "opened_at": opened.isoformat() if opened else None,
+            "responded_at": responded.isoformat() if responded else None,
+            "interest_level": rng.choice(["high", "medium", "low", "none", None]) if responded else None,
+        })
+    return rows
+
+
+def _folded_rows(rows):
+    return [{"channel": bucket.channel, **counters} for bucket, counters in fold_distributions(rows).items()]
+
+
+def _assert_same(rollup, scan):
+    assert rollup["interest_breakdown"] == scan["interest_breakdown"]
+    assert rollup["channel_performance"] == scan["channel_performance"]
+    for key, value in scan["summary"].items():
+        assert rollup["summary"][key] == pytest.approx(value)
+
+
+@pytest.mark.parametrize("bid_card_id", [None, "bc-2"])
+def test_backfilled_rollups_match_row_scan(bid_card_id):
+    rows = [r for r in _distributions() if bid_card_id is None or r["bid_card_id"] == bid_card_id]
+    _assert_same(summarize_outreach(_folded_rows(rows)), ResponseMonitor._analytics_from_distributions(rows))
+
+
+def test_followup_rollups_match_log_scan():
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    logs = [
+        {"strategy": strategy, "channel": channel, "created_at": (start + timedelta(hours=n * 5)).isoformat()}
+        for n, (strategy, channel) in enumerate(
+            [("gentle_reminder", "email"), ("urgency", "sms"), ("gentle_reminder", "sms")] * 20
+        )
+    ]
+    buckets = [
+        {"day": day, "strategy": strategy, "channel": channel, "followups": count}
+        for (day, strategy, channel), count in fold_followups(logs).items()
+    ]
+
+    assert summarize_followups(buckets) == FollowUpAutomation._followup_stats_from_logs(logs)
+
+
+def test_analytics_scan_distributions_until_rollups_are_backfilled(fake_supabase, monkeypatch):
+    rows = _distributions(count=40)
+    fake_supabase.tables["bid_card_distributions"] = rows
+    monitor = ResponseMonitor.__new__(ResponseMonitor)
+    monitor.supabase, monitor.rollups = fake_supabase, OutreachRollups(fake_supabase)
+
+    monkeypatch.delenv("OUTREACH_ROLLUPS_ENABLED", raising=False)
+    monitor.use_rollups = outreach_rollups_enabled()
+    assert monitor.use_rollups is False
+
+    # Enabled, but the rollup table has not been backfilled yet
+    monkeypatch.setenv("OUTREACH_ROLLUPS_ENABLED", "true")
+    monitor.use_rollups = outreach_rollups_enabled()
+    analytics = monitor.get_response_analytics()
+    assert analytics["source"] == "distributions"
+    assert analytics["summary"]["total_sent"] == len(rows)
+
+
+def test_tracking_leaves_rollups_to_the_distribution_trigger(fake_supabase):
+    row = {**_distributions(count=1)[0], "opened_at": None, "responded_at": None, "interest_level": None}
+    fake_supabase.tables["bid_card_distributions"] = [row]
+    monitor = ResponseMonitor.__new__(ResponseMonitor)
+    monitor.supabase, monitor.rollups = fake_supabase, OutreachRollups(fake_supabase)
+
+    assert monitor.track_email_open(row["id"])["success"]
+
+    # Only the UPDATE touched the table: no read of the old row and no delta RPC
+    assert fake_supabase.selects == [("bid_card_distributions", "*")]
+    assert fake_supabase.rpc_calls == []
+    assert fake_supabase.tables["bid_card_distributions"][0]["status"] == "opened"
@@ -0,0 +1,96 @@
+import pytest
+
+from services.potential_bid_card_patch import FieldUpdate, PotentialBidCardPatcher, VersionConflict
+
+
+def seed(fake_supabase, **card):
+    fake_supabase.tables.update({
+        "potential_bid_cards": [{"id": "pbc-1", "version": 0, "field_confidence": {}, "primary_trade": "general",
+                                 **card}],
+        "cia_conversation_tracking": [{"potential_bid_card_id": "pbc-1", "fields_collected": {}}],
+    })
+    return fake_supabase.tables["potential_bid_cards"][0]
+
+
+def test_many_fields_land_in_one_versioned_write(fake_supabase):
+    card = seed(fake_supabase)
+    fake_supabase.executed = 0
+
+    result = PotentialBidCardPatcher(fake_supabase).apply("pbc-1", [
+        FieldUpdate("project_type", "kitchen", 0.9),
+        FieldUpdate("project_description", "New cabinets", 0.8),
+        FieldUpdate("zip_code", "94107", 0.95),
+        FieldUpdate("urgency_level", "week", 0.7),
+        FieldUpdate("materials", "quartz", 0.6),
+    ])
+
+    assert fake_supabase.executed == 4  # read, write, tracking read + write
+    assert result.version == 1 == card["version"] and result.completion["ready_for_conversion"]
+    assert card["user_scope_notes"] == "New cabinets" and card["materials_specified"] == ["quartz"]
+    assert card["field_confidence"]["zip_code"] == 0.95 and card["completion_percentage"] == result.completion["percentage"]
+    tracking = fake_supabase.tables["cia_conversation_tracking"][0]
+    assert set(tracking["fields_collected"]) == {"project_type", "project_description", "zip_code", "urgency_level",
+                                                 "materials"}
+
+
+def test_lower_confidence_does_not_overwrite_and_manual_edits_win(fake_supabase):
+    card = seed(fake_supabase, zip_code="94107", field_confidence={"zip_code": 0.95})
+    patcher = PotentialBidCardPatcher(fake_supabase)
+
+    result = patcher.apply("pbc-1", [FieldUpdate("zip_code", "94110", 0.5), FieldUpdate("budget_context", "flexible")])
+    assert result.skipped == ["zip_code"] and card["zip_code"] == "94107" and card["budget_context"] == "flexible"
+
+    patcher.apply("pbc-1", [FieldUpdate("zip_code", "94110", 0.5)], source="manual")
+    assert card["zip_code"] == "94110" and card["field_confidence"]["zip_code"] == 1.0 and card["version"] == 2
+
+    fake_supabase.executed = 0
+    assert patcher.apply("pbc-1", [FieldUpdate("zip_code", "94110", 1.0)]).version == 2
+    assert fake_supabase.executed == 1  # nothing changed, nothing written
+
+
+def test_concurrent_writers_do_not_lose_updates(fake_supabase):
+    card = seed(fake_supabase)
+    patcher = PotentialBidCardPatcher(fake_supabase)
+    load = patcher._load
+    raced = []
+
+    def racing_load(bid_card_id):
+        snapshot = dict(load(bid_card_id))
+        if not raced:  # another turn commits between our read and our write
+            raced.append(True)
+            card.update(version=card["version"] + 1, zip_code="94107")
+        return snapshot
+
+    patcher._load = racing_load
+    result = patcher.apply("pbc-1", [FieldUpdate("urgency_level", "week")])
+
+    assert result.retries == 1 and card["version"] == 2
+    assert card["zip_code"] == "94107" and card["urgency_level"] == "week"
+    assert card["completion_percentage"] == result.completion["percentage"]  # includes the other turn's zip
+
+    with pytest.raises(VersionConflict) as conflict:
+        patcher.apply("pbc-1", [FieldUpdate("budget_context", "tight")], expected_version=1)
+    assert conflict.value.current_version == 2 and "budget_context" not in card
+
+
+def test_unspecified_confidence_counts_as_certain_but_explicit_zero_is_kept(fake_supabase):
+    card = seed(fake_supabase)
+    patcher = PotentialBidCardPatcher(fake_supabase)
+
+    patcher.apply("pbc-1", [FieldUpdate("zip_code", "94107", 0.0), FieldUpdate("budget_context", "tight")])
+    assert card["field_confidence"] == {"zip_code": 0.0, "budget_context": 1.0}
+
+    # A CIA extraction replaces the zero-confidence guess
+    result = patcher.apply("pbc-1", [FieldUpdate("zip_code", "94110", 0.9)])
+    assert result.applied == ["zip_code"] and card["zip_code"] == "94110"
+
+
+def test_only_conversation_writes_defer_to_stored_confidence(fake_supabase):
+    card = seed(fake_supabase, zip_code="94107", field_confidence={"zip_code": 1.0})
+    patcher = PotentialBidCardPatcher(fake_supabase)
+
+    assert patcher.apply("pbc-1", [FieldUpdate("zip_code", "94110", 0.9)]).skipped == ["zip_code"]
+
+    result = patcher.apply("pbc-1", [FieldUpdate("zip_code", "94110", 0.6)], source="api")
+    assert result.applied == ["zip_code"] and card["zip_code"] == "94110"
+    assert card["field_confidence"]["zip_code"] == 0.6
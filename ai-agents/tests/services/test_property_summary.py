@@ -0,0 +1,51 @@
+from services.property_summary import PropertySummaryService
+
+
+def seed(fake_supabase, photos=(), **counts):
+    fake_supabase.tables.update({
+        "properties": [{"id": "prop-1", "name": "Home", "issues_indexed_at": None, **counts}],
+        "property_photos": [dict(photo) for photo in photos],
+    })
+
+
+def photo(photo_id, created_at, issues=()):
+    return {"id": photo_id, "property_id": "prop-1", "photo_url": f"https://cdn/{photo_id}.jpg",
+            "original_filename": f"{photo_id}.jpg", "created_at": created_at,
+            "ai_classification": {"detected_issues": list(issues)}}
+
+
+def test_dashboard_reads_counters_and_recent_photos_in_two_queries(fake_supabase):
+    photos = [photo(f"ph-{n}", f"2026-01-0{n}") for n in range(1, 8)]
+    seed(fake_supabase, photos, room_count=2, photo_count=7, asset_count=4)
+    fake_supabase.executed = 0
+
+    dashboard = PropertySummaryService(fake_supabase).dashboard("prop-1")
+
+    assert fake_supabase.executed == 2
+    assert dashboard["stats"] == {"room_count": 2, "photo_count": 7, "asset_count": 4, "maintenance_issue_count": 0}
+    assert dashboard["setup_complete"] and len(dashboard["recent_photos"]) == 5
+    assert "ai_classification" not in dashboard["recent_photos"][0]
+    assert PropertySummaryService(fake_supabase).dashboard("nope") is None
+
+
+def test_issues_are_indexed_once_then_served_from_the_index(fake_supabase):
+    seed(fake_supabase, [
+        photo("ph-1", "2026-01-01", ["Leaky faucet"]),
+        photo("ph-2", "2026-01-02", [{"description": "Cracked tile", "severity": "high"}, 42]),
+        photo("ph-3", "2026-01-03"),
+    ])
+    service = PropertySummaryService(fake_supabase)
+
+    issues = service.maintenance_issues("prop-1")
+
+    assert sorted(issue["id"] for issue in issues) == ["ph-1-0", "ph-2-0"]
+    cracked = next(issue for issue in issues if issue["photo_id"] == "ph-2")
+    assert cracked["severity"] == "high" and cracked["photo_url"] == "https://cdn/ph-2.jpg"
+    assert fake_supabase.tables["properties"][0]["issues_indexed_at"]
+
+    fake_supabase.selects.clear()
+    assert len(service.maintenance_issues("prop-1")) == 2
+    assert ("property_photos", "*") not in fake_supabase.selects
+    assert not any(table == "property_photos" and "ai_classification" in columns
+                   for table, columns in fake_supabase.selects)
+
@@ -0,0 +1,121 @@
+import asyncio
+import base64
+import io
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from services.vision_analysis_service import (
+    MAX_SHORT_SIDE,
+    VisionAnalysisCache,
+    VisionAnalysisService,
+    prepare_image,
+)
+
+
+def _jpeg_b64(width: int, height: int, color=(200, 50, 50)) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+class StubCompletions:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"analysis {len(self.calls)}"))]
+        )
+
+
+@pytest.fixture
+def service():
+    completions = StubCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    svc = VisionAnalysisService(cache=VisionAnalysisCache(db_client=None), async_client=client)
+    return svc, completions
+
+
+def test_prepare_image_hashes_content_not_wrapper():
+    raw = _jpeg_b64(64, 64)
+    assert prepare_image(raw).content_hash == prepare_image(f"data:image/jpeg;base64,{raw}").content_hash
+
+
+def test_prepare_image_downscales_to_effective_resolution():
+    prepared = prepare_image(_jpeg_b64(4000, 3000))
+    assert prepared.downscaled
+
+    data = base64.b64decode(prepared.data_url.split(",", 1)[1])
+    with Image.open(io.BytesIO(data)) as img:
+        assert min(img.size) == MAX_SHORT_SIDE
+
+
+def test_prepare_image_leaves_small_images_untouched():
+    raw = _jpeg_b64(300, 200)
+    prepared = prepare_image(raw)
+    assert not prepared.downscaled
+    assert prepared.data_url.endswith(raw)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_photos_hit_cache(service):
+    svc, completions = service
+    raw = _jpeg_b64(128, 128)
+
+    first = await svc.analyze(raw, "prompt", variant="iris")
+    second = await svc.analyze(f"data:image/jpeg;base64,{raw}", "prompt", variant="iris")
+
+    assert first == second
+    assert len(completions.calls) == 1
+    assert svc.cache.stats["memory_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_prompt_variant_is_part_of_key(service):
+    svc, completions = service
+    raw = _jpeg_b64(128, 128)
+
+    await svc.analyze(raw, "prompt a", variant="iris")
+    await svc.analyze(raw, "prompt b", variant="iris")
+
+    assert len(completions.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_many_runs_concurrently_and_collapses_duplicates(service):
+    svc, completions = service
+    a, b = _jpeg_b64(96, 96, (10, 10, 10)), _jpeg_b64(96, 96, (240, 240, 240))
+
+    results = await svc.analyze_many([a, b, a], "prompt", variant="cia")
+
+    assert len(results) == 3
+    assert results[0] == results[2]
+    assert len(completions.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_persistent_cache_is_read_off_the_event_loop(fake_supabase):
+    import threading
+
+    loop_thread = threading.get_ident()
+    lookups = []
+    table = fake_supabase.table
+
+    def tracking_table(name):
+        lookups.append(threading.get_ident())
+        return table(name)
+
+    fake_supabase.table = tracking_table
+    cache = VisionAnalysisCache(db_client=fake_supabase)
+    fake_supabase.tables["vision_analysis_cache"] = [
+        {"cache_key": VisionAnalysisCache.make_key("abc", "iris:v", "gpt-4o"), "response_text": "stored"}
+    ]
+
+    assert await cache.aget("abc", "iris:v", "gpt-4o") == "stored"
+    assert cache.stats["persistent_hits"] == 1 and lookups and loop_thread not in lookups
+    assert await cache.aget("abc", "iris:v", "gpt-4o") == "stored"
+    assert len(lookups) == 1  # second read served from memory
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+
+from admin.websocket_manager import AdminWebSocketManager, MessageType
+from routers.contractor_websocket_routes import ContractorWebSocketManager
+from utils.ws_backplane import BusBackplane, InProcessBackplane, MemoryBus, WebSocketBackplane
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def types(socket):
+    return [message["type"] for message in socket.sent]
+
+
+@pytest.mark.asyncio
+async def test_contractor_messages_reach_the_worker_holding_the_socket():
+    bus = MemoryBus()
+    worker_a = ContractorWebSocketManager(BusBackplane(bus, batch_window=0))
+    worker_b = ContractorWebSocketManager(BusBackplane(bus, batch_window=0))
+    socket = FakeSocket()
+    await worker_a.connect("c-1", socket)
+
+    local = await worker_b.send_personal_message("c-1", {"type": "bid_card_change", "bid_card_id": "bc-1"})
+    await worker_b.send_personal_message("c-2", {"type": "bid_card_change"})  # connected nowhere
+
+    assert local == 0 and types(socket)[-1] == "bid_card_change"
+    assert bus.subscribers["contractor:c-1"] == {worker_a.backplane}
+    assert worker_a.backplane.stats["received"] == 1
+
+    await worker_a.disconnect("c-1", socket)
+    assert not bus.subscribers["contractor:c-1"]
+    assert await worker_a.send_many({"c-1": {"type": "late"}}) == 0
+
+
+@pytest.mark.asyncio
+async def test_small_messages_are_batched_per_channel():
+    bus = MemoryBus()
+    sender = BusBackplane(bus, batch_window=0.01, batch_max=1000)
+    receiver = BusBackplane(bus)
+    received = []
+
+    async def handler(channel, message):
+        received.append((channel, message["n"]))
+        return 1
+
+    await receiver.subscribe("session:s1", handler)
+    await receiver.subscribe("session:s2", handler)
+    for n in range(30):
+        await sender.publish("session:s1" if n % 3 else "session:s2", {"n": n})
+    assert bus.published == [] and received == []
+
+    await asyncio.sleep(0.03)
+    assert len(bus.published) == 2 and sender.stats["flushes"] == 1
+    assert [n for channel, n in received if channel == "session:s1"] == [n for n in range(30) if n % 3]
+
+    # A large message goes out at once, together with whatever is queued
+    await sender.publish("session:s1", {"n": 99, "blob": "x" * 10000})
+    assert len(bus.published) == 3 and received[-1] == ("session:s1", 99)
+
+
+@pytest.mark.asyncio
+async def test_admin_broadcasts_route_by_subscription_across_workers():
+    bus = MemoryBus()
+    worker_a = AdminWebSocketManager(BusBackplane(bus, batch_window=0))
+    worker_b = AdminWebSocketManager(BusBackplane(bus, batch_window=0))
+    alice, bob = FakeSocket(), FakeSocket()
+    await worker_a.connect(alice, "client-a", "alice")
+    await worker_b.connect(bob, "client-b", "bob")
+    assert types(alice) == ["connection_status", "connection_status"]  # welcome + bob joined
+
+    await worker_b.subscribe_client("client-b", "campaigns")
+    await worker_a.broadcast_message(MessageType.CAMPAIGN_UPDATE, {"id": 1}, target_subscription="campaigns")
+    await worker_a.broadcast_message(MessageType.SYSTEM_ALERT, {"msg": "hi"})
+    assert bus.subscribers["admin:campaigns"] == {worker_b.backplane}
+    assert types(bob)[-2:] == ["campaign_update", "system_alert"] and types(alice)[-1] == "system_alert"
+
+    assert await worker_b.send_to_client("client-a", MessageType.AGENT_STATUS, {"agent": "cia"})
+    assert types(alice)[-1] == "agent_status"
+
+
+@pytest.mark.asyncio
+async def test_in_process_backplane_delivers_locally_without_forwarding():
+    manager = ContractorWebSocketManager(InProcessBackplane())
+    socket = FakeSocket()
+    await manager.connect("c-1", socket)
+
+    assert await manager.send_many({"c-1": {"type": "bid_card_change"}, "c-2": {"type": "x"}}) == 1
+    assert types(socket)[-1] == "bid_card_change"
+
+
+class SlowBusBackplane(BusBackplane):
+    """Transport whose subscribe round trips yield, like Redis"""
+
+    async def _listen(self, channel):
+        await asyncio.sleep(0.01)
+        await super()._listen(channel)
+
+    async def _unlisten(self, channel):
+        await asyncio.sleep(0.01)
+        await super()._unlisten(channel)
+
+
+@pytest.mark.asyncio
+async def test_fast_reconnect_keeps_the_channel_subscribed():
+    from utils.websocket_manager import WebSocketManager
+
+    bus = MemoryBus()
+    worker_a = WebSocketManager(SlowBusBackplane(bus, batch_window=0))
+    worker_b = WebSocketManager(BusBackplane(bus, batch_window=0))
+    old, new = FakeSocket(), FakeSocket()
+    await worker_a.connect(old, "u-1")
+
+    await asyncio.gather(worker_a.disconnect(old, "u-1"), worker_a.connect(new, "u-1"))
+    await worker_b.send_user_message({"type": "agent-activity"}, "u-1")
+
+    assert bus.subscribers["user:u-1"] == {worker_a.backplane}
+    assert types(new)[-1] == "agent-activity"
+
+    contractors = ContractorWebSocketManager(SlowBusBackplane(bus, batch_window=0))
+    await contractors.connect("c-1", old)
+    await asyncio.gather(contractors.disconnect("c-1", old), contractors.connect("c-1", new))
+    assert bus.subscribers["contractor:c-1"] == {contractors.backplane}
+
+
+def test_backplane_base_requires_a_transport():
+    class NoTransport(WebSocketBackplane):
+        pass
+
+    with pytest.raises(TypeError):
+        WebSocketBackplane()
+    with pytest.raises(TypeError):
+        NoTransport()
@@ -94,6 +94,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Dict[str, Any], None]:
     except Exception as e:
         logger.warning(f"Database pool initialization failed: {e}")
     
+    # Resume COIA research jobs left unfinished by a previous worker
+    try:
+        from routers.coia_landing_api import resume_research_jobs
+        resumed = await resume_research_jobs()
+        logger.info(f"COIA research queue ready ({resumed} jobs resumed)")
+    except Exception as e:
+        logger.warning(f"COIA research job resume failed: {e}")
+    
     yield {
         "http_client": _http_client
     }
@@ -105,6 +113,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Dict[str, Any], None]:
         await _http_client.aclose()
         logger.info("Async HTTP client closed")
     
+    # Stop local research jobs; their leases lapse and another worker resumes them
+    try:
+        from routers.coia_landing_api import shutdown_research_jobs
+        await shutdown_research_jobs()
+    except Exception as e:
+        logger.warning(f"COIA research job shutdown failed: {e}")
+    
+    # Flush queued WebSocket backplane messages and drop its subscriptions
+    try:
+        from utils.ws_backplane import get_backplane
+        await get_backplane().close()
+    except Exception as e:
+        logger.warning(f"WebSocket backplane shutdown failed: {e}")
+    
     # Close database pool
     try:
         from utils.database_pool import close_db_pool
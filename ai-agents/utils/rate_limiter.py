@@ -0,0 +1,64 @@
+"""
+Async token-bucket rate limiter for external API quotas.
+Shared by callers in the same process so concurrent tasks respect one quota.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket that hands out reservations instead of holding a lock.
+
+    Each acquire() takes its tokens immediately, letting the balance go
+    negative, and sleeps for exactly as long as it takes the bucket to
+    refill that debt. Callers are therefore served in FIFO order, bursts
+    up to `capacity` go through without waiting, and the limiter can be
+    shared across event loops (e.g. scripts calling asyncio.run repeatedly).
+    """
+
+    def __init__(self,
+                 rate: float,
+                 capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.total_acquired = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now and return how many seconds the caller must wait before using them"""
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+            self.total_acquired += 1
+            self.total_wait_seconds += wait
+            return wait
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until `tokens` are available; returns the time spent waiting"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
@@ -1,35 +1,55 @@
 """
 WebSocket Manager for Real-time Agent Updates
 Broadcasts agent activity events to connected clients
+
+User messages (channel user:{id}) and broadcasts (agent-activity) go through
+the WebSocket backplane, so they reach sockets held by any worker.
 """
 
 import asyncio
 import json
 import logging
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from fastapi import WebSocket
 from datetime import datetime
 
+from utils.ws_backplane import WebSocketBackplane, get_backplane, user_channel
+
+BROADCAST_CHANNEL = "agent-activity"
+
 logger = logging.getLogger(__name__)
 
 class WebSocketManager:
     """Manages WebSocket connections and broadcasts agent activity"""
     
-    def __init__(self):
+    def __init__(self, backplane: Optional[WebSocketBackplane] = None):
+        self._backplane = backplane
         # Store active connections by user_id
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # Store all connections for global broadcasts
         self.all_connections: Set[WebSocket] = set()
+        # Orders backplane subscribe/unsubscribe with the connection sets they follow
+        self.connection_lock = asyncio.Lock()
+
+    @property
+    def backplane(self) -> WebSocketBackplane:
+        """Process-wide backplane unless one was injected"""
+        return self._backplane or get_backplane()
         
     async def connect(self, websocket: WebSocket, user_id: str = None):
         """Accept a new WebSocket connection"""
         await websocket.accept()
-        self.all_connections.add(websocket)
-        
-        if user_id:
-            if user_id not in self.active_connections:
-                self.active_connections[user_id] = set()
-            self.active_connections[user_id].add(websocket)
+        backplane = self.backplane
+        async with self.connection_lock:
+            if not self.all_connections:
+                await backplane.subscribe(BROADCAST_CHANNEL, self._deliver_broadcast)
+            self.all_connections.add(websocket)
+            
+            if user_id:
+                if user_id not in self.active_connections:
+                    self.active_connections[user_id] = set()
+                    await backplane.subscribe(user_channel(user_id), self._deliver_to_user)
+                self.active_connections[user_id].add(websocket)
             
         logger.info(f"WebSocket connected for user: {user_id or 'anonymous'}")
         
@@ -40,14 +60,19 @@ class WebSocketManager:
             "timestamp": datetime.utcnow().isoformat()
         }, websocket)
     
-    def disconnect(self, websocket: WebSocket, user_id: str = None):
+    async def disconnect(self, websocket: WebSocket, user_id: str = None):
         """Remove a WebSocket connection"""
-        self.all_connections.discard(websocket)
-        
-        if user_id and user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+        backplane = self.backplane
+        async with self.connection_lock:
+            self.all_connections.discard(websocket)
+            if not self.all_connections:
+                await backplane.unsubscribe(BROADCAST_CHANNEL, self._deliver_broadcast)
+            
+            if user_id and user_id in self.active_connections:
+                self.active_connections[user_id].discard(websocket)
+                if not self.active_connections[user_id]:
+                    del self.active_connections[user_id]
+                    await backplane.unsubscribe(user_channel(user_id), self._deliver_to_user)
                 
         logger.info(f"WebSocket disconnected for user: {user_id or 'anonymous'}")
     
@@ -60,27 +85,34 @@ class WebSocketManager:
             self.all_connections.discard(websocket)
     
     async def send_user_message(self, message: dict, user_id: str):
-        """Send message to all connections for a specific user"""
+        """Send message to all connections for a specific user, on any worker"""
+        await self.backplane.publish(user_channel(user_id), message)
+
+    async def _deliver_to_user(self, channel: str, message: dict) -> int:
+        user_id = channel.split(":", 1)[1]
+        sent = 0
         if user_id in self.active_connections:
             disconnected = []
-            for connection in self.active_connections[user_id]:
+            for connection in list(self.active_connections[user_id]):
                 try:
                     await connection.send_text(json.dumps(message))
+                    sent += 1
                 except Exception as e:
                     logger.error(f"Error sending to user {user_id}: {e}")
                     disconnected.append(connection)
             
             # Clean up disconnected connections
             for conn in disconnected:
-                self.disconnect(conn, user_id)
+                await self.disconnect(conn, user_id)
+        return sent
     
     async def broadcast(self, message: str):
-        """Broadcast message to all connected clients"""
-        if not self.all_connections:
-            return
-            
+        """Broadcast message to all connected clients, on every worker"""
+        await self.backplane.publish(BROADCAST_CHANNEL, message)
+
+    async def _deliver_broadcast(self, channel: str, message: str) -> int:
         disconnected = []
-        for connection in self.all_connections:
+        for connection in list(self.all_connections):
             try:
                 await connection.send_text(message)
             except Exception as e:
@@ -90,6 +122,7 @@ class WebSocketManager:
         # Clean up disconnected connections
         for conn in disconnected:
             self.all_connections.discard(conn)
+        return len(self.all_connections)
     
     async def broadcast_agent_activity(
         self,
@@ -0,0 +1,337 @@
+"""
+WebSocket pub/sub backplane.
+Routes WebSocket messages to whichever worker holds the socket.
+
+Connection managers subscribe a channel (contractor id, admin subscription,
+session id, ...) while they hold at least one socket for it and publish to
+channels instead of iterating their own dicts. publish() delivers to local
+subscribers right away and forwards the message to the other workers through
+the transport; only workers subscribed to that channel receive it.
+
+- InProcessBackplane: single worker, nothing is forwarded (default)
+- RedisBackplane: Redis pub/sub, one Redis channel per backplane channel;
+  small messages are batched per flush into one PUBLISH per channel, all
+  sent in one pipeline round trip
+- MemoryBus + BusBackplane: several "workers" in one process sharing an
+  in-memory bus, the test stand-in for Redis
+
+WS_BACKPLANE=redis (with REDIS_URL) selects Redis; anything else in-process.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKPLANE_KIND = os.getenv("WS_BACKPLANE", "inprocess").lower()
+BATCH_WINDOW_SECONDS = float(os.getenv("WS_BACKPLANE_BATCH_MS", "5")) / 1000
+BATCH_MAX_MESSAGES = int(os.getenv("WS_BACKPLANE_BATCH_MAX", "100"))
+# Messages above this size are forwarded immediately instead of waiting for a batch
+BATCH_MAX_MESSAGE_BYTES = int(os.getenv("WS_BACKPLANE_BATCH_BYTES", "8192"))
+
+# Handlers return how many sockets they delivered to (None counts as 0)
+Handler = Callable[[str, Any], Awaitable[Optional[int]]]
+
+
+def contractor_channel(contractor_id: str) -> str:
+    return f"contractor:{contractor_id}"
+
+
+def admin_channel(subscription: Optional[str] = None) -> str:
+    return f"admin:{subscription}" if subscription else "admin"
+
+
+def admin_client_channel(client_id: str) -> str:
+    return f"admin-client:{client_id}"
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def session_channel(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+class WebSocketBackplane(ABC):
+    """
+    Local subscription registry plus batched forwarding.
+
+    Subclasses provide the transport: _listen/_unlisten when a channel gains
+    its first or loses its last local handler, and _send for a flush.
+    Transport changes are serialized and reconcile with the current handlers,
+    so an unsubscribe racing a re-subscribe never leaves a live handler
+    without its transport subscription.
+    """
+
+    forwards = False
+
+    def __init__(self,
+                 batch_window: float = BATCH_WINDOW_SECONDS,
+                 batch_max: int = BATCH_MAX_MESSAGES,
+                 batch_max_bytes: int = BATCH_MAX_MESSAGE_BYTES):
+        self.worker_id = uuid.uuid4().hex
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        self.batch_max_bytes = batch_max_bytes
+        self._handlers: dict[str, list[Handler]] = {}
+        self._listening: set[str] = set()
+        self._transport_lock = asyncio.Lock()
+        self._outbox: dict[str, list[str]] = {}
+        self._queued = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats: Counter = Counter()
+
+    @property
+    def channels(self) -> set[str]:
+        return set(self._handlers)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        handlers = self._handlers.setdefault(channel, [])
+        if handler in handlers:
+            return
+        handlers.append(handler)
+        if len(handlers) == 1 and self.forwards:
+            await self._sync_transport(channel)
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        if self._remove(channel, handler) and self.forwards:
+            await self._sync_transport(channel)
+
+    def unsubscribe_nowait(self, channel: str, handler: Handler) -> None:
+        """unsubscribe() for sync paths; the transport side runs as a task"""
+        if self._remove(channel, handler) and self.forwards:
+            try:
+                asyncio.get_running_loop().create_task(self._sync_transport(channel))
+            except RuntimeError:
+                pass
+
+    async def _sync_transport(self, channel: str) -> None:
+        """Listen while the channel has local handlers and unlisten once it has none"""
+        async with self._transport_lock:
+            if channel in self._handlers and channel not in self._listening:
+                await self._listen(channel)
+                self._listening.add(channel)
+            elif channel not in self._handlers and channel in self._listening:
+                await self._unlisten(channel)
+                self._listening.discard(channel)
+
+    def _remove(self, channel: str, handler: Handler) -> bool:
+        """Drop a handler; True when the channel has no local handlers left"""
+        handlers = self._handlers.get(channel)
+        if not handlers or handler not in handlers:
+            return False
+        handlers.remove(handler)
+        if handlers:
+            return False
+        del self._handlers[channel]
+        return True
+
+    async def publish(self, channel: str, message: Any) -> int:
+        """Deliver to local subscribers now and forward to other workers; returns local deliveries"""
+        self.stats["published"] += 1
+        delivered = await self._deliver(channel, [message])
+        if self.forwards:
+            encoded = json.dumps(message, default=str)
+            self._outbox.setdefault(channel, []).append(encoded)
+            self._queued += 1
+            if (self.batch_window <= 0 or self._queued >= self.batch_max
+                    or len(encoded) > self.batch_max_bytes):
+                await self.flush()
+            elif self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_later())
+        return delivered
+
+    async def flush(self) -> None:
+        """Forward everything queued: one payload per channel, one transport call"""
+        if not self._outbox:
+            return
+        outbox, self._outbox, self._queued = self._outbox, {}, 0
+        payloads = {
+            channel: '{"origin": %s, "messages": [%s]}' % (json.dumps(self.worker_id), ",".join(messages))
+            for channel, messages in outbox.items()
+        }
+        self.stats["batches"] += len(payloads)
+        self.stats["flushes"] += 1
+        try:
+            await self._send(payloads)
+        except Exception as e:
+            logger.warning(f"WebSocket backplane forward failed ({len(payloads)} channels): {e}")
+
+    async def close(self) -> None:
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.batch_window)
+        await self.flush()
+
+    async def _deliver(self, channel: str, messages: list[Any]) -> int:
+        delivered = 0
+        for handler in list(self._handlers.get(channel, ())):
+            for message in messages:
+                try:
+                    delivered += await handler(channel, message) or 0
+                except Exception as e:
+                    logger.error(f"WebSocket backplane handler failed on {channel}: {e}")
+        self.stats["delivered"] += delivered
+        return delivered
+
+    async def _receive(self, channel: str, payload: str) -> None:
+        """A forwarded batch from the transport; our own batches were delivered at publish"""
+        batch = json.loads(payload)
+        if batch.get("origin") == self.worker_id:
+            return
+        self.stats["received"] += len(batch["messages"])
+        await self._deliver(channel, batch["messages"])
+
+    # ---- transport ------------------------------------------------------
+
+    @abstractmethod
+    async def _listen(self, channel: str) -> None:
+        ...
+
+    @abstractmethod
+    async def _unlisten(self, channel: str) -> None:
+        ...
+
+    @abstractmethod
+    async def _send(self, payloads: dict[str, str]) -> None:
+        ...
+
+
+class InProcessBackplane(WebSocketBackplane):
+    """Single-worker backplane: local delivery only"""
+
+    # forwards is False, so the transport is never used
+
+    async def _listen(self, channel: str) -> None:
+        pass
+
+    async def _unlisten(self, channel: str) -> None:
+        pass
+
+    async def _send(self, payloads: dict[str, str]) -> None:
+        pass
+
+
+class MemoryBus:
+    """In-memory stand-in for Redis pub/sub shared by several BusBackplane workers"""
+
+    def __init__(self):
+        self.subscribers: dict[str, set[WebSocketBackplane]] = {}
+        self.published: list[tuple[str, str]] = []
+
+    async def publish(self, channel: str, payload: str) -> int:
+        self.published.append((channel, payload))
+        receivers = list(self.subscribers.get(channel, ()))
+        for backplane in receivers:
+            await backplane._receive(channel, payload)
+        return len(receivers)
+
+
+class BusBackplane(WebSocketBackplane):
+    """A worker attached to a MemoryBus"""
+
+    forwards = True
+
+    def __init__(self, bus: MemoryBus, **kwargs):
+        super().__init__(**kwargs)
+        self.bus = bus
+
+    async def _listen(self, channel: str) -> None:
+        self.bus.subscribers.setdefault(channel, set()).add(self)
+
+    async def _unlisten(self, channel: str) -> None:
+        self.bus.subscribers.get(channel, set()).discard(self)
+
+    async def _send(self, payloads: dict[str, str]) -> None:
+        for channel, payload in payloads.items():
+            await self.bus.publish(channel, payload)
+
+
+class RedisBackplane(WebSocketBackplane):
+    """Redis pub/sub transport; each worker subscribes only the channels it holds sockets for"""
+
+    forwards = True
+
+    def __init__(self, url: Optional[str] = None, prefix: str = "instabids:ws:", **kwargs):
+        super().__init__(**kwargs)
+        import redis.asyncio as aioredis
+
+        self.prefix = prefix
+        self.client = aioredis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"),
+                                        decode_responses=True)
+        self.pubsub = self.client.pubsub()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def _listen(self, channel: str) -> None:
+        try:
+            await self.pubsub.subscribe(self.prefix + channel)
+        except Exception as e:
+            logger.warning(f"Redis backplane subscribe failed for {channel}: {e}")
+            return
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def _unlisten(self, channel: str) -> None:
+        try:
+            await self.pubsub.unsubscribe(self.prefix + channel)
+        except Exception as e:
+            logger.warning(f"Redis backplane unsubscribe failed for {channel}: {e}")
+
+    async def _send(self, payloads: dict[str, str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for channel, payload in payloads.items():
+                pipe.publish(self.prefix + channel, payload)
+            await pipe.execute()
+
+    async def _read(self) -> None:
+        # listen() ends once nothing is subscribed; _listen starts a new reader
+        async for message in self.pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                await self._receive(message["channel"][len(self.prefix):], message["data"])
+            except Exception as e:
+                logger.error(f"Redis backplane dropped a batch: {e}")
+
+    async def close(self) -> None:
+        await super().close()
+        if self._reader and not self._reader.done():
+            self._reader.cancel()
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+_backplane: Optional[WebSocketBackplane] = None
+
+
+def _default_backplane() -> WebSocketBackplane:
+    if BACKPLANE_KIND == "redis":
+        try:
+            return RedisBackplane()
+        except Exception as e:
+            logger.warning(f"Redis backplane unavailable, WebSockets stay worker-local: {e}")
+    return InProcessBackplane()
+
+
+def get_backplane() -> WebSocketBackplane:
+    """Return the process-wide WebSocket backplane"""
+    global _backplane
+    if _backplane is None:
+        _backplane = _default_backplane()
+    return _backplane
+
+
+def set_backplane(backplane: Optional[WebSocketBackplane]) -> None:
+    """Replace the process-wide backplane (tests, custom transports); None resets to the default"""
+    global _backplane
+    _backplane = backplane